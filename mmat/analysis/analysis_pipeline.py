@@ -0,0 +1,170 @@
+# mmat/analysis/analysis_pipeline.py
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from mmat.utils.image_utils import ImageSource, describe_image
+from mmat.utils.logger import Logger
+
+class AnalysisPipeline:
+    """
+    Runs screenshot analysis on a bounded pool of background workers so test steps
+    do not wait for model round-trips.
+
+    submit() blocks once `max_pending` analyses are queued or running, which keeps
+    memory bounded when the model is slower than the browser. drain() waits for all
+    outstanding analyses and must be called before the run report is written.
+    """
+    def __init__(self, screenshot_analyzer, max_workers: int = 2, max_pending: int = 8):
+        """
+        Initializes the AnalysisPipeline.
+
+        Args:
+            screenshot_analyzer: The ScreenshotAnalyzer used by the workers.
+            max_workers: Number of analyses running at the same time.
+            max_pending: Maximum number of analyses queued or running before submit() blocks.
+        """
+        self.logger = Logger(__name__)
+        self.screenshot_analyzer = screenshot_analyzer
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mmat-analysis")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self.stats: Dict[str, int] = {"submitted": 0, "completed": 0, "failed": 0, "backpressure_waits": 0}
+
+    def submit(self, screenshot_path: ImageSource, on_result: Optional[Callable[[Optional[Dict[str, Any]], Optional[Exception]], None]] = None) -> Future:
+        """
+        Queues a screenshot for analysis.
+
+        Args:
+            screenshot_path: The file path to the screenshot image, or the encoded image bytes.
+            on_result: Called from the worker thread with (result, None) on success or
+                       (None, exception) on failure, e.g. to attach the result to its step.
+
+        Returns:
+            A Future resolving to the analysis result.
+        """
+        return self._queue(self._analyze, screenshot_path, on_result, description=describe_image(screenshot_path), count=1)
+
+    def submit_batch(self, screenshot_paths: List[ImageSource], on_results: Optional[List[Optional[Callable]]] = None) -> Future:
+        """
+        Queues the screenshots of a whole test case as one batch. The batch takes one
+        queue slot and one worker; the vision model sends its requests concurrently.
+
+        Args:
+            screenshot_paths: The file paths of the screenshot images, or their encoded bytes.
+            on_results: Optional callbacks, one per screenshot, called like the
+                        on_result callback of submit().
+
+        Returns:
+            A Future resolving to the list of results (None for failed analyses).
+        """
+        on_results = on_results or [None] * len(screenshot_paths)
+        return self._queue(self._analyze_batch, screenshot_paths, on_results,
+                           description=f"a batch of {len(screenshot_paths)} screenshots", count=len(screenshot_paths))
+
+    def _queue(self, work: Callable, paths, callbacks, description: str, count: int) -> Future:
+        """Takes a queue slot (waiting if the pipeline is full) and hands the work to the executor."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["backpressure_waits"] += 1
+            self.logger.debug(f"Analysis queue full ({self.max_pending}); waiting before queuing {description}")
+            self._slots.acquire()
+
+        with self._lock:
+            self.stats["submitted"] += count
+        try:
+            # Run in a copy of the submitter's context, so tracing spans nest under its step
+            future = self._executor.submit(contextvars.copy_context().run, work, paths, callbacks)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _analyze(self, screenshot_path: ImageSource, on_result) -> Optional[Dict[str, Any]]:
+        """Worker body: analyzes one screenshot and reports the outcome."""
+        try:
+            result = self.screenshot_analyzer.analyze_screenshot(screenshot_path)
+        except Exception as e:
+            self.logger.error(f"Background analysis of {describe_image(screenshot_path)} failed: {e}")
+            with self._lock:
+                self.stats["failed"] += 1
+            if on_result:
+                on_result(None, e)
+            return None
+
+        with self._lock:
+            self.stats["completed"] += 1
+        if on_result:
+            on_result(result, None)
+        return result
+
+    def _analyze_batch(self, screenshot_paths: List[ImageSource], on_results: List[Optional[Callable]]) -> List[Optional[Dict[str, Any]]]:
+        """Worker body: analyzes a batch of screenshots and reports each outcome."""
+        try:
+            outcomes = self.screenshot_analyzer.analyze_screenshots(screenshot_paths, return_exceptions=True)
+        except Exception as e:
+            outcomes = [e] * len(screenshot_paths)
+
+        results = []
+        for screenshot_path, outcome, on_result in zip(screenshot_paths, outcomes, on_results):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Background analysis of {describe_image(screenshot_path)} failed: {outcome}")
+                with self._lock:
+                    self.stats["failed"] += 1
+                if on_result:
+                    on_result(None, outcome)
+                results.append(None)
+                continue
+            with self._lock:
+                self.stats["completed"] += 1
+            if on_result:
+                on_result(outcome, None)
+            results.append(outcome)
+        return results
+
+    def _on_done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def pending(self) -> int:
+        """Returns the number of analyses queued or running."""
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for all queued and running analyses to finish.
+
+        Args:
+            timeout: Maximum number of seconds to wait per outstanding analysis.
+
+        Returns:
+            True if every analysis finished, False if the timeout expired.
+        """
+        with self._lock:
+            outstanding = list(self._pending)
+        if outstanding:
+            self.logger.info(f"Waiting for {len(outstanding)} screenshot analyses to finish...")
+        finished = True
+        for future in outstanding:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                # Failures are already reported through on_result and the stats
+                if not future.done():
+                    finished = False
+        return finished
+
+    def shutdown(self):
+        """Drains the pipeline and stops the workers."""
+        self.drain()
+        self._executor.shutdown(wait=True)
@@ -5,7 +5,6 @@ from mmat.analysis.screenshot_analyzer import ScreenshotAnalyzer
 from mmat.graph.graph_api import GraphAPI
 from mmat.models.reasoning_model import ReasoningModel
 from mmat.models.vision_model import VisionModel
-from mmat.environment.environment import Environment
 from mmat.utils.logger import Logger
 from typing import Dict, Any
 
@@ -14,7 +13,7 @@ class Analyzer:
     Coordinates different analysis modules (HTML, Screenshot) to gather information
     about the application under test and update the knowledge graph.
     """
-    def __init__(self, reasoning_model: ReasoningModel, vision_model: VisionModel, graph_api: GraphAPI, environment: Environment):
+    def __init__(self, reasoning_model: ReasoningModel, vision_model: VisionModel, graph_api: GraphAPI, driver):
         """
         Initializes the Analyzer.
 
@@ -22,10 +21,10 @@ class Analyzer:
             reasoning_model: An instance of the ReasoningModel.
             vision_model: An instance of the VisionModel.
             graph_api: An instance of the GraphAPI.
-            environment: The current test environment.
+            driver: The browser driver of the current test (a PlaywrightDriver).
         """
         self.logger = Logger(__name__)
-        self.html_analyzer = HTMLAnalyzer(reasoning_model, graph_api, environment)
+        self.html_analyzer = HTMLAnalyzer(reasoning_model, graph_api, driver)
         self.screenshot_analyzer = ScreenshotAnalyzer(vision_model, graph_api)
         self.graph_api = graph_api
 
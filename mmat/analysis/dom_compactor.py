@@ -0,0 +1,369 @@
+# mmat/analysis/dom_compactor.py
+
+import math
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Union
+
+from mmat.driver.dom_snapshot import INTERACTIVE_TAGS, KEPT_ATTRIBUTES, SKIPPED_TAGS, DomNode, DomSnapshot
+
+# Longest group of siblings recognized as the repeated unit of a list, e.g. a link
+# and a price lifted out of their list item
+MAX_GROUP = 4
+
+# Elements without an end tag
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"})
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+_WORD_PATTERN = re.compile(r"[A-Za-z][a-z]*|[a-z]+|\d+")
+_QUOTED_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"')
+_STOPWORDS = frozenset({"a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "is", "it", "of", "on",
+                        "or", "the", "then", "to", "with", "should", "be", "that", "this", "page", "user"})
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text for the model's tokenizer.
+
+    A fast local approximation of BPE tokenizers: a word counts one token per five
+    letters, every number one token per three digits and every punctuation mark one
+    token. It errs on the high side for English text and markup.
+    """
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        count += max(1, math.ceil(len(piece) / 5)) if piece[0].isalpha() else 1
+    return count
+
+def keywords(description: Optional[str]) -> List[str]:
+    """Returns the lower-case words of a step description used to rank elements (camelCase is split)."""
+    words = [word.lower() for word in _WORD_PATTERN.findall(description or "")]
+    return sorted({word for word in words if len(word) > 1 and word not in _STOPWORDS})
+
+class CompactedDom:
+    """The result of a DomCompactor: the outline sent to the model and what was left out."""
+    __slots__ = ("text", "tokens", "elements", "elements_kept", "repeats_collapsed")
+
+    def __init__(self, text: str, tokens: int, elements: int, elements_kept: int, repeats_collapsed: int):
+        self.text = text
+        self.tokens = tokens                      # Estimated tokens of the text
+        self.elements = elements                  # Elements of the page
+        self.elements_kept = elements_kept        # Elements in the text
+        self.repeats_collapsed = repeats_collapsed  # Repeated elements replaced by a count
+
+class _Entry:
+    """One line of the outline: an element's label and its children."""
+    __slots__ = ("label", "shape", "interactive", "children", "score", "subtree_score")
+
+    def __init__(self, label: str, shape: str, interactive: bool, children: List["_Entry"]):
+        self.label = label
+        self.shape = shape  # Equal for elements that only differ by their texts and attribute values
+        self.interactive = interactive
+        self.children = children
+        self.score = 0
+        self.subtree_score = 0
+
+class _HtmlTreeBuilder(HTMLParser):
+    """Builds a DomNode tree of an HTML document with the pruning rules of DOM_SNAPSHOT_SCRIPT."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root: Dict[str, Any] = {"tag": "body", "attrs": {}, "text": [], "children": []}
+        self._stack = [self.root]
+        self._skip_depth = 0  # Open elements inside a skipped or hidden element
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: value if value is not None else "" for name, value in attrs}
+        if tag in VOID_TAGS:
+            if not self._skip_depth and not self._hidden(attributes):
+                self._current()["children"].append({"tag": tag, "attrs": attributes, "text": [], "children": []})
+            return
+        if self._skip_depth or tag in SKIPPED_TAGS or self._hidden(attributes):
+            self._skip_depth += 1
+            self._stack.append({"tag": tag, "skipped": True})
+            return
+        if tag in ("html", "body"):
+            self._stack.append({"tag": tag, "transparent": True})
+            return
+        element = {"tag": tag, "attrs": attributes, "text": [], "children": []}
+        self._current()["children"].append(element)
+        self._stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Close unclosed elements up to the matching start tag; stray end tags are ignored
+        if not any(element["tag"] == tag for element in self._stack[1:]):
+            return
+        while len(self._stack) > 1:
+            element = self._stack.pop()
+            if element.get("skipped"):
+                self._skip_depth -= 1
+            if element["tag"] == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current()["text"].append(data)
+
+    def _current(self) -> Dict[str, Any]:
+        """Returns the innermost open element that is not transparent."""
+        for element in reversed(self._stack):
+            if not element.get("transparent"):
+                return element
+        return self.root
+
+    @staticmethod
+    def _hidden(attributes: Dict[str, str]) -> bool:
+        style = attributes.get("style", "").replace(" ", "").lower()
+        return ("hidden" in attributes or attributes.get("aria-hidden") == "true" or attributes.get("type") == "hidden"
+                or "display:none" in style or "visibility:hidden" in style)
+
+    @classmethod
+    def prune(cls, element: Dict[str, Any]) -> List[DomNode]:
+        """Turns a parsed element into DomNodes: kept elements, or the kept descendants of a dropped one."""
+        children = [node for child in element["children"] for node in cls.prune(child)]
+        text = _clip(" ".join("".join(element["text"]).split()))
+        attrs = element["attrs"]
+        role = attrs.get("role") or None
+        interactive = (element["tag"] in INTERACTIVE_TAGS or role is not None or "tabindex" in attrs
+                       or "onclick" in attrs or attrs.get("contenteditable") == "true")
+        if not interactive and not text:
+            return children
+        attributes = {name: _clip(attrs[name]) for name in KEPT_ATTRIBUTES if name in attrs}
+        if element["tag"] in ("input", "textarea") and attrs.get("type") != "password" and attrs.get("value"):
+            attributes["value"] = _clip(attrs["value"])
+        if "checked" in attrs:
+            attributes["checked"] = ""
+        return [DomNode(element["tag"], role, text or None, attributes, children)]
+
+def _clip(text: str) -> str:
+    return text if len(text) <= 80 else text[:77] + "..."
+
+def parse_html(html: str) -> DomSnapshot:
+    """
+    Builds a DOM snapshot of an HTML document, like DOM_SNAPSHOT_SCRIPT does for a
+    live page: scripts, styles and hidden elements are stripped and only elements
+    that are interactive, carry a role or hold text are kept. Form field values
+    are those of the markup.
+    """
+    builder = _HtmlTreeBuilder()
+    builder.feed(html)
+    builder.close()
+    root = builder.root
+    return DomSnapshot(DomNode("body", children=[node for child in root["children"] for node in _HtmlTreeBuilder.prune(child)]))
+
+class DomCompactor:
+    """
+    Compacts a page's DOM into an outline that fits a token budget of the reasoning
+    model's prompt.
+
+    The outline has one line per element, indented by nesting. Runs of `min_repeat`
+    or more consecutive siblings with the same structure (list items, table rows,
+    search results) are collapsed into the first one as a template and a count;
+    siblings matching the step description are kept. If the outline still exceeds
+    `token_budget`, the elements most relevant to the description (and interactive
+    elements after them) are kept with their ancestors, in document order.
+    """
+    def __init__(self, token_budget: int = 1500, min_repeat: int = 3):
+        """
+        Initializes the DomCompactor.
+
+        Args:
+            token_budget: Largest estimated number of tokens of an outline (see estimate_tokens).
+            min_repeat: Shortest run of alike siblings that is collapsed.
+        """
+        self.token_budget = max(1, token_budget)
+        self.min_repeat = max(2, min_repeat)
+
+    def compact(self, dom: Union[str, DomSnapshot, DomNode], description: Optional[str] = None) -> CompactedDom:
+        """
+        Compacts a DOM for a model prompt.
+
+        Args:
+            dom: A DomSnapshot or DomNode, an HTML document, or an outline as rendered
+                 by DomSnapshot.render() (indented lines, e.g. from HTMLAnalyzer).
+            description: The step or element description the elements are ranked by.
+
+        Returns:
+            The compacted outline and its statistics.
+        """
+        entries = self._entries(dom)
+        elements = sum(self._count(entry) for entry in entries)
+        terms = keywords(description)
+        for entry in entries:
+            self._score(entry, terms)
+        collapsed = sum(self._collapse(entry) for entry in entries)
+        entries, count = self._collapse_run_list(entries)
+        collapsed += count
+
+        lines: List[tuple] = []  # (depth, entry) in document order
+        for entry in entries:
+            self._flatten(entry, 0, lines)
+        text = self._render(lines)
+        tokens = estimate_tokens(text)
+        kept = self._elements(lines)
+        if tokens > self.token_budget:
+            text, kept = self._truncate(entries)
+            tokens = estimate_tokens(text)
+        return CompactedDom(text, tokens, elements, kept, collapsed)
+
+    def _entries(self, dom: Union[str, DomSnapshot, DomNode]) -> List[_Entry]:
+        """Turns the supported DOM inputs into outline entries."""
+        if isinstance(dom, DomSnapshot):
+            dom = dom.root
+        if isinstance(dom, DomNode):
+            return [self._node_entry(dom)]
+        if re.match(r"\s*<", dom):
+            return [self._node_entry(parse_html(dom).root)]
+        return self._outline_entries(dom)
+
+    @classmethod
+    def _node_entry(cls, node: DomNode) -> _Entry:
+        children = [cls._node_entry(child) for child in node.children]
+        shape = "|".join([node.tag, node.role or "", ",".join(sorted(node.attributes)), "1" if node.text else ""])
+        shape += "(" + ";".join(child.shape for child in children) + ")"
+        return _Entry(node.label(), shape, node.is_interactive(), children)
+
+    @staticmethod
+    def _outline_entries(outline: str) -> List[_Entry]:
+        """Parses indented outline lines; texts and numbers do not take part in the shape."""
+        roots: List[_Entry] = []
+        stack: List[tuple] = []  # (depth, entry) of the open ancestors
+        for line in outline.splitlines():
+            if not line.strip():
+                continue
+            label = line.strip()
+            depth = (len(line) - len(line.lstrip(" "))) // 2
+            tag = re.split(r"[#\s]", label, maxsplit=1)[0]
+            entry = _Entry(label, re.sub(r"\d+", "0", _QUOTED_PATTERN.sub('""', label)),
+                           tag in INTERACTIVE_TAGS or "[role=" in label, [])
+            while stack and stack[-1][0] >= depth:
+                stack.pop()
+            (stack[-1][1].children if stack else roots).append(entry)
+            stack.append((depth, entry))
+        for entry in roots:
+            DomCompactor._close_shape(entry)
+        return roots
+
+    @staticmethod
+    def _close_shape(entry: _Entry):
+        """Adds the children's shapes to the shape of outline entries."""
+        for child in entry.children:
+            DomCompactor._close_shape(child)
+        entry.shape += "(" + ";".join(child.shape for child in entry.children) + ")"
+
+    @classmethod
+    def _count(cls, entry: _Entry) -> int:
+        return 1 + sum(cls._count(child) for child in entry.children)
+
+    @classmethod
+    def _score(cls, entry: _Entry, terms: List[str]) -> int:
+        """Scores an entry by the description words in its label; returns the best score of its subtree."""
+        label = entry.label.lower()
+        entry.score = 10 * sum(1 for term in terms if term in label) + (1 if entry.interactive else 0)
+        entry.subtree_score = max([entry.score] + [cls._score(child, terms) for child in entry.children])
+        return entry.subtree_score
+
+    def _collapse(self, entry: _Entry) -> int:
+        """Collapses runs of alike children in the subtree; returns the number of elements collapsed."""
+        collapsed = sum(self._collapse(child) for child in entry.children)
+        entry.children, count = self._collapse_run_list(entry.children)
+        return collapsed + count
+
+    def _collapse_run_list(self, siblings: List[_Entry]):
+        """
+        Collapses the runs of a list of siblings: `min_repeat` or more consecutive groups
+        of up to MAX_GROUP siblings with the same shapes. Returns the new list and the
+        number of elements collapsed.
+        """
+        shapes = [sibling.shape for sibling in siblings]
+        result: List[_Entry] = []
+        collapsed = 0
+        start = 0
+        while start < len(siblings):
+            size, repeats = self._longest_run(shapes, start)
+            if repeats < self.min_repeat:
+                result.append(siblings[start])
+                start += 1
+                continue
+            groups = [siblings[start + i * size:start + (i + 1) * size] for i in range(repeats)]
+            # The first group is the template; groups matching the description are kept as well
+            kept = [0] + [index for index in range(1, repeats) if max(item.subtree_score for item in groups[index]) >= 10]
+            for index in kept:
+                result.extend(groups[index])
+            omitted = repeats - len(kept)
+            if omitted:
+                result.append(_Entry(f"(+{omitted} more like the above)", None, False, []))
+                kept_items = {id(item) for index in kept for item in groups[index]}
+                collapsed += sum(self._count(item) for group in groups for item in group if id(item) not in kept_items)
+            start += size * repeats
+        return result, collapsed
+
+    @staticmethod
+    def _longest_run(shapes: List[str], start: int):
+        """Returns the group size and repeat count of the run covering most siblings from `start`."""
+        best = (1, 1)
+        for size in range(1, MAX_GROUP + 1):
+            group = shapes[start:start + size]
+            if len(group) < size:
+                break
+            repeats = 1
+            while shapes[start + repeats * size:start + (repeats + 1) * size] == group:
+                repeats += 1
+            if repeats > 1 and size * repeats > best[0] * best[1]:
+                best = (size, repeats)
+        return best
+
+    @classmethod
+    def _flatten(cls, entry: _Entry, depth: int, lines: List[tuple]):
+        lines.append((depth, entry))
+        for child in entry.children:
+            cls._flatten(child, depth + 1, lines)
+
+    @staticmethod
+    def _elements(lines: List[tuple]) -> int:
+        """Counts the element lines, leaving out the counts of collapsed runs."""
+        return sum(1 for _, entry in lines if entry.shape is not None)
+
+    @staticmethod
+    def _render(lines: List[tuple]) -> str:
+        return "\n".join("  " * depth + entry.label for depth, entry in lines)
+
+    def _truncate(self, entries: List[_Entry]):
+        """
+        Keeps the highest scoring entries with their ancestors within the budget;
+        returns the outline and the number of elements kept.
+        """
+        positions: List[tuple] = []  # (depth, entry, parent position) in document order
+        def visit(entry, depth, parent):
+            index = len(positions)
+            positions.append((depth, entry, parent))
+            for child in entry.children:
+                visit(child, depth + 1, index)
+        for entry in entries:
+            visit(entry, 0, None)
+
+        line_tokens = [estimate_tokens("  " * depth + entry.label) + 1 for depth, entry, _ in positions]
+        budget = self.token_budget - estimate_tokens(f"({len(positions)} more elements omitted)") - 1
+        selected = set()
+        used = 0
+        ranked = sorted(range(len(positions)), key=lambda index: (-positions[index][1].score, index))
+        for index in ranked:
+            path = []
+            while index is not None and index not in selected:
+                path.append(index)
+                index = positions[index][2]
+            cost = sum(line_tokens[position] for position in path)
+            if cost and used + cost <= budget:
+                selected.update(path)
+                used += cost
+
+        lines = [positions[index][:2] for index in sorted(selected)]
+        kept = self._elements(lines)
+        omitted = self._elements([position[:2] for position in positions]) - kept
+        text = self._render(lines)
+        if omitted:
+            text += f"\n({omitted} more elements omitted)"
+        return text, kept
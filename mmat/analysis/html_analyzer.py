@@ -2,42 +2,81 @@
 
 from mmat.graph.graph_api import GraphAPI
 from mmat.models.reasoning_model import ReasoningModel
-from mmat.environment.environment import Environment # Assuming Environment provides access to browser/Playwright
+from mmat.driver.dom_snapshot import DomSnapshot
 from mmat.utils.logger import Logger
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class HTMLAnalyzer:
     """
     Analyzes the HTML structure of a web page using the Reasoning Model.
-    Interacts with the browser environment to get the DOM structure.
+    Takes compact DOM snapshots through the browser driver and sends the model only
+    what changed since the previous snapshot of the same page.
     Updates the knowledge graph with findings.
     """
-    def __init__(self, reasoning_model: ReasoningModel, graph_api: GraphAPI, environment: Environment):
+    def __init__(self, reasoning_model: ReasoningModel, graph_api: GraphAPI, driver, max_diff_ratio: float = 0.5):
         """
         Initializes the HTMLAnalyzer.
 
         Args:
             reasoning_model: An instance of the ReasoningModel.
             graph_api: An instance of the GraphAPI.
-            environment: The browser environment providing DOM access.
+            driver: The browser driver providing DOM snapshots (a PlaywrightDriver).
+            max_diff_ratio: Largest diff, as a fraction of the snapshot's nodes, that is sent
+                            instead of the whole snapshot.
         """
         self.logger = Logger(__name__)
         self.reasoning_model = reasoning_model
         self.graph_api = graph_api
-        self.environment = environment
+        self.driver = driver
+        self.max_diff_ratio = max_diff_ratio
+        self._previous: Dict[str, DomSnapshot] = {} # Latest snapshot of every URL
+        self._analyses: Dict[str, Dict[str, Any]] = {} # Latest analysis of every URL
+        self.stats: Dict[str, int] = {"snapshots": 0, "unchanged": 0, "diffs": 0, "full": 0, "nodes_total": 0, "nodes_sent": 0}
 
-    def analyze_dom(self) -> Dict[str, Any]:
+    def analyze_dom(self, snapshot: Optional[DomSnapshot] = None) -> Dict[str, Any]:
         """
-        Gets the current DOM structure from the environment and analyzes it
-        using the reasoning model. Updates the graph.
+        Takes a DOM snapshot and analyzes it using the reasoning model. Updates the graph.
+
+        A page whose structural hash equals that of its previous snapshot is not sent
+        to the model again. Otherwise only the changed subtrees are sent, unless they
+        make up more than `max_diff_ratio` of the page, e.g. after a navigation.
+
+        Args:
+            snapshot: A snapshot taken by the caller, e.g. with an AsyncPlaywrightDriver.
+                      Taken with the driver if omitted.
 
         Returns:
-            A dictionary representing the analysis results.
+            A dictionary with the snapshot's 'dom_hash', the 'mode' ('unchanged', 'diff'
+            or 'full'), the number of 'nodes_sent' and the model's 'analysis' (for an
+            unchanged page, the analysis of its previous snapshot).
         """
         self.logger.info("Analyzing DOM structure...")
         try:
-            dom_structure = self.environment.get_dom_structure() # Placeholder method
-            analysis_result = self.reasoning_model.analyze_html(dom_structure) # Placeholder method
+            snapshot = snapshot or self.driver.dom_snapshot()
+            if snapshot is None:
+                raise RuntimeError("Could not take a DOM snapshot of the page.")
+            previous = self._previous.get(snapshot.url)
+            self.stats["snapshots"] += 1
+            self.stats["nodes_total"] += snapshot.size()
+
+            if previous is not None and previous.hash == snapshot.hash:
+                self.stats["unchanged"] += 1
+                self.logger.info(f"DOM of {snapshot.url} unchanged ({snapshot.hash}); skipping analysis.")
+                return {"dom_hash": snapshot.hash, "mode": "unchanged", "nodes_sent": 0, "analysis": self._analyses.get(snapshot.url)}
+
+            mode, nodes_sent, dom_structure = "full", snapshot.size(), f"Page {snapshot.url}:\n{snapshot.render()}"
+            if previous is not None:
+                diff = snapshot.diff(previous)
+                if diff.size() <= self.max_diff_ratio * snapshot.size():
+                    mode, nodes_sent = "diff", diff.size()
+                    dom_structure = f"Changes to page {snapshot.url} since its previous snapshot:\n{diff.render()}"
+            self.stats["diffs" if mode == "diff" else "full"] += 1
+            self.stats["nodes_sent"] += nodes_sent
+            self.logger.info(f"Sending {mode} DOM of {snapshot.url} to the reasoning model ({nodes_sent} of {snapshot.size()} nodes).")
+            analysis_result = self.reasoning_model.analyze_dom(dom_structure)
+            # Only an analyzed snapshot becomes the base of the next diff
+            self._previous[snapshot.url] = snapshot
+            self._analyses[snapshot.url] = analysis_result
 
             # Update graph based on analysis_result
             # This is a placeholder; actual implementation would parse analysis_result
@@ -45,7 +84,7 @@ class HTMLAnalyzer:
             # Example: self.graph_api.add_node(...)
 
             self.logger.info("DOM analysis complete.")
-            return analysis_result
+            return {"dom_hash": snapshot.hash, "mode": mode, "nodes_sent": nodes_sent, "analysis": analysis_result}
         except Exception as e:
             self.logger.error(f"Error during DOM analysis: {e}")
             raise
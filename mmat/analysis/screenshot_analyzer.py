@@ -1,59 +1,181 @@
 # mmat/analysis/screenshot_analyzer.py
 
+import time
+
 from mmat.graph.graph_api import GraphAPI
 from mmat.models.vision_model import VisionModel
+from mmat.analysis.screenshot_deduplicator import ScreenshotDeduplicator
 from mmat.utils.logger import Logger
-from typing import Dict, Any
+from mmat.utils import tracing
+from mmat.utils.image_utils import ImageSource, describe_image
+from typing import Dict, Any, List, Optional
 
 class ScreenshotAnalyzer:
     """
     Analyzes screenshots of the web page using the Vision Model.
     Updates the knowledge graph with visual findings, including VisualRefs.
     """
-    def __init__(self, vision_model: VisionModel, graph_api: GraphAPI):
+    def __init__(self, vision_model: VisionModel, graph_api: GraphAPI, deduplicator: Optional[ScreenshotDeduplicator] = None):
         """
         Initializes the ScreenshotAnalyzer.
 
         Args:
             vision_model: An instance of the VisionModel.
             graph_api: An instance of the GraphAPI.
+            deduplicator: Optional ScreenshotDeduplicator; screenshots similar to an
+                          already analyzed one reuse its result instead of calling the model.
         """
         self.logger = Logger(__name__)
         self.vision_model = vision_model
         self.graph_api = graph_api
+        self.deduplicator = deduplicator
 
-    def analyze_screenshot(self, screenshot_path: str) -> Dict[str, Any]:
+    def analyze_screenshot(self, screenshot_path: ImageSource) -> Dict[str, Any]:
         """
         Analyzes a screenshot using the vision model and updates the graph
         with visual information, including VisualRefs.
 
         Args:
-            screenshot_path: The file path to the screenshot image.
+            screenshot_path: The file path to the screenshot image, or the encoded image bytes.
 
         Returns:
             A dictionary representing the analysis results.
         """
-        self.logger.info(f"Analyzing screenshot: {screenshot_path}")
+        self.logger.info(f"Analyzing screenshot: {describe_image(screenshot_path)}")
+        with tracing.span('analysis', screenshot=describe_image(screenshot_path)) as analysis_span:
+            analysis_result = self._analyze_deduplicated(screenshot_path)
+            analysis_span.set(deduplicated=bool(analysis_result.get('deduplicated')))
+            return analysis_result
+
+    def _analyze_deduplicated(self, screenshot_path: ImageSource) -> Dict[str, Any]:
+        """
+        Analyzes a screenshot, reusing the analysis of a similar frame if a deduplicator is configured.
+        """
+        if not self.deduplicator:
+            return self._analyze_with_model(screenshot_path)
+
+        try:
+            frame_hash = self.deduplicator.compute_hash(screenshot_path)
+        except Exception as e:
+            self.logger.warning(f"Could not hash screenshot {describe_image(screenshot_path)} for deduplication: {e}")
+            return self._analyze_with_model(screenshot_path)
+
+        frame, is_owner = self.deduplicator.claim(frame_hash)
+        if not is_owner:
+            reused_result = self.deduplicator.wait_for(frame)
+            if reused_result is not None:
+                self.logger.info(f"Screenshot {describe_image(screenshot_path)} matches an analyzed frame; reusing its analysis.")
+                return dict(reused_result, deduplicated=True, model_seconds=0.0)
+            # The similar frame's analysis failed; analyze this one on its own
+            return self._analyze_with_model(screenshot_path)
+
+        try:
+            analysis_result = self._analyze_with_model(screenshot_path)
+        except Exception:
+            self.deduplicator.fail(frame)
+            raise
+        self.deduplicator.complete(frame, analysis_result)
+        return analysis_result
+
+    def analyze_screenshots(self, screenshot_paths: List[ImageSource], return_exceptions: bool = False) -> List[Any]:
+        """
+        Analyzes several screenshots (e.g. all screenshots of a test case) in one batch,
+        so the vision model can serve them concurrently.
+
+        Args:
+            screenshot_paths: The file paths of the screenshot images, or their encoded bytes.
+            return_exceptions: If True, a failed analysis is returned as its exception
+                               in place of the result instead of being raised.
+
+        Returns:
+            The analysis results, in the order of `screenshot_paths`.
+        """
+        self.logger.info(f"Analyzing {len(screenshot_paths)} screenshots in one batch")
+        with tracing.span('analysis.batch', screenshots=len(screenshot_paths)):
+            return self._analyze_batch(screenshot_paths, return_exceptions)
+
+    def _analyze_batch(self, screenshot_paths: List[ImageSource], return_exceptions: bool) -> List[Any]:
+        """
+        Analyzes a batch of screenshots. See analyze_screenshots().
+        """
+        results: List[Any] = [None] * len(screenshot_paths)
+        claims = {} # index -> (frame, is_owner) for screenshots taking part in deduplication
+        to_analyze = []
+        for index, screenshot_path in enumerate(screenshot_paths):
+            if self.deduplicator:
+                try:
+                    claims[index] = self.deduplicator.claim(self.deduplicator.compute_hash(screenshot_path))
+                except Exception as e:
+                    self.logger.warning(f"Could not hash screenshot {describe_image(screenshot_path)} for deduplication: {e}")
+                if index in claims and not claims[index][1]:
+                    continue # Reuses the analysis of a similar frame, resolved after the batch
+            to_analyze.append(index)
+
+        started = time.perf_counter()
+        model_results = self.vision_model.analyze_screenshots([screenshot_paths[i] for i in to_analyze], return_exceptions=True)
+        # The requests of a batch run concurrently; each screenshot is charged an equal share
+        model_seconds = round((time.perf_counter() - started) / len(to_analyze), 3) if to_analyze else 0.0
+        for index, model_result in zip(to_analyze, model_results):
+            if not isinstance(model_result, Exception):
+                try:
+                    model_result = dict(self._process_result(model_result), model_seconds=model_seconds)
+                except Exception as e:
+                    model_result = e
+            if index in claims:
+                if isinstance(model_result, Exception):
+                    self.deduplicator.fail(claims[index][0])
+                else:
+                    self.deduplicator.complete(claims[index][0], model_result)
+            results[index] = model_result
+
+        for index, (frame, is_owner) in claims.items():
+            if is_owner:
+                continue
+            reused_result = self.deduplicator.wait_for(frame)
+            if reused_result is not None:
+                results[index] = dict(reused_result, deduplicated=True, model_seconds=0.0)
+                continue
+            try:
+                results[index] = self._analyze_with_model(screenshot_paths[index])
+            except Exception as e:
+                results[index] = e
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def _analyze_with_model(self, screenshot_path: ImageSource) -> Dict[str, Any]:
+        """
+        Sends a screenshot to the vision model and processes the result. The
+        result's 'model_seconds' is the time spent waiting for the model.
+        """
         try:
             # Use the vision model to analyze the screenshot
-            # Use the vision model to analyze the screenshot
+            started = time.perf_counter()
             analysis_result = self.vision_model.analyze_screenshot(screenshot_path)
-
-            # Process the analysis result from the vision model
-            # Assuming the result structure is like OpenAI chat completion response
-            if analysis_result and analysis_result.get("choices"):
-                model_output = analysis_result["choices"][0]["message"]["content"]
-                self.logger.info(f"Screenshot analysis result: {model_output[:200]}...") # Log first 200 chars
-                # TODO: Parse model_output and update graph with visual findings and VisualRefs
-                # Example: self.graph_api.add_node(node_type="visual_ref", data={"visual_ref": {...}})
-            else:
-                self.logger.warning("Vision model analysis returned no usable result.")
-                model_output = "No analysis result."
-
-            self.logger.info("Screenshot analysis processing complete.")
-            return {"raw_result": analysis_result, "parsed_content": model_output}
+            return dict(self._process_result(analysis_result), model_seconds=round(time.perf_counter() - started, 3))
         except Exception as e:
             self.logger.error(f"Error during screenshot analysis: {e}")
             raise
 
+    def _process_result(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extracts the model output from a vision model response.
+        """
+        # Process the analysis result from the vision model
+        # Assuming the result structure is like OpenAI chat completion response
+        if analysis_result and analysis_result.get("choices"):
+            model_output = analysis_result["choices"][0]["message"]["content"]
+            self.logger.info(f"Screenshot analysis result: {model_output[:200]}...") # Log first 200 chars
+            # TODO: Parse model_output and update graph with visual findings and VisualRefs
+            # Example: self.graph_api.add_node(node_type="visual_ref", data={"visual_ref": {...}})
+        else:
+            self.logger.warning("Vision model analysis returned no usable result.")
+            model_output = "No analysis result."
+
+        self.logger.info("Screenshot analysis processing complete.")
+        return {"raw_result": analysis_result, "parsed_content": model_output}
+
     # Add methods for specific visual analysis tasks if needed
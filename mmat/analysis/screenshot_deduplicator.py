@@ -0,0 +1,149 @@
+# mmat/analysis/screenshot_deduplicator.py
+
+import hashlib
+import io
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from mmat.utils.image_utils import ImageSource, read_image
+from mmat.utils.logger import Logger
+
+try:
+    from PIL import Image # Optional: enables perceptual (near-duplicate) matching
+except ImportError:
+    Image = None
+
+FrameHash = Union[int, str]
+
+def difference_hash(image_path: ImageSource, hash_size: int = 8) -> int:
+    """
+    Computes the difference hash (dHash) of an image.
+
+    The image is converted to grayscale and downscaled to (hash_size + 1) x hash_size
+    pixels; each bit records whether a pixel is brighter than its right neighbour.
+    Small changes such as a blinking text caret do not change the hash, or change
+    only a few bits.
+
+    Args:
+        image_path: The file path to the image, or the encoded image bytes.
+        hash_size: Number of rows (and bits per row) of the hash.
+
+    Returns:
+        The hash as an integer of hash_size * hash_size bits.
+    """
+    with Image.open(io.BytesIO(image_path) if isinstance(image_path, bytes) else image_path) as image:
+        pixels = list(image.convert("L").resize((hash_size + 1, hash_size)).getdata())
+    frame_hash = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            frame_hash = (frame_hash << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return frame_hash
+
+def file_digest(image_path: ImageSource) -> str:
+    """
+    Computes the SHA-256 digest of an image file (or of encoded image bytes). Used
+    when Pillow is not installed, in which case only byte-identical screenshots are
+    treated as duplicates.
+    """
+    return hashlib.sha256(read_image(image_path)).hexdigest()
+
+def hash_distance(first: FrameHash, second: FrameHash) -> Optional[int]:
+    """
+    Returns the number of differing bits between two perceptual hashes, 0 for equal
+    digests, or None if the hashes cannot be compared.
+    """
+    if isinstance(first, int) and isinstance(second, int):
+        return bin(first ^ second).count("1")
+    return 0 if first == second else None
+
+class _AnalyzedFrame:
+    """A frame whose analysis is finished or in progress."""
+    def __init__(self, frame_hash: FrameHash):
+        self.frame_hash = frame_hash
+        self.result: Optional[Dict[str, Any]] = None
+        self.failed = False
+        self.done = threading.Event()
+
+class ScreenshotDeduplicator:
+    """
+    Detects screenshots that are visually the same as an already analyzed one, so
+    their vision model analysis can be reused instead of repeated.
+
+    Frames are compared by perceptual hash (Hamming distance up to `max_distance`
+    bits) when Pillow is available, and by file digest otherwise. Only the last
+    `history_size` analyzed frames are kept for comparison.
+    """
+    def __init__(self, max_distance: int = 4, history_size: int = 32, hash_function: Optional[Callable[[str], FrameHash]] = None):
+        """
+        Initializes the ScreenshotDeduplicator.
+
+        Args:
+            max_distance: Maximum number of differing hash bits for two frames to count as the same.
+            history_size: Number of analyzed frames kept for comparison.
+            hash_function: Overrides the frame hash function (path -> hash).
+        """
+        self.logger = Logger(__name__)
+        self.max_distance = max_distance
+        if hash_function:
+            self.hash_function = hash_function
+        elif Image is not None:
+            self.hash_function = difference_hash
+        else:
+            self.logger.warning("Pillow is not installed; only byte-identical screenshots will be deduplicated.")
+            self.hash_function = file_digest
+        self._frames: deque = deque(maxlen=max(1, history_size))
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"frames": 0, "calls_avoided": 0}
+
+    def compute_hash(self, screenshot_path: ImageSource) -> FrameHash:
+        """Computes the hash of a screenshot file or in-memory image."""
+        return self.hash_function(screenshot_path)
+
+    def claim(self, frame_hash: FrameHash) -> Tuple[_AnalyzedFrame, bool]:
+        """
+        Finds an analyzed (or in-progress) frame similar to the given hash, or registers
+        the hash as a new frame to be analyzed by the caller.
+
+        Returns:
+            (frame, is_owner): when is_owner is True the caller must analyze the frame
+            and call complete() or fail(); otherwise the caller can wait_for() the result.
+        """
+        with self._lock:
+            self.stats["frames"] += 1
+            for frame in reversed(self._frames):
+                distance = hash_distance(frame.frame_hash, frame_hash)
+                if distance is not None and distance <= self.max_distance:
+                    return frame, False
+            frame = _AnalyzedFrame(frame_hash)
+            self._frames.append(frame)
+            return frame, True
+
+    def complete(self, frame: _AnalyzedFrame, result: Dict[str, Any]):
+        """Stores the analysis result of a frame claimed with claim()."""
+        frame.result = result
+        frame.done.set()
+
+    def fail(self, frame: _AnalyzedFrame):
+        """Marks a claimed frame as failed so similar frames are analyzed again."""
+        frame.failed = True
+        with self._lock:
+            try:
+                self._frames.remove(frame)
+            except ValueError:
+                pass
+        frame.done.set()
+
+    def wait_for(self, frame: _AnalyzedFrame, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the analysis of a similar frame and returns it for reuse.
+
+        Returns:
+            The analysis result, or None if that analysis failed or timed out.
+        """
+        if not frame.done.wait(timeout) or frame.failed:
+            return None
+        with self._lock:
+            self.stats["calls_avoided"] += 1
+        return frame.result
@@ -1,4 +1,5 @@
 import argparse
+import json
 import sys
 import os
 
@@ -6,6 +7,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from mmat.core.mmat import MMAT # Uncomment the import
+from mmat.reporting.report_merge import merge_reports
 
 def main():
     """Main entry point for the MMAT CLI."""
@@ -32,16 +34,76 @@ def main():
         action="store_true", # Store True if flag is present
         help="Overwrite output file if it already exists",
     )
+    generate_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the reasoning model, ignoring cached completions",
+    )
+    generate_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the steps from the reasoning model and show each one as soon as it is generated",
+    )
 
     # Run command
     run_parser = subparsers.add_parser("run", help="Run a test plan")
-    run_parser.add_argument("test", help="Path to the test plan file (YAML or JSON)") # Changed to 'test' to match MMAT.run args
+    run_parser.add_argument(
+        "test",
+        nargs="+",
+        help="Test plan file (YAML or JSON), directory of plans or glob such as 'tests/**/*.yaml'. "
+             "Several plans run as one batch on a shared browser pool with a merged report",
+    ) # Named 'test' to match MMAT.run args
     run_parser.add_argument(
         "--step", # Changed to 'step' to match MMAT.run args
         type=int,
         default=1,
         help="Step number to start execution from (1-based index)",
     )
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of browsers to run test cases on in parallel (default: 1)",
+    )
+    run_parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run the plan with the asyncio engine: test cases share one browser and run on concurrent pages (up to --workers at a time)",
+    )
+    run_parser.add_argument(
+        "--scheduler",
+        choices=["cases", "dag"],
+        help="How test cases are scheduled: 'cases' runs each case on its own, 'dag' runs the steps cases share once "
+             "(default: 'execution.scheduler' of the config, else 'cases')",
+    )
+    run_parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Execute only the test cases whose steps, parameters or base URL changed, or that did not pass in their last run",
+    )
+    run_parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Execute only shard I of N (e.g. 2/4) of the test cases, balanced by the pinned durations of "
+             "'execution.shard_durations' (else by step counts). "
+             "Merge the shard reports with 'mmat merge-reports'",
+    )
+    run_parser.add_argument(
+        "--trace",
+        metavar="TRACE_PATH",
+        help="Record timing spans of the run (steps, driver actions, screenshots, model requests) and write them to this file",
+    )
+    run_parser.add_argument(
+        "--trace-format",
+        choices=["chrome", "otel"],
+        help="Format of the trace file: 'chrome' for chrome://tracing and Perfetto, 'otel' for OpenTelemetry JSON "
+             "(default: 'tracing.format' of the config, else 'chrome')",
+    )
+    run_parser.add_argument(
+        "--report",
+        help="Optional: Path to write the merged JSON report of the run to.",
+    )
     run_parser.add_argument(
         "--config",
         default="config/config.yaml", # Default config path
@@ -49,6 +111,55 @@ def main():
     )
     # Add other potential run options here (e.g., --reporter, --environment)
 
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Show the slowest steps, duration trends and regressions from the duration history")
+    stats_parser.add_argument(
+        "--history",
+        help="Path to the duration history database (default: 'execution.history' of the config, else output/history.db)",
+    )
+    stats_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Number of slowest steps to show (default: 10)",
+    )
+    stats_parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Number of recent runs to summarize (default: 10)",
+    )
+    stats_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="Ratio of a step's latest time to its median over the previous runs reported as a regression (default: 1.5)",
+    )
+    stats_parser.add_argument(
+        "--export-durations",
+        metavar="PATH",
+        help="Write the median recent duration of every test case to PATH instead of printing statistics. "
+             "Point 'execution.shard_durations' at it so all shards of 'mmat run --shard' split the cases alike",
+    )
+    stats_parser.add_argument(
+        "--config",
+        default="config/config.yaml",
+        help="Path to the configuration file (YAML or JSON)",
+    )
+
+    # Merge reports command
+    merge_parser = subparsers.add_parser("merge-reports", help="Merge the JSON reports of the shards of a run into one report")
+    merge_parser.add_argument(
+        "reports",
+        nargs="+",
+        help="JSON report files written with 'mmat run --shard I/N --report'",
+    )
+    merge_parser.add_argument(
+        "--output",
+        default="output/report.json",
+        help="Path to write the merged report to (default: output/report.json)",
+    )
+
     # Init command
     init_parser = subparsers.add_parser("init", help="Initialize a new MMAT project structure")
     init_parser.add_argument(
@@ -105,6 +216,11 @@ def main():
         action="store_true",
         help="Overwrite output file if it already exists",
     )
+    describe_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the reasoning model, ignoring cached completions",
+    )
 
     # Feedback command
     feedback_parser = subparsers.add_parser("feedback", help="Provide feedback on a test run or specific test step")
@@ -150,11 +266,52 @@ def main():
 
     args = parser.parse_args()
 
+    if args.command == "merge-reports":
+        # Merging needs no configuration, models or browsers
+        merge_report_files(args.reports, args.output)
+        return
+
     # Instantiate MMAT with the specified config path
     config_path = args.config if hasattr(args, 'config') else "config/config.yaml"
     mmat_app = MMAT(config_path=config_path)
     mmat_app.run(args)
 
+def merge_report_files(report_files, output_path):
+    """
+    Merges the JSON reports of the shards of a run into one report file.
+
+    Args:
+        report_files (list): Paths of the shard reports.
+        output_path (str): Path to write the merged report to.
+
+    Returns:
+        dict | None: The merged report, or None if a report could not be read.
+    """
+    reports = []
+    for report_file in report_files:
+        try:
+            with open(report_file, 'r') as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"[MMAT] Error: Could not read report {report_file}: {e}")
+            return None
+    merged_report = merge_reports(reports)
+    merged_report['merged_from'] = list(report_files)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(merged_report, f, indent=4)
+    summary = merged_report['summary']
+    print(f"[MMAT] Merged {len(reports)} reports into {output_path}: {summary['total']} test cases, "
+          f"{summary['passed']} passed, {summary['failed']} failed, {summary['error']} errors.")
+    if merged_report.get('missing_shards'):
+        print(f"[MMAT] Warning: Reports of shards {merged_report['missing_shards']} are missing.")
+    if merged_report['missing_cases'] or merged_report['duplicate_cases']:
+        print(f"[MMAT] Error: The merged report is incomplete: {len(merged_report['missing_cases'])} test cases are in no report "
+              f"and {len(merged_report['duplicate_cases'])} in more than one (see 'missing_cases' and 'duplicate_cases').")
+    return merged_report
+
 
 if __name__ == "__main__":
     main()
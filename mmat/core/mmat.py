@@ -3,6 +3,9 @@ import argparse # Import argparse for real CLI argument parsing
 import os
 import yaml
 import json
+import asyncio
+import glob
+import time
 
 from mmat.driver.playwright_driver import PlaywrightDriver
 from mmat.description_generator import DescriptionGenerator # Import DescriptionGenerator
@@ -11,9 +14,18 @@ from mmat.config.config_manager import ConfigManager # Import ConfigManager
 from mmat.plan_builder.plan_builder import PlanBuilder # Import PlanBuilder
 from mmat.models.local_api_reasoning_model import LocalApiReasoningModel # Import the concrete reasoning model
 from mmat.models.local_api_vision_model import LocalApiVisionModel # Import the concrete vision model
+from mmat.models.model_transport import ModelTransport
+from mmat.models.response_cache import ResponseCache
 from mmat.graph.graph_api import GraphAPI # Import GraphAPI
+from mmat.graph.sqlite_store import SqliteGraphStore
 from mmat.analysis.screenshot_analyzer import ScreenshotAnalyzer # Import ScreenshotAnalyzer
+from mmat.analysis.screenshot_deduplicator import ScreenshotDeduplicator
 from mmat.orchestration.feedback_handler import FeedbackHandler # Import FeedbackHandler
+from mmat.reporting.json_reporter import JsonReporter
+from mmat.utils import tracing
+from mmat.test_runner.sharding import parse_shard
+from mmat.test_runner.duration_history import DurationHistory
+from mmat.test_runner.run_state import RunState
 
 class MMAT:
     """
@@ -38,6 +50,8 @@ class MMAT:
         self.reasoning_model = None
         self.vision_model = None
         models_config = self.config.get('models', {})
+        # One pooled HTTP transport (keep-alive, timeouts, retries, circuit breaker) shared by both model clients
+        self.model_transport = ModelTransport.from_config(models_config.get('transport'))
 
         if 'reasoning' in models_config:
             reasoning_config = models_config['reasoning']
@@ -56,7 +70,19 @@ class MMAT:
                          print("[MMAT] Error: 'endpoint' or 'model_name' missing in reasoning model config parameters.")
                          self.reasoning_model = None # Ensure model is None if config is incomplete
                      else:
-                         self.reasoning_model = LocalApiReasoningModel(api_url=api_url, model_name=model_name)
+                         # Optional persistent cache of completions (regenerating an unchanged plan makes no model call)
+                         reasoning_cache = None
+                         if model_params.get('cache_dir'):
+                             ttl_hours = model_params.get('cache_ttl_hours')
+                             reasoning_cache = ResponseCache(model_params['cache_dir'],
+                                                             max_bytes=int(model_params.get('cache_max_mb', 64)) * 1024 * 1024,
+                                                             ttl_seconds=float(ttl_hours) * 3600 if ttl_hours else None)
+                         self.reasoning_model = LocalApiReasoningModel(api_url=api_url, model_name=model_name,
+                                                                      transport=self.model_transport,
+                                                                      cache=reasoning_cache,
+                                                                      deterministic=model_params.get('deterministic', False),
+                                                                      seed=int(model_params.get('seed', 0)),
+                                                                      dom_token_budget=int(model_params.get('dom_token_budget', 1500)))
 
                  except TypeError as e:
                      print(f"[MMAT] Error initializing reasoning model with parameters {model_params}: {e}")
@@ -86,7 +112,14 @@ class MMAT:
                          print("[MMAT] Error: 'api_url' or 'model_name' missing in vision model config parameters.")
                          self.vision_model = None # Ensure model is None if config is incomplete
                      else:
-                         self.vision_model = LocalApiVisionModel(api_url=api_url, model_name=model_name)
+                         # Optional persistent cache of vision responses (rerunning an unchanged suite makes no model calls)
+                         vision_cache = None
+                         if model_params.get('cache_dir'):
+                             vision_cache = ResponseCache(model_params['cache_dir'],
+                                                          max_bytes=int(model_params.get('cache_max_mb', 256)) * 1024 * 1024)
+                         self.vision_model = LocalApiVisionModel(api_url=api_url, model_name=model_name, cache=vision_cache,
+                                                                 transport=self.model_transport,
+                                                                 max_in_flight=int(model_params.get('max_in_flight', 4)))
 
                  except TypeError as e:
                      print(f"[MMAT] Error initializing vision model with parameters {model_params}: {e}")
@@ -102,8 +135,12 @@ class MMAT:
         # Initialize Plan Builder with config_manager and reasoning model
         self.plan_builder = PlanBuilder(self.config_manager, self.reasoning_model)
 
-        # Initialize Graph API
-        self.graph_api = GraphAPI()
+        # Initialize Graph API; 'graph.storage: sqlite' keeps the knowledge graph across runs
+        graph_store = None
+        if self.config_manager.get('graph.storage', 'memory') == 'sqlite':
+            graph_store = SqliteGraphStore(self.config_manager.get('graph.path', 'output/graph.db'),
+                                           batch_size=self.config_manager.get('graph.batch_size', 100))
+        self.graph_api = GraphAPI(graph_store)
 
         # Debug prints before ScreenshotAnalyzer initialization check
         print(f"[MMAT] Debug: self.vision_model before check: {self.vision_model}")
@@ -112,7 +149,11 @@ class MMAT:
         # Initialize Screenshot Analyzer (requires vision model and graph API)
         if self.vision_model and self.graph_api:
             print("[MMAT] Debug: Initializing ScreenshotAnalyzer.")
-            self.screenshot_analyzer = ScreenshotAnalyzer(self.vision_model, self.graph_api)
+            # Reuse the analysis of visually identical frames unless 'analysis.deduplicate' is false
+            deduplicator = None
+            if self.config_manager.get('analysis.deduplicate', True):
+                deduplicator = ScreenshotDeduplicator(max_distance=self.config_manager.get('analysis.dedup_max_distance', 4))
+            self.screenshot_analyzer = ScreenshotAnalyzer(self.vision_model, self.graph_api, deduplicator)
         else:
             self.screenshot_analyzer = None
             print("[MMAT] Warning: Vision model or Graph API not initialized. Screenshot analysis will be unavailable.")
@@ -120,7 +161,10 @@ class MMAT:
         # Initialize core components that depend on models/analyzers
         self.playwright_driver = PlaywrightDriver(self.config) # Initialize Playwright Driver
         # Initialize Test Runner with driver, config_manager, and screenshot_analyzer
-        self.test_runner = TestRunner(self.playwright_driver, self.config_manager, self.screenshot_analyzer)
+        # 'reuse_browser' keeps one browser open across plans; each test case still gets a fresh context
+        reuse_browser = self.config_manager.get('environments.browser.config.reuse_browser', False)
+        self.test_runner = TestRunner(self.playwright_driver, self.config_manager, self.screenshot_analyzer, reuse_browser=reuse_browser,
+                                      graph_api=self.graph_api)
 
         # Initialize Feedback Handler (requires config_manager and reasoning model)
         if self.reasoning_model:
@@ -138,6 +182,10 @@ class MMAT:
         """
         print(f"[MMAT] Executing command: {args.command}")
 
+        if getattr(args, 'no_cache', False) and self.reasoning_model and self.reasoning_model.cache is not None:
+            print("[MMAT] Reasoning model cache disabled for this command (--no-cache).")
+            self.reasoning_model.cache = None
+
         if args.command == 'generate':
             print("[MMAT] Generating test plan...")
             description = args.desc
@@ -157,8 +205,11 @@ class MMAT:
                 print(f"[MMAT] Error: Output file '{output_path}' already exists. Use --force to overwrite.")
                 return
 
+            stream = getattr(args, 'stream', False)
+
             try:
-                test_plan = self.plan_builder.generate_plan_from_description(description)
+                on_step = self._show_generated_step if stream else None
+                test_plan = self.plan_builder.generate_plan_from_description(description, stream=stream, on_step=on_step)
                 if test_plan:
                     # Save the generated test plan to the output file (as YAML)
                     output_dir = os.path.dirname(output_path)
@@ -181,10 +232,88 @@ class MMAT:
             print("[MMAT] Running test plan...")
             test_plan_path = args.test
             start_step = getattr(args, 'step', 1) # Default to step 1 if not provided
-
-            test_plan = self.test_runner.load_test_plan(test_plan_path)
-            if test_plan:
-                self.test_runner.execute_plan(test_plan, start_step)
+            workers = getattr(args, 'workers', 1) or 1
+            report_path = getattr(args, 'report', None)
+
+            use_async = getattr(args, 'use_async', False)
+            changed_only = getattr(args, 'changed_only', False)
+            trace_path = getattr(args, 'trace', None)
+            if not trace_path and self.config_manager.get('tracing.enabled', False):
+                trace_path = self.config_manager.get('tracing.output', 'output/trace.json')
+            trace_format = getattr(args, 'trace_format', None) or self.config_manager.get('tracing.format', 'chrome')
+            shard = None
+            if getattr(args, 'shard', None):
+                try:
+                    shard = parse_shard(args.shard)
+                except ValueError as e:
+                    print(f"[MMAT] Error: {e}")
+                    return
+            if trace_path:
+                tracing.tracer.enable()
+
+            # Several identifiers when the shell already expanded a glob
+            plan_identifiers = test_plan_path if isinstance(test_plan_path, list) else [test_plan_path]
+            plan_paths = self._resolve_test_plans(plan_identifiers)
+            if len(plan_paths) > 1:
+                # A directory or glob matching several plans: run them as one batch on a shared browser pool
+                if use_async:
+                    print("[MMAT] Warning: --async runs a single test plan; running the batch with the sync engine.")
+                if start_step != 1:
+                    print("[MMAT] Warning: --step applies to a single test plan; running all steps of the batch.")
+                test_plans = [(path, self.test_runner.load_test_plan(path)) for path in plan_paths]
+                executed = self.test_runner.execute_plans(test_plans, workers=workers, changed_only=changed_only,
+                                                          scheduler=getattr(args, 'scheduler', None), shard=shard)
+                if executed and report_path:
+                    self.test_runner.write_report(report_path)
+                test_plan = None
+            elif plan_paths:
+                test_plan = self.test_runner.load_test_plan(plan_paths[0])
+            else:
+                print(f"[MMAT] Error: No test plans found for {', '.join(plan_identifiers)}.")
+                test_plan = None
+            if test_plan and use_async:
+                asyncio.run(self._run_plan_async(test_plan, start_step, workers, report_path, changed_only, shard))
+            elif test_plan:
+                executed = self.test_runner.execute_plan(test_plan, start_step, workers=workers, scheduler=getattr(args, 'scheduler', None),
+                                                         changed_only=changed_only, shard=shard)
+                if executed and report_path:
+                    self.test_runner.write_report(report_path)
+            if self.test_runner.reuse_browser:
+                self.test_runner.close()
+            if trace_path:
+                tracing.tracer.disable()
+                try:
+                    span_count = tracing.tracer.export(trace_path, trace_format)
+                    print(f"[MMAT] Trace of {span_count} spans written to {trace_path} ({trace_format} format).")
+                except (OSError, ValueError) as e:
+                    print(f"[MMAT] Error writing trace {trace_path}: {e}")
+            if self.screenshot_analyzer and self.screenshot_analyzer.deduplicator:
+                dedup_stats = self.screenshot_analyzer.deduplicator.stats
+                print(f"[MMAT] Screenshot deduplication: {dedup_stats['calls_avoided']} of {dedup_stats['frames']} vision model calls avoided.")
+            capture_stats = self.test_runner.screenshot_capture.stats
+            if capture_stats['captures']:
+                print(f"[MMAT] Screenshots: {capture_stats['captures']} captured in memory ({capture_stats['bytes']} bytes), "
+                      f"{capture_stats['transcoded']} re-encoded, {capture_stats['files_written']} written to disk.")
+            if self.vision_model and self.vision_model.cache is not None:
+                cache_stats = self.vision_model.cache.get_stats()
+                print(f"[MMAT] Vision cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                      f"{cache_stats['entries']} entries ({cache_stats['bytes']} bytes).")
+
+        elif args.command == 'stats':
+            history_path = args.history or self.config_manager.get('execution.history', 'output/history.db')
+            if not history_path or not os.path.exists(history_path):
+                print(f"[MMAT] Error: No duration history found at {history_path}. Run a test plan first.")
+                return
+            history = DurationHistory(history_path)
+            try:
+                if getattr(args, 'export_durations', None):
+                    durations = history.case_durations()
+                    RunState.write_durations(args.export_durations, durations)
+                    print(f"[MMAT] Wrote the durations of {len(durations)} test cases to {args.export_durations}.")
+                else:
+                    self._print_stats(history, args.limit, args.runs, args.threshold)
+            finally:
+                history.close()
 
         elif args.command == 'export':
             print("[MMAT] Exporting test plan...")
@@ -578,6 +707,7 @@ def test_failed_comment_submission_empty_comment(page: Page):
       baseUrl: https://bestin-it.com/photo-into-embroidery-art-interactive-tool-converter/ # Target URL for comment tests
       headless: true # Set to false to see the browser
       defaultTimeout: 10000 # Milliseconds
+      reuse_browser: false # Keep one browser open across test plans; each test case still gets a fresh context
 
 models:
   reasoning:
@@ -586,6 +716,11 @@ models:
     config:
       endpoint: http://172.29.32.1:1234/v1
       model_name: mistralai/magistral-small
+      cache_dir: output/cache/reasoning # Persistent cache of completions for generate/describe; remove to disable
+      cache_max_mb: 64 # Least recently used completions are evicted above this size
+      cache_ttl_hours: 168 # Cached completions expire after a week
+      deterministic: false # true: temperature 0 and a fixed seed, so unchanged prompts give the same plan
+      dom_token_budget: 1500 # Estimated tokens of a page's DOM in a prompt; larger pages are compacted
 
   vision:
     provider: local_api # Using local API for vision model as well
@@ -593,6 +728,65 @@ models:
     parameters: # Changed to parameters to match LocalApiVisionModel
       api_url: http://172.29.32.1:1234/v1
       model_name: mistralai/mistral-small-3.2
+      cache_dir: output/cache/vision # Persistent cache of vision responses; remove to disable
+      cache_max_mb: 256 # Least recently used responses are evicted above this size
+      max_in_flight: 4 # Concurrent requests to the vision API (LM Studio and vLLM batch them)
+
+  transport: # Shared HTTP connection pool used by both model APIs
+    connect_timeout: 5 # Seconds
+    read_timeout: 120 # Seconds; a hung model server fails the call instead of the run
+    max_retries: 3 # Retries on connection errors, timeouts, 429 and 5xx, with exponential backoff
+    backoff_factor: 0.5 # First retry after ~0.5s, then ~1s, ~2s, ...
+    circuit_failure_threshold: 5 # Consecutive failed requests before calls fail fast
+    circuit_reset_seconds: 30 # Wait before a trial request is let through again
+
+analysis:
+  background: true # Analyze screenshots on background workers while the next steps run
+  workers: 2 # Number of screenshot analyses running at the same time
+  max_pending: 8 # Queued analyses before steps wait for the model (backpressure)
+  batch_per_case: false # Analyze all screenshots of a test case together once it finishes
+  deduplicate: true # Reuse the analysis of a visually identical earlier screenshot
+  dedup_max_distance: 4 # Differing perceptual-hash bits (of 64) still treated as identical; needs Pillow
+
+screenshots:
+  format: png # png, jpeg or webp (webp needs Pillow); screenshots go to the vision model from memory
+  quality: null # JPEG/WebP quality (1-100)
+  full_page: false # Capture the full scrollable page instead of the viewport
+  selector: null # Capture only the first element matching this selector
+  max_width: null # Downscale to the vision model's input resolution (needs Pillow)
+  max_height: null
+  retain: true # Also write the screenshots to disk (in the background); false keeps them in memory only
+  policy:
+    mode: always # always: capture after every step; triggers: only after steps a trigger below fires for
+    actions: [navigate, click, fill] # Capture steps with these actions
+    on_failure: true # Capture failed and erroring steps
+    every_nth: 0 # Also capture every Nth step of the plan (0: off)
+    dom_mutation: false # Capture steps that changed the page's DOM (counted by a MutationObserver)
+
+execution:
+  scheduler: cases # dag: run the steps test cases start with in common once and resume the cases from a snapshot
+  run_state: output/run_state.json # Content hash and last result of every test case, used by run --changed-only
+  history: output/history.db # SQLite history of case and step durations: longest-first scheduling, shard balancing, mmat stats
+  shard_durations: null # Pinned case durations balancing run --shard (write with mmat stats --export-durations); null: split by step counts
+
+artifacts:
+  enabled: true # Keep the retained screenshots of every run apart; false writes them to output/screenshots/
+  root: output/artifacts # objects/: content-addressed files shared by all runs; runs/<run_id>/: manifest of each run
+  pack: null # gz or zstd (needs zstandard): pack finished runs into runs/<run_id>.tar.gz or .tar.zst
+  keep_unpacked: 1 # Newest finished runs left unpacked for browsing
+  max_runs: 20 # Oldest runs beyond this count are removed
+  max_age_days: 30 # Runs older than this are removed
+  max_bytes: null # Oldest runs are removed while the store is larger than this
+
+tracing:
+  enabled: false # Record timing spans of every run (run --trace records one run)
+  output: output/trace.json
+  format: chrome # chrome: chrome://tracing or Perfetto; otel: OpenTelemetry (OTLP) JSON
+
+graph:
+  storage: memory # sqlite: keep the knowledge graph of executed steps and pages across runs
+  path: output/graph.db # SQLite database file (storage: sqlite)
+  batch_size: 100 # Graph upserts written per transaction
 
 reporting:
   - type: json
@@ -638,8 +832,156 @@ This is an MMAT project.
         else:
             print(f"[MMAT] Unknown command: {args.command}")
 
+        if self.reasoning_model and self.reasoning_model.cache is not None:
+            cache_stats = self.reasoning_model.cache.get_stats()
+            if cache_stats['hits'] or cache_stats['misses']:
+                print(f"[MMAT] Reasoning cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                      f"{cache_stats['entries']} entries ({cache_stats['bytes']} bytes).")
+        self._print_model_transport_stats()
         print("[MMAT] Command execution finished.")
 
+    def _resolve_test_plans(self, plan_identifiers):
+        """
+        Resolves the plan arguments of 'run' to test plan files, each listed once.
+
+        Args:
+            plan_identifiers (list): Plan files, directories or glob patterns (see _discover_test_plans).
+
+        Returns:
+            list: The test plan paths, in argument order and sorted within each argument. A plan
+                  matched by several arguments, or spelled differently (e.g. 'plans/a.yaml' and
+                  './plans/a.yaml'), is listed at its first match.
+        """
+        plan_paths = []
+        seen = set()
+        for plan_identifier in plan_identifiers:
+            for path in self._discover_test_plans(plan_identifier):
+                key = os.path.normcase(os.path.abspath(path))
+                if key not in seen:
+                    seen.add(key)
+                    plan_paths.append(path)
+        return plan_paths
+
+    def _discover_test_plans(self, plan_identifier):
+        """
+        Resolves the plan argument of 'run' to test plan files.
+
+        Args:
+            plan_identifier (str): A plan file, a directory (searched recursively for
+                                   .yaml, .yml and .json files) or a glob pattern
+                                   (** matches any number of directories).
+
+        Returns:
+            list: The test plan paths, sorted.
+        """
+        if os.path.isdir(plan_identifier):
+            plan_paths = []
+            for root, _, files in os.walk(plan_identifier):
+                plan_paths.extend(os.path.join(root, name) for name in files if name.endswith(('.yaml', '.yml', '.json')))
+            return sorted(plan_paths)
+        if any(char in plan_identifier for char in '*?['):
+            return sorted(path for path in glob.glob(plan_identifier, recursive=True) if os.path.isfile(path))
+        return [plan_identifier]
+
+    def _show_generated_step(self, step_number, step):
+        """
+        Prints a streamed step as soon as it arrives and warns about steps the runner cannot execute.
+
+        Args:
+            step_number (int): 1-based number of the step in the generated plan.
+            step (dict): The generated step.
+        """
+        action = step.get('action')
+        details = {key: value for key, value in step.items() if key != 'action'}
+        print(f"[MMAT] Step {step_number}: {action} {json.dumps(details, ensure_ascii=False)}")
+        if not action:
+            print(f"[MMAT] Warning: Generated step {step_number} has no 'action'.")
+
+    def _print_model_transport_stats(self):
+        """
+        Prints request counters and per-endpoint latencies of the model API transport,
+        if any model requests were made.
+        """
+        stats = self.model_transport.get_stats()
+        if not stats['requests']:
+            return
+        print(f"[MMAT] Model API: {stats['requests']} requests, {stats['retries']} retries, "
+              f"{stats['failures']} failures, {stats['circuit_rejections']} rejected by an open circuit.")
+        for endpoint, latency in stats['latency'].items():
+            print(f"[MMAT]   {endpoint}: {latency['count']} calls, mean {latency['mean']}s, "
+                  f"p50 <= {latency['p50']}s, p95 <= {latency['p95']}s, max {latency['max']}s")
+
+    def _print_stats(self, history, limit, runs, threshold):
+        """
+        Prints the run trend, the slowest steps and the regressions of the latest run.
+
+        Args:
+            history (DurationHistory): The duration history to report on.
+            limit (int): Number of slowest steps to list.
+            runs (int): Number of recent runs the trend and the step percentiles cover.
+            threshold (float): Ratio of a step's latest time to its baseline reported as a regression.
+        """
+        print(f"[MMAT] Last {runs} runs (case durations in seconds):")
+        for run in history.runs(runs):
+            started = time.strftime('%Y-%m-%d %H:%M', time.localtime(run['started']))
+            print(f"[MMAT]   #{run['run_id']} {started} {run['label'] or ''}: {run['cases']} cases, "
+                  f"p50 {run['p50']:.2f}s, p95 {run['p95']:.2f}s, total {run['total']:.2f}s")
+
+        print(f"[MMAT] Slowest steps (wall time over the last {runs} runs; driver/screenshot/model medians):")
+        for step in history.slowest_steps(limit, runs):
+            parts = ', '.join(f"{part} {step[part]:.2f}s" for part in ('driver', 'screenshot', 'model') if step[part] is not None)
+            print(f"[MMAT]   {step['case_key']} step {step['step_index']} ({step['action']}): "
+                  f"p50 {step['p50']:.2f}s, p95 {step['p95']:.2f}s over {step['runs']} runs ({parts})")
+
+        regressions = history.regressions(threshold=threshold)
+        if not regressions:
+            print("[MMAT] No step regressions in the latest run.")
+        for regression in regressions:
+            print(f"[MMAT]   Regression: {regression['case_key']} step {regression['step_index']} ({regression['action']}) "
+                  f"took {regression['wall']:.2f}s, baseline {regression['baseline']:.2f}s (+{regression['increase']:.2f}s)")
+
+    async def _run_plan_async(self, test_plan, start_step, workers, report_path=None, changed_only=False, shard=None):
+        """
+        Executes a test plan with the asyncio execution engine.
+
+        Args:
+            test_plan (dict): The loaded test plan.
+            start_step (int): The step number to start execution from (1-based index).
+            workers (int): Maximum number of test cases running at the same time.
+            report_path (str, optional): Path to write the merged JSON report to.
+            changed_only (bool): Execute only the test cases that changed or did not pass last time.
+            shard (tuple, optional): (index, count) of the shard of the test cases to execute.
+        """
+        # Imported here so the sync engine does not require playwright.async_api
+        from mmat.driver.async_playwright_driver import AsyncPlaywrightDriver
+        from mmat.test_runner.async_test_runner import AsyncTestRunner
+
+        async_runner = AsyncTestRunner(AsyncPlaywrightDriver(self.config), self.config_manager,
+                                       self.screenshot_analyzer, reporters=self._create_reporters(),
+                                       max_concurrency=workers, graph_api=self.graph_api)
+        executed = await async_runner.execute_plan(test_plan, start_step, changed_only=changed_only, shard=shard)
+        if executed and report_path:
+            async_runner.write_report(report_path)
+
+    def _create_reporters(self):
+        """
+        Creates the reporters listed in the 'reporting' section of the configuration.
+
+        Returns:
+            list: Reporter instances.
+        """
+        reporters = []
+        for reporter_config in self.config.get('reporting', None) or []:
+            reporter_type = reporter_config.get('type')
+            reporter_params = reporter_config.get('config', {}) or {}
+            if reporter_type == 'json':
+                output_dir = reporter_params.get('outputDir', '.')
+                os.makedirs(output_dir, exist_ok=True)
+                reporters.append(JsonReporter({"output_path": os.path.join(output_dir, "mmat_results.json")}))
+            else:
+                print(f"[MMAT] Warning: Unknown reporter type '{reporter_type}' specified in config.")
+        return reporters
+
     def _generate_playwright_code(self, test_plan):
         """
         Generates Playwright Python code from a test plan.
@@ -0,0 +1,258 @@
+from playwright.async_api import async_playwright
+
+from mmat.driver.dom_snapshot import DOM_SNAPSHOT_SCRIPT, DomSnapshot
+from mmat.driver.playwright_driver import DOM_MUTATION_COUNTER_SCRIPT
+
+class AsyncPlaywrightDriver:
+    """
+    Manages browser interactions using the asyncio Playwright API.
+
+    One driver owns Playwright and the browser. new_session() hands out child
+    drivers that share the browser but have their own context and page, so a
+    single event loop can drive many pages at the same time.
+    """
+    def __init__(self, config, _parent=None):
+        """
+        Initializes the AsyncPlaywrightDriver.
+
+        Args:
+            config (dict): Configuration for the Playwright driver.
+        """
+        self.config = config
+        self._parent = _parent
+        self.playwright = None
+        self.browser = _parent.browser if _parent else None
+        self.context = None
+        self.page = None
+        if not _parent:
+            print("[AsyncPlaywrightDriver] Initialized.")
+
+    async def launch_browser(self, browser_type="chromium", headless=True):
+        """
+        Launches a browser instance. It opens no context or page: pages are opened
+        with new_session().
+
+        Args:
+            browser_type (str): Type of browser to launch (e.g., 'chromium', 'firefox', 'webkit').
+            headless (bool): Whether to run the browser in headless mode.
+        """
+        print(f"[AsyncPlaywrightDriver] Launching {browser_type} browser (headless={headless}).")
+        try:
+            self.playwright = await async_playwright().start()
+            p = self.playwright
+            if browser_type == "chromium":
+                self.browser = await p.chromium.launch(headless=headless)
+            elif browser_type == "firefox":
+                self.browser = await p.firefox.launch(headless=headless)
+            elif browser_type == "webkit":
+                self.browser = await p.webkit.launch(headless=headless)
+            else:
+                print(f"[AsyncPlaywrightDriver] Warning: Unsupported browser type '{browser_type}'. Launching chromium.")
+                self.browser = await p.chromium.launch(headless=headless)
+            print("[AsyncPlaywrightDriver] Browser launched.")
+        except Exception as e:
+            print(f"[AsyncPlaywrightDriver] Error launching browser: {e}")
+            self.browser = None
+            self.context = None
+            self.page = None
+
+    async def new_session(self) -> "AsyncPlaywrightDriver":
+        """
+        Opens a new context and page on the running browser.
+
+        Returns:
+            AsyncPlaywrightDriver: A driver bound to the new page. Closing it closes only
+                                   its context. Its page is None if the context could not
+                                   be created.
+        """
+        session = AsyncPlaywrightDriver(self.config, _parent=self)
+        if not self.browser:
+            print("[AsyncPlaywrightDriver] Error: No browser available. Launch browser first.")
+            return session
+        try:
+            session.context = await self.browser.new_context()
+            session.page = await session.context.new_page()
+        except Exception as e:
+            print(f"[AsyncPlaywrightDriver] Error creating browser context: {e}")
+            session.context = None
+            session.page = None
+        return session
+
+    async def navigate(self, url):
+        """
+        Navigates the current page to a URL.
+
+        Args:
+            url (str): The URL to navigate to.
+        """
+        if self.page:
+            print(f"[AsyncPlaywrightDriver] Navigating to {url}")
+            try:
+                await self.page.goto(url)
+                print(f"[AsyncPlaywrightDriver] Successfully navigated to {url}")
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error navigating to {url}: {e}")
+        else:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+
+    async def click(self, selector):
+        """
+        Clicks an element matching the selector.
+
+        Args:
+            selector (str): CSS selector for the element.
+        """
+        if self.page:
+            print(f"[AsyncPlaywrightDriver] Clicking element with selector: {selector}")
+            try:
+                await self.page.click(selector)
+                print(f"[AsyncPlaywrightDriver] Successfully clicked element with selector: {selector}")
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error clicking element with selector {selector}: {e}")
+        else:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+
+    async def fill(self, selector, value):
+        """
+        Fills an input field with the given value.
+
+        Args:
+            selector (str): CSS selector for the input field.
+            value (str): The value to fill.
+        """
+        if self.page:
+            print(f"[AsyncPlaywrightDriver] Filling element with selector: {selector}")
+            try:
+                await self.page.fill(selector, value)
+                print(f"[AsyncPlaywrightDriver] Successfully filled element with selector: {selector}")
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error filling element with selector {selector}: {e}")
+        else:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+
+    async def screenshot(self, path):
+        """
+        Takes a screenshot of the current page.
+
+        Args:
+            path (str): Path to save the screenshot.
+        """
+        if self.page:
+            print(f"[AsyncPlaywrightDriver] Taking screenshot and saving to {path}")
+            try:
+                await self.page.screenshot(path=path)
+                print(f"[AsyncPlaywrightDriver] Successfully saved screenshot to {path}")
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error taking screenshot: {e}")
+        else:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+
+    async def capture_screenshot(self, image_format: str = "png", quality: int | None = None, full_page: bool = False,
+                                 selector: str | None = None) -> bytes | None:
+        """
+        Takes a screenshot of the current page and returns the encoded image. See
+        PlaywrightDriver.capture_screenshot.
+        """
+        if not self.page:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+            return None
+        options = {"type": image_format}
+        if quality is not None and image_format == "jpeg":
+            options["quality"] = quality
+        try:
+            if selector:
+                return await self.page.locator(selector).first.screenshot(**options)
+            return await self.page.screenshot(full_page=full_page, **options)
+        except Exception as e:
+            print(f"[AsyncPlaywrightDriver] Error taking screenshot: {e}")
+            return None
+
+    async def dom_mutations(self) -> int | None:
+        """
+        Returns the number of DOM mutations since the previous call on the current
+        document. See PlaywrightDriver.dom_mutations.
+        """
+        if not self.page:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+            return None
+        try:
+            return await self.page.evaluate(DOM_MUTATION_COUNTER_SCRIPT)
+        except Exception as e:
+            print(f"[AsyncPlaywrightDriver] Error reading DOM mutations: {e}")
+            return None
+
+    async def dom_snapshot(self) -> DomSnapshot | None:
+        """
+        Takes a compact snapshot of the current page's DOM. See PlaywrightDriver.dom_snapshot.
+        """
+        if not self.page:
+            print("[AsyncPlaywrightDriver] Error: No page available. Launch browser first.")
+            return None
+        try:
+            return DomSnapshot.from_dict(await self.page.evaluate(DOM_SNAPSHOT_SCRIPT), self.page.url)
+        except Exception as e:
+            print(f"[AsyncPlaywrightDriver] Error taking DOM snapshot: {e}")
+            return None
+
+    async def close_browser(self):
+        """
+        Closes the browser and stops Playwright. On a session driver, closes only its context.
+        """
+        if self.context:
+            try:
+                await self.context.close()
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error closing browser context: {e}")
+            self.context = None
+            self.page = None
+
+        if self._parent:
+            return
+
+        if self.browser:
+            print("[AsyncPlaywrightDriver] Closing browser.")
+            try:
+                await self.browser.close()
+                print("[AsyncPlaywrightDriver] Browser closed.")
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error closing browser: {e}")
+            self.browser = None
+        if self.playwright:
+            try:
+                await self.playwright.stop()
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error stopping Playwright: {e}")
+            self.playwright = None
+
+    def get_current_url(self) -> str:
+        """
+        Gets the current URL of the page.
+
+        Returns:
+            str: The current URL, or an empty string if no page is available.
+        """
+        if self.page:
+            return self.page.url
+        else:
+            print("[AsyncPlaywrightDriver] Error: No page available to get URL from.")
+            return ""
+
+    async def is_element_visible(self, selector: str) -> bool:
+        """
+        Checks if an element matching the selector is visible on the page.
+
+        Args:
+            selector (str): CSS selector for the element.
+
+        Returns:
+            bool: True if the element is visible, False otherwise.
+        """
+        if self.page:
+            try:
+                return await self.page.locator(selector).is_visible()
+            except Exception as e:
+                print(f"[AsyncPlaywrightDriver] Error checking visibility for selector '{selector}': {e}")
+                return False
+        else:
+            print("[AsyncPlaywrightDriver] Error: No page available to check element visibility.")
+            return False
@@ -0,0 +1,214 @@
+# mmat/driver/dom_snapshot.py
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Elements kept in a snapshot without text or role, and the attributes kept on every
+# element (mirrored by DOM_SNAPSHOT_SCRIPT; the live 'value' and 'checked' are added)
+INTERACTIVE_TAGS = frozenset({"a", "button", "input", "select", "textarea", "option", "summary", "label"})
+KEPT_ATTRIBUTES = ("id", "type", "name", "href", "placeholder", "aria-label", "alt", "title", "for",
+                   "disabled", "aria-expanded", "aria-checked", "aria-selected")
+# Elements whose content is never part of a snapshot
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "canvas", "iframe", "head"})
+
+# Extracts a pruned tree of the page: elements that are interactive, carry an ARIA
+# role or hold text. Other elements are dropped and their kept descendants lifted
+# into the nearest kept ancestor; hidden elements, scripts and styles are skipped.
+DOM_SNAPSHOT_SCRIPT = """() => {
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'CANVAS', 'IFRAME', 'HEAD']);
+    const INTERACTIVE = new Set(['A', 'BUTTON', 'INPUT', 'SELECT', 'TEXTAREA', 'OPTION', 'SUMMARY', 'LABEL']);
+    const ATTRIBUTES = ['id', 'type', 'name', 'href', 'placeholder', 'aria-label', 'alt', 'title', 'for',
+                        'disabled', 'aria-expanded', 'aria-checked', 'aria-selected'];
+    const clip = text => text.length > 80 ? text.slice(0, 77) + '...' : text;
+    const hidden = el => {
+        if (el.getAttribute('aria-hidden') === 'true' || el.hidden) return true;
+        const style = getComputedStyle(el);
+        return style.display === 'none' || style.visibility === 'hidden';
+    };
+    const walk = el => {
+        if (SKIP.has(el.tagName.toUpperCase()) || hidden(el)) return [];
+        const children = [];
+        let text = '';
+        for (const child of el.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) text += child.textContent;
+            else if (child.nodeType === Node.ELEMENT_NODE) children.push(...walk(child));
+        }
+        text = clip(text.replace(/\\s+/g, ' ').trim());
+        const role = el.getAttribute('role');
+        const interactive = INTERACTIVE.has(el.tagName) || role !== null || el.hasAttribute('tabindex')
+            || el.hasAttribute('onclick') || el.getAttribute('contenteditable') === 'true';
+        if (!interactive && !text) return children;
+        const node = {tag: el.tagName.toLowerCase()};
+        if (role) node.role = role;
+        const attributes = {};
+        for (const name of ATTRIBUTES) {
+            const value = el.getAttribute(name);
+            if (value !== null) attributes[name] = clip(value);
+        }
+        // The live state of form fields; password values never leave the page
+        if ('value' in el && ['INPUT', 'TEXTAREA', 'SELECT'].includes(el.tagName) && el.type !== 'password' && el.value) {
+            attributes.value = clip(String(el.value));
+        }
+        if ((el.type === 'checkbox' || el.type === 'radio') && el.checked) attributes.checked = '';
+        if (Object.keys(attributes).length) node.attributes = attributes;
+        if (text) node.text = text;
+        if (children.length) node.children = children;
+        return [node];
+    };
+    return {tag: 'body', children: document.body ? walk(document.body).flatMap(node => node.tag === 'body' ? (node.children || []) : [node]) : []};
+}"""
+
+class DomNode:
+    """
+    A node of a DOM snapshot. Its hash covers the node and its whole subtree, so
+    two subtrees with the same hash are structurally identical.
+    """
+    __slots__ = ("tag", "role", "text", "attributes", "children", "hash")
+
+    def __init__(self, tag: str, role: Optional[str] = None, text: Optional[str] = None,
+                 attributes: Optional[Dict[str, str]] = None, children: Optional[List["DomNode"]] = None):
+        self.tag = tag
+        self.role = role
+        self.text = text
+        self.attributes = attributes or {}
+        self.children = children or []
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(self.signature().encode("utf-8"))
+        for child in self.children:
+            digest.update(child.hash.encode("ascii"))
+        self.hash = digest.hexdigest()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DomNode":
+        """Builds a node and its subtree from the dictionaries returned by DOM_SNAPSHOT_SCRIPT."""
+        return cls(data["tag"], data.get("role"), data.get("text"), data.get("attributes"),
+                   [cls.from_dict(child) for child in data.get("children", [])])
+
+    def signature(self) -> str:
+        """Returns the node's own content, without its children."""
+        return json.dumps([self.tag, self.role, self.text, sorted(self.attributes.items())], ensure_ascii=False)
+
+    def key(self) -> Tuple[str, str]:
+        """Returns the key matching this node to its counterpart among the children of the previous snapshot."""
+        return self.tag, self.attributes.get("id") or self.role or ""
+
+    def size(self) -> int:
+        """Returns the number of nodes of the subtree."""
+        return 1 + sum(child.size() for child in self.children)
+
+    def is_interactive(self) -> bool:
+        """Whether the node is an element a user can interact with or one with an ARIA role."""
+        return self.tag in INTERACTIVE_TAGS or self.role is not None
+
+    def label(self) -> str:
+        """Returns the one-line description of the node, e.g. `button#login [role=button] name="go" "Sign in"`."""
+        label = self.tag
+        attributes = dict(self.attributes)
+        if "id" in attributes:
+            label += f"#{attributes.pop('id')}"
+        if self.role:
+            label += f" [role={self.role}]"
+        for name, value in attributes.items():
+            label += f" {name}" if value == "" else f" {name}={json.dumps(value, ensure_ascii=False)}"
+        if self.text:
+            label += f" {json.dumps(self.text, ensure_ascii=False)}"
+        return label
+
+    def render(self, depth: int = 0, lines: Optional[List[str]] = None) -> List[str]:
+        """Renders the subtree as indented lines, one label per node."""
+        lines = [] if lines is None else lines
+        lines.append("  " * depth + self.label())
+        for child in self.children:
+            child.render(depth + 1, lines)
+        return lines
+
+class DomDiff:
+    """The subtrees that differ between two DOM snapshots."""
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self):
+        self.added: List[DomNode] = []    # Subtrees of the new snapshot without a counterpart
+        self.removed: List[DomNode] = []  # Subtrees of the old snapshot without a counterpart
+        self.changed: List[DomNode] = []  # New subtrees whose own content changed
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def size(self) -> int:
+        """Returns the number of nodes in the changed subtrees."""
+        return sum(node.size() for node in self.added + self.changed) + len(self.removed)
+
+    def render(self) -> str:
+        """Renders the diff for a model prompt: added and changed subtrees in full, removed ones by their root."""
+        sections = []
+        for title, nodes in (("Added", self.added), ("Changed", self.changed)):
+            for node in nodes:
+                sections.append(f"{title}:\n" + "\n".join(node.render(depth=1)))
+        for node in self.removed:
+            sections.append("Removed:\n" + node.render(depth=1)[0])
+        return "\n".join(sections)
+
+class DomSnapshot:
+    """
+    A compact, pruned tree of a page's DOM (see DOM_SNAPSHOT_SCRIPT) with a
+    structural hash: equal hashes mean the interactive elements, texts and roles
+    of two pages are the same.
+    """
+    def __init__(self, root: DomNode, url: str = ""):
+        self.root = root
+        self.url = url
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], url: str = "") -> "DomSnapshot":
+        """Builds a snapshot from the result of DOM_SNAPSHOT_SCRIPT."""
+        return cls(DomNode.from_dict(data), url)
+
+    @property
+    def hash(self) -> str:
+        return self.root.hash
+
+    def size(self) -> int:
+        """Returns the number of nodes of the snapshot."""
+        return self.root.size()
+
+    def render(self) -> str:
+        """Renders the whole snapshot as indented lines."""
+        return "\n".join(self.root.render())
+
+    def diff(self, previous: "DomSnapshot") -> DomDiff:
+        """
+        Compares the snapshot with a previous one.
+
+        Subtrees with equal hashes are skipped without descending into them. Children
+        are matched by tag and id (or role) in order of appearance; a matched node
+        whose own content changed is reported with its whole subtree.
+
+        Args:
+            previous: The earlier snapshot, usually of the same page.
+
+        Returns:
+            The added, removed and changed subtrees.
+        """
+        result = DomDiff()
+        self._diff_nodes(previous.root, self.root, result)
+        return result
+
+    @classmethod
+    def _diff_nodes(cls, old: DomNode, new: DomNode, result: DomDiff):
+        if old.hash == new.hash:
+            return
+        if old.signature() != new.signature():
+            result.changed.append(new)
+            return
+        unmatched: Dict[Tuple[str, str], List[DomNode]] = {}
+        for child in old.children:
+            unmatched.setdefault(child.key(), []).append(child)
+        for child in new.children:
+            candidates = unmatched.get(child.key())
+            if candidates:
+                cls._diff_nodes(candidates.pop(0), child, result)
+            else:
+                result.added.append(child)
+        for candidates in unmatched.values():
+            result.removed.extend(candidates)
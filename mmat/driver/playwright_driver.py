@@ -1,5 +1,23 @@
+import time
+
 from playwright.sync_api import sync_playwright
 
+from mmat.driver.dom_snapshot import DOM_SNAPSHOT_SCRIPT, DomSnapshot
+
+# Counts DOM mutations with a MutationObserver installed on first use in each document.
+# Returns the mutations since the previous call and resets the count; -1 for a new document.
+DOM_MUTATION_COUNTER_SCRIPT = """() => {
+    if (window.__mmatMutations === undefined) {
+        window.__mmatMutations = 0;
+        new MutationObserver(records => { window.__mmatMutations += records.length; })
+            .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+        return -1;
+    }
+    const count = window.__mmatMutations;
+    window.__mmatMutations = 0;
+    return count;
+}"""
+
 class PlaywrightDriver:
     """
     Manages browser interactions using Playwright.
@@ -12,21 +30,48 @@ class PlaywrightDriver:
             config (dict): Configuration for the Playwright driver.
         """
         self.config = config
+        self.playwright = None
         self.browser = None
+        self.browser_type = None
+        self.context = None
         self.page = None
+        # Counters for the long-lived browser session
+        self.session_stats = {
+            "browser_launches": 0,
+            "browser_reuses": 0,
+            "contexts_created": 0,
+            "launch_seconds_total": 0.0,
+        }
         print("[PlaywrightDriver] Initialized.")
 
     def launch_browser(self, browser_type="chromium", headless=True):
         """
-        Launches a browser instance.
+        Launches a browser instance, or reuses the one already running.
+
+        Playwright is started once per driver and the browser stays open until
+        close_browser() is called, so repeated launches only pay for a new context.
 
         Args:
             browser_type (str): Type of browser to launch (e.g., 'chromium', 'firefox', 'webkit').
             headless (bool): Whether to run the browser in headless mode.
         """
+        if self.browser and self.browser_type == browser_type and self.browser.is_connected():
+            self.session_stats["browser_reuses"] += 1
+            print(f"[PlaywrightDriver] Reusing running {browser_type} browser.")
+            if not self.page:
+                self.new_context()
+            return
+
+        if self.browser:
+            # A different browser type was requested; replace the running one
+            self._close_browser_only()
+
         print(f"[PlaywrightDriver] Launching {browser_type} browser (headless={headless}).")
         try:
-            p = sync_playwright().start()
+            launch_started = time.perf_counter()
+            if not self.playwright:
+                self.playwright = sync_playwright().start()
+            p = self.playwright
             if browser_type == "chromium":
                 self.browser = p.chromium.launch(headless=headless)
             elif browser_type == "firefox":
@@ -36,14 +81,88 @@ class PlaywrightDriver:
             else:
                 print(f"[PlaywrightDriver] Warning: Unsupported browser type '{browser_type}'. Launching chromium.")
                 self.browser = p.chromium.launch(headless=headless)
+            self.browser_type = browser_type
+            self.session_stats["browser_launches"] += 1
+            self.session_stats["launch_seconds_total"] += time.perf_counter() - launch_started
 
-            self.page = self.browser.new_page()
+            self.new_context()
             print("[PlaywrightDriver] Browser launched and new page created.")
         except Exception as e:
             print(f"[PlaywrightDriver] Error launching browser: {e}")
             self.browser = None
+            self.context = None
             self.page = None
 
+    def new_context(self, storage_state=None):
+        """
+        Replaces the current browser context with a fresh one and opens a page in it.
+
+        A new context starts without cookies, local storage or cache, which isolates
+        test cases from each other without relaunching the browser.
+
+        Args:
+            storage_state (dict, optional): Cookies and local storage to start the context
+                                            with, as returned by get_storage_state().
+        """
+        if not self.browser:
+            print("[PlaywrightDriver] Error: No browser available. Launch browser first.")
+            return
+        self.close_context()
+        try:
+            if storage_state is not None:
+                self.context = self.browser.new_context(storage_state=storage_state)
+            else:
+                self.context = self.browser.new_context()
+            self.page = self.context.new_page()
+            self.session_stats["contexts_created"] += 1
+            print("[PlaywrightDriver] New browser context created.")
+        except Exception as e:
+            print(f"[PlaywrightDriver] Error creating browser context: {e}")
+            self.context = None
+            self.page = None
+
+    def get_storage_state(self) -> dict | None:
+        """
+        Gets the cookies and local storage of the current context.
+
+        Returns:
+            dict | None: The storage state, or None if no context is available or it could not be read.
+        """
+        if not self.context:
+            print("[PlaywrightDriver] Error: No browser context available to get the storage state from.")
+            return None
+        try:
+            return self.context.storage_state()
+        except Exception as e:
+            print(f"[PlaywrightDriver] Error getting storage state: {e}")
+            return None
+
+    def close_context(self):
+        """
+        Closes the current browser context and its pages, keeping the browser open.
+        """
+        if self.context:
+            try:
+                self.context.close()
+            except Exception as e:
+                print(f"[PlaywrightDriver] Error closing browser context: {e}")
+        self.context = None
+        self.page = None
+
+    def get_session_stats(self) -> dict:
+        """
+        Gets the counters of the browser session.
+
+        Returns:
+            dict: Launch, reuse and context counters, plus the launch time saved by
+                  reusing the browser (estimated from the average launch time).
+        """
+        stats = dict(self.session_stats)
+        launches = stats["browser_launches"]
+        average_launch = stats["launch_seconds_total"] / launches if launches else 0.0
+        stats["launch_time_saved_seconds"] = round(stats["browser_reuses"] * average_launch, 3)
+        return stats
+
     def navigate(self, url):
         """
         Navigates the current page to a URL.
@@ -113,22 +232,99 @@ class PlaywrightDriver:
         else:
             print("[PlaywrightDriver] Error: No page available. Launch browser first.")
 
+    def capture_screenshot(self, image_format: str = "png", quality: int | None = None, full_page: bool = False,
+                           selector: str | None = None) -> bytes | None:
+        """
+        Takes a screenshot of the current page and returns the encoded image instead of writing a file.
+
+        Args:
+            image_format (str): 'png' or 'jpeg' (the formats Playwright encodes).
+            quality (int, optional): JPEG quality (0-100).
+            full_page (bool): Capture the full scrollable page instead of the viewport.
+            selector (str, optional): Capture only the element matching this selector.
+
+        Returns:
+            bytes | None: The encoded image, or None if no screenshot could be taken.
+        """
+        if not self.page:
+            print("[PlaywrightDriver] Error: No page available. Launch browser first.")
+            return None
+        options = {"type": image_format}
+        if quality is not None and image_format == "jpeg":
+            options["quality"] = quality
+        try:
+            if selector:
+                return self.page.locator(selector).first.screenshot(**options)
+            return self.page.screenshot(full_page=full_page, **options)
+        except Exception as e:
+            print(f"[PlaywrightDriver] Error taking screenshot: {e}")
+            return None
+
+    def dom_mutations(self) -> int | None:
+        """
+        Returns the number of DOM mutations since the previous call on the current document.
+
+        The first call in a document installs a MutationObserver and returns -1, so a
+        navigation to a new document always counts as a change.
+
+        Returns:
+            int | None: The mutation count, -1 for a new document, or None if it could not be read.
+        """
+        if not self.page:
+            print("[PlaywrightDriver] Error: No page available. Launch browser first.")
+            return None
+        try:
+            return self.page.evaluate(DOM_MUTATION_COUNTER_SCRIPT)
+        except Exception as e:
+            print(f"[PlaywrightDriver] Error reading DOM mutations: {e}")
+            return None
+
+    def dom_snapshot(self) -> DomSnapshot | None:
+        """
+        Takes a compact snapshot of the current page's DOM: only interactive elements,
+        elements with an ARIA role and elements holding text, with a structural hash.
+
+        Returns:
+            DomSnapshot | None: The snapshot, or None if it could not be taken.
+        """
+        if not self.page:
+            print("[PlaywrightDriver] Error: No page available. Launch browser first.")
+            return None
+        try:
+            return DomSnapshot.from_dict(self.page.evaluate(DOM_SNAPSHOT_SCRIPT), self.page.url)
+        except Exception as e:
+            print(f"[PlaywrightDriver] Error taking DOM snapshot: {e}")
+            return None
 
     def close_browser(self):
         """
-        Closes the browser instance.
+        Closes the browser instance and stops Playwright.
         """
         if self.browser:
-            print("[PlaywrightDriver] Closing browser.")
+            self._close_browser_only()
+        elif not self.playwright:
+            print("[PlaywrightDriver] Error: No page available. Launch browser first.")
+        if self.playwright:
             try:
-                self.browser.close()
-                print("[PlaywrightDriver] Browser closed.")
+                self.playwright.stop()
             except Exception as e:
-                print(f"[PlaywrightDriver] Error closing browser: {e}")
-            self.browser = None
-            self.page = None
-        else:
-            print("[PlaywrightDriver] Error: No page available. Launch browser first.")
+                print(f"[PlaywrightDriver] Error stopping Playwright: {e}")
+            self.playwright = None
+
+    def _close_browser_only(self):
+        """
+        Closes the browser instance, leaving Playwright running.
+        """
+        print("[PlaywrightDriver] Closing browser.")
+        self.close_context()
+        try:
+            self.browser.close()
+            print("[PlaywrightDriver] Browser closed.")
+        except Exception as e:
+            print(f"[PlaywrightDriver] Error closing browser: {e}")
+        self.browser = None
+        self.browser_type = None
+        self.page = None
 
     def get_current_url(self) -> str:
         """
@@ -0,0 +1,184 @@
+# mmat/driver/screenshot_capture.py
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from mmat.utils import image_utils, tracing
+from mmat.utils.logger import Logger
+
+DEFAULT_SETTINGS = {
+    "format": "png",     # png, jpeg or webp (webp is encoded with Pillow)
+    "quality": None,     # JPEG/WebP quality (1-100)
+    "full_page": False,  # Capture the full scrollable page instead of the viewport
+    "selector": None,    # Capture only the element matching this selector
+    "max_width": None,   # Downscale to fit the vision model's input resolution (needs Pillow)
+    "max_height": None,
+    "retain": True,      # Also write the screenshots to disk, in the background
+}
+
+class CapturedScreenshot:
+    """An encoded screenshot held in memory, with the path it is written to if retained."""
+    __slots__ = ("data", "mime_type", "path")
+
+    def __init__(self, data: bytes, mime_type: str, path: Optional[str]):
+        self.data = data
+        self.mime_type = mime_type
+        self.path = path
+
+class ScreenshotCapture:
+    """
+    Takes step screenshots as in-memory images for the vision model.
+
+    The settings of the 'screenshots' config section select the format and
+    quality, full-page or viewport capture, an element to clip to, and a maximum
+    size to downscale to. A step can override them with a 'screenshot' mapping,
+    e.g. `screenshot: {selector: "#cart", format: jpeg}`. When `retain` is on, the
+    images are also written to disk on a background thread; call drain() before
+    relying on the files. They go to the run's artifacts while `artifacts` is set
+    (see ArtifactStore), else to files under `output_dir`.
+    """
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, output_dir: str = "output"):
+        """
+        Initializes the ScreenshotCapture.
+
+        Args:
+            settings: Values overriding DEFAULT_SETTINGS.
+            output_dir: Directory that screenshot directories are relative to without an artifact store.
+        """
+        self.logger = Logger(__name__)
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.output_dir = output_dir
+        self.artifacts = None # RunArtifacts of the current run, set by the runner
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._writes: List[Future] = []
+        self._lock = threading.Lock()
+        self._warned_pillow = False
+        self.stats: Dict[str, int] = {"captures": 0, "bytes": 0, "transcoded": 0, "files_written": 0}
+
+    @classmethod
+    def from_config(cls, config_manager) -> "ScreenshotCapture":
+        """Creates a ScreenshotCapture from the 'screenshots' section of the configuration."""
+        return cls(config_manager.get('screenshots', None) or {})
+
+    def options(self, step_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Returns the capture settings for a step: the configured ones with the step's overrides."""
+        overrides = (step_data or {}).get("screenshot")
+        options = dict(self.settings, **overrides) if isinstance(overrides, dict) else dict(self.settings)
+        if options["format"] not in image_utils.IMAGE_FORMATS:
+            self.logger.warning(f"Unknown screenshot format '{options['format']}'; using png.")
+            options["format"] = "png"
+        return options
+
+    def path_for(self, directory: str, step_number: int, options: Dict[str, Any]) -> str:
+        """Returns the relative path of a step screenshot, with the extension of its format."""
+        return os.path.join(directory, f"step_{step_number}.{image_utils.IMAGE_FORMATS[options['format']][0]}")
+
+    def capture(self, driver, directory: str, step_number: int, step_data: Optional[Dict[str, Any]] = None) -> Optional[CapturedScreenshot]:
+        """
+        Captures a step screenshot with a PlaywrightDriver.
+
+        Args:
+            driver: The driver whose page is captured.
+            directory: Directory of the screenshot when retained, relative to `output_dir`,
+                       or the name prefix of the artifact within the run.
+            step_number: Number of the step, used in the file name.
+            step_data: The step, whose 'screenshot' mapping overrides the settings.
+
+        Returns:
+            The captured screenshot, or None if the driver could not take one.
+        """
+        options = self.options(step_data)
+        data = driver.capture_screenshot(**self._driver_options(options))
+        return self._finish(data, options, directory, step_number)
+
+    async def capture_async(self, driver, directory: str, step_number: int, step_data: Optional[Dict[str, Any]] = None) -> Optional[CapturedScreenshot]:
+        """Captures a step screenshot with an AsyncPlaywrightDriver. See capture()."""
+        options = self.options(step_data)
+        data = await driver.capture_screenshot(**self._driver_options(options))
+        return self._finish(data, options, directory, step_number)
+
+    def _driver_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        # Playwright encodes PNG and JPEG; WebP is converted from a lossless PNG capture
+        return {
+            "image_format": "jpeg" if options["format"] == "jpeg" else "png",
+            "quality": options["quality"],
+            "full_page": bool(options["full_page"]),
+            "selector": options["selector"],
+        }
+
+    def _finish(self, data: Optional[bytes], options: Dict[str, Any], directory: str, step_number: int) -> Optional[CapturedScreenshot]:
+        """Re-encodes or downscales a capture as configured and queues the file write if retained."""
+        if not data:
+            return None
+        if options["format"] == "webp" or options["max_width"] or options["max_height"]:
+            data = self._transcode(data, options)
+        with self._lock:
+            self.stats["captures"] += 1
+            self.stats["bytes"] += len(data)
+
+        path = None
+        if options["retain"]:
+            name = self.path_for(directory, step_number, options)
+            artifacts = self.artifacts
+            if artifacts is not None:
+                # The object path is known from the digest before the background write
+                extension = image_utils.IMAGE_FORMATS[options["format"]][0]
+                digest = artifacts.digest(data)
+                path = artifacts.object_path(digest, extension)
+                self._submit_write(self._put_artifact, artifacts, name, data, extension, digest)
+            else:
+                path = os.path.join(self.output_dir, name)
+                self._submit_write(self._write, path, data)
+        return CapturedScreenshot(data, image_utils.detect_mime_type(data), path)
+
+    def _transcode(self, data: bytes, options: Dict[str, Any]) -> bytes:
+        if image_utils.Image is None:
+            if not self._warned_pillow:
+                self._warned_pillow = True
+                self.logger.warning("Pillow is not installed; screenshots are kept as captured (no WebP, no downscaling).")
+            if options["format"] == "webp":
+                options["format"] = "png" # The capture is a PNG; keep the file extension truthful
+            return data
+        with tracing.span('screenshot.encode', image_format=options["format"]):
+            try:
+                data = image_utils.transcode(data, options["format"], options["quality"], options["max_width"], options["max_height"])
+            except Exception as e:
+                self.logger.warning(f"Could not re-encode screenshot: {e}")
+                if options["format"] == "webp":
+                    options["format"] = "png"
+                return data
+        with self._lock:
+            self.stats["transcoded"] += 1
+        return data
+
+    def _submit_write(self, write, *args):
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mmat-screenshot-writer")
+            self._writes.append(self._writer.submit(write, *args))
+
+    def _put_artifact(self, artifacts, name: str, data: bytes, extension: str, digest: str):
+        artifacts.put(name, data, extension, digest)
+        with self._lock:
+            self.stats["files_written"] += 1
+
+    def _write(self, path: str, data: bytes):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            self.stats["files_written"] += 1
+
+    def drain(self):
+        """Waits until every queued screenshot file has been written."""
+        with self._lock:
+            writes, self._writes = self._writes, []
+        for write in writes:
+            try:
+                write.result()
+            except OSError as e:
+                self.logger.error(f"Could not write screenshot: {e}")
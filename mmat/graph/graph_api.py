@@ -1,27 +1,177 @@
 # mmat/graph/graph_api.py
 
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from mmat.graph.models import ExecutionGraph, GraphEdge, GraphNode
+
 class GraphAPI:
     """
     Handles the creation and manipulation of the test execution graph.
     """
-    def __init__(self):
+    def __init__(self, graph=None):
         """
         Initializes the GraphAPI.
+
+        Args:
+            graph: The graph storage backend: an in-memory ExecutionGraph (the default)
+                   or a persistent SqliteGraphStore, which keep the graph across runs.
+        """
+        self.graph = graph if graph is not None else ExecutionGraph()
+        self._lock = threading.Lock()
+        print(f"[GraphAPI] Initialized with {type(self.graph).__name__} storage.")
+
+    def add_node(self, node_type: str, data: Dict[str, Any], node_id: Optional[str] = None) -> GraphNode:
+        """
+        Adds a node to the graph, replacing any node with the same id.
+
+        Args:
+            node_type: Type of the node (e.g., "action", "state", "screenshot", "visual_ref").
+            data: Node-specific data.
+            node_id: Unique identifier for the node. Generated from the type if omitted.
+
+        Returns:
+            The added node.
+        """
+        if node_id is None:
+            node_id = f"{node_type}_{uuid.uuid4().hex[:12]}" # Unique across runs sharing a persistent graph
+        node = GraphNode(node_id, node_type, data)
+        with self._lock:
+            self.graph.add_node(node)
+        return node
+
+    def add_edge(self, source_node_id: str, target_node_id: str, edge_type: str, data: Optional[Dict[str, Any]] = None) -> GraphEdge:
+        """
+        Adds an edge between two nodes, replacing the data of an existing edge of the
+        same type between them.
+
+        Returns:
+            The added edge.
         """
-        print("[GraphAPI] Initialized.")
+        edge = GraphEdge(source_node_id, target_node_id, edge_type, data or {})
+        with self._lock:
+            self.graph.add_edge(edge)
+        return edge
 
-    def build_graph(self, test_suites):
+    def build_graph(self, test_suites, plan_name: Optional[str] = None):
         """
         Builds the execution graph from loaded test suites.
+
+        Every suite, test case and step becomes a node ("suite", "test_case" and
+        "action"). Suites and cases are linked to their children by "contains"
+        edges, and the steps of a case are chained by "next" edges in execution order.
+
+        Args:
+            test_suites (list): The 'test_suites' list of a test plan.
+            plan_name (str, optional): The name of the test plan, which scopes the node ids.
+
+        Returns:
+            The graph storage backend held by this GraphAPI.
         """
-        # Placeholder for graph building logic
-        pass
+        for suite_index, suite in enumerate(test_suites or []):
+            suite_name = suite.get('name', f'Suite {suite_index + 1}')
+            suite_id = self._suite_node_id(plan_name, suite_name)
+            self.add_node("suite", {"name": suite_name, "description": suite.get('description')}, node_id=suite_id)
+
+            for case_index, case in enumerate(suite.get('test_cases', [])):
+                case_name = case.get('name', f'Case {case_index + 1}')
+                case_id = f"{suite_id}/case:{case_name}"
+                self.add_node("test_case", {"name": case_name, "description": case.get('description')}, node_id=case_id)
+                self.add_edge(suite_id, case_id, "contains")
+
+                previous_step_id = None
+                for step_index, step in enumerate(case.get('steps', [])):
+                    step_id = self.step_node_id(suite_name, case_name, step_index + 1, plan_name)
+                    self.add_node("action", dict(step, step_index=step_index + 1), node_id=step_id)
+                    self.add_edge(case_id, step_id, "contains")
+                    if previous_step_id:
+                        self.add_edge(previous_step_id, step_id, "next")
+                    previous_step_id = step_id
+
+        print(f"[GraphAPI] Built execution graph with {self.graph.node_count()} nodes and {self.graph.edge_count()} edges.")
+        return self.graph
 
     def get_next_step(self, current_step_id):
         """
         Determines the next step to execute based on the graph.
+
+        Args:
+            current_step_id (str): Id of the current step node.
+
+        Returns:
+            str | None: Id of the next step node, or None after the last step.
+        """
+        next_steps = self.graph.successors(current_step_id, "next")
+        return next_steps[0] if next_steps else None
+
+    @staticmethod
+    def _suite_node_id(plan_name: Optional[str], suite_name: str) -> str:
+        return f"plan:{plan_name}/suite:{suite_name}" if plan_name is not None else f"suite:{suite_name}"
+
+    @classmethod
+    def step_node_id(cls, suite_name: str, case_name: str, step_index: int, plan_name: Optional[str] = None) -> str:
         """
-        # Placeholder for graph traversal logic
-        pass
+        Returns the id of the node of a step (1-based index within its test case).
+        Steps of plans with the same suite and case names get distinct ids if the
+        plan name is given.
+        """
+        return f"{cls._suite_node_id(plan_name, suite_name)}/case:{case_name}/step:{step_index}"
+
+    def record_step(self, suite_name: str, case_name: str, step_index: int, step_result: Dict[str, Any], page_url: Optional[str] = None,
+                    plan_name: Optional[str] = None):
+        """
+        Records an executed step. Upserts its "action" node with the outcome, links
+        it to the previous step of the case, and links it to a "state" node for the
+        page URL after the step.
+
+        Args:
+            suite_name (str): The name of the test suite.
+            case_name (str): The name of the test case.
+            step_index (int): 1-based index of the step within its test case.
+            step_result (dict): The step result of the test runner.
+            page_url (str, optional): URL of the page after the step.
+            plan_name (str, optional): The name of the test plan the step belongs to.
+        """
+        step_id = self.step_node_id(suite_name, case_name, step_index, plan_name)
+        # Private keys ('_'-prefixed) hold runner bookkeeping, not step outcomes
+        data = {key: value for key, value in step_result.items() if key != 'analysis' and not key.startswith('_')}
+        data['step_index'] = step_index
+        self.add_node("action", data, node_id=step_id)
+        if step_index > 1:
+            self.add_edge(self.step_node_id(suite_name, case_name, step_index - 1, plan_name), step_id, "next")
+        if page_url:
+            state_id = f"state:{page_url}"
+            self.add_node("state", {"url": page_url}, node_id=state_id)
+            self.add_edge(step_id, state_id, "result", {"status": step_result.get('status')})
+
+    def flush(self):
+        """Writes buffered changes of a persistent graph backend."""
+        if hasattr(self.graph, "flush"):
+            self.graph.flush()
+
+    def close(self):
+        """Writes buffered changes and releases the graph backend."""
+        if hasattr(self.graph, "close"):
+            self.graph.close()
+
+    def get_node(self, node_id: str) -> Optional[GraphNode]:
+        return self.graph.get_node(node_id)
+
+    def get_nodes_by_type(self, node_type: str) -> List[GraphNode]:
+        """Returns all nodes of a type, e.g. every "visual_ref"."""
+        return self.graph.nodes_by_type(node_type)
+
+    def find_nodes(self, attribute: str, value: Any, node_type: Optional[str] = None) -> List[GraphNode]:
+        """Returns the nodes whose data has the given attribute value, e.g. ("url", "https://...")."""
+        return self.graph.find_nodes(attribute, value, node_type)
+
+    def get_neighbors(self, node_id: str, edge_type: Optional[str] = None) -> List[str]:
+        """Returns the ids of the nodes reached by the outgoing edges of a node."""
+        return self.graph.successors(node_id, edge_type)
+
+    def shortest_path(self, source_node_id: str, target_node_id: str, edge_type: Optional[str] = None) -> Optional[List[str]]:
+        """Returns the node ids of a shortest path between two nodes, or None."""
+        return self.graph.shortest_path(source_node_id, target_node_id, edge_type)
 
     # Add methods for graph visualization, dependency management, etc.
@@ -0,0 +1,98 @@
+# mmat/graph/memory_benchmark.py
+#
+# Measures the memory used per graph node and edge, comparing the slotted models
+# with the previous __dict__-based ones. Run with:
+#
+#     python -m mmat.graph.memory_benchmark --nodes 100000
+
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from mmat.graph.models import GraphEdge, GraphNode
+
+class _DictGraphNode:
+    """The previous GraphNode layout: per-instance __dict__, to_dict() copies data."""
+    def __init__(self, node_id: str, node_type: str, data: Dict[str, Any]):
+        self.node_id = node_id
+        self.node_type = node_type
+        self.data = data
+        self.visual_ref = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"node_id": self.node_id, "node_type": self.node_type, "data": self.data.copy()}
+
+class _DictGraphEdge:
+    """The previous GraphEdge layout: per-instance __dict__."""
+    def __init__(self, source_node_id: str, target_node_id: str, edge_type: str, data: Dict[str, Any]):
+        self.source_node_id = source_node_id
+        self.target_node_id = target_node_id
+        self.edge_type = edge_type
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"source_node_id": self.source_node_id, "target_node_id": self.target_node_id,
+                "edge_type": self.edge_type, "data": self.data}
+
+def _measure(build: Callable[[], Any]) -> tuple:
+    """Returns (result, bytes still allocated by build())."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+# Ids and types are built at runtime, as when a graph is loaded from JSON or SQLite,
+# so every object starts with its own copy of the strings
+_NODE_TYPES = ["state", "action", "dom_element", "screenshot"]
+
+def _build_nodes(node_class, count: int) -> list:
+    return [node_class(f"node_{i}", "".join(_NODE_TYPES[i % 4]), {"url": f"/page/{i % 100}"}) for i in range(count)]
+
+def _build_edges(edge_class, count: int) -> list:
+    return [edge_class(f"node_{i}", f"node_{i + 1}", "".join("result"), {}) for i in range(count)]
+
+def run_benchmark(count: int) -> List[Dict[str, Any]]:
+    """
+    Builds `count` nodes and edges with each model layout and measures the memory
+    per object and the memory allocated by serializing the nodes.
+
+    Returns:
+        One row per layout with bytes_per_node, bytes_per_edge and to_dict_bytes_per_node.
+    """
+    rows = []
+    for label, node_class, edge_class in (("dict-based (before)", _DictGraphNode, _DictGraphEdge),
+                                          ("slotted (after)", GraphNode, GraphEdge)):
+        nodes, node_bytes = _measure(lambda: _build_nodes(node_class, count))
+        edges, edge_bytes = _measure(lambda: _build_edges(edge_class, count))
+        _, to_dict_bytes = _measure(lambda: [node.to_dict() for node in nodes])
+        rows.append({
+            "layout": label,
+            "bytes_per_node": node_bytes / count,
+            "bytes_per_edge": edge_bytes / count,
+            "to_dict_bytes_per_node": to_dict_bytes / count,
+        })
+        del nodes, edges
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory used per graph node and edge.")
+    parser.add_argument("--nodes", type=int, default=100000, help="Number of nodes (and edges) to build")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.nodes)
+    print(f"Graph model memory for {args.nodes} nodes and edges (tracemalloc):")
+    print(f"{'layout':<22}{'bytes/node':>12}{'bytes/edge':>12}{'to_dict bytes/node':>20}")
+    for row in rows:
+        print(f"{row['layout']:<22}{row['bytes_per_node']:>12.1f}{row['bytes_per_edge']:>12.1f}{row['to_dict_bytes_per_node']:>20.1f}")
+    before, after = rows
+    print(f"Saved per node: {before['bytes_per_node'] - after['bytes_per_node']:.1f} bytes "
+          f"({1 - after['bytes_per_node'] / before['bytes_per_node']:.0%}); "
+          f"per edge: {before['bytes_per_edge'] - after['bytes_per_edge']:.1f} bytes "
+          f"({1 - after['bytes_per_edge'] / before['bytes_per_edge']:.0%}).")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 # mmat/graph/models.py
 
-from typing import Dict, Any, List, Optional
+import sys
+from collections import deque
+from typing import Dict, Any, List, Optional, Set
 
 class VisualRef:
     """
     Represents a visual-only reference to an element on the page.
     Used when a standard DOM selector is not available.
     """
+    __slots__ = ("bbox", "ocr_text", "description")
+
     def __init__(self, bbox: Dict[str, int], ocr_text: Optional[str] = None, description: Optional[str] = None):
         """
         Initializes a VisualRef.
@@ -31,7 +35,13 @@ class GraphNode:
     """
     Represents a node in the test execution graph.
     Can be a DOM element, Action, State, Screenshot, or VisualRef.
+
+    Nodes use __slots__ and interned id and type strings, because large crawls create
+    hundreds of thousands of them. to_dict() returns the node's own data dict
+    without copying it.
     """
+    __slots__ = ("node_id", "node_type", "data", "_visual_ref")
+
     def __init__(self, node_id: str, node_type: str, data: Dict[str, Any]):
         """
         Initializes a GraphNode.
@@ -41,24 +51,32 @@ class GraphNode:
             node_type: Type of the node (e.g., "dom_element", "action", "state", "screenshot", "visual_ref").
             data: Dictionary containing node-specific data.
         """
-        self.node_id = node_id
-        self.node_type = node_type
+        self.node_id = sys.intern(node_id)
+        self.node_type = sys.intern(node_type)
         self.data = data
-        self.visual_ref: Optional[VisualRef] = None # For visual_ref type nodes
+        self._visual_ref: Optional[VisualRef] = None # Built on first access, for visual_ref type nodes
 
-        if node_type == "visual_ref" and "visual_ref" in data:
-             self.visual_ref = VisualRef(**data["visual_ref"])
+    @property
+    def visual_ref(self) -> Optional[VisualRef]:
+        if self._visual_ref is None and self.node_type == "visual_ref" and "visual_ref" in self.data:
+            self._visual_ref = VisualRef(**self.data["visual_ref"])
+        return self._visual_ref
 
+    @visual_ref.setter
+    def visual_ref(self, visual_ref: Optional[VisualRef]):
+        self._visual_ref = visual_ref
+        # The data dict stays the serialized form, so to_dict() needs no copy
+        if visual_ref is None:
+            self.data.pop("visual_ref", None)
+        else:
+            self.data["visual_ref"] = visual_ref.to_dict()
 
     def to_dict(self) -> Dict[str, Any]:
-        data_dict = self.data.copy()
-        if self.visual_ref:
-            data_dict["visual_ref"] = self.visual_ref.to_dict()
-
+        """Returns the serialized node. The "data" entry is the node's own dict, not a copy."""
         return {
             "node_id": self.node_id,
             "node_type": self.node_type,
-            "data": data_dict
+            "data": self.data
         }
 
 
@@ -66,7 +84,12 @@ class GraphEdge:
     """
     Represents an edge in the test execution graph.
     Connects two nodes and represents a relationship or result.
+
+    Edges use __slots__; their node ids and type are interned, so every edge
+    shares the id strings of its nodes instead of holding its own copies.
     """
+    __slots__ = ("source_node_id", "target_node_id", "edge_type", "data")
+
     def __init__(self, source_node_id: str, target_node_id: str, edge_type: str, data: Dict[str, Any]):
         """
         Initializes a GraphEdge.
@@ -77,9 +100,9 @@ class GraphEdge:
             edge_type: Type of the edge (e.g., "relation", "result").
             data: Dictionary containing edge-specific data (e.g., "click", "fill", "leads to").
         """
-        self.source_node_id = source_node_id
-        self.target_node_id = target_node_id
-        self.edge_type = edge_type
+        self.source_node_id = sys.intern(source_node_id)
+        self.target_node_id = sys.intern(target_node_id)
+        self.edge_type = sys.intern(edge_type)
         self.data = data
 
     def to_dict(self) -> Dict[str, Any]:
@@ -90,23 +113,175 @@ class GraphEdge:
             "data": self.data
         }
 
-class ExecutionGraph:
+class GraphTraversal:
+    """
+    Traversal helpers shared by the graph implementations. Subclasses provide
+    get_node(node_id) and successors(node_id, edge_type).
+    """
+    def bfs(self, start_node_id: str, edge_type: Optional[str] = None, max_depth: Optional[int] = None) -> List[str]:
+        """
+        Returns the ids of the nodes reachable from a node in breadth-first order,
+        starting with the node itself.
+        """
+        if self.get_node(start_node_id) is None:
+            return []
+        visited = {start_node_id}
+        order = [start_node_id]
+        queue = deque([(start_node_id, 0)])
+        while queue:
+            node_id, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for next_id in self.successors(node_id, edge_type):
+                if next_id not in visited:
+                    visited.add(next_id)
+                    order.append(next_id)
+                    queue.append((next_id, depth + 1))
+        return order
+
+    def shortest_path(self, source_node_id: str, target_node_id: str, edge_type: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Returns the node ids of a path with the fewest edges from source to target,
+        or None if the target cannot be reached.
+        """
+        if self.get_node(source_node_id) is None or self.get_node(target_node_id) is None:
+            return None
+        previous: Dict[str, Optional[str]] = {source_node_id: None}
+        queue = deque([source_node_id])
+        while queue:
+            node_id = queue.popleft()
+            if node_id == target_node_id:
+                path = []
+                while node_id is not None:
+                    path.append(node_id)
+                    node_id = previous[node_id]
+                return path[::-1]
+            for next_id in self.successors(node_id, edge_type):
+                if next_id not in previous:
+                    previous[next_id] = node_id
+                    queue.append(next_id)
+        return None
+
+class ExecutionGraph(GraphTraversal):
     """
     Represents the test execution graph.
     Contains nodes and edges defining the test flow and relationships.
+
+    Edges are kept in adjacency maps in both directions, and nodes are indexed by
+    type and by the data attributes in INDEXED_ATTRIBUTES, so neighbour, type and
+    attribute lookups do not scan the whole graph. There is at most one edge of a
+    type between two nodes, as in SqliteGraphStore.
     """
+    INDEXED_ATTRIBUTES = ("url", "selector", "target")
+
     def __init__(self):
         self.nodes: Dict[str, GraphNode] = {}
         self.edges: List[GraphEdge] = []
+        self._out_edges: Dict[str, List[GraphEdge]] = {}
+        self._in_edges: Dict[str, List[GraphEdge]] = {}
+        self._edge_index: Dict[tuple, GraphEdge] = {} # (source, target, type) -> edge
+        self._type_index: Dict[str, Set[str]] = {}
+        self._attribute_index: Dict[str, Dict[Any, Set[str]]] = {name: {} for name in self.INDEXED_ATTRIBUTES}
 
     def add_node(self, node: GraphNode):
         if node.node_id in self.nodes:
-            # Handle potential duplicates or updates
-            pass # For now, simple add
+            # Replacing a node: drop the index entries of the old version
+            self._unindex_node(self.nodes[node.node_id])
         self.nodes[node.node_id] = node
+        self._type_index.setdefault(node.node_type, set()).add(node.node_id)
+        for name in self.INDEXED_ATTRIBUTES:
+            value = node.data.get(name)
+            if value is not None and not isinstance(value, (dict, list)):
+                self._attribute_index[name].setdefault(value, set()).add(node.node_id)
+
+    def _unindex_node(self, node: GraphNode):
+        node_ids = self._type_index.get(node.node_type)
+        if node_ids is not None:
+            node_ids.discard(node.node_id)
+        for name in self.INDEXED_ATTRIBUTES:
+            value = node.data.get(name)
+            node_ids = self._attribute_index[name].get(value) if value is not None and not isinstance(value, (dict, list)) else None
+            if node_ids is not None:
+                node_ids.discard(node.node_id)
 
     def add_edge(self, edge: GraphEdge):
+        """Adds an edge, or updates the data of the edge of the same type between the same nodes."""
+        key = (edge.source_node_id, edge.target_node_id, edge.edge_type)
+        existing = self._edge_index.get(key)
+        if existing is not None:
+            existing.data = edge.data
+            return
+        self._edge_index[key] = edge
         self.edges.append(edge)
+        self._out_edges.setdefault(edge.source_node_id, []).append(edge)
+        self._in_edges.setdefault(edge.target_node_id, []).append(edge)
+
+    def get_node(self, node_id: str) -> Optional[GraphNode]:
+        return self.nodes.get(node_id)
+
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    def edge_count(self) -> int:
+        return len(self.edges)
+
+    def out_edges(self, node_id: str, edge_type: Optional[str] = None) -> List[GraphEdge]:
+        """Returns the edges leaving a node, optionally only those of one type."""
+        edges = self._out_edges.get(node_id, [])
+        return [edge for edge in edges if edge.edge_type == edge_type] if edge_type else list(edges)
+
+    def in_edges(self, node_id: str, edge_type: Optional[str] = None) -> List[GraphEdge]:
+        """Returns the edges entering a node, optionally only those of one type."""
+        edges = self._in_edges.get(node_id, [])
+        return [edge for edge in edges if edge.edge_type == edge_type] if edge_type else list(edges)
+
+    def successors(self, node_id: str, edge_type: Optional[str] = None) -> List[str]:
+        return [edge.target_node_id for edge in self.out_edges(node_id, edge_type)]
+
+    def predecessors(self, node_id: str, edge_type: Optional[str] = None) -> List[str]:
+        return [edge.source_node_id for edge in self.in_edges(node_id, edge_type)]
+
+    def nodes_by_type(self, node_type: str) -> List[GraphNode]:
+        """Returns all nodes of a type."""
+        return [self.nodes[node_id] for node_id in self._type_index.get(node_type, ())]
+
+    def find_nodes(self, attribute: str, value: Any, node_type: Optional[str] = None) -> List[GraphNode]:
+        """
+        Returns the nodes whose data has the given attribute value. Uses the index for
+        INDEXED_ATTRIBUTES and scans the nodes for any other attribute.
+        """
+        if attribute in self._attribute_index:
+            candidates = (self.nodes[node_id] for node_id in self._attribute_index[attribute].get(value, ()))
+        else:
+            candidates = (node for node in self.nodes.values() if node.data.get(attribute) == value)
+        return [node for node in candidates if node_type is None or node.node_type == node_type]
+
+    def topological_order(self, edge_type: Optional[str] = None) -> List[str]:
+        """
+        Returns the node ids ordered so that every edge points forward (Kahn's algorithm).
+        Nodes without ordering constraints keep their insertion order.
+
+        Raises:
+            ValueError: If the graph (restricted to edge_type) contains a cycle.
+        """
+        in_degree = {node_id: 0 for node_id in self.nodes}
+        for node_id in self.nodes:
+            for next_id in self.successors(node_id, edge_type):
+                if next_id in in_degree:
+                    in_degree[next_id] += 1
+        queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+        order = []
+        while queue:
+            node_id = queue.popleft()
+            order.append(node_id)
+            for next_id in self.successors(node_id, edge_type):
+                if next_id in in_degree:
+                    in_degree[next_id] -= 1
+                    if in_degree[next_id] == 0:
+                        queue.append(next_id)
+        if len(order) != len(self.nodes):
+            raise ValueError("The execution graph contains a cycle; it has no topological order.")
+        return order
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -0,0 +1,206 @@
+# mmat/graph/sqlite_store.py
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from mmat.graph.models import ExecutionGraph, GraphEdge, GraphNode, GraphTraversal
+from mmat.utils.logger import Logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id TEXT PRIMARY KEY,
+    node_type TEXT NOT NULL,
+    url TEXT,
+    selector TEXT,
+    target TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes (node_type);
+CREATE INDEX IF NOT EXISTS idx_nodes_url ON nodes (url);
+CREATE INDEX IF NOT EXISTS idx_nodes_selector ON nodes (selector);
+CREATE INDEX IF NOT EXISTS idx_nodes_target ON nodes (target);
+CREATE TABLE IF NOT EXISTS edges (
+    source_node_id TEXT NOT NULL,
+    target_node_id TEXT NOT NULL,
+    edge_type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source_node_id, target_node_id, edge_type)
+);
+CREATE INDEX IF NOT EXISTS idx_edges_target ON edges (target_node_id, edge_type);
+"""
+
+class SqliteGraphStore(GraphTraversal):
+    """
+    Persistent execution graph stored in a SQLite database, so the knowledge graph
+    grows across runs without being loaded into memory in full.
+
+    Writes are upserts: a node with an existing id replaces the stored one, and an
+    edge is identified by its source, target and type. They are buffered and written
+    in one transaction per `batch_size` operations (or on flush()); queries flush
+    pending writes first and read only the rows they need. The query methods match
+    those of ExecutionGraph. The attributes in ExecutionGraph.INDEXED_ATTRIBUTES are
+    stored in indexed columns.
+    """
+    INDEXED_ATTRIBUTES = ExecutionGraph.INDEXED_ATTRIBUTES
+
+    def __init__(self, db_path: str, batch_size: int = 100):
+        """
+        Initializes the SqliteGraphStore.
+
+        Args:
+            db_path: Path to the SQLite database file. Created if missing.
+            batch_size: Number of buffered upserts written per transaction.
+        """
+        self.logger = Logger(__name__)
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # Steps are recorded from worker threads; one connection guarded by a lock
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._pending_nodes: Dict[str, tuple] = {}
+        self._pending_edges: Dict[tuple, tuple] = {}
+        self.stats: Dict[str, int] = {"node_upserts": 0, "edge_upserts": 0, "transactions": 0}
+
+    def add_node(self, node: GraphNode):
+        """Queues an upsert of a node."""
+        node_dict = node.to_dict()
+        data = node_dict["data"]
+        row = (node.node_id, node.node_type,
+               *(self._column_value(data.get(name)) for name in self.INDEXED_ATTRIBUTES),
+               json.dumps(data, ensure_ascii=False, default=str))
+        with self._lock:
+            self._pending_nodes[node.node_id] = row
+            self.stats["node_upserts"] += 1
+            self._flush_if_full()
+
+    def add_edge(self, edge: GraphEdge):
+        """Queues an upsert of an edge."""
+        key = (edge.source_node_id, edge.target_node_id, edge.edge_type)
+        with self._lock:
+            self._pending_edges[key] = key + (json.dumps(edge.data or {}, ensure_ascii=False, default=str),)
+            self.stats["edge_upserts"] += 1
+            self._flush_if_full()
+
+    @staticmethod
+    def _column_value(value: Any) -> Optional[str]:
+        return None if value is None or isinstance(value, (dict, list)) else str(value)
+
+    def _flush_if_full(self):
+        if len(self._pending_nodes) + len(self._pending_edges) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered upserts in one transaction."""
+        with self._lock:
+            if not self._pending_nodes and not self._pending_edges:
+                return
+            with self._connection: # Commits on success, rolls back on error
+                self._connection.executemany(
+                    "INSERT INTO nodes (node_id, node_type, url, selector, target, data) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(node_id) DO UPDATE SET node_type = excluded.node_type, url = excluded.url, "
+                    "selector = excluded.selector, target = excluded.target, data = excluded.data",
+                    list(self._pending_nodes.values()))
+                self._connection.executemany(
+                    "INSERT INTO edges (source_node_id, target_node_id, edge_type, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(source_node_id, target_node_id, edge_type) DO UPDATE SET data = excluded.data",
+                    list(self._pending_edges.values()))
+            self._pending_nodes.clear()
+            self._pending_edges.clear()
+            self.stats["transactions"] += 1
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            self.flush()
+            return self._connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _node_from_row(row: tuple) -> GraphNode:
+        return GraphNode(row[0], row[1], json.loads(row[2]))
+
+    @staticmethod
+    def _edge_from_row(row: tuple) -> GraphEdge:
+        return GraphEdge(row[0], row[1], row[2], json.loads(row[3]))
+
+    def get_node(self, node_id: str) -> Optional[GraphNode]:
+        rows = self._query("SELECT node_id, node_type, data FROM nodes WHERE node_id = ?", (node_id,))
+        return self._node_from_row(rows[0]) if rows else None
+
+    def node_count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM nodes")[0][0]
+
+    def edge_count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM edges")[0][0]
+
+    def out_edges(self, node_id: str, edge_type: Optional[str] = None) -> List[GraphEdge]:
+        """Returns the edges leaving a node, optionally only those of one type."""
+        sql = "SELECT source_node_id, target_node_id, edge_type, data FROM edges WHERE source_node_id = ?"
+        params = (node_id,)
+        if edge_type:
+            sql += " AND edge_type = ?"
+            params += (edge_type,)
+        return [self._edge_from_row(row) for row in self._query(sql + " ORDER BY rowid", params)]
+
+    def in_edges(self, node_id: str, edge_type: Optional[str] = None) -> List[GraphEdge]:
+        """Returns the edges entering a node, optionally only those of one type."""
+        sql = "SELECT source_node_id, target_node_id, edge_type, data FROM edges WHERE target_node_id = ?"
+        params = (node_id,)
+        if edge_type:
+            sql += " AND edge_type = ?"
+            params += (edge_type,)
+        return [self._edge_from_row(row) for row in self._query(sql + " ORDER BY rowid", params)]
+
+    def successors(self, node_id: str, edge_type: Optional[str] = None) -> List[str]:
+        return [edge.target_node_id for edge in self.out_edges(node_id, edge_type)]
+
+    def predecessors(self, node_id: str, edge_type: Optional[str] = None) -> List[str]:
+        return [edge.source_node_id for edge in self.in_edges(node_id, edge_type)]
+
+    def nodes_by_type(self, node_type: str) -> List[GraphNode]:
+        """Returns all nodes of a type."""
+        rows = self._query("SELECT node_id, node_type, data FROM nodes WHERE node_type = ? ORDER BY rowid", (node_type,))
+        return [self._node_from_row(row) for row in rows]
+
+    def find_nodes(self, attribute: str, value: Any, node_type: Optional[str] = None) -> List[GraphNode]:
+        """
+        Returns the nodes whose data has the given attribute value. Uses the indexed
+        column for INDEXED_ATTRIBUTES and the JSON data for any other attribute.
+        """
+        if attribute in self.INDEXED_ATTRIBUTES:
+            sql = f"SELECT node_id, node_type, data FROM nodes WHERE {attribute} = ?"
+            params = (self._column_value(value),)
+        else:
+            sql = "SELECT node_id, node_type, data FROM nodes WHERE json_extract(data, ?) = ?"
+            params = (f'$."{attribute}"', value)
+        if node_type:
+            sql += " AND node_type = ?"
+            params += (node_type,)
+        nodes = [self._node_from_row(row) for row in self._query(sql + " ORDER BY rowid", params)]
+        # Indexed columns hold strings; compare with the original value type
+        return [node for node in nodes if node.data.get(attribute) == value]
+
+    def to_execution_graph(self) -> ExecutionGraph:
+        """Loads the whole stored graph into memory."""
+        graph = ExecutionGraph()
+        for row in self._query("SELECT node_id, node_type, data FROM nodes ORDER BY rowid"):
+            graph.add_node(self._node_from_row(row))
+        for row in self._query("SELECT source_node_id, target_node_id, edge_type, data FROM edges ORDER BY rowid"):
+            graph.add_edge(self._edge_from_row(row))
+        return graph
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.to_execution_graph().to_dict()
+
+    def close(self):
+        """Writes pending upserts and closes the database."""
+        with self._lock:
+            self.flush()
+            self._connection.close()
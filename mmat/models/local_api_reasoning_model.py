@@ -2,34 +2,73 @@
 
 import requests
 import json # Import the json module
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
 from .reasoning_model import ReasoningModel
+from .model_transport import ModelTransport, get_shared_transport
+from .response_cache import ResponseCache
+from .streaming_json import IncrementalJsonArrayParser
+from mmat.analysis.dom_compactor import DomCompactor
 
 class LocalApiReasoningModel(ReasoningModel):
     """
     Reasoning model implementation that interacts with a local LLM API endpoint.
     """
-    def __init__(self, api_url: str, model_name: str):
+    def __init__(self, api_url: str, model_name: str, transport: Optional[ModelTransport] = None,
+                 cache: Optional[ResponseCache] = None, deterministic: bool = False, seed: int = 0,
+                 dom_token_budget: int = 1500):
         """
         Initializes the LocalApiReasoningModel.
 
         Args:
             api_url: The URL of the local LLM API endpoint (e.g., http://172.29.32.1:1234/v1).
             model_name: The name of the model to use (e.g., mistralai/magistral-small).
+            transport: Pooled HTTP transport (timeouts, retries, circuit breaker).
+                       Defaults to the process-wide shared transport.
+            cache: Optional persistent cache of completions, keyed by the normalized
+                   messages, model name and sampling parameters.
+            deterministic: Sample with temperature 0 and a fixed seed, so the same
+                           prompt gives the same completion.
+            seed: The sampling seed used in deterministic mode.
+            dom_token_budget: Largest estimated number of tokens of the DOM outline in a
+                              prompt; larger pages are compacted (see DomCompactor).
         """
         self.api_url = api_url
         self.model_name = model_name
+        self.transport = transport or get_shared_transport()
+        self.cache = cache
+        self.deterministic = deterministic
+        self.seed = seed
+        self.dom_compactor = DomCompactor(token_budget=dom_token_budget)
         print(f"[LocalApiReasoningModel] Initialized with API URL: {self.api_url}, Model: {self.model_name}")
 
     def analyze_dom(self, dom_structure: str) -> Dict[str, Any]:
         """
         Analyzes the HTML DOM structure using the reasoning model.
-        (Implementation needed)
+
+        The DOM (an HTML document or a rendered DOM snapshot) is compacted to the
+        configured token budget before it is sent.
+
+        Args:
+            dom_structure: The HTML or the outline of the page's DOM.
+
+        Returns:
+            The model's JSON analysis ('page_type', 'summary', 'interactive_elements'),
+            or {'raw': content} if the reply is not a JSON object, with the 'dom_compaction'
+            statistics of the prompt.
+
+        Raises:
+            requests.exceptions.RequestException: If the API call fails.
         """
-        print("[LocalApiReasoningModel] analyze_dom called (implementation needed)")
-        # Placeholder implementation
-        return {"analysis_result": "DOM analysis not implemented yet"}
+        compacted = self.dom_compactor.compact(dom_structure)
+        print(f"[LocalApiReasoningModel] Analyzing DOM: {compacted.elements_kept} of {compacted.elements} elements, ~{compacted.tokens} tokens")
+        prompt_messages = [
+            {"role": "system", "content": "You are a web page analyst. You receive an outline of a page's DOM with one element per line, indented by nesting; repeated items are shown once followed by a count. Describe the page as a JSON object with 'page_type', 'summary' and 'interactive_elements' (a list of objects with 'description' and 'selector'). Provide only the JSON object."},
+            {"role": "user", "content": f"DOM outline:\n{compacted.text}"}
+        ]
+        analysis = self._parse_json_object(self._message_content(self._chat_completion(prompt_messages, max_tokens=1000)))
+        analysis["dom_compaction"] = self._compaction_stats(compacted)
+        return analysis
 
     def generate_test_plan(self, description: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -46,28 +85,11 @@ class LocalApiReasoningModel(ReasoningModel):
         print(f"[LocalApiReasoningModel] Generating test plan for description: '{description}'")
         print(f"[LocalApiReasoningModel] Context: {context}")
 
-        # Construct the prompt for the LLM
-        # This prompt needs to guide the LLM to output test steps in a structured format (e.g., JSON)
-        prompt_messages = [
-            {"role": "system", "content": "You are a test automation expert. Your task is to convert natural language descriptions of user interactions into a sequence of structured test steps in JSON format. Each step should be an object with 'action' (e.g., 'navigate', 'fill', 'click', 'assert_url', 'assert_element_visible') and 'parameters' (a dictionary specific to the action). For 'fill' and 'click', include a 'selector'. For 'navigate', include a 'url'. For assertions, include 'expected' or 'selector'. Provide only the JSON array of steps."},
-            {"role": "user", "content": f"Generate test steps for the following scenario:\nDescription: {description}\nContext: {context}\n\nOutput the steps as a JSON array."}
-        ]
+        prompt_messages = self._test_plan_messages(description, context)
 
         try:
             # Make the API call to the local LLM server
-            response = requests.post(
-                f"{self.api_url}/chat/completions", # Assuming chat completions endpoint
-                json={
-                    "model": self.model_name,
-                    "messages": prompt_messages,
-                    "max_tokens": 2000, # Increased to allow for longer responses
-                    "temperature": 0.7, # Adjust as needed
-                    # Add other parameters if required by the API
-                }
-            )
-            response.raise_for_status() # Raise an exception for bad status codes
-
-            api_response = response.json()
+            api_response = self._chat_completion(prompt_messages, max_tokens=2000) # Increased to allow for longer responses
             print(f"[LocalApiReasoningModel] Received API response: {api_response}")
 
             # Parse the API response to extract test steps
@@ -89,6 +111,145 @@ class LocalApiReasoningModel(ReasoningModel):
             traceback.print_exc() # Print traceback for debugging
             return []
 
+    def _sampling_params(self, max_tokens: int) -> Dict[str, Any]:
+        """Returns the sampling parameters of a request; fixed temperature and seed in deterministic mode."""
+        if self.deterministic:
+            return {"max_tokens": max_tokens, "temperature": 0, "seed": self.seed}
+        return {"max_tokens": max_tokens, "temperature": 0.7} # Adjust as needed
+
+    @staticmethod
+    def _normalize_messages(prompt_messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Normalizes chat messages for the cache key: line endings, trailing whitespace
+        and surrounding blank lines do not change the key.
+        """
+        normalized = []
+        for message in prompt_messages:
+            content = str(message.get("content", "")).replace("\r\n", "\n").strip()
+            normalized.append({
+                "role": str(message.get("role", "")).strip().lower(),
+                "content": "\n".join(line.rstrip() for line in content.split("\n")),
+            })
+        return normalized
+
+    def _cache_key(self, prompt_messages: List[Dict[str, str]], sampling_params: Dict[str, Any]) -> Optional[str]:
+        """Builds the response cache key of a request, or None when caching is off."""
+        if self.cache is None:
+            return None
+        return ResponseCache.make_key("reasoning", self._normalize_messages(prompt_messages), self.model_name, sampling_params)
+
+    def _chat_completion(self, prompt_messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, Any]:
+        """
+        Sends chat messages to the chat completions endpoint, using the response cache
+        when one is configured.
+
+        Returns:
+            The decoded JSON response of the API.
+        """
+        sampling_params = self._sampling_params(max_tokens)
+        cache_key = self._cache_key(prompt_messages, sampling_params)
+        if cache_key:
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                print("[LocalApiReasoningModel] Using cached LLM response.")
+                return cached_response
+
+        response = self.transport.post(
+            f"{self.api_url}/chat/completions", # Assuming chat completions endpoint
+            json={"model": self.model_name, "messages": prompt_messages, **sampling_params}
+        )
+        response.raise_for_status() # Raise an exception for bad status codes
+        api_response = response.json()
+
+        if cache_key:
+            self.cache.put(cache_key, api_response)
+        return api_response
+
+    def _test_plan_messages(self, description: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Builds the chat messages asking the LLM for the test steps of a scenario.
+        """
+        # Construct the prompt for the LLM
+        # This prompt needs to guide the LLM to output test steps in a structured format (e.g., JSON)
+        return [
+            {"role": "system", "content": "You are a test automation expert. Your task is to convert natural language descriptions of user interactions into a sequence of structured test steps in JSON format. Each step should be an object with 'action' (e.g., 'navigate', 'fill', 'click', 'assert_url', 'assert_element_visible') and 'parameters' (a dictionary specific to the action). For 'fill' and 'click', include a 'selector'. For 'navigate', include a 'url'. For assertions, include 'expected' or 'selector'. Provide only the JSON array of steps."},
+            {"role": "user", "content": f"Generate test steps for the following scenario:\nDescription: {description}\nContext: {context}\n\nOutput the steps as a JSON array."}
+        ]
+
+    def stream_test_plan(self, description: str, context: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generates test steps with a streamed completion ("stream": true), yielding each
+        step as soon as its JSON object is complete instead of after the whole response.
+
+        Args:
+            description: A natural language description of the test objective.
+            context: A dictionary containing relevant context (e.g., start URL, test data).
+
+        Yields:
+            One dictionary per test step.
+        """
+        print(f"[LocalApiReasoningModel] Streaming test plan for description: '{description}'")
+        prompt_messages = self._test_plan_messages(description, context)
+        sampling_params = self._sampling_params(max_tokens=2000)
+        cache_key = self._cache_key(prompt_messages, sampling_params)
+        if cache_key:
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                print("[LocalApiReasoningModel] Using cached LLM response.")
+                yield from self._parse_llm_response(cached_response)
+                return
+
+        parser = IncrementalJsonArrayParser()
+        streamed_content = []
+        step_count = 0
+        try:
+            response = self.transport.post(
+                f"{self.api_url}/chat/completions",
+                json={"model": self.model_name, "messages": prompt_messages, **sampling_params, "stream": True},
+                stream=True,
+            )
+            with response: # Returns the pooled connection, also when the status is an error
+                response.raise_for_status()
+                for content in self._iter_stream_content(response):
+                    streamed_content.append(content)
+                    for element in parser.feed(content):
+                        if isinstance(element, dict):
+                            step_count += 1
+                            yield element
+                        else:
+                            print(f"[LocalApiReasoningModel] Ignoring array element that is not a step: {element!r}")
+                    if parser.done:
+                        break # The steps are complete; the rest of the completion is not needed
+        except requests.exceptions.RequestException as e:
+            print(f"[LocalApiReasoningModel] Error calling LLM API: {e}")
+            return
+
+        print(f"[LocalApiReasoningModel] Streamed {step_count} steps from LLM.")
+        if cache_key and parser.done:
+            # Cache the completed array in the shape of a regular completion, so both modes share entries
+            self.cache.put(cache_key, {"choices": [{"message": {"role": "assistant", "content": "".join(streamed_content)}}]})
+
+    def _iter_stream_content(self, response) -> Iterator[str]:
+        """
+        Yields the content deltas of a server-sent events (SSE) chat completion stream.
+        """
+        response.encoding = "utf-8" # SSE is always UTF-8; requests would assume ISO-8859-1 for text/event-stream
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue # Blank separators, comments and other SSE fields
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            try:
+                chunk = json.loads(data)
+            except json.JSONDecodeError:
+                print(f"[LocalApiReasoningModel] Skipping malformed stream event: {data[:100]}")
+                continue
+            for choice in chunk.get("choices", []):
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+
     def generate_text(self, prompt_messages: List[Dict[str, str]]) -> str: # Changed prompt to prompt_messages
         """
         Generates text based on a given prompt using the reasoning model.
@@ -103,18 +264,7 @@ class LocalApiReasoningModel(ReasoningModel):
         print(f"[LocalApiReasoningModel] Generating text for prompt (first message content first 100 chars): '{prompt_messages[0]['content'][:100]}'")
 
         try:
-            response = requests.post(
-                f"{self.api_url}/chat/completions",
-                json={
-                    "model": self.model_name,
-                    "messages": prompt_messages, # Pass the list of messages
-                    "max_tokens": 1000,
-                    "temperature": 0.7,
-                }
-            )
-            response.raise_for_status()
-
-            api_response = response.json()
+            api_response = self._chat_completion(prompt_messages, max_tokens=1000)
             print(f"[LocalApiReasoningModel] Received API response for text generation.")
 
             # Extract content from the response
@@ -139,11 +289,69 @@ class LocalApiReasoningModel(ReasoningModel):
         """
         Identifies a specific element within the DOM structure based on a description
         using the reasoning model.
-        (Implementation needed)
+
+        The DOM is compacted to the configured token budget, keeping the elements
+        whose texts and attributes match the description first.
+
+        Args:
+            dom_structure: The HTML or the outline of the page's DOM.
+            description: A natural language description of the element.
+
+        Returns:
+            A dictionary with the 'element_selector' (None if not found), the model's
+            'confidence' (0 to 1), its 'reason' and the 'dom_compaction' statistics.
         """
-        print("[LocalApiReasoningModel] identify_element_by_structure called (implementation needed)")
-        # Placeholder implementation
-        return {"element_selector": "body", "confidence": 0.5}
+        compacted = self.dom_compactor.compact(dom_structure, description)
+        print(f"[LocalApiReasoningModel] Identifying element '{description}' in {compacted.elements_kept} of {compacted.elements} elements (~{compacted.tokens} tokens)")
+        prompt_messages = [
+            {"role": "system", "content": "You are a test automation expert. You receive an outline of a page's DOM with one element per line, indented by nesting; repeated items are shown once followed by a count. Find the element matching the description and answer with a JSON object with 'selector' (a CSS selector, or null if no element matches), 'confidence' (0 to 1) and 'reason'. Provide only the JSON object."},
+            {"role": "user", "content": f"Element: {description}\n\nDOM outline:\n{compacted.text}"}
+        ]
+        result = {"element_selector": None, "confidence": 0.0, "reason": "", "dom_compaction": self._compaction_stats(compacted)}
+        try:
+            answer = self._parse_json_object(self._message_content(self._chat_completion(prompt_messages, max_tokens=300)))
+        except requests.exceptions.RequestException as e:
+            print(f"[LocalApiReasoningModel] Error calling LLM API for element identification: {e}")
+            result["reason"] = f"Error: Could not identify the element: {e}"
+            return result
+        try:
+            result["confidence"] = min(1.0, max(0.0, float(answer.get("confidence", 0))))
+        except (TypeError, ValueError):
+            pass
+        result["element_selector"] = answer.get("selector") or None
+        result["reason"] = str(answer.get("reason") or answer.get("raw", ""))
+        return result
+
+    @staticmethod
+    def _compaction_stats(compacted) -> Dict[str, int]:
+        """Returns the statistics of a compacted DOM reported with the model's answer."""
+        return {"tokens": compacted.tokens, "elements": compacted.elements,
+                "elements_kept": compacted.elements_kept, "repeats_collapsed": compacted.repeats_collapsed}
+
+    @staticmethod
+    def _message_content(api_response: Dict[str, Any]) -> str:
+        """Returns the content of the first choice of a chat completion, or an empty string."""
+        choices = api_response.get("choices", [])
+        if choices and choices[0].get("message"):
+            return choices[0]["message"].get("content") or ""
+        return ""
+
+    @staticmethod
+    def _parse_json_object(content: str) -> Dict[str, Any]:
+        """
+        Parses the first JSON object of a completion; the model may surround it with
+        other text. Returns {'raw': content} if there is none.
+        """
+        json_start = content.find('{')
+        json_end = content.rfind('}')
+        if json_start != -1 and json_end > json_start:
+            try:
+                parsed = json.loads(content[json_start : json_end + 1])
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError as e:
+                print(f"[LocalApiReasoningModel] JSON parsing failed: {e}")
+        return {"raw": content}
 
     def _parse_llm_response(self, api_response: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -1,52 +1,97 @@
 import base64
+import contextvars
+import hashlib
+import threading
 import requests
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from mmat.models.vision_model import VisionModel # Import VisionModel from the correct path
+from mmat.models.model_transport import ModelTransport, get_shared_transport
+from mmat.models.response_cache import ResponseCache
 from mmat.utils.logger import Logger
+from mmat.utils import tracing
+from mmat.utils.image_utils import ImageSource, describe_image, detect_mime_type
+
+ANALYZE_SCREENSHOT_PROMPT = "Analyze this screenshot and describe its content, layout, and any interactive elements."
 
 class LocalApiVisionModel(VisionModel):
     """
     Vision model implementation that interacts with a local API endpoint
     (e.g., LM Studio) for multimodal analysis.
     """
-    def __init__(self, api_url: str, model_name: str):
+    def __init__(self, api_url: str, model_name: str, cache: Optional[ResponseCache] = None,
+                 transport: Optional[ModelTransport] = None, max_in_flight: int = 4):
         """
         Initializes the LocalApiVisionModel.
 
         Args:
             api_url: The URL of the local API endpoint (e.g., http://localhost:1234/v1).
             model_name: The name of the model to use (e.g., mistralai/mistral-small-3.2).
+            cache: Optional persistent cache of model responses, keyed by image digest,
+                   prompt, model name and max_tokens.
+            transport: Pooled HTTP transport (timeouts, retries, circuit breaker).
+                       Defaults to the process-wide shared transport.
+            max_in_flight: Maximum number of requests sent to the API at the same time,
+                           across all callers. Local inference servers (LM Studio, vLLM)
+                           batch concurrent requests, so a few in flight raise throughput.
         """
         self.logger = Logger(__name__)
         self.api_url = api_url
         self.model_name = model_name
+        self.cache = cache
+        self.transport = transport or get_shared_transport()
+        self.max_in_flight = max(1, max_in_flight)
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
         self.logger.info(f"Initialized LocalApiVisionModel for {model_name} at {api_url}")
 
-    def _encode_image_to_base64(self, image_path: str) -> str:
-        """Encodes an image file to a base64 string."""
+    def _read_image(self, image_path: ImageSource) -> bytes:
+        """Reads an image file into memory. In-memory images (bytes) are returned as they are."""
+        if isinstance(image_path, (bytes, bytearray)):
+            return bytes(image_path)
         try:
             with open(image_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+                return image_file.read()
         except FileNotFoundError:
             self.logger.error(f"Image file not found: {image_path}")
             raise
         except Exception as e:
-            self.logger.error(f"Error encoding image {image_path}: {e}")
+            self.logger.error(f"Error reading image {image_path}: {e}")
             raise
 
-    def analyze_screenshot(self, screenshot_path: str) -> Dict[str, Any]:
-        """
-        Analyzes a screenshot using the local multimodal model.
+    def _encode_image_to_base64(self, image_path: ImageSource) -> str:
+        """Encodes an image file (or in-memory image) to a base64 string."""
+        try:
+            return base64.b64encode(self._read_image(image_path)).decode('utf-8')
+        except Exception as e:
+            self.logger.error(f"Error encoding image {describe_image(image_path)}: {e}")
+            raise
 
-        Args:
-            screenshot_path: The file path to the screenshot image.
+    def _cache_key(self, image_bytes: bytes, prompt: str, max_tokens: int) -> Optional[str]:
+        """Builds the response cache key for an image and prompt, or None when caching is off."""
+        if self.cache is None:
+            return None
+        image_digest = hashlib.sha256(image_bytes).hexdigest()
+        return ResponseCache.make_key("vision", image_digest, prompt, self.model_name, max_tokens)
 
-        Returns:
-            A dictionary containing the visual analysis results.
+    def _complete_with_image(self, image_bytes: bytes, prompt: str, max_tokens: int) -> Dict[str, Any]:
         """
-        self.logger.info(f"Sending screenshot {screenshot_path} for analysis to {self.api_url}")
-        base64_image = self._encode_image_to_base64(screenshot_path)
+        Sends an image and a prompt to the chat completions endpoint, using the
+        response cache when one is configured.
 
+        Returns:
+            The decoded JSON response of the API.
+        """
+        cache_key = self._cache_key(image_bytes, prompt, max_tokens)
+        if cache_key:
+            with tracing.span('vision.cache_lookup') as lookup_span:
+                cached_response = self.cache.get(cache_key)
+                lookup_span.set(hit=cached_response is not None)
+            if cached_response is not None:
+                self.logger.info("Using cached vision model response.")
+                return cached_response
+
+        with tracing.span('vision.encode', image_bytes=len(image_bytes)):
+            base64_image = base64.b64encode(image_bytes).decode('utf-8')
         # Construct the payload for the local API (assuming OpenAI-like chat completion format)
         payload = {
             "model": self.model_name,
@@ -54,18 +99,42 @@ class LocalApiVisionModel(VisionModel):
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": "Analyze this screenshot and describe its content, layout, and any interactive elements."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": f"data:{detect_mime_type(image_bytes)};base64,{base64_image}"}}
                     ]
                 }
             ],
-            "max_tokens": 1000 # Adjust as needed
+            "max_tokens": max_tokens
         }
 
+        with tracing.span('vision.request', model=self.model_name):
+            with self._in_flight:
+                response = self.transport.post(f"{self.api_url}/chat/completions", json=payload)
+        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
+        with tracing.span('vision.parse', response_bytes=len(response.content)):
+            api_response = response.json()
+
+        if cache_key:
+            self.cache.put(cache_key, api_response)
+        return api_response
+
+    def analyze_screenshot(self, screenshot_path: ImageSource) -> Dict[str, Any]:
+        """
+        Analyzes a screenshot using the local multimodal model.
+
+        Args:
+            screenshot_path: The file path to the screenshot image, or the encoded image
+                             bytes (sent without a disk round-trip).
+
+        Returns:
+            A dictionary containing the visual analysis results.
+        """
+        self.logger.info(f"Sending screenshot {describe_image(screenshot_path)} for analysis to {self.api_url}")
+        with tracing.span('vision.read'):
+            image_bytes = self._read_image(screenshot_path)
+
         try:
-            response = requests.post(f"{self.api_url}/chat/completions", json=payload)
-            response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-            analysis_result = response.json()
+            analysis_result = self._complete_with_image(image_bytes, ANALYZE_SCREENSHOT_PROMPT, 1000) # Adjust max_tokens as needed
             self.logger.info("Received analysis result from local API.")
             # The structure of analysis_result depends on the API response format.
             # We'll need to parse this later in ScreenshotAnalyzer.
@@ -77,7 +146,37 @@ class LocalApiVisionModel(VisionModel):
             self.logger.error(f"Error processing vision API response: {e}")
             raise
 
-    def identify_element_visually(self, screenshot_path: str, description: str) -> Dict[str, Any]:
+    def analyze_screenshots(self, screenshot_paths: List[ImageSource], return_exceptions: bool = False) -> List[Any]:
+        """
+        Analyzes several screenshots with up to `max_in_flight` requests running concurrently.
+
+        Args:
+            screenshot_paths: The file paths of the screenshot images.
+            return_exceptions: If True, a failed analysis is returned as its exception
+                               in place of the result instead of being raised.
+
+        Returns:
+            The analysis results, in the order of `screenshot_paths`.
+        """
+        if len(screenshot_paths) <= 1:
+            return super().analyze_screenshots(screenshot_paths, return_exceptions)
+
+        self.logger.info(f"Sending {len(screenshot_paths)} screenshots for analysis to {self.api_url} "
+                         f"({self.max_in_flight} in flight)")
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(screenshot_paths)),
+                                thread_name_prefix="mmat-vision") as executor:
+            futures = [executor.submit(contextvars.copy_context().run, self.analyze_screenshot, path) for path in screenshot_paths]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+        return results
+
+    def identify_element_visually(self, screenshot_path: ImageSource, description: str) -> Dict[str, Any]:
         """
         Identifies a specific element within a screenshot based on a description
         using the local multimodal model.
@@ -91,28 +190,12 @@ class LocalApiVisionModel(VisionModel):
             including visual references like BBOX coordinates, OCR text, or a textual description.
             Returns an empty dictionary or None if the element cannot be identified.
         """
-        self.logger.info(f"Attempting to visually identify element '{description}' in {screenshot_path}")
-        base64_image = self._encode_image_to_base64(screenshot_path)
-
-        # Construct the payload for the local API
-        payload = {
-            "model": self.model_name,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": f"Identify the element described as '{description}' in this screenshot. Provide its bounding box coordinates (x1, y1, x2, y2) if possible, or a textual description if coordinates are not available. Respond in JSON format like {{ \"element\": {{ \"description\": \"...\", \"bbox\": [x1, y1, x2, y2] }} }} or {{ \"element\": {{ \"description\": \"...\" }} }} if no bbox." },
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
-                    ]
-                }
-            ],
-            "max_tokens": 500 # Adjust as needed
-        }
+        self.logger.info(f"Attempting to visually identify element '{description}' in {describe_image(screenshot_path)}")
+        image_bytes = self._read_image(screenshot_path)
+        prompt = f"Identify the element described as '{description}' in this screenshot. Provide its bounding box coordinates (x1, y1, x2, y2) if possible, or a textual description if coordinates are not available. Respond in JSON format like {{ \"element\": {{ \"description\": \"...\", \"bbox\": [x1, y1, x2, y2] }} }} or {{ \"element\": {{ \"description\": \"...\" }} }} if no bbox."
 
         try:
-            response = requests.post(f"{self.api_url}/chat/completions", json=payload)
-            response.raise_for_status()
-            api_response = response.json()
+            api_response = self._complete_with_image(image_bytes, prompt, 500) # Adjust max_tokens as needed
 
             # Attempt to parse the response content, assuming the model tries to output JSON
             # This parsing might need refinement based on actual model output
@@ -0,0 +1,288 @@
+# MMAT Model Transport
+# Shared, pooled HTTP transport for the local model APIs.
+
+import bisect
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mmat.utils.logger import Logger
+from mmat.utils import tracing
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while the circuit breaker of an endpoint is open."""
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of request latencies for one endpoint.
+    """
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float):
+        """Records one latency."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a latency quantile as the upper bound of the bucket containing it
+        (the observed maximum for the unbounded bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.buckets[i], self.max_seconds) if i < len(self.buckets) else self.max_seconds
+        return self.max_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total_seconds / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max_seconds, 4),
+            "buckets": {(f"le_{bound}" if i < len(self.buckets) else "inf"): self.counts[i]
+                        for i, bound in enumerate(self.buckets + (None,))},
+        }
+
+class _CircuitBreaker:
+    """
+    Per-host circuit breaker. After `failure_threshold` consecutive failed requests the
+    circuit opens and requests fail fast for `reset_timeout` seconds; then a single
+    trial request is let through (half-open) and its outcome closes or reopens it.
+    """
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Records a failed request. Returns True if this opened the circuit."""
+        self.failures += 1
+        was_open = self.opened_at is not None
+        if was_open or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+            return not was_open
+        return False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.trial_in_flight else "open"
+
+class ModelTransport:
+    """
+    HTTP transport shared by the local model API clients.
+
+    Keeps connections alive in a pooled `requests.Session`, applies connect/read
+    timeouts to every request, retries connection errors, timeouts and retryable
+    status codes (429 and 5xx) with exponential backoff and jitter, and fails fast
+    through a per-host circuit breaker when a model server keeps failing.
+    Request latencies are recorded in a histogram per endpoint.
+    """
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 120.0, max_retries: int = 3,
+                 backoff_factor: float = 0.5, max_backoff: float = 30.0,
+                 retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+                 circuit_failure_threshold: int = 5, circuit_reset_seconds: float = 30.0, pool_size: int = 10):
+        """
+        Initializes the ModelTransport.
+
+        Args:
+            connect_timeout: Seconds to wait for a connection to the model server.
+            read_timeout: Seconds to wait for the response once connected.
+            max_retries: Retries after the first attempt of a request.
+            backoff_factor: Base of the exponential backoff (factor * 2^attempt seconds).
+            max_backoff: Maximum wait between two attempts.
+            retry_statuses: HTTP status codes that are retried.
+            circuit_failure_threshold: Consecutive failed requests that open the circuit of a host.
+            circuit_reset_seconds: Seconds an open circuit waits before letting a trial request through.
+            pool_size: Maximum number of kept-alive connections per host.
+        """
+        self.logger = Logger(__name__)
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_seconds = circuit_reset_seconds
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, _CircuitBreaker] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self.stats: Dict[str, int] = {"requests": 0, "retries": 0, "failures": 0, "circuit_rejections": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ModelTransport":
+        """Creates a transport from the 'models.transport' config block."""
+        config = config or {}
+        keys = ("connect_timeout", "read_timeout", "max_retries", "backoff_factor", "max_backoff",
+                "retry_statuses", "circuit_failure_threshold", "circuit_reset_seconds", "pool_size")
+        return cls(**{key: config[key] for key in keys if key in config})
+
+    def _breaker(self, host: str) -> _CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = _CircuitBreaker(self.circuit_failure_threshold, self.circuit_reset_seconds)
+        return breaker
+
+    def _observe(self, endpoint: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Seconds to wait before the next attempt, honouring a numeric Retry-After header."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        return delay * random.uniform(0.5, 1.0) # Jitter, so parallel workers do not retry in lockstep
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request with timeouts, retries and the circuit breaker applied.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL of the endpoint.
+            **kwargs: Passed on to `requests.Session.request` (json, headers, stream, ...).
+
+        Returns:
+            The response. A retryable status that persists after the last retry is
+            returned as is, so callers still handle it with `raise_for_status()`.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+            requests.exceptions.RequestException: If the last attempt failed to connect or timed out.
+        """
+        parts = urlsplit(url)
+        host = parts.netloc
+        endpoint = f"{method.upper()} {parts.netloc}{parts.path}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            breaker = self._breaker(host)
+            if not breaker.allow():
+                self.stats["circuit_rejections"] += 1
+                raise CircuitOpenError(f"Circuit open for {host} after {breaker.failures} consecutive failures; not sending {endpoint}")
+
+        attempt = 0
+        while True:
+            response = None
+            error = None
+            started = time.perf_counter()
+            try:
+                with tracing.span('http.request', method=method.upper(), endpoint=endpoint, attempt=attempt) as request_span:
+                    response = self.session.request(method, url, **kwargs)
+                    request_span.set(status_code=response.status_code)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except Exception:
+                # Not retryable (e.g. an invalid URL); still counts against the circuit
+                with self._lock:
+                    self.stats["failures"] += 1
+                    breaker.record_failure()
+                raise
+            self._observe(endpoint, time.perf_counter() - started)
+
+            retryable = error is not None or response.status_code in self.retry_statuses
+            if not retryable:
+                with self._lock:
+                    breaker.record_success()
+                return response
+            if attempt >= self.max_retries:
+                break
+
+            delay = self._backoff(attempt, response)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            self.logger.warning(f"{endpoint} failed ({reason}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            if response is not None:
+                response.close() # Return the connection to the pool
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(delay)
+            attempt += 1
+
+        with self._lock:
+            self.stats["failures"] += 1
+            if breaker.record_failure():
+                self.logger.error(f"Circuit opened for {host} after {breaker.failures} consecutive failed requests.")
+        if error is not None:
+            raise error
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Sends a POST request. See request()."""
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns request counters, circuit states per host and latency histograms per endpoint.
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                "circuits": {host: breaker.state for host, breaker in self._breakers.items()},
+                "latency": {endpoint: histogram.to_dict() for endpoint, histogram in self._histograms.items()},
+            }
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+_shared_transport: Optional[ModelTransport] = None
+_shared_lock = threading.Lock()
+
+def get_shared_transport() -> ModelTransport:
+    """Returns the process-wide transport used by model clients created without one."""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = ModelTransport()
+        return _shared_transport
@@ -2,7 +2,7 @@
 # Defines the interface for reasoning models used in MMAT.
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 class ReasoningModel(ABC):
     """
@@ -41,6 +41,21 @@ class ReasoningModel(ABC):
         """
         pass
 
+    def stream_test_plan(self, description: str, context: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generates test steps like generate_test_plan, yielding each step as soon as it
+        is available. Models that support streamed responses override this; the
+        default yields the steps of generate_test_plan once it returns.
+
+        Args:
+            description: A natural language description of the test objective.
+            context: A dictionary containing relevant context (e.g., start URL, test data).
+
+        Yields:
+            One dictionary per test step.
+        """
+        yield from self.generate_test_plan(description, context) or []
+
     @abstractmethod
     def identify_element_by_structure(self, dom_structure: str, description: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,173 @@
+# MMAT Model Response Cache
+# Persistent, size-bounded cache for model API responses.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from mmat.utils.logger import Logger
+
+class ResponseCache:
+    """
+    On-disk cache of model API responses with least-recently-used eviction.
+
+    Every entry is stored as one JSON file named after its key under `cache_dir`,
+    so the cache survives between runs. The file modification time records the
+    last access, which restores the LRU order when the cache is reopened. With a
+    `ttl_seconds`, entries older than that are treated as misses and removed.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Initializes the ResponseCache.
+
+        Args:
+            cache_dir: Directory holding the cache entries. Created if missing.
+            max_bytes: Maximum total size of the entries on disk.
+            max_entries: Optional maximum number of entries.
+            ttl_seconds: Optional maximum age of an entry, counted from when it was stored.
+        """
+        self.logger = Logger(__name__)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict() # key -> size, least recently used first
+        self._total_bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expirations": 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Builds a cache key from JSON-serializable parts.
+
+        Returns:
+            The SHA-256 hex digest of the canonical JSON encoding of the parts.
+        """
+        encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_index(self):
+        """Rebuilds the in-memory LRU index from the files in the cache directory."""
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, file_name[:-len(".json")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self.logger.debug(f"Loaded {len(self._index)} cached responses ({self._total_bytes} bytes) from {self.cache_dir}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Looks up a cached response.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        with self._lock:
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if self.ttl_seconds is not None and time.time() - entry.get("created", 0) > self.ttl_seconds:
+                    self._remove(key)
+                    self.stats["expirations"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                os.utime(path) # Record the access for LRU ordering across runs
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.get("value")
+
+    def put(self, key: str, value: Any):
+        """
+        Stores a response in the cache, evicting least recently used entries if needed.
+
+        Args:
+            key: The cache key.
+            value: A JSON-serializable value.
+        """
+        data = json.dumps({"value": value, "created": time.time()}, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path) # Atomic, so readers never see a partial entry
+            except OSError as e:
+                self.logger.warning(f"Could not write cache entry {path}: {e}")
+                return
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self.stats["writes"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Removes least recently used entries until the size limits hold."""
+        while self._index and (self._total_bytes > self.max_bytes or
+                               (self.max_entries is not None and len(self._index) > self.max_entries)):
+            oldest_key = next(iter(self._index))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        size = self._index.pop(key, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss statistics and the current size of the cache.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._index)
+            stats["bytes"] = self._total_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
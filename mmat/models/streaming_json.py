@@ -0,0 +1,98 @@
+# MMAT Streaming JSON Parser
+# Incremental parser that extracts the elements of a JSON array while it is being generated.
+
+import json
+from typing import Any, List, Optional
+
+from mmat.utils.logger import Logger
+
+class IncrementalJsonArrayParser:
+    """
+    Extracts the elements of the first top-level JSON array in a text that arrives in
+    chunks, such as the streamed content of an LLM completion.
+
+    Text before the opening '[' (e.g. an introduction or a ```json fence) is ignored.
+    Objects and nested arrays are returned as soon as their closing bracket arrives;
+    scalar elements once the following ',' or ']' arrives. Elements that are not valid
+    JSON are skipped and counted in `errors`.
+    """
+    def __init__(self):
+        self.logger = Logger(__name__)
+        self._buffer = ""
+        self._pos = 0 # Next character of the buffer to scan
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start: Optional[int] = None
+        self.done = False
+        self.errors = 0
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Adds a chunk of text.
+
+        Args:
+            text: The next chunk of the generated text.
+
+        Returns:
+            The array elements completed by this chunk, in order.
+        """
+        if self.done or not text:
+            return []
+        self._buffer += text
+        elements = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer) and not self.done:
+            char = buffer[i]
+            if not self._started:
+                if char == '[':
+                    self._started = True
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._element_start is None:
+                    self._element_start = i
+            elif char in '{[':
+                if self._depth == 1 and self._element_start is None:
+                    self._element_start = i
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 1 and self._element_start is not None:
+                    self._emit(buffer[self._element_start:i + 1], elements)
+                elif self._depth == 0:
+                    if self._element_start is not None:
+                        self._emit(buffer[self._element_start:i], elements)
+                    self.done = True
+            elif self._depth == 1:
+                if char == ',':
+                    if self._element_start is not None:
+                        self._emit(buffer[self._element_start:i], elements)
+                elif not char.isspace() and self._element_start is None:
+                    self._element_start = i
+            i += 1
+
+        # Drop the scanned text that no pending element refers to
+        keep_from = self._element_start if self._element_start is not None else i
+        self._buffer = buffer[keep_from:]
+        self._pos = i - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return elements
+
+    def _emit(self, text: str, elements: List[Any]):
+        self._element_start = None
+        try:
+            elements.append(json.loads(text))
+        except json.JSONDecodeError as e:
+            self.errors += 1
+            self.logger.warning(f"Skipping array element that is not valid JSON: {e}")
@@ -18,13 +18,36 @@ class VisionModel(ABC):
         Analyzes a screenshot and extracts relevant visual information.
 
         Args:
-            screenshot_path: The file path to the screenshot image.
+            screenshot_path: The file path to the screenshot image, or the encoded image bytes.
 
         Returns:
             A dictionary containing the visual analysis results (e.g., layout, detected elements).
         """
         pass
 
+    def analyze_screenshots(self, screenshot_paths: List[str], return_exceptions: bool = False) -> List[Any]:
+        """
+        Analyzes several screenshots. Models that can serve concurrent requests
+        override this to send them in parallel; the default analyzes them one by one.
+
+        Args:
+            screenshot_paths: The file paths of the screenshot images, or their encoded bytes.
+            return_exceptions: If True, a failed analysis is returned as its exception
+                               in place of the result instead of being raised.
+
+        Returns:
+            The analysis results, in the order of `screenshot_paths`.
+        """
+        results = []
+        for screenshot_path in screenshot_paths:
+            try:
+                results.append(self.analyze_screenshot(screenshot_path))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
     @abstractmethod
     def identify_element_visually(self, screenshot_path: str, description: str) -> Dict[str, Any]:
         """
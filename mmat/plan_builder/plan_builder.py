@@ -56,13 +56,16 @@ class PlanBuilder:
             print(f"[PlanBuilder] An unexpected error occurred while loading {test_plan_path}: {e}")
             return None
 
-    def generate_plan_from_description(self, description, url=None):
+    def generate_plan_from_description(self, description, url=None, stream=False, on_step=None):
         """
         Generates a test plan from a natural language description.
 
         Args:
             description (str): The natural language description of the test.
             url (str, optional): The URL to interact with. Defaults to None.
+            stream (bool): Stream the steps from the reasoning model as they are generated.
+            on_step (callable, optional): Called with (step_number, step) for every step as
+                                          soon as it arrives, e.g. to show or validate it early.
 
         Returns:
             dict: The generated test plan dictionary, or None if generation fails.
@@ -85,7 +88,19 @@ class PlanBuilder:
 
         try:
             # Use the reasoning model to generate test steps
-            generated_steps = self.reasoning_model.generate_test_plan(description, context)
+            if stream:
+                generated_steps = []
+                for step in self.reasoning_model.stream_test_plan(description, context):
+                    generated_steps.append(step)
+                    if on_step:
+                        on_step(len(generated_steps), step)
+                if not generated_steps:
+                    generated_steps = None # Nothing could be parsed from the stream
+            else:
+                generated_steps = self.reasoning_model.generate_test_plan(description, context)
+                if on_step:
+                    for step_number, step in enumerate(generated_steps or [], start=1):
+                        on_step(step_number, step)
 
             if generated_steps is None:
                  print("[PlanBuilder] Reasoning model failed to generate test steps.")
@@ -0,0 +1,126 @@
+# MMAT Report Merge
+# Merges the JSON reports of the shards of a sharded run into one report.
+
+from typing import Any, Dict, List
+
+from mmat.utils.logger import Logger
+
+logger = Logger(__name__)
+
+def merge_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merges the reports of the shards of a run (see `mmat run --shard`) into the
+    report of the whole run.
+
+    Suites are matched by plan and name and their cases are put back into plan
+    order using the 'case_index' every sharded run stores. Plans of batch reports
+    are told apart by path, since several plans may have the same name. The summary is
+    recomputed from the merged cases; 'steps_skipped' and the screenshot counts
+    are added up.
+
+    The case indices of every plan must cover all its cases (the 'case_count'
+    sharded runs record) exactly once. Shards missing from the input are listed
+    under 'missing_shards', cases no report contains under 'missing_cases' and
+    cases reported more than once under 'duplicate_cases' (only their first copy
+    is merged); missing cases name their plan by path in batch reports. 'complete' is False if any of the three is not empty.
+
+    Args:
+        reports: The shard reports, as written by `mmat run --report`.
+
+    Returns:
+        The merged report.
+    """
+    merged: Dict[str, Any] = {'name': None, 'suites': [], 'summary': {}}
+    suites_by_key: Dict[tuple, Dict[str, Any]] = {}
+    plans_by_path: Dict[Any, Dict[str, Any]] = {}
+    shard_count = None
+    shard_indices = set()
+    case_counts: Dict[Any, int] = {} # Number of cases of every plan path (None: the plan of single-plan reports)
+    added_up = {'steps_skipped': 0, 'screenshots_captured': 0, 'screenshots_avoided': 0}
+
+    for report in reports:
+        merged['name'] = merged['name'] or report.get('name')
+        shard = report.get('shard')
+        if shard:
+            if shard_count is not None and shard['count'] != shard_count:
+                logger.warning(f"Merging reports of runs with different shard counts ({shard_count} and {shard['count']})")
+            shard_count = shard['count']
+            if shard['index'] in shard_indices:
+                logger.warning(f"Shard {shard['index']}/{shard['count']} appears in more than one report")
+            shard_indices.add(shard['index'])
+            if 'case_count' in shard:
+                _expect_cases(case_counts, None, shard['case_count'])
+        for key in added_up:
+            added_up[key] += report.get('summary', {}).get(key, 0)
+
+        for suite in report.get('suites', []):
+            key = (_plan_key(suite), suite.get('name'))
+            if key not in suites_by_key:
+                suites_by_key[key] = {field: value for field, value in suite.items() if field != 'cases'}
+                suites_by_key[key]['cases'] = []
+                merged['suites'].append(suites_by_key[key])
+            suites_by_key[key]['cases'].extend(suite.get('cases', []))
+
+        for plan in report.get('plans', []):
+            plans_by_path.setdefault(plan.get('path'), {'path': plan.get('path'), 'name': plan.get('name')})
+            if 'case_count' in plan:
+                _expect_cases(case_counts, plan.get('path'), plan['case_count'])
+
+    seen: Dict[tuple, Dict[str, Any]] = {} # (plan, case index) -> first merged copy
+    merged['duplicate_cases'] = []
+    for suite in merged['suites']:
+        cases = []
+        for case in sorted(suite['cases'], key=lambda case: case.get('case_index', 0)):
+            if 'case_index' in case:
+                key = (_plan_key(suite), case['case_index'])
+                if key in seen:
+                    logger.error(f"Test case '{case.get('name')}' of suite '{suite['name']}' appears in more than one report; keeping the first copy")
+                    merged['duplicate_cases'].append({'plan': suite.get('plan'), 'suite': suite['name'], 'name': case.get('name'),
+                                                      'case_index': case['case_index']})
+                    continue
+                seen[key] = case
+            cases.append(case)
+        suite['cases'] = cases
+    merged['missing_cases'] = []
+    for plan, count in case_counts.items():
+        for case_index in range(count):
+            if (plan, case_index) not in seen:
+                merged['missing_cases'].append({'plan': plan, 'case_index': case_index})
+    if merged['missing_cases']:
+        logger.error(f"No report contains the test cases {merged['missing_cases']}")
+
+    summary = {'total': 0, 'passed': 0, 'failed': 0, 'error': 0, **added_up}
+    plan_summaries: Dict[Any, Dict[str, int]] = {}
+    for suite in merged['suites']:
+        for case in suite['cases']:
+            summary['total'] += 1
+            summary[case['status']] = summary.get(case['status'], 0) + 1
+            plan_summary = plan_summaries.setdefault(_plan_key(suite), {'total': 0, 'passed': 0, 'failed': 0, 'error': 0})
+            plan_summary['total'] += 1
+            plan_summary[case['status']] = plan_summary.get(case['status'], 0) + 1
+    # Keep suites in plan order: by the position of their first case
+    merged['suites'].sort(key=lambda suite: suite['cases'][0].get('case_index', 0) if suite['cases'] else 0)
+    if plans_by_path:
+        # Case indices restart in every plan, so order suites by plan first
+        plan_order = {path: position for position, path in enumerate(plans_by_path)}
+        merged['suites'].sort(key=lambda suite: plan_order.get(_plan_key(suite), len(plan_order)))
+        merged['plans'] = [dict(plan, summary=plan_summaries.get(plan['path'], {'total': 0, 'passed': 0, 'failed': 0, 'error': 0}))
+                           for plan in plans_by_path.values()]
+    merged['summary'] = summary
+
+    if shard_count is not None:
+        merged['missing_shards'] = [index for index in range(1, shard_count + 1) if index not in shard_indices]
+        if merged['missing_shards']:
+            logger.warning(f"Missing the reports of shards {merged['missing_shards']} of {shard_count}")
+    merged['complete'] = not (merged.get('missing_shards') or merged['missing_cases'] or merged['duplicate_cases'])
+    return merged
+
+def _plan_key(suite: Dict[str, Any]) -> Any:
+    """Returns the plan a suite belongs to: its plan path in batch reports, else its plan name (None in single-plan reports)."""
+    return suite.get('plan_path', suite.get('plan'))
+
+def _expect_cases(case_counts: Dict[Any, int], plan: Any, count: int):
+    """Records the case count of a plan, warning if shard reports disagree on it."""
+    if plan in case_counts and case_counts[plan] != count:
+        logger.warning(f"Shard reports disagree on the number of test cases of plan {plan!r} ({case_counts[plan]} and {count})")
+    case_counts[plan] = max(case_counts.get(plan, 0), count)
@@ -0,0 +1,382 @@
+# mmat/test_runner/artifact_store.py
+
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import tarfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from mmat.utils.logger import Logger
+
+try:
+    import zstandard # Optional: enables packing runs as .tar.zst
+except ImportError:
+    zstandard = None
+
+PACK_FORMATS = {"gz": ".tar.gz", "zstd": ".tar.zst"}
+
+# Objects younger than this are never garbage collected: another process may have
+# just referenced them in a manifest this process read before the reference was added
+GC_GRACE_SECONDS = 300
+
+def new_run_id() -> str:
+    """Returns a new run id: the start time to the millisecond (sortable) and a random suffix against collisions."""
+    now = time.time()
+    return f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now % 1 * 1000):03d}-{secrets.token_hex(3)}"
+
+class RunArtifacts:
+    """
+    The artifacts of one run: a manifest of named files whose content lives in the
+    store's content-addressed objects. Thread-safe; returned by ArtifactStore.begin_run().
+    """
+    def __init__(self, store: "ArtifactStore", run_id: str):
+        self.store = store
+        self.run_id = run_id
+        self.directory = os.path.join(store.runs_dir, run_id)
+        self._manifest_path = os.path.join(self.directory, "manifest.jsonl")
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"artifacts": 0, "objects_written": 0, "bytes_written": 0, "duplicates": 0}
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """Returns the content address (SHA-256 hex digest) of an artifact."""
+        return hashlib.sha256(data).hexdigest()
+
+    def object_path(self, digest: str, extension: str) -> str:
+        """Returns the path of the object holding the content with the given digest."""
+        return self.store.object_path(digest, extension)
+
+    def put(self, name: str, data: bytes, extension: str, digest: Optional[str] = None) -> str:
+        """
+        Adds an artifact to the run. Content already in the store is not written again.
+
+        Args:
+            name: Name of the artifact within the run, e.g. 'screenshots/step_3.png'.
+            data: The content.
+            extension: File extension of the object, e.g. 'png'.
+            digest: The content's digest, if already computed.
+
+        Returns:
+            The path of the object holding the content.
+        """
+        digest = digest or self.digest(data)
+        path = self.object_path(digest, extension)
+        # The reference is recorded before the object is written or touched, so a
+        # concurrent garbage collection either sees it or sees a fresh object
+        entry = {"name": name, "digest": digest, "extension": extension, "size": len(data)}
+        with self._lock:
+            with open(self._manifest_path, "a", encoding="utf-8") as manifest:
+                manifest.write(json.dumps(entry) + "\n")
+            self.stats["artifacts"] += 1
+        if os.path.exists(path):
+            os.utime(path)
+            with self._lock:
+                self.stats["duplicates"] += 1
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+        os.replace(temporary_path, path) # Atomic: readers never see a partial object
+        with self._lock:
+            self.stats["objects_written"] += 1
+            self.stats["bytes_written"] += len(data)
+        return path
+
+class ArtifactStore:
+    """
+    Keeps the artifacts of every run (screenshots) under a directory of its own.
+
+    Layout under `root`:
+        objects/<ab>/<digest>.<ext>   content-addressed files shared by all runs, so
+                                      identical screenshots are stored once
+        runs/<run_id>/run.json        run id, label, start and end time, status, summary
+        runs/<run_id>/manifest.jsonl  one line per artifact: name, digest, extension, size
+        runs/<run_id>.tar.gz|.tar.zst a packed run: run.json, manifest.jsonl and every
+                                      artifact under its name
+
+    Run ids start with the start time, so concurrent and repeated runs never share
+    a directory. When a run finishes, runs beyond the newest `keep_unpacked` are
+    packed if `pack` is set, then retention removes the oldest finished runs beyond
+    `max_runs`, older than `max_age_days` or over `max_bytes` in total, and objects
+    no longer referenced by an unpacked run are deleted.
+    """
+    gc_grace_seconds = GC_GRACE_SECONDS
+
+    def __init__(self, root: str, pack: Optional[str] = None, keep_unpacked: int = 1, max_runs: Optional[int] = None,
+                 max_age_days: Optional[float] = None, max_bytes: Optional[int] = None):
+        """
+        Initializes the ArtifactStore.
+
+        Args:
+            root: Directory of the store. Created if missing.
+            pack: 'gz' or 'zstd' to pack finished runs into archives; None keeps them unpacked.
+            keep_unpacked: Number of newest finished runs that are not packed.
+            max_runs: Maximum number of runs kept, or None.
+            max_age_days: Maximum age of kept runs in days, or None.
+            max_bytes: Maximum total size of objects and archives, or None.
+        """
+        self.logger = Logger(__name__)
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.runs_dir = os.path.join(root, "runs")
+        if pack and pack not in PACK_FORMATS:
+            self.logger.warning(f"Unknown artifact pack format '{pack}'; runs are not packed.")
+            pack = None
+        if pack == "zstd" and zstandard is None:
+            self.logger.warning("zstandard is not installed; packing runs as .tar.gz instead of .tar.zst.")
+            pack = "gz"
+        self.pack = pack
+        self.keep_unpacked = max(0, keep_unpacked)
+        self.max_runs = max_runs
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        os.makedirs(self.runs_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config_manager) -> Optional["ArtifactStore"]:
+        """Creates an ArtifactStore from the 'artifacts' section of the configuration; None if disabled."""
+        settings = config_manager.get('artifacts', None) or {}
+        if not settings.get('enabled', True):
+            return None
+        return cls(settings.get('root', 'output/artifacts'), pack=settings.get('pack'), keep_unpacked=settings.get('keep_unpacked', 1),
+                   max_runs=settings.get('max_runs', 20), max_age_days=settings.get('max_age_days', 30), max_bytes=settings.get('max_bytes'))
+
+    def object_path(self, digest: str, extension: str) -> str:
+        """Returns the path of the object holding the content with the given digest."""
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.{extension}")
+
+    def begin_run(self, label: Optional[str] = None, run_id: Optional[str] = None) -> RunArtifacts:
+        """
+        Starts a run and creates its directory.
+
+        Args:
+            label: Optional description of the run, e.g. the plan names.
+            run_id: Id of the run; a new one by default.
+
+        Returns:
+            The RunArtifacts the run's artifacts are added to.
+        """
+        run = RunArtifacts(self, run_id or new_run_id())
+        os.makedirs(run.directory, exist_ok=True)
+        self._write_run_info(run.directory, {"run_id": run.run_id, "label": label, "started": time.time(), "status": "running"})
+        return run
+
+    def finish_run(self, run: RunArtifacts, summary: Optional[Dict[str, Any]] = None):
+        """
+        Marks a run as finished, then packs older runs and applies the retention limits.
+
+        Args:
+            run: The finished run.
+            summary: Optional summary stored in the run's run.json, e.g. the report summary.
+        """
+        info = self._read_run_info(run.directory) or {"run_id": run.run_id}
+        info.update(finished=time.time(), status="finished", artifacts=run.stats["artifacts"])
+        if summary is not None:
+            info["summary"] = summary
+        self._write_run_info(run.directory, info)
+        try:
+            if self.pack:
+                self._pack_old_runs()
+            self.prune(keep=run.run_id)
+        except OSError as e:
+            self.logger.error(f"Could not pack or prune artifact runs: {e}")
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """
+        Returns every run in the store, oldest first, with its run.json info, whether
+        it is packed, and its 'path' (directory or archive).
+        """
+        runs = []
+        for entry in sorted(os.listdir(self.runs_dir)):
+            path = os.path.join(self.runs_dir, entry)
+            if os.path.isdir(path):
+                info = self._read_run_info(path) or {"run_id": entry, "status": "unknown"}
+                runs.append(dict(info, packed=False, path=path))
+                continue
+            for pack, suffix in PACK_FORMATS.items():
+                if entry.endswith(suffix):
+                    run_id = entry[:-len(suffix)]
+                    runs.append({"run_id": run_id, "status": "finished", "packed": True, "pack": pack, "path": path,
+                                 "finished": os.path.getmtime(path)})
+        return runs
+
+    def _pack_old_runs(self):
+        """Packs the finished unpacked runs beyond the newest `keep_unpacked`."""
+        finished = [run for run in self.runs() if not run["packed"] and run.get("status") == "finished"]
+        for run in finished[:max(0, len(finished) - self.keep_unpacked)]:
+            self.pack_run(run["path"])
+
+    def pack_run(self, run_directory: str) -> str:
+        """
+        Packs an unpacked run into an archive holding its run.json, manifest and artifacts,
+        then removes the run directory. Objects only it referenced are collected by prune().
+
+        Returns:
+            The path of the archive.
+        """
+        archive_path = run_directory.rstrip(os.sep) + PACK_FORMATS[self.pack]
+        temporary_path = archive_path + ".tmp"
+        if self.pack == "zstd":
+            with open(temporary_path, "wb") as raw, zstandard.ZstdCompressor().stream_writer(raw) as compressed:
+                with tarfile.open(fileobj=compressed, mode="w|") as archive:
+                    self._add_run_to_archive(archive, run_directory)
+        else:
+            with tarfile.open(temporary_path, "w:gz") as archive:
+                self._add_run_to_archive(archive, run_directory)
+        os.replace(temporary_path, archive_path)
+        shutil.rmtree(run_directory, ignore_errors=True)
+        self.logger.info(f"Packed artifact run {os.path.basename(run_directory)} into {archive_path}")
+        return archive_path
+
+    def _add_run_to_archive(self, archive: tarfile.TarFile, run_directory: str):
+        for file_name in ("run.json", "manifest.jsonl"):
+            path = os.path.join(run_directory, file_name)
+            if os.path.exists(path):
+                archive.add(path, arcname=file_name)
+        first_names: Dict[str, str] = {}
+        added_names = set()
+        for entry in self._read_manifest(run_directory):
+            if entry["name"] in added_names:
+                continue # Written again by the run, e.g. a replayed step; the archive keeps the first
+            added_names.add(entry["name"])
+            if entry["digest"] in first_names:
+                # Identical artifacts are stored once; the others are hard links in the archive
+                link = tarfile.TarInfo(entry["name"])
+                link.type = tarfile.LNKTYPE
+                link.linkname = first_names[entry["digest"]]
+                archive.addfile(link)
+                continue
+            object_path = self.object_path(entry["digest"], entry["extension"])
+            if not os.path.exists(object_path):
+                self.logger.warning(f"Artifact {entry['name']} of {run_directory} is missing from the object store")
+                continue
+            archive.add(object_path, arcname=entry["name"])
+            first_names[entry["digest"]] = entry["name"]
+
+    def prune(self, keep: Optional[str] = None) -> Dict[str, int]:
+        """
+        Applies the retention limits and deletes unreferenced objects.
+
+        Runs are removed oldest first. `max_age_days` applies to every run (a run
+        still 'running' after that long is assumed to have crashed); `max_runs` and
+        `max_bytes` remove finished runs only. Removing a run frees the objects that
+        no other unpacked run references.
+
+        Args:
+            keep: Id of a run that is never removed, e.g. the run that just finished.
+
+        Returns:
+            {'runs_removed': n, 'objects_removed': m, 'bytes_freed': b}
+        """
+        runs = self.runs()
+        references: Dict[str, set] = {}
+        for run in runs:
+            if not run["packed"]:
+                for entry in self._read_manifest(run["path"]):
+                    references.setdefault(self._object_key(entry), set()).add(run["run_id"])
+        objects = self._list_objects()
+        total_bytes = sum(size for size, _ in objects.values()) + sum(os.path.getsize(run["path"]) for run in runs if run["packed"])
+        stats = {"runs_removed": 0, "objects_removed": 0, "bytes_freed": 0}
+
+        now = time.time()
+        remaining = len(runs)
+        for run in runs:
+            if run["run_id"] == keep:
+                continue
+            started = run.get("started") or run.get("finished") or now
+            expired = self.max_age_days is not None and now - started > self.max_age_days * 86400
+            finished = run.get("status") == "finished"
+            over_count = self.max_runs is not None and remaining > self.max_runs
+            over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+            if not (expired or (finished and (over_count or over_bytes))):
+                continue
+            freed = self._remove_run(run, references, objects)
+            total_bytes -= freed
+            remaining -= 1
+            stats["runs_removed"] += 1
+            stats["bytes_freed"] += freed
+
+        # Objects no unpacked run references: left by packed or removed runs, or by crashes
+        for key, (size, path) in objects.items():
+            if key not in references and now - os.path.getmtime(path) > self.gc_grace_seconds:
+                os.remove(path)
+                stats["objects_removed"] += 1
+                stats["bytes_freed"] += size
+        if stats["runs_removed"] or stats["objects_removed"]:
+            self.logger.info(f"Artifact retention: removed {stats['runs_removed']} runs and {stats['objects_removed']} objects, "
+                             f"{stats['bytes_freed']} bytes freed.")
+        return stats
+
+    def _remove_run(self, run: Dict[str, Any], references: Dict[str, set], objects: Dict[str, tuple]) -> int:
+        """Deletes a run and its objects that no other run references. Returns the bytes freed."""
+        if run["packed"]:
+            freed = os.path.getsize(run["path"])
+            os.remove(run["path"])
+            return freed
+        freed = 0
+        for entry in self._read_manifest(run["path"]):
+            key = self._object_key(entry)
+            holders = references.get(key)
+            if holders is None:
+                continue
+            holders.discard(run["run_id"])
+            if not holders:
+                del references[key]
+                if key in objects:
+                    size, path = objects.pop(key)
+                    os.remove(path)
+                    freed += size
+        shutil.rmtree(run["path"], ignore_errors=True)
+        return freed
+
+    def _list_objects(self) -> Dict[str, tuple]:
+        """Returns (size, path) of every object, keyed like _object_key()."""
+        objects = {}
+        if not os.path.isdir(self.objects_dir):
+            return objects
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for file_name in os.listdir(prefix_dir):
+                if file_name.endswith(".tmp"):
+                    continue
+                path = os.path.join(prefix_dir, file_name)
+                objects[file_name] = (os.path.getsize(path), path)
+        return objects
+
+    @staticmethod
+    def _object_key(entry: Dict[str, Any]) -> str:
+        return f"{entry['digest']}.{entry['extension']}"
+
+    @staticmethod
+    def _read_manifest(run_directory: str) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            with open(os.path.join(run_directory, "manifest.jsonl"), encoding="utf-8") as manifest:
+                for line in manifest:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue # A line being appended by a running process
+        except FileNotFoundError:
+            pass
+        return entries
+
+    @staticmethod
+    def _read_run_info(run_directory: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(run_directory, "run.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_run_info(run_directory: str, info: Dict[str, Any]):
+        temporary_path = os.path.join(run_directory, "run.json.tmp")
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2)
+        os.replace(temporary_path, os.path.join(run_directory, "run.json"))
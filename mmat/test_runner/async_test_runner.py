@@ -0,0 +1,318 @@
+import asyncio
+import time
+
+from mmat.driver.async_playwright_driver import AsyncPlaywrightDriver
+from mmat.config.config_manager import ConfigManager
+from mmat.test_runner.test_runner import TestRunner
+from mmat.utils import tracing
+from mmat.utils.image_utils import ImageSource
+
+class AsyncTestRunner(TestRunner):
+    """
+    Executes MMAT test plans on an asyncio event loop.
+
+    Test cases of a suite run concurrently, each on its own page of a shared browser.
+    Screenshot analysis runs in worker threads while the next steps execute, and the
+    async Reporter hooks are awaited as suites and cases start and finish.
+    """
+    def __init__(self, driver: AsyncPlaywrightDriver, config_manager: ConfigManager, screenshot_analyzer=None, reporters=None, max_concurrency: int = 4, graph_api=None):
+        """
+        Initializes the AsyncTestRunner.
+
+        Args:
+            driver (AsyncPlaywrightDriver): The async Playwright driver instance.
+            config_manager (ConfigManager): The configuration manager instance.
+            screenshot_analyzer (ScreenshotAnalyzer, optional): Analyzer for step screenshots.
+            reporters (list, optional): Reporter instances notified of suite and case results.
+            max_concurrency (int): Maximum number of test cases running at the same time.
+            graph_api (GraphAPI, optional): Knowledge graph that every executed step is recorded in.
+        """
+        super().__init__(driver, config_manager, screenshot_analyzer, graph_api=graph_api)
+        self.reporters = reporters or []
+        self.max_concurrency = max(1, max_concurrency)
+
+    def _create_analysis_pipeline(self) -> None:
+        """
+        The async runner analyzes screenshots in worker threads of the event loop
+        (see _analyze_screenshot_async), so it creates no AnalysisPipeline.
+        """
+        return None
+
+    async def execute_plan(self, test_plan: dict, start_step: int = 1, workers: int | None = None, changed_only: bool = False,
+                           shard: tuple | None = None) -> bool:
+        """
+        Executes a given test plan.
+
+        Args:
+            test_plan (dict): The test plan dictionary.
+            start_step (int): The step number to start execution from (1-based index).
+            workers (int, optional): Overrides the maximum number of concurrent test cases.
+            changed_only (bool): Execute only the test cases whose content changed or that did
+                                 not pass in their last run.
+            shard (tuple, optional): (index, count): execute only the 1-based shard `index` of
+                                     `count` balanced shards of the test cases.
+
+        Returns:
+            bool: True if the plan executed successfully, False otherwise.
+        """
+        if not test_plan:
+            print("[AsyncTestRunner] Error: Empty test plan provided.")
+            return False
+
+        actual_test_plan_content = test_plan.get('test_plan', {})
+        if not actual_test_plan_content:
+            print("[AsyncTestRunner] Error: 'test_plan' key not found in the loaded test plan.")
+            return False
+
+        case_entries = self._collect_cases(actual_test_plan_content)
+        total_steps = sum(len(entry['steps']) for entry in case_entries)
+
+        if not total_steps:
+            print("[AsyncTestRunner] Error: No executable steps found in the test plan.")
+            return False
+
+        if start_step < 1 or start_step > total_steps:
+            print(f"[AsyncTestRunner] Error: Invalid start step {start_step}. Must be between 1 and {total_steps}.")
+            return False
+
+        case_entries = [entry for entry in case_entries if entry['offset'] + len(entry['steps']) >= start_step]
+        max_concurrency = max(1, workers) if workers else self.max_concurrency
+
+        print(f"[AsyncTestRunner] Executing test plan with {total_steps} steps in {len(case_entries)} test cases "
+              f"(up to {max_concurrency} at a time), starting from step {start_step}.")
+
+        browser_config = self.config_manager.get('environments.browser', {})
+        browser_params = browser_config.get('config', {})
+        browser_type = browser_params.get('browser_type', 'chromium')
+        headless = browser_params.get('headless', True)
+        base_url = browser_params.get('baseUrl', None)
+
+        run_context = {
+            'total_steps': total_steps,
+            'start_step': start_step,
+            'base_url': base_url,
+        }
+
+        self.run_started = time.time()
+        self._estimate_cases([(actual_test_plan_content, entry) for entry in case_entries])
+        plan_case_count = len(case_entries)
+        if shard:
+            case_entries = self._select_shard(case_entries, shard)
+
+        unchanged_results = {}
+        if changed_only:
+            case_entries, unchanged_results = self._select_changed_cases(actual_test_plan_content, case_entries, base_url)
+
+        case_results = []
+        self._begin_artifacts(actual_test_plan_content.get('name', 'Unnamed Test Plan'))
+        if case_entries:
+            await self.driver.launch_browser(browser_type=browser_type, headless=headless)
+            if not self.driver.browser:
+                print("[AsyncTestRunner] Error: Failed to launch browser. Cannot execute test plan.")
+                await self.driver.close_browser() # Stops Playwright if it started
+                self._finish_artifacts(None)
+                return False
+
+            semaphore = asyncio.Semaphore(max_concurrency)
+            try:
+                # Suites run one after another so reporters see a consistent suite order;
+                # the cases inside a suite run concurrently.
+                for suite_name, suite_entries in self._group_by_suite(case_entries):
+                    await self._notify('start_suite', suite_name)
+                    suite_results = await asyncio.gather(*(self._execute_case_async(entry, semaphore, run_context) for entry in suite_entries))
+                    case_results.extend(suite_results)
+                    await self._notify('end_suite', suite_name)
+            finally:
+                await self.driver.close_browser()
+        else:
+            print("[AsyncTestRunner] No test cases to execute.")
+
+        if self.graph_api:
+            self.graph_api.flush()
+        self.screenshot_capture.drain()
+        self._update_run_state(actual_test_plan_content, case_entries, case_results, base_url, start_step)
+        self._record_history(list(zip(case_entries, case_results)), start_step, actual_test_plan_content.get('name', 'Unnamed Test Plan'))
+        case_results = self._in_plan_order(case_entries, case_results, unchanged_results)
+        if shard:
+            self._tag_case_indices(case_entries, unchanged_results, case_results)
+        self.last_report = self._merge_case_results(actual_test_plan_content, case_results)
+        if shard:
+            self.last_report['shard'] = {'index': shard[0], 'count': shard[1], 'case_count': plan_case_count}
+        self._finish_artifacts(self.last_report)
+        await self._notify('publish_results')
+
+        summary = self.last_report['summary']
+        print(f"[AsyncTestRunner] Summary: {summary['total']} test cases, {summary['passed']} passed, {summary['failed']} failed, {summary['error']} errors.")
+        self._print_capture_summary(summary)
+        print("[AsyncTestRunner] Test plan execution finished.")
+        return True
+
+    def _group_by_suite(self, case_entries: list) -> list:
+        """
+        Groups consecutive case entries by suite name.
+
+        Returns:
+            list: (suite_name, entries) tuples in plan order.
+        """
+        groups = []
+        for entry in case_entries:
+            if groups and groups[-1][0] == entry['suite_name']:
+                groups[-1][1].append(entry)
+            else:
+                groups.append((entry['suite_name'], [entry]))
+        return groups
+
+    async def _notify(self, hook: str, *args):
+        """
+        Awaits a reporter hook on every configured reporter. Reporter errors are logged
+        and do not interrupt the run.
+        """
+        for reporter in self.reporters:
+            try:
+                await getattr(reporter, hook)(*args)
+            except Exception as e:
+                print(f"[AsyncTestRunner] Error in reporter {type(reporter).__name__}.{hook}: {e}")
+
+    async def _execute_case_async(self, case_entry: dict, semaphore: asyncio.Semaphore, run_context: dict) -> dict:
+        """
+        Executes the steps of a single test case on its own page.
+
+        Args:
+            case_entry (dict): Case entry as returned by _collect_cases.
+            semaphore (asyncio.Semaphore): Limits the number of concurrent test cases.
+            run_context (dict): Shared execution parameters.
+
+        Returns:
+            dict: The case result with the status of every executed step.
+        """
+        async with semaphore:
+            suite_name = case_entry['suite_name']
+            case_name = case_entry['case_name']
+            await self._notify('start_case', suite_name, case_name)
+
+            session = await self.driver.new_session()
+            step_results = []
+            analysis_tasks = []
+            pending_images = []
+            try:
+                if not session.page:
+                    case_result = {
+                        'suite_name': suite_name,
+                        'name': case_name,
+                        'status': 'error',
+                        'steps': [],
+                        'details': 'Test case was not executed: could not create a browser context.',
+                    }
+                    await self._notify('end_case', suite_name, case_name, case_result['status'], case_result)
+                    return case_result
+
+                with tracing.span('case', suite=suite_name, case=case_name):
+                    for local_index, step_data in enumerate(case_entry['steps']):
+                        step_number = case_entry['offset'] + local_index + 1
+                        if step_number < run_context['start_step']:
+                            continue
+                        step_result = await self._execute_step_async(step_data, step_number, session, run_context, analysis_tasks, pending_images)
+                        step_results.append(step_result)
+                        self._record_step(case_entry, local_index + 1, step_result, session.page)
+
+                # Analyses were started in the background; wait for them before the case is reported
+                if analysis_tasks:
+                    await asyncio.gather(*analysis_tasks)
+                elif pending_images:
+                    steps_with_screenshot = [step for step, _ in pending_images]
+                    images = [image for _, image in pending_images]
+                    pending_images.clear()
+                    await asyncio.to_thread(self._analyze_screenshot_batch, steps_with_screenshot, images)
+            finally:
+                await session.close_browser()
+
+            status = 'failed' if any(step['status'] in ('failed', 'error') for step in step_results) else 'passed'
+            case_result = {
+                'suite_name': suite_name,
+                'name': case_name,
+                'status': status,
+                'steps': step_results,
+                'duration': self._case_duration(step_results),
+            }
+            await self._notify('end_case', suite_name, case_name, status, case_result)
+            return case_result
+
+    async def _execute_step_async(self, step_data: dict, step_number: int, session: AsyncPlaywrightDriver, run_context: dict, analysis_tasks: list,
+                                  pending_images: list) -> dict:
+        """
+        Executes a single step, takes a screenshot and starts its analysis in the background.
+
+        Args:
+            step_data (dict): The step dictionary.
+            step_number (int): Global 1-based number of the step in the plan.
+            session (AsyncPlaywrightDriver): The session driver of the test case.
+            run_context (dict): Shared execution parameters.
+            analysis_tasks (list): Collects the analysis tasks of the test case.
+            pending_images (list): Collects (step_result, image) pairs analyzed together when the case finishes.
+
+        Returns:
+            dict: The step result. The 'analysis' key is filled in when the analysis finishes.
+        """
+        total_steps = run_context['total_steps']
+        step_name = step_data.get('description', f'Step {step_number}')
+        step_type = step_data.get('action')
+        step_result = {'number': step_number, 'description': step_name, 'action': step_type, 'status': 'passed'}
+        started = time.perf_counter()
+
+        with tracing.span('step', number=step_number, action=step_type) as step_span:
+            print(f"[AsyncTestRunner] Executing step {step_number}/{total_steps}: {step_name} (Type: {step_type})")
+            self._resolve_step_url(step_data, step_type, run_context['base_url'])
+
+            try:
+                step_instance = self._create_step(step_type, step_data, session)
+                if not step_instance:
+                    print(f"[AsyncTestRunner] Warning: Unknown step type '{step_type}'. Skipping step.")
+                    step_result['status'] = 'skipped'
+                    return step_result
+
+                with tracing.span('driver', action=step_type):
+                    success = await step_instance.execute_async()
+                if success:
+                    print(f"[AsyncTestRunner] Step {step_number} '{step_name}' completed successfully. ✔️")
+                else:
+                    print(f"[AsyncTestRunner] Step {step_number} '{step_name}' failed. ❌")
+                    step_result['status'] = 'failed'
+            except Exception as e:
+                print(f"[AsyncTestRunner] An error occurred during execution of step {step_number} '{step_name}': {e} ❌")
+                step_result['status'] = 'error'
+                step_result['error'] = str(e)
+            step_result['timings'] = {'driver': round(time.perf_counter() - started, 3)}
+
+            try:
+                # Screenshots that are neither analyzed nor retained are not taken
+                if self.screenshot_analyzer or self.screenshot_capture.options(step_data)['retain']:
+                    dom_mutations = await session.dom_mutations() if self.screenshot_policy.needs_dom_check else None
+                    step_result['screenshot_trigger'] = self.screenshot_policy.trigger(step_data, step_number, step_result['status'], dom_mutations)
+                if step_result.get('screenshot_trigger'):
+                    screenshot_started = time.perf_counter()
+                    with tracing.span('screenshot'):
+                        screenshot = await self.screenshot_capture.capture_async(session, 'screenshots', step_number, step_data)
+                    step_result['timings']['screenshot'] = round(time.perf_counter() - screenshot_started, 3)
+                    if screenshot is not None:
+                        if screenshot.path:
+                            step_result['screenshot'] = screenshot.path
+                        if self.screenshot_analyzer and self.batch_analysis:
+                            pending_images.append((step_result, screenshot.data))
+                        elif self.screenshot_analyzer:
+                            analysis_tasks.append(asyncio.create_task(self._analyze_screenshot_async(step_result, screenshot.data)))
+            except Exception as e:
+                print(f"[AsyncTestRunner] Error taking screenshot for step {step_number}: {e}")
+
+            step_result['duration'] = round(time.perf_counter() - started, 3)
+            step_span.set(status=step_result['status'])
+            return step_result
+
+    async def _analyze_screenshot_async(self, step_result: dict, screenshot_path: ImageSource):
+        """
+        Runs the blocking screenshot analysis in a worker thread and attaches the result to the step.
+        """
+        try:
+            analysis_result = await asyncio.to_thread(self.screenshot_analyzer.analyze_screenshot, screenshot_path)
+            self._attach_analysis(step_result, analysis_result, None)
+        except Exception as e:
+            self._attach_analysis(step_result, None, e)
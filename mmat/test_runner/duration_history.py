@@ -0,0 +1,208 @@
+# mmat/test_runner/duration_history.py
+
+import math
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from mmat.utils.logger import Logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS case_durations (
+    run_id INTEGER NOT NULL,
+    case_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_case_durations_key ON case_durations (case_key, run_id);
+CREATE TABLE IF NOT EXISTS step_durations (
+    run_id INTEGER NOT NULL,
+    case_key TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    action TEXT,
+    description TEXT,
+    status TEXT NOT NULL,
+    wall REAL NOT NULL,
+    driver REAL,
+    screenshot REAL,
+    model REAL
+);
+CREATE INDEX IF NOT EXISTS idx_step_durations_key ON step_durations (case_key, step_index, run_id);
+"""
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Returns the nearest-rank percentile (fraction between 0 and 1) of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+class DurationHistory:
+    """
+    The durations of every executed test case and step, kept in a SQLite database
+    across runs.
+
+    Each step row holds its wall time and the part of it spent in the browser
+    driver, taking the screenshot and waiting for the vision model (which runs in
+    the background unless analysis is inline, so model time can exceed the rest).
+    Cases are keyed like the run state (plan/suite/case). The history estimates
+    case durations for longest-first scheduling and shard balancing, and feeds
+    `mmat stats`.
+    """
+    def __init__(self, db_path: str):
+        """
+        Initializes the DurationHistory.
+
+        Args:
+            db_path: Path to the SQLite database file. Created if missing.
+        """
+        self.logger = Logger(__name__)
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def record_run(self, cases: List[Dict[str, Any]], label: Optional[str] = None, started: Optional[float] = None) -> int:
+        """
+        Stores the durations of the cases and steps of one run in a single transaction.
+
+        Args:
+            cases: One dict per executed case with 'key', 'status', 'duration' and
+                   'steps' (step results with 'duration' and optional 'timings').
+                   Steps copied from a shared execution ('shared_from') are not stored.
+            label: Optional description of the run, e.g. the plan names.
+            started: Start time of the run (epoch seconds); defaults to now.
+
+        Returns:
+            The id of the run.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute("INSERT INTO runs (started, label) VALUES (?, ?)", (started or time.time(), label))
+            run_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO case_durations (run_id, case_key, status, duration) VALUES (?, ?, ?, ?)",
+                [(run_id, case['key'], case['status'], case['duration']) for case in cases])
+            step_rows = []
+            for case in cases:
+                for step_index, step in enumerate(case.get('steps', []), start=1):
+                    if step.get('shared_from') or 'duration' not in step:
+                        continue
+                    timings = step.get('timings', {})
+                    step_rows.append((run_id, case['key'], step_index, step.get('action'), step.get('description'), step.get('status', 'passed'),
+                                      step['duration'], timings.get('driver'), timings.get('screenshot'), timings.get('model')))
+            self._connection.executemany(
+                "INSERT INTO step_durations (run_id, case_key, step_index, action, description, status, wall, driver, screenshot, model) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", step_rows)
+        return run_id
+
+    def case_durations(self, recent: int = 5) -> Dict[str, float]:
+        """
+        Returns the estimated duration of every recorded case: the median of its
+        `recent` latest recorded durations.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT case_key, duration FROM case_durations ORDER BY case_key, run_id DESC").fetchall()
+        samples: Dict[str, List[float]] = {}
+        for case_key, duration in rows:
+            if len(samples.setdefault(case_key, [])) < recent:
+                samples[case_key].append(duration)
+        return {case_key: statistics.median(durations) for case_key, durations in samples.items()}
+
+    def runs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Returns the latest runs, oldest first, with the p50, p95 and total of their case durations.
+        """
+        with self._lock:
+            run_rows = self._connection.execute(
+                "SELECT run_id, started, label FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)).fetchall()
+            durations: Dict[int, List[float]] = {}
+            for run_id, duration in self._connection.execute(
+                    "SELECT run_id, duration FROM case_durations WHERE run_id >= ?", (run_rows[-1][0] if run_rows else 0,)):
+                durations.setdefault(run_id, []).append(duration)
+        runs = []
+        for run_id, started, label in reversed(run_rows):
+            values = durations.get(run_id, [])
+            runs.append({'run_id': run_id, 'started': started, 'label': label, 'cases': len(values),
+                         'p50': percentile(values, 0.5) if values else 0.0,
+                         'p95': percentile(values, 0.95) if values else 0.0,
+                         'total': round(sum(values), 3)})
+        return runs
+
+    def slowest_steps(self, limit: int = 10, recent_runs: int = 20) -> List[Dict[str, Any]]:
+        """
+        Returns the steps with the highest p50 wall time over the `recent_runs` latest
+        runs, with their p95 and the median driver, screenshot and model times.
+        """
+        samples = self._step_samples(recent_runs)
+        steps = []
+        for (case_key, step_index), rows in samples.items():
+            walls = [row['wall'] for row in rows]
+            step = {'case_key': case_key, 'step_index': step_index, 'action': rows[-1]['action'],
+                    'description': rows[-1]['description'], 'runs': len(rows),
+                    'p50': percentile(walls, 0.5), 'p95': percentile(walls, 0.95)}
+            for part in ('driver', 'screenshot', 'model'):
+                values = [row[part] for row in rows if row[part] is not None]
+                step[part] = statistics.median(values) if values else None
+            steps.append(step)
+        steps.sort(key=lambda step: (-step['p50'], step['case_key'], step['step_index']))
+        return steps[:limit]
+
+    def regressions(self, threshold: float = 1.5, min_increase: float = 0.5, baseline_runs: int = 5) -> List[Dict[str, Any]]:
+        """
+        Compares the steps of the latest run with their median wall time over the
+        `baseline_runs` runs before it.
+
+        Args:
+            threshold: Minimum ratio of latest to baseline time reported as a regression.
+            min_increase: Minimum increase in seconds, so that noise on fast steps is not reported.
+            baseline_runs: Number of earlier runs the baseline is taken from.
+
+        Returns:
+            The regressed steps, largest increase first.
+        """
+        samples = self._step_samples(baseline_runs + 1)
+        with self._lock:
+            latest = self._connection.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+        regressions = []
+        for (case_key, step_index), rows in samples.items():
+            current = [row for row in rows if row['run_id'] == latest]
+            baseline = [row['wall'] for row in rows if row['run_id'] != latest]
+            if not current or not baseline:
+                continue
+            wall = current[0]['wall']
+            median = statistics.median(baseline)
+            if wall - median >= min_increase and wall >= threshold * median:
+                regressions.append({'case_key': case_key, 'step_index': step_index, 'action': current[0]['action'],
+                                    'description': current[0]['description'], 'wall': wall, 'baseline': median,
+                                    'increase': round(wall - median, 3)})
+        regressions.sort(key=lambda regression: -regression['increase'])
+        return regressions
+
+    def _step_samples(self, recent_runs: int) -> Dict[tuple, List[Dict[str, Any]]]:
+        """Returns the step rows of the `recent_runs` latest runs, grouped by case key and step index, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_id, case_key, step_index, action, description, wall, driver, screenshot, model FROM step_durations "
+                "WHERE run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?) ORDER BY run_id", (recent_runs,)).fetchall()
+        samples: Dict[tuple, List[Dict[str, Any]]] = {}
+        for run_id, case_key, step_index, action, description, wall, driver, screenshot, model in rows:
+            samples.setdefault((case_key, step_index), []).append({
+                'run_id': run_id, 'action': action, 'description': description, 'wall': wall,
+                'driver': driver, 'screenshot': screenshot, 'model': model})
+        return samples
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,195 @@
+# mmat/test_runner/plan_dag.py
+
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from mmat.graph.models import ExecutionGraph, GraphEdge, GraphNode
+from mmat.test_runner.work_queue import WorkStealingQueue
+
+# Step keys that do not change what a step does in the browser
+_IGNORED_STEP_KEYS = ("description", "name", "url")
+# Actions whose effect lives only in the current page, not in cookies or storage
+PAGE_LOCAL_ACTIONS = ("fill",)
+# Actions that do not change the page
+ASSERTION_ACTIONS = ("assert_url", "assert_element_visible")
+
+def step_key(step: Dict[str, Any]) -> str:
+    """
+    Returns the identity of a step for prefix sharing: its content without the
+    description and the 'url' key the runner derives from the target.
+    """
+    return json.dumps({key: value for key, value in step.items() if key not in _IGNORED_STEP_KEYS},
+                      sort_keys=True, default=str)
+
+class PlanDag:
+    """
+    A test plan compiled into a DAG of step groups.
+
+    The leading steps that test cases have in common become shared "step_group"
+    nodes, so a plan whose cases all start with the same navigate and login steps
+    becomes a tree: the shared prefix runs once, and every case (or group of cases)
+    that continues differently is a branch below it. Groups are linked by "then"
+    edges from the step-less ROOT group.
+
+    Each group node holds:
+        steps: The steps of the group, taken from its first case.
+        start_index: 0-based index of the group's first step within its cases.
+        cases: Positions (in the case entry list) of the cases running through the group.
+        ending_cases: Positions of the cases whose last step is in the group.
+    """
+    ROOT = "root"
+
+    def __init__(self, case_entries: List[Dict[str, Any]]):
+        """
+        Compiles the DAG.
+
+        Args:
+            case_entries: Case entries as returned by TestRunner._collect_cases.
+        """
+        self.case_entries = case_entries
+        self.graph = ExecutionGraph()
+        self.ending_group: Dict[int, str] = {} # Case position -> group holding its last step
+        # Execution counters, updated by the workers running the DAG
+        self.stats: Dict[str, int] = {"steps_executed": 0, "steps_replayed": 0, "snapshot_restores": 0}
+        self._stats_lock = threading.Lock()
+        self._compile()
+
+    def _compile(self):
+        # Build a trie with one node per step, then merge chains of nodes that
+        # neither branch nor end a case into a single group
+        trie = {"children": {}, "steps": [], "cases": [], "ending_cases": [], "start_index": 0}
+        for position, entry in enumerate(self.case_entries):
+            node = trie
+            node["cases"].append(position)
+            for index, step in enumerate(entry["steps"]):
+                key = step_key(step)
+                child = node["children"].get(key)
+                if child is None:
+                    child = node["children"][key] = {"children": {}, "steps": [step], "cases": [],
+                                                     "ending_cases": [], "start_index": index}
+                child["cases"].append(position)
+                node = child
+            node["ending_cases"].append(position)
+
+        self.graph.add_node(GraphNode(self.ROOT, "step_group", {"steps": [], "start_index": 0, "cases": trie["cases"],
+                                                                "ending_cases": trie["ending_cases"]}))
+        for position in trie["ending_cases"]:
+            self.ending_group[position] = self.ROOT
+        pending = [(self.ROOT, child) for child in trie["children"].values()]
+        while pending:
+            parent_id, node = pending.pop(0)
+            steps = list(node["steps"])
+            while len(node["children"]) == 1 and not node["ending_cases"]:
+                node = next(iter(node["children"].values()))
+                steps.extend(node["steps"])
+            group_id = f"group_{self.graph.node_count()}"
+            start_index = node["start_index"] - len(steps) + 1
+            self.graph.add_node(GraphNode(group_id, "step_group", {"steps": steps, "start_index": start_index,
+                                                                   "cases": node["cases"], "ending_cases": node["ending_cases"]}))
+            self.graph.add_edge(GraphEdge(parent_id, group_id, "then", {}))
+            for position in node["ending_cases"]:
+                self.ending_group[position] = group_id
+            pending.extend((group_id, child) for child in node["children"].values())
+
+    def group(self, group_id: str) -> Dict[str, Any]:
+        """Returns the data of a group node."""
+        return self.graph.get_node(group_id).data
+
+    def children(self, group_id: str) -> List[str]:
+        """Returns the ids of the groups that continue after a group, in plan order."""
+        return self.graph.successors(group_id, "then")
+
+    def path(self, position: int) -> List[str]:
+        """Returns the ids of the groups a case runs through, from the first to the one holding its last step."""
+        group_ids = []
+        group_id = self.ending_group[position]
+        while group_id != self.ROOT:
+            group_ids.append(group_id)
+            group_id = self.graph.predecessors(group_id, "then")[0]
+        return group_ids[::-1]
+
+    def path_steps(self, group_id: str) -> List[Dict[str, Any]]:
+        """Returns the steps from the start of the plan up to and including a group."""
+        group_ids = self.path(self.owner(group_id))
+        steps = []
+        for path_group_id in group_ids[:group_ids.index(group_id) + 1]:
+            steps.extend(self.group(path_group_id)["steps"])
+        return steps
+
+    def replay_steps(self, group_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns the steps a branch replays after restoring a snapshot taken at the end of a group.
+
+        A storage state snapshot holds cookies and local storage but not the page
+        itself, so values typed into the page after the last page-changing step are
+        lost: the trailing fill steps of the prefix (assertions in between change
+        nothing and are not replayed).
+        """
+        replay = []
+        for step in reversed(self.path_steps(group_id)):
+            action = step.get("action")
+            if action in PAGE_LOCAL_ACTIONS:
+                replay.append(step)
+            elif action not in ASSERTION_ACTIONS:
+                break
+        return replay[::-1]
+
+    def owner(self, group_id: str) -> int:
+        """Returns the position of the case a group's steps are executed and numbered for."""
+        return self.group(group_id)["cases"][0]
+
+    def shared_step_count(self) -> int:
+        """Returns the number of step executions saved by running shared groups once."""
+        return sum(len(node.data["steps"]) * (len(node.data["cases"]) - 1) for node in self.graph.nodes_by_type("step_group"))
+
+    def total_step_count(self) -> int:
+        """Returns the number of steps over all cases, as executed without sharing."""
+        return sum(len(entry["steps"]) for entry in self.case_entries)
+
+    def count(self, name: str, amount: int = 1):
+        """Adds to an execution counter."""
+        with self._stats_lock:
+            self.stats[name] += amount
+
+class BranchQueue:
+    """
+    Work-stealing queue of DAG branches that workers also add to while they run.
+
+    get() waits while the queue is empty but other branches are still running,
+    since they may put new branches, and returns None once all work is done.
+    Every item taken with get() must be acknowledged with task_done().
+    """
+    def __init__(self, num_workers: int):
+        self._queue = WorkStealingQueue(num_workers)
+        self._condition = threading.Condition()
+        self._unfinished = 0
+
+    @property
+    def steals(self) -> int:
+        return self._queue.steals
+
+    def put(self, item: Any, worker_id: Optional[int] = None):
+        """Adds a branch, by default to the deque of the worker that found it."""
+        with self._condition:
+            self._unfinished += 1
+            self._queue.put(item, worker_id)
+            self._condition.notify()
+
+    def get(self, worker_id: int) -> Any:
+        """Takes the next branch for a worker, or returns None when all branches are done."""
+        with self._condition:
+            while True:
+                item = self._queue.get(worker_id)
+                if item is not None:
+                    return item
+                if self._unfinished == 0:
+                    return None
+                self._condition.wait()
+
+    def task_done(self):
+        """Marks a branch taken with get() as finished."""
+        with self._condition:
+            self._unfinished -= 1
+            if self._unfinished == 0:
+                self._condition.notify_all()
@@ -0,0 +1,131 @@
+# mmat/test_runner/run_state.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from mmat.utils.logger import Logger
+
+try:
+    import fcntl # File locking between shard processes sharing a state file (POSIX only)
+except ImportError:
+    fcntl = None
+
+def case_hash(steps: list, parameters: Optional[Dict[str, Any]] = None, base_url: Optional[str] = None) -> str:
+    """
+    Returns the content hash of a test case: its steps, its parameters (any other
+    keys of the case) and the base URL its relative targets resolve against.
+
+    The 'url' key the runner derives from a step's target is ignored, so the hash
+    is the same before and after a run.
+    """
+    content = {
+        "steps": [{key: value for key, value in step.items() if key != "url"} for step in steps],
+        "parameters": parameters or {},
+        "base_url": base_url,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class RunState:
+    """
+    The content hash and last result of every executed test case, kept in a JSON
+    file between runs so `mmat run --changed-only` can skip the cases that did not
+    change and passed last time.
+
+    Cases are keyed by plan name, suite name and case name. The recorded case
+    durations also balance sharded runs (see mmat.test_runner.sharding).
+    """
+    VERSION = 1
+
+    def __init__(self, path: str):
+        """
+        Initializes the RunState and loads the file if it exists.
+
+        Args:
+            path: Path of the JSON state file.
+        """
+        self.logger = Logger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self._recorded: Dict[str, Dict[str, Any]] = {} # Records added since loading
+        self.cases: Dict[str, Dict[str, Any]] = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable run state {self.path}: {e}")
+            return {}
+        if state.get("version") != self.VERSION:
+            self.logger.warning(f"Ignoring run state {self.path} of version {state.get('version')}")
+            return {}
+        return state.get("cases", {})
+
+    @staticmethod
+    def case_key(plan_name: str, suite_name: str, case_name: str) -> str:
+        return f"{plan_name}/{suite_name}/{case_name}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the recorded hash, status and time of a case, or None."""
+        with self._lock:
+            return self.cases.get(key)
+
+    def is_unchanged(self, key: str, content_hash: str) -> bool:
+        """Returns True if a case has the recorded hash and passed in its last run."""
+        record = self.get(key)
+        return record is not None and record.get("hash") == content_hash and record.get("status") == "passed"
+
+    def record(self, key: str, content_hash: str, status: str, duration: Optional[float] = None):
+        """Stores the hash, status and duration (seconds) of an executed case."""
+        record = {"hash": content_hash, "status": status, "updated": time.time()}
+        if duration is not None:
+            record["duration"] = round(duration, 3)
+        with self._lock:
+            self.cases[key] = record
+            self._recorded[key] = record
+
+    def durations(self) -> Dict[str, float]:
+        """Returns the last recorded duration of every case that has one."""
+        with self._lock:
+            return {key: record["duration"] for key, record in self.cases.items() if record.get("duration")}
+
+    @classmethod
+    def write_durations(cls, path: str, durations: Dict[str, float]):
+        """
+        Writes a state file holding only case durations, e.g. the pinned durations
+        that split sharded runs ('execution.shard_durations'). Replaces the file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {"version": cls.VERSION, "cases": {key: {"duration": round(duration, 3)} for key, duration in durations.items()}}
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+    def save(self):
+        """
+        Writes the records added since loading into the state file atomically. The
+        file is re-read first, so processes sharing it (e.g. the shards of a run)
+        do not drop each other's records.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, open(f"{self.path}.lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self.cases = self._read()
+            self.cases.update(self._recorded)
+            state = {"version": self.VERSION, "cases": self.cases}
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
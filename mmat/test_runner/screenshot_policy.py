@@ -0,0 +1,106 @@
+# mmat/test_runner/screenshot_policy.py
+
+from typing import Any, Dict, Iterable, Optional
+
+from mmat.utils.logger import Logger
+
+MODES = ("always", "triggers")
+
+DEFAULT_POLICY = {
+    "mode": "always",     # always: after every step; triggers: only when a trigger below fires
+    "actions": ["navigate", "click", "fill"],  # Actions whose steps are captured
+    "on_failure": True,   # Capture failed and erroring steps
+    "every_nth": 0,       # Also capture every Nth step (0: off)
+    "dom_mutation": False,  # Capture steps after which the DOM changed
+}
+
+class ScreenshotPolicy:
+    """
+    Decides after which steps a screenshot is taken.
+
+    In 'always' mode every executed step is captured, as before. In 'triggers'
+    mode a step is captured only if its action is one of `actions`, it failed and
+    `on_failure` is on, its number is a multiple of `every_nth`, or `dom_mutation`
+    is on and the page's DOM changed during the step. A step can force or suppress
+    its screenshot with `screenshot: true` or `screenshot: false`.
+
+    The DOM check is left to the runner, which reads the driver's mutation counter
+    (a driver call, sync or async) when `needs_dom_check` is set and passes the
+    result to trigger().
+    """
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initializes the ScreenshotPolicy.
+
+        Args:
+            settings: Values overriding DEFAULT_POLICY.
+        """
+        self.logger = Logger(__name__)
+        settings = dict(DEFAULT_POLICY, **(settings or {}))
+        self.mode = settings["mode"]
+        if self.mode not in MODES:
+            self.logger.warning(f"Unknown screenshot policy mode '{self.mode}'; using 'always'.")
+            self.mode = "always"
+        self.actions = frozenset(settings["actions"] or ())
+        self.on_failure = bool(settings["on_failure"])
+        self.every_nth = max(0, int(settings["every_nth"] or 0))
+        self.dom_mutation = bool(settings["dom_mutation"])
+
+    @classmethod
+    def from_config(cls, config_manager) -> "ScreenshotPolicy":
+        """Creates a ScreenshotPolicy from the 'screenshots.policy' section of the configuration."""
+        return cls(config_manager.get('screenshots.policy', None) or {})
+
+    @property
+    def needs_dom_check(self) -> bool:
+        """
+        Whether the runner reads the DOM mutation count after each step. It is read
+        after every step, captured or not, so that each count covers a single step.
+        """
+        return self.mode == "triggers" and self.dom_mutation
+
+    def trigger(self, step_data: Dict[str, Any], step_number: int, status: str, dom_mutations: Optional[int] = None) -> Optional[str]:
+        """
+        Returns why a step's screenshot is taken, or None if it is not taken.
+
+        Args:
+            step_data: The step; a boolean 'screenshot' value forces or suppresses the capture.
+            step_number: Global 1-based number of the step in the plan.
+            status: The step status: 'passed', 'failed' or 'error'.
+            dom_mutations: DOM mutations during the step (-1 for a new document, None if unknown).
+
+        Returns:
+            'step', 'always', 'failure', 'action', 'every_nth' or 'dom_mutation'; None if
+            the screenshot is avoided.
+        """
+        override = step_data.get("screenshot")
+        if isinstance(override, bool):
+            return "step" if override else None
+        if self.mode == "always":
+            return "always"
+        if self.on_failure and status in ("failed", "error"):
+            return "failure"
+        if step_data.get("action") in self.actions:
+            return "action"
+        if self.every_nth and step_number % self.every_nth == 0:
+            return "every_nth"
+        # An unreadable counter counts as a change: better one capture too many than a missed one
+        if self.dom_mutation and (dom_mutations is None or dom_mutations != 0):
+            return "dom_mutation"
+        return None
+
+def count_captures(step_results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Counts the screenshots taken and avoided by the policy in executed step results.
+
+    Steps copied from a shared execution ('shared_from') are not counted again.
+
+    Returns:
+        {'screenshots_captured': n, 'screenshots_avoided': m}
+    """
+    counts = {"screenshots_captured": 0, "screenshots_avoided": 0}
+    for step in step_results:
+        if "screenshot_trigger" not in step or step.get("shared_from"):
+            continue
+        counts["screenshots_captured" if step["screenshot_trigger"] else "screenshots_avoided"] += 1
+    return counts
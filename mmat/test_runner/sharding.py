@@ -0,0 +1,66 @@
+# mmat/test_runner/sharding.py
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parses a shard specification of the form "i/N" (1-based index, shard count).
+
+    Returns:
+        The (index, count) tuple.
+
+    Raises:
+        ValueError: If the value is not of the form "i/N" with 1 <= i <= N.
+    """
+    try:
+        index_text, count_text = value.split("/")
+        index, count = int(index_text), int(count_text)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid shard '{value}'. Expected i/N, e.g. 2/4.")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}'. The index must be between 1 and the shard count.")
+    return index, count
+
+def case_weights(case_keys: Sequence[str], step_counts: Sequence[int], durations: Optional[Dict[str, float]] = None) -> List[float]:
+    """
+    Estimates the execution time of test cases.
+
+    A case with a recorded duration weighs its duration. The other cases weigh
+    their step count times the average seconds per step of the recorded cases,
+    or just their step count when no case has a recorded duration.
+
+    Args:
+        case_keys: Run state keys of the cases.
+        step_counts: Number of steps of each case.
+        durations: Recorded durations in seconds, keyed like case_keys.
+
+    Returns:
+        The weight of every case, in the order of case_keys.
+    """
+    durations = durations or {}
+    known = [(durations[key], steps) for key, steps in zip(case_keys, step_counts) if durations.get(key)]
+    known_steps = sum(steps for _, steps in known)
+    seconds_per_step = sum(seconds for seconds, _ in known) / known_steps if known_steps else 1.0
+    return [float(durations[key]) if durations.get(key) else steps * seconds_per_step
+            for key, steps in zip(case_keys, step_counts)]
+
+def partition(case_keys: Sequence[str], weights: Sequence[float], shard_count: int) -> List[List[str]]:
+    """
+    Splits test cases into shards of balanced total weight (greedy longest
+    processing time first).
+
+    The result depends only on the keys and weights, not on their order, so
+    every shard process computes the same partition from the same inputs.
+
+    Returns:
+        The case keys of every shard, each list in the order the cases were assigned.
+    """
+    shards: List[List[str]] = [[] for _ in range(shard_count)]
+    loads = [(0.0, shard) for shard in range(shard_count)] # (total weight, shard index)
+    heapq.heapify(loads)
+    for weight, key in sorted(zip(weights, case_keys), key=lambda item: (-item[0], item[1])):
+        load, shard = heapq.heappop(loads)
+        shards[shard].append(key)
+        heapq.heappush(loads, (load + weight, shard))
+    return shards
@@ -1,28 +1,72 @@
 import yaml
 import os
+import json
+import sqlite3
+import threading
+import time
 
 from mmat.driver.playwright_driver import PlaywrightDriver
 from mmat.config.config_manager import ConfigManager
 from mmat.test_steps.web_steps import NavigateStep, FillStep, ClickStep
 from mmat.test_steps.assertion_steps import AssertUrlStep, AssertElementVisibleStep # Import new assertion steps
 from mmat.test_steps.base_step import TestStep # Import BaseStep
+from mmat.test_runner.work_queue import WorkStealingQueue
+from mmat.test_runner.plan_dag import BranchQueue, PlanDag
+from mmat.test_runner.run_state import RunState, case_hash
+from mmat.test_runner.sharding import case_weights, partition
+from mmat.test_runner.duration_history import DurationHistory
+from mmat.analysis.analysis_pipeline import AnalysisPipeline
+from mmat.driver.screenshot_capture import ScreenshotCapture
+from mmat.test_runner.screenshot_policy import ScreenshotPolicy, count_captures
+from mmat.test_runner.artifact_store import ArtifactStore
+from mmat.utils import tracing
 
 class TestRunner:
     """
     Handles the execution of MMAT test plans.
     """
-    def __init__(self, driver: PlaywrightDriver, config_manager: ConfigManager, screenshot_analyzer=None):
+    def __init__(self, driver: PlaywrightDriver, config_manager: ConfigManager, screenshot_analyzer=None, driver_factory=None, reuse_browser: bool = False, graph_api=None):
         """
         Initializes the TestRunner.
 
         Args:
             driver (PlaywrightDriver): The Playwright driver instance.
             config_manager (ConfigManager): The configuration manager instance.
+            screenshot_analyzer (ScreenshotAnalyzer, optional): Analyzer for step screenshots.
+            driver_factory (callable, optional): Creates the extra drivers used by parallel
+                                                 workers. Defaults to a new driver of the
+                                                 same class and config as `driver`.
+            reuse_browser (bool): Keep the browser of `driver` open between plans. Call
+                                  close() when no more plans will be executed.
+            graph_api (GraphAPI, optional): Knowledge graph that every executed step is recorded in.
         """
         self.driver = driver
         self.config_manager = config_manager
         self.config = self.config_manager.config
         self.screenshot_analyzer = screenshot_analyzer # Store the screenshot analyzer
+        self.driver_factory = driver_factory or (lambda: type(self.driver)(self.driver.config))
+        self.reuse_browser = reuse_browser
+        self.graph_api = graph_api
+        self.last_report = None # Merged report of the last executed plan
+        self.last_dag_stats = None # Step counters of the last plan executed with the 'dag' scheduler
+
+        # Screenshot analysis runs on background workers unless disabled with 'analysis.background: false'
+        self.analysis_pipeline = self._create_analysis_pipeline()
+        # With 'analysis.batch_per_case' the screenshots of a test case are analyzed together once the case finishes
+        self.batch_analysis = bool(self.screenshot_analyzer) and self.config_manager.get('analysis.batch_per_case', False)
+        # 'cases' runs every test case on its own; 'dag' runs the steps test cases share once (see PlanDag)
+        self.scheduler = self.config_manager.get('execution.scheduler', 'cases')
+        # Content hashes and results of executed test cases, used by changed_only runs; null disables it
+        self.run_state_path = self.config_manager.get('execution.run_state', 'output/run_state.json')
+        # SQLite history of case and step durations (see DurationHistory); null disables it
+        self.history_path = self.config_manager.get('execution.history', 'output/history.db')
+        self.run_started = None # Start time (epoch seconds) of the current run
+        # Step screenshots are captured in memory for analysis and written to disk in the background if retained
+        self.screenshot_capture = ScreenshotCapture.from_config(self.config_manager)
+        # Which steps are captured at all: every step, or only those a trigger fires for
+        self.screenshot_policy = ScreenshotPolicy.from_config(self.config_manager)
+        # Retained screenshots go to a directory per run with retention limits unless 'artifacts.enabled' is false
+        self.artifact_store = ArtifactStore.from_config(self.config_manager)
         print("[TestRunner] Initialized.")
 
     def load_test_plan(self, test_plan_path: str) -> dict | None:
@@ -50,13 +94,42 @@ class TestRunner:
             print(f"[TestRunner] Error loading test plan {absolute_test_plan_path}: {e}")
             return None
 
-    def execute_plan(self, test_plan: dict, start_step: int = 1) -> bool:
+    def _create_analysis_pipeline(self) -> AnalysisPipeline | None:
+        """
+        Creates the background workers that analyze step screenshots.
+
+        Returns:
+            AnalysisPipeline | None: The pipeline, or None if there is no screenshot analyzer
+                                     or background analysis is disabled.
+        """
+        if not self.screenshot_analyzer or not self.config_manager.get('analysis.background', True):
+            return None
+        return AnalysisPipeline(
+            self.screenshot_analyzer,
+            max_workers=self.config_manager.get('analysis.workers', 2),
+            max_pending=self.config_manager.get('analysis.max_pending', 8),
+        )
+
+    def execute_plan(self, test_plan: dict, start_step: int = 1, workers: int = 1, scheduler: str | None = None, changed_only: bool = False,
+                     shard: tuple | None = None) -> bool:
         """
         Executes a given test plan.
 
+        With the 'cases' scheduler each test case is executed as a unit. With more than
+        one worker, test cases are scheduled onto a pool of isolated browsers through a
+        work-stealing queue and the per-case results are merged back into plan order.
+        The 'dag' scheduler compiles the plan into a DAG of step groups and executes
+        the steps shared by several test cases once (see _execute_dag).
+
         Args:
             test_plan (dict): The test plan dictionary.
             start_step (int): The step number to start execution from (1-based index).
+            workers (int): Number of browsers to execute test cases on concurrently.
+            scheduler (str, optional): 'cases' or 'dag'. Defaults to 'execution.scheduler' of the config.
+            changed_only (bool): Execute only the test cases whose content changed or that did
+                                 not pass in their last run (see _select_changed_cases).
+            shard (tuple, optional): (index, count): execute only the 1-based shard `index` of
+                                     `count` balanced shards of the test cases (see _select_shard).
 
         Returns:
             bool: True if the plan executed successfully, False otherwise.
@@ -73,123 +146,1178 @@ class TestRunner:
             print("[TestRunner] Error: 'test_plan' key not found in the loaded test plan.")
             return False
 
-        all_steps = []
-        test_suites = actual_test_plan_content.get('test_suites', [])
-        print(f"[TestRunner] Debug: test_suites found: {test_suites}")
-
-        for suite in test_suites:
-            test_cases = suite.get('test_cases', [])
-            print(f"[TestRunner] Debug: test_cases in suite '{suite.get('name')}': {test_cases}")
-            for case in test_cases:
-                steps = case.get('steps', [])
-                print(f"[TestRunner] Debug: steps in test case '{case.get('name')}': {steps}")
-                all_steps.extend(steps)
+        case_entries = self._collect_cases(actual_test_plan_content)
+        total_steps = sum(len(entry['steps']) for entry in case_entries)
+        self.run_started = time.time()
 
-        if not all_steps:
+        if not total_steps:
             print("[TestRunner] Error: No executable steps found in the test plan.")
             return False
 
-        total_steps = len(all_steps)
-
         if start_step < 1 or start_step > total_steps:
             print(f"[TestRunner] Error: Invalid start step {start_step}. Must be between 1 and {total_steps}.")
             return False
 
-        print(f"[TestRunner] Executing test plan with {total_steps} steps, starting from step {start_step}.")
+        if workers < 1:
+            print(f"[TestRunner] Error: Invalid number of workers {workers}. Must be at least 1.")
+            return False
+
+        # Cases that end before the start step have nothing to execute
+        case_entries = [entry for entry in case_entries if entry['offset'] + len(entry['steps']) >= start_step]
+
+        print(f"[TestRunner] Executing test plan with {total_steps} steps in {len(case_entries)} test cases, starting from step {start_step}.")
+
+        browser_type, headless, base_url = self._browser_settings()
+
+        run_context = {
+            'total_steps': total_steps,
+            'start_step': start_step,
+            'base_url': base_url,
+        }
+
+        self._estimate_cases([(actual_test_plan_content, entry) for entry in case_entries])
+        plan_case_count = len(case_entries)
+        if shard:
+            case_entries = self._select_shard(case_entries, shard)
+
+        unchanged_results = {}
+        if changed_only:
+            case_entries, unchanged_results = self._select_changed_cases(actual_test_plan_content, case_entries, base_url)
+
+        scheduler = scheduler or self.scheduler
+        if scheduler not in ('cases', 'dag'):
+            print(f"[TestRunner] Warning: Unknown scheduler '{scheduler}'. Using 'cases'.")
+            scheduler = 'cases'
+        if scheduler == 'dag' and start_step > 1:
+            # Shared step groups are numbered after their first test case; a start step cannot split them
+            print("[TestRunner] Warning: The 'dag' scheduler always runs whole test cases. Using 'cases' to start from a step.")
+            scheduler = 'cases'
+
+        self._begin_artifacts(actual_test_plan_content.get('name', 'Unnamed Test Plan'))
+        case_results = self._execute_entries(case_entries, workers, scheduler, browser_type, headless, run_context)
+        if case_results is None:
+            self._finish_artifacts(None)
+            return False
+
+        if self.analysis_pipeline:
+            # All analyses must be attached to their steps before the report is built
+            self.analysis_pipeline.drain()
+        self.screenshot_capture.drain()
+        if self.graph_api:
+            self.graph_api.flush()
+
+        self._update_run_state(actual_test_plan_content, case_entries, case_results, base_url, start_step)
+        self._record_history(list(zip(case_entries, case_results)), start_step, actual_test_plan_content.get('name', 'Unnamed Test Plan'))
+        case_results = self._in_plan_order(case_entries, case_results, unchanged_results)
+        if shard:
+            self._tag_case_indices(case_entries, unchanged_results, case_results)
+
+        steps_skipped = self.last_dag_stats['steps_skipped'] if scheduler == 'dag' and case_entries else 0
+        self.last_report = self._merge_case_results(actual_test_plan_content, case_results, steps_skipped)
+        if shard:
+            # The plan's case count lets merge_reports find cases no shard reported
+            self.last_report['shard'] = {'index': shard[0], 'count': shard[1], 'case_count': plan_case_count}
+        self._finish_artifacts(self.last_report)
+        summary = self.last_report['summary']
+        print(f"[TestRunner] Summary: {summary['total']} test cases, {summary['passed']} passed, {summary['failed']} failed, {summary['error']} errors.")
+        if steps_skipped:
+            print(f"[TestRunner] Shared steps: {steps_skipped} of {total_steps} steps skipped by running shared prefixes once.")
+        self._print_capture_summary(summary)
+
+        print("[TestRunner] Test plan execution finished.")
+        return True # Indicate that execution finished (not necessarily all steps succeeded)
+
+    def execute_plans(self, test_plans: list, workers: int = 1, changed_only: bool = False, scheduler: str | None = None,
+                      shard: tuple | None = None) -> bool:
+        """
+        Executes several test plans as one batch on a shared pool of browsers.
+
+        The test cases of all plans are scheduled together, longest first, so the
+        pool stays busy until the end of the batch, and the per-plan results are
+        merged into a single report (see _merge_plan_reports). Browsers are launched
+        once for the whole batch instead of once per plan.
 
-        # Get browser configuration
+        Args:
+            test_plans (list): (path, test plan dictionary) tuples, as loaded by load_test_plan.
+            workers (int): Number of browsers to execute test cases on concurrently.
+            changed_only (bool): Execute only the test cases that changed or did not pass in their last run.
+            scheduler (str, optional): Only 'cases' is supported for batches; 'dag' is ignored with a warning.
+            shard (tuple, optional): (index, count): execute only the 1-based shard `index` of
+                                     `count` balanced shards of the test cases of all plans.
+
+        Returns:
+            bool: True if the batch executed, False otherwise.
+        """
+        if workers < 1:
+            print(f"[TestRunner] Error: Invalid number of workers {workers}. Must be at least 1.")
+            return False
+        scheduler = scheduler or self.scheduler
+        if scheduler != 'cases':
+            print(f"[TestRunner] Warning: Test plan batches are scheduled per test case; ignoring the '{scheduler}' scheduler.")
+
+        browser_type, headless, base_url = self._browser_settings()
+        self.run_started = time.time()
+        loaded_plans = []
+        for plan_path, test_plan in test_plans:
+            test_plan_content = (test_plan or {}).get('test_plan', {})
+            if not test_plan_content:
+                print(f"[TestRunner] Error: 'test_plan' key not found in {plan_path}. Skipping it.")
+                continue
+            loaded_plans.append((plan_path, test_plan_content, self._collect_cases(test_plan_content)))
+        self._estimate_cases([(content, entry) for _, content, entries in loaded_plans for entry in entries])
+        case_counts = [len(entries) for _, _, entries in loaded_plans]
+        if shard:
+            # Partition the cases of all plans together, then keep each plan's share
+            selected = self._select_shard([entry for _, _, entries in loaded_plans for entry in entries], shard)
+            selected_ids = {id(entry) for entry in selected}
+            loaded_plans = [(path, content, [entry for entry in entries if id(entry) in selected_ids]) for path, content, entries in loaded_plans]
+
+        plans = []
+        batch_entries = []
+        for plan_index, (plan_path, test_plan_content, case_entries) in enumerate(loaded_plans):
+            plan_stem = os.path.splitext(os.path.basename(plan_path))[0]
+            run_context = {
+                'total_steps': sum(len(entry['steps']) for entry in case_entries),
+                'start_step': 1,
+                'base_url': base_url,
+                # Step numbers restart in every plan; keep their screenshots apart
+                'screenshot_dir': os.path.join('screenshots', f"{plan_index + 1}_{plan_stem}"),
+            }
+            unchanged_results = {}
+            if changed_only:
+                case_entries, unchanged_results = self._select_changed_cases(test_plan_content, case_entries, base_url)
+            for entry in case_entries:
+                entry['run_context'] = run_context
+            plans.append({'path': plan_path, 'content': test_plan_content, 'entries': case_entries, 'unchanged_results': unchanged_results,
+                          'case_count': case_counts[plan_index]})
+            batch_entries.extend(entry for entry in case_entries if entry['steps'])
+
+        if not plans:
+            print("[TestRunner] Error: No valid test plans to execute.")
+            return False
+
+        # Longest test cases first: the short ones fill the gaps at the end of the batch
+        batch_entries.sort(key=lambda entry: entry['estimate'], reverse=True)
+        print(f"[TestRunner] Executing {len(batch_entries)} test cases from {len(plans)} test plans on {min(workers, max(1, len(batch_entries)))} workers.")
+
+        self._begin_artifacts(', '.join(plan['content'].get('name', 'Unnamed Test Plan') for plan in plans))
+        batch_results = self._execute_entries(batch_entries, workers, 'cases', browser_type, headless, None)
+        if batch_results is None:
+            self._finish_artifacts(None)
+            return False
+        if self.analysis_pipeline:
+            self.analysis_pipeline.drain()
+        self.screenshot_capture.drain()
+        if self.graph_api:
+            self.graph_api.flush()
+
+        results_by_entry = {id(entry): case_result for entry, case_result in zip(batch_entries, batch_results)}
+        self._record_history(list(zip(batch_entries, batch_results)), 1, ', '.join(plan['content'].get('name', 'Unnamed Test Plan') for plan in plans))
+        plan_reports = []
+        for plan in plans:
+            # Cases without steps were not scheduled; they pass trivially as in a single-plan run
+            case_results = [results_by_entry.get(id(entry)) or {'suite_name': entry['suite_name'], 'name': entry['case_name'], 'status': 'passed', 'steps': []}
+                            for entry in plan['entries']]
+            self._update_run_state(plan['content'], plan['entries'], case_results, base_url, 1)
+            case_results = self._in_plan_order(plan['entries'], case_results, plan['unchanged_results'])
+            if shard:
+                self._tag_case_indices(plan['entries'], plan['unchanged_results'], case_results)
+            plan_report = self._merge_case_results(plan['content'], case_results)
+            plan_report['path'] = plan['path']
+            if shard:
+                plan_report['case_count'] = plan['case_count']
+            plan_reports.append(plan_report)
+
+        self.last_report = self._merge_plan_reports(plan_reports)
+        if shard:
+            self.last_report['shard'] = {'index': shard[0], 'count': shard[1]}
+        self._finish_artifacts(self.last_report)
+        summary = self.last_report['summary']
+        print(f"[TestRunner] Batch summary: {len(plan_reports)} test plans, {summary['total']} test cases, {summary['passed']} passed, "
+              f"{summary['failed']} failed, {summary['error']} errors.")
+        self._print_capture_summary(summary)
+        print("[TestRunner] Test plan batch execution finished.")
+        return True
+
+    def _merge_plan_reports(self, plan_reports: list) -> dict:
+        """
+        Merges the reports of several test plans into one report.
+
+        The suites of all plans are listed in plan order, each with a 'plan' key naming
+        its plan and a 'plan_path' key identifying it (plans may share a name), so the
+        merged report keeps the layout of a single-plan report. The 'plans' key lists
+        the path, name and summary of every plan (and the plan's 'case_count' in a
+        sharded run), and the summary counts are added up.
+
+        Args:
+            plan_reports (list): Reports as built by _merge_case_results, each with a 'path'.
+
+        Returns:
+            dict: The merged report.
+        """
+        report = {
+            'name': f"{len(plan_reports)} test plans",
+            'suites': [],
+            'plans': [],
+            'summary': {'total': 0, 'passed': 0, 'failed': 0, 'error': 0, 'steps_skipped': 0,
+                        'screenshots_captured': 0, 'screenshots_avoided': 0},
+        }
+        for plan_report in plan_reports:
+            for suite in plan_report['suites']:
+                report['suites'].append(dict(suite, plan=plan_report['name'], plan_path=plan_report.get('path')))
+            plan_entry = {'path': plan_report.get('path'), 'name': plan_report['name'], 'summary': plan_report['summary']}
+            if 'case_count' in plan_report:
+                plan_entry['case_count'] = plan_report['case_count']
+            report['plans'].append(plan_entry)
+            for key, value in plan_report['summary'].items():
+                report['summary'][key] = report['summary'].get(key, 0) + value
+        return report
+
+    def _browser_settings(self) -> tuple:
+        """
+        Reads the browser configuration.
+
+        Returns:
+            tuple: The browser type, whether to run headless, and the base URL of relative navigate targets.
+        """
         browser_config = self.config_manager.get('environments.browser', {})
         # Access parameters from the nested 'config' key as per test-mmat/config/config.yaml
         browser_params = browser_config.get('config', {})
         browser_type = browser_params.get('browser_type', 'chromium')
         headless = browser_params.get('headless', True)
         base_url = browser_params.get('baseUrl', None)
+        return browser_type, headless, base_url
 
-        # Launch browser before executing steps
+    def _execute_entries(self, case_entries: list, workers: int, scheduler: str, browser_type: str, headless: bool, run_context: dict | None) -> list | None:
+        """
+        Executes test case entries with the given scheduler and number of workers.
+
+        Args:
+            case_entries (list): Case entries as returned by _collect_cases. An entry with a
+                                 'run_context' key is executed with it instead of `run_context`.
+            workers (int): Number of browsers to execute test cases on concurrently.
+            scheduler (str): 'cases' or 'dag'.
+            browser_type (str): Browser to launch.
+            headless (bool): Whether to run the browsers in headless mode.
+            run_context (dict | None): Shared execution parameters.
+
+        Returns:
+            list | None: Case results in the same order as case_entries, or None if no browser could be launched.
+        """
+        if not case_entries:
+            print("[TestRunner] No test cases to execute.")
+            return []
+        if scheduler == 'dag':
+            return self._execute_dag(case_entries, workers, browser_type, headless, run_context)
+        if workers > 1:
+            return self._execute_cases_parallel(case_entries, workers, browser_type, headless, run_context)
+
+        # Launch browser before executing steps (reuses the running one if kept open)
         self.driver.launch_browser(browser_type=browser_type, headless=headless)
         if not self.driver.page:
             print("[TestRunner] Error: Failed to launch browser. Cannot execute test plan.")
-            return False
+            if not self.reuse_browser:
+                self.driver.close_browser() # Stops Playwright if it started; close() does it for kept browsers
+            return None
+
+        try:
+            return [self._execute_case(entry, self.driver, run_context) for entry in case_entries]
+        finally:
+            # Close browser after all steps are executed or an error occurs, unless it is kept for the next plan
+            if self.reuse_browser:
+                self.driver.close_context()
+            else:
+                self.driver.close_browser()
+
+    def _collect_cases(self, test_plan_content: dict) -> list:
+        """
+        Flattens the suites of a test plan into a list of test case entries.
+
+        Args:
+            test_plan_content (dict): The content under the 'test_plan' key.
+
+        Returns:
+            list: Entries with the plan and suite names, the case, its steps and the
+                  global (0-based) index of its first step.
+        """
+        case_entries = []
+        offset = 0
+        test_suites = test_plan_content.get('test_suites', [])
+        print(f"[TestRunner] Debug: test_suites found: {test_suites}")
 
-        # Prepare test data if available (assuming it's at the top level or passed per test case)
-        test_data = test_plan.get('test_data', {}) # This might need refinement if data is per test case
+        for suite in test_suites:
+            test_cases = suite.get('test_cases', [])
+            print(f"[TestRunner] Debug: test_cases in suite '{suite.get('name')}': {test_cases}")
+            for case in test_cases:
+                steps = case.get('steps', [])
+                print(f"[TestRunner] Debug: steps in test case '{case.get('name')}': {steps}")
+                case_entries.append({
+                    'index': len(case_entries),
+                    'plan_name': test_plan_content.get('name', 'Unnamed Test Plan'),
+                    'suite_name': suite.get('name', 'Unnamed Test Suite'),
+                    'case_name': case.get('name', 'Unnamed Test Case'),
+                    'steps': steps,
+                    'offset': offset,
+                    # Any other keys of the case (e.g. test data) are part of its content hash
+                    'parameters': {key: value for key, value in case.items() if key not in ('name', 'description', 'steps')},
+                })
+                offset += len(steps)
+        return case_entries
 
+    def _case_key_and_hash(self, test_plan_content: dict, case_entry: dict, base_url: str | None) -> tuple:
+        """Returns the run state key and the content hash of a test case."""
+        key = RunState.case_key(test_plan_content.get('name', 'Unnamed Test Plan'), case_entry['suite_name'], case_entry['case_name'])
+        return key, case_hash(case_entry['steps'], case_entry.get('parameters'), base_url)
+
+    def _select_changed_cases(self, test_plan_content: dict, case_entries: list, base_url: str | None) -> tuple:
+        """
+        Splits the test cases into those to execute and those unchanged since their last passing run.
+
+        A case is executed if its content hash (steps, parameters and base URL) differs
+        from the one recorded in the run state, it has no record, or its last run did not pass.
+
+        Returns:
+            tuple: The case entries to execute, and the results of the skipped cases keyed by case index.
+        """
+        if not self.run_state_path:
+            print("[TestRunner] Warning: No run state configured ('execution.run_state'). Executing all test cases.")
+            return case_entries, {}
+        run_state = RunState(self.run_state_path)
+        changed_entries = []
+        unchanged_results = {}
+        for entry in case_entries:
+            key, content_hash = self._case_key_and_hash(test_plan_content, entry, base_url)
+            if run_state.is_unchanged(key, content_hash):
+                unchanged_results[entry['index']] = {
+                    'suite_name': entry['suite_name'],
+                    'name': entry['case_name'],
+                    'status': 'unchanged',
+                    'steps': [],
+                    'details': 'Not executed: unchanged since its last passing run.',
+                }
+            else:
+                changed_entries.append(entry)
+        print(f"[TestRunner] Changed-only run: executing {len(changed_entries)} of {len(case_entries)} test cases, "
+              f"{len(unchanged_results)} unchanged since their last passing run.")
+        return changed_entries, unchanged_results
+
+    def _update_run_state(self, test_plan_content: dict, case_entries: list, case_results: list, base_url: str | None, start_step: int):
+        """
+        Records the content hash and status of every test case executed from its first step.
+        """
+        if not self.run_state_path or not case_entries:
+            return
+        run_state = RunState(self.run_state_path)
+        for entry, case_result in zip(case_entries, case_results):
+            if entry['offset'] + 1 < start_step:
+                continue # Started in the middle of the case; its result does not cover all steps
+            key, content_hash = self._case_key_and_hash(test_plan_content, entry, base_url)
+            run_state.record(key, content_hash, case_result['status'], case_result.get('duration'))
         try:
-            for i in range(start_step - 1, total_steps):
-                step_data = all_steps[i]
-                step_number = i + 1
-                step_name = step_data.get('description', f'Step {step_number}') # Use 'description' for step name
-                step_type = step_data.get('action') # Use 'action' for step type
+            run_state.save()
+        except OSError as e:
+            print(f"[TestRunner] Error writing run state {self.run_state_path}: {e}")
 
-                print(f"[TestRunner] Executing step {step_number}/{total_steps}: {step_name} (Type: {step_type})")
+    def _estimate_cases(self, plan_cases: list):
+        """
+        Stores a unique key ('history_key') and the estimated duration in seconds
+        ('estimate') on every case entry, for longest-first scheduling.
 
-                # For navigate steps, prepend base_url if target is relative
-                if step_type == 'navigate' and base_url and step_data.get('target') and not step_data['target'].startswith(('http://', 'https://', 'file://')):
-                    step_data['url'] = f"{base_url}{step_data['target']}"
-                else:
-                    step_data['url'] = step_data.get('target') # Ensure 'url' key is set for NavigateStep
+        Estimates are the median recent duration from the duration history, else the
+        last duration recorded in the run state, else the step count times the average
+        seconds per step of the timed cases (see mmat.test_runner.sharding.case_weights).
+        Shards are not split by these estimates, since every run updates them (see
+        _select_shard).
 
+        Args:
+            plan_cases (list): (test plan content, case entry) tuples, in plan order.
+        """
+        durations = {}
+        if self.history_path and os.path.exists(self.history_path):
+            try:
+                history = DurationHistory(self.history_path)
                 try:
-                    # Instantiate the correct step class based on type
-                    step_instance: TestStep | None = None
-                    if step_type == 'navigate':
-                        step_instance = NavigateStep(step_data, self.driver)
-                    elif step_type == 'fill':
-                        step_instance = FillStep(step_data, self.driver)
-                    elif step_type == 'click':
-                        step_instance = ClickStep(step_data, self.driver)
-                    elif step_type == 'assert_url':
-                        step_instance = AssertUrlStep(step_data, self.driver)
-                    elif step_type == 'assert_element_visible':
-                        step_instance = AssertElementVisibleStep(step_data, self.driver)
-                    # Add other step types here as they are implemented (e.g., visual.click, api.call)
-                    else:
-                        print(f"[TestRunner] Warning: Unknown step type '{step_type}'. Skipping step.")
-                        continue # Skip unknown step types
-
-                    if step_instance:
-                        success = step_instance.execute()
-                        if success:
-                            print(f"[TestRunner] Step {step_number} '{step_name}' completed successfully. ✔️")
-                        else:
-                            print(f"[TestRunner] Step {step_number} '{step_name}' failed. ❌")
-                            # Depending on requirements, you might stop execution on failure
-                            # For now, let's continue to the next step
-                            # return False # Uncomment to stop on first failure
+                    durations = history.case_durations()
+                finally:
+                    history.close()
+            except sqlite3.Error as e:
+                print(f"[TestRunner] Could not read duration history {self.history_path}: {e}")
+        if not durations and self.run_state_path:
+            durations = RunState(self.run_state_path).durations()
+
+        keys = []
+        seen = {}
+        for test_plan_content, entry in plan_cases:
+            key = RunState.case_key(test_plan_content.get('name', 'Unnamed Test Plan'), entry['suite_name'], entry['case_name'])
+            seen[key] = seen.get(key, 0) + 1
+            keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}") # Cases with the same name stay distinct
+        weights = case_weights(keys, [len(entry['steps']) for _, entry in plan_cases], durations)
+        for (_, entry), key, weight in zip(plan_cases, keys, weights):
+            entry['history_key'] = key
+            entry['estimate'] = weight
+
+    def _shard_durations(self) -> dict:
+        """
+        Reads the pinned case durations that split a sharded run: the run state file
+        named by 'execution.shard_durations' (see `mmat stats --export-durations`).
+
+        The split must not depend on anything a shard run writes, or shards run one
+        after another would split the cases differently and skip or repeat some. So
+        the duration history and the run state file of the run are never used; without
+        a pinned file, cases are weighed by their step counts.
+
+        Returns:
+            dict: Durations in seconds keyed by case key; empty to weigh by step counts.
+        """
+        durations_path = self.config_manager.get('execution.shard_durations', None)
+        if not durations_path:
+            return {}
+        if self.run_state_path and os.path.abspath(durations_path) == os.path.abspath(self.run_state_path):
+            print(f"[TestRunner] Warning: 'execution.shard_durations' is the run state file every run updates; "
+                  f"splitting shards by step counts. Pin a copy with 'mmat stats --export-durations'.")
+            return {}
+        if not os.path.exists(durations_path):
+            print(f"[TestRunner] Warning: Shard durations file {durations_path} not found; splitting shards by step counts.")
+            return {}
+        return RunState(durations_path).durations()
+
+    def _select_shard(self, case_entries: list, shard: tuple) -> list:
+        """
+        Selects the test cases of one shard of a sharded run.
+
+        All cases are split into `count` shards of balanced estimated duration (see
+        mmat.test_runner.sharding.partition). The weights come from the pinned
+        durations of _shard_durations, or the step counts, so every shard process
+        computes the same split however many shards have run before it.
+
+        Args:
+            case_entries (list): Case entries of all cases, in plan order, with estimates.
+            shard (tuple): (index, count), with a 1-based index.
+
+        Returns:
+            list: The entries of the cases in the shard, in plan order.
+        """
+        shard_index, shard_count = shard
+        keys = [entry['history_key'] for entry in case_entries]
+        durations = self._shard_durations()
+        weights = case_weights(keys, [len(entry['steps']) for entry in case_entries], durations)
+        shard_keys = set(partition(keys, weights, shard_count)[shard_index - 1])
+
+        selected = [entry for entry in case_entries if entry['history_key'] in shard_keys]
+        estimate = sum(weight for key, weight in zip(keys, weights) if key in shard_keys)
+        timed = sum(1 for key in keys if durations.get(key))
+        print(f"[TestRunner] Shard {shard_index}/{shard_count}: {len(selected)} of {len(case_entries)} test cases "
+              f"(weight {estimate:.1f} of {sum(weights):.1f}; {timed} cases with pinned durations).")
+        return selected
+
+    def _record_history(self, executed: list, start_step: int, label: str):
+        """
+        Stores the case and step durations of a run in the duration history.
+
+        Args:
+            executed (list): (case entry, case result) tuples of the executed cases.
+            start_step (int): Cases started after their first step are not recorded.
+            label (str): Description of the run, e.g. the plan name.
+        """
+        cases = [{'key': entry['history_key'], 'status': case_result['status'], 'duration': case_result['duration'],
+                  'steps': case_result.get('steps', [])}
+                 for entry, case_result in executed
+                 if 'history_key' in entry and 'duration' in case_result and entry['offset'] + 1 >= start_step]
+        if not self.history_path or not cases:
+            return
+        try:
+            history = DurationHistory(self.history_path)
+            try:
+                history.record_run(cases, label=label, started=self.run_started)
+            finally:
+                history.close()
+        except sqlite3.Error as e:
+            print(f"[TestRunner] Error writing duration history {self.history_path}: {e}")
+
+    def _tag_case_indices(self, case_entries: list, other_results: dict, case_results: list):
+        """
+        Stores the plan position of every case result as 'case_index', so the reports
+        of several shards can be merged back into plan order.
+
+        Args:
+            case_entries (list): The executed case entries.
+            other_results (dict): Results of cases that were not executed, keyed by case index.
+            case_results (list): All case results in plan order, as returned by _in_plan_order.
+        """
+        indices = sorted([entry['index'] for entry in case_entries] + list(other_results))
+        for case_index, case_result in zip(indices, case_results):
+            case_result['case_index'] = case_index
+
+    def _in_plan_order(self, case_entries: list, case_results: list, other_results: dict) -> list:
+        """
+        Combines the results of the executed cases with results keyed by case index (e.g. of unchanged cases) in plan order.
+        """
+        if not other_results:
+            return case_results
+        results_by_index = dict(other_results)
+        for entry, case_result in zip(case_entries, case_results):
+            results_by_index[entry['index']] = case_result
+        return [results_by_index[index] for index in sorted(results_by_index)]
+
+    def _execute_cases_parallel(self, case_entries: list, workers: int, browser_type: str, headless: bool, run_context: dict) -> list:
+        """
+        Executes test cases concurrently, one browser per worker.
+
+        The sync Playwright API is bound to the thread that started it, so every worker
+        thread owns its own driver instance and browser.
+
+        Args:
+            case_entries (list): Case entries as returned by _collect_cases.
+            workers (int): Number of worker threads (and browsers).
+            browser_type (str): Browser to launch in each worker.
+            headless (bool): Whether to run the browsers in headless mode.
+            run_context (dict): Shared execution parameters.
+
+        Returns:
+            list: Case results in the same order as case_entries.
+        """
+        workers = min(workers, len(case_entries))
+        print(f"[TestRunner] Running {len(case_entries)} test cases on {workers} workers.")
+
+        work_queue = WorkStealingQueue(workers)
+        # Longest estimated test cases first; stealing from the back takes the shortest ones
+        for position in sorted(range(len(case_entries)), key=lambda position: -case_entries[position].get('estimate', len(case_entries[position]['steps']))):
+            work_queue.put((position, case_entries[position]))
 
+        case_results = [None] * len(case_entries)
+
+        def worker(worker_id: int):
+            driver = self.driver_factory()
+            driver.launch_browser(browser_type=browser_type, headless=headless)
+            if not driver.page:
+                # Leave the pending cases to the other workers
+                print(f"[TestRunner] Error: Worker {worker_id} failed to launch browser.")
+                driver.close_browser() # Stops Playwright if it started
+                return
+            try:
+                while True:
+                    item = work_queue.get(worker_id)
+                    if item is None:
+                        break
+                    position, entry = item
+                    print(f"[TestRunner] Worker {worker_id} picked test case '{entry['case_name']}'.")
+                    case_results[position] = self._execute_case(entry, driver, run_context)
+            finally:
+                driver.close_browser()
+
+        threads = [threading.Thread(target=worker, args=(worker_id,), name=f"mmat-worker-{worker_id}") for worker_id in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        print(f"[TestRunner] Parallel execution finished ({work_queue.steals} test cases stolen between workers).")
+
+        for position, entry in enumerate(case_entries):
+            if case_results[position] is None:
+                case_results[position] = {
+                    'suite_name': entry['suite_name'],
+                    'name': entry['case_name'],
+                    'status': 'error',
+                    'steps': [],
+                    'details': 'Test case was not executed: no worker could launch a browser.',
+                }
+        return case_results
+
+    def _execute_dag(self, case_entries: list, workers: int, browser_type: str, headless: bool, run_context: dict) -> list | None:
+        """
+        Executes the test cases as a DAG of step groups.
+
+        The steps that test cases share at their start run once. Where the cases
+        continue differently, the worker keeps following the first branch on its page
+        and queues the other branches with a snapshot of the page: the storage state
+        (cookies and local storage) and the URL. Any worker can resume a queued
+        branch in a new context created from the snapshot, so independent branches
+        run concurrently.
+
+        Args:
+            case_entries (list): Case entries as returned by _collect_cases.
+            workers (int): Number of browsers executing branches concurrently.
+            browser_type (str): Browser to launch.
+            headless (bool): Whether to run the browsers in headless mode.
+            run_context (dict): Shared execution parameters.
+
+        Returns:
+            list | None: Case results in the same order as case_entries, or None if no browser could be launched.
+        """
+        dag = PlanDag(case_entries)
+        shared_steps = dag.shared_step_count()
+        print(f"[TestRunner] Compiled {len(case_entries)} test cases into {dag.graph.node_count() - 1} step groups; "
+              f"{shared_steps} of {dag.total_step_count()} steps are shared and run once.")
+
+        workers = max(1, min(workers, len(case_entries)))
+        branch_queue = BranchQueue(workers)
+        branch_queue.put((PlanDag.ROOT, None), worker_id=0)
+        group_results = {}
+        failed_cases = {}
+
+        def run_branches(worker_id: int, driver: PlaywrightDriver):
+            while True:
+                item = branch_queue.get(worker_id)
+                if item is None:
+                    break
+                group_id, snapshot = item
+                try:
+                    self._execute_branch(dag, group_id, snapshot, driver, branch_queue, worker_id, group_results, failed_cases, run_context)
                 except Exception as e:
-                    print(f"[TestRunner] An error occurred during execution of step {step_number} '{step_name}': {e} ❌")
-                            # return False # Uncomment to stop on first exception
+                    print(f"[TestRunner] Error executing step group '{group_id}': {e}")
+                    for position in dag.group(group_id)['cases']:
+                        failed_cases.setdefault(position, f'Test case was not completed: {e}')
+                finally:
+                    branch_queue.task_done()
+
+        if workers == 1:
+            self.driver.launch_browser(browser_type=browser_type, headless=headless)
+            if not self.driver.page:
+                print("[TestRunner] Error: Failed to launch browser. Cannot execute test plan.")
+                if not self.reuse_browser:
+                    self.driver.close_browser() # Stops Playwright if it started; close() does it for kept browsers
+                return None
+            try:
+                run_branches(0, self.driver)
+            finally:
+                if self.reuse_browser:
+                    self.driver.close_context()
+                else:
+                    self.driver.close_browser()
+        else:
+            print(f"[TestRunner] Running step groups on {workers} workers.")
 
-                # After executing a step that might change the page, take a screenshot and analyze it
-                # TODO: Refine which steps trigger a screenshot (e.g., navigate, click, fill)
-                # TODO: Determine screenshot naming convention and storage location
-                screenshot_path = f"output/screenshots/step_{step_number}.png"
+            def worker(worker_id: int):
+                driver = self.driver_factory()
+                driver.launch_browser(browser_type=browser_type, headless=headless)
+                if not driver.page:
+                    print(f"[TestRunner] Error: Worker {worker_id} failed to launch browser.")
+                    driver.close_browser() # Stops Playwright if it started
+                    return
                 try:
-                    # Ensure the screenshot directory exists
-                    os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-                    # Use the correct method name from PlaywrightDriver
-                    self.driver.screenshot(screenshot_path)
-                    print(f"[TestRunner] Screenshot taken: {screenshot_path}")
-
-                    if self.screenshot_analyzer:
-                        print(f"[TestRunner] Analyzing screenshot for step {step_number}...")
-                        analysis_result = self.screenshot_analyzer.analyze_screenshot(screenshot_path)
-                        # TODO: Process analysis_result (e.g., update graph)
-                        print(f"[TestRunner] Screenshot analysis for step {step_number} complete.")
-                    else:
-                        print("[TestRunner] Screenshot Analyzer not available. Skipping analysis.")
+                    run_branches(worker_id, driver)
+                finally:
+                    driver.close_browser()
 
-                except Exception as e:
-                    print(f"[TestRunner] Error taking or analyzing screenshot for step {step_number}: {e}")
-                    # Continue execution even if screenshot/analysis fails
+            threads = [threading.Thread(target=worker, args=(worker_id,), name=f"mmat-worker-{worker_id}") for worker_id in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print(f"[TestRunner] DAG execution finished ({branch_queue.steals} branches stolen between workers).")
 
-        finally:
-            # Close browser after all steps are executed or an error occurs
-            self.driver.close_browser()
+        if self.analysis_pipeline:
+            # Shared step results are copied into every case below; their analyses must be attached first
+            self.analysis_pipeline.drain()
+        case_results = self._assemble_dag_results(dag, group_results, failed_cases)
 
-        print("[TestRunner] Test plan execution finished.")
-        return True # Indicate that execution finished (not necessarily all steps succeeded)
+        # Every shared step in a case result was skipped for that case, unless a branch replayed it
+        shared_steps = sum(1 for case_result in case_results for step in case_result['steps'] if 'shared_from' in step)
+        self.last_dag_stats = dict(dag.stats, steps_skipped=max(0, shared_steps - dag.stats['steps_replayed']))
+        print(f"[TestRunner] Executed {dag.stats['steps_executed']} steps and replayed {dag.stats['steps_replayed']} "
+              f"after {dag.stats['snapshot_restores']} snapshot restores; {self.last_dag_stats['steps_skipped']} steps skipped.")
+        return case_results
+
+    def _execute_branch(self, dag: PlanDag, group_id: str, snapshot: dict | None, driver: PlaywrightDriver, branch_queue: BranchQueue,
+                        worker_id: int, group_results: dict, failed_cases: dict, run_context: dict):
+        """
+        Executes a step group and then the first group of every branch below it, on one page.
+
+        Args:
+            dag (PlanDag): The compiled plan.
+            group_id (str): The group to start with.
+            snapshot (dict | None): Page snapshot to resume from; None starts from a fresh context.
+            driver (PlaywrightDriver): The driver of the worker.
+            branch_queue (BranchQueue): Receives the other branches with a snapshot.
+            worker_id (int): The worker executing the branch.
+            group_results (dict): Collects the step results per group.
+            failed_cases (dict): Collects the case positions that cannot complete, with the reason.
+            run_context (dict): Shared execution parameters.
+        """
+        driver.new_context(storage_state=snapshot.get('storage_state') if snapshot else None)
+        if not driver.page:
+            for position in dag.group(group_id)['cases']:
+                failed_cases.setdefault(position, 'Test case was not executed: could not create a browser context.')
+            return
+        if snapshot:
+            with tracing.span('snapshot.restore', group=group_id, replayed_steps=len(snapshot.get('replay', []))):
+                self._restore_snapshot(snapshot, driver)
+            dag.count('steps_replayed', len(snapshot.get('replay', [])))
+            if snapshot.get('url'):
+                dag.count('snapshot_restores')
+
+        while group_id is not None:
+            group = dag.group(group_id)
+            owner_entry = dag.case_entries[dag.owner(group_id)]
+            step_results = []
+            pending_images = []
+            with tracing.span('step_group', group=group_id, cases=len(group['cases'])):
+                for step_offset, step_data in enumerate(group['steps']):
+                    local_index = group['start_index'] + step_offset
+                    step_result = self._execute_step(step_data, owner_entry['offset'] + local_index + 1, driver, run_context, pending_images)
+                    step_results.append(step_result)
+                    self._record_step(owner_entry, local_index + 1, step_result, driver.page)
+            group_results[group_id] = step_results
+            dag.count('steps_executed', len(step_results))
+            if self.batch_analysis:
+                self._analyze_case_screenshots(pending_images)
+
+            children = dag.children(group_id)
+            if len(children) > 1:
+                with tracing.span('snapshot.take', group=group_id):
+                    branch_snapshot = None if group_id == PlanDag.ROOT else self._take_snapshot(dag, group_id, driver)
+                for child_id in children[1:]:
+                    branch_queue.put((child_id, branch_snapshot), worker_id)
+            group_id = children[0] if children else None
+
+    def _take_snapshot(self, dag: PlanDag, group_id: str, driver: PlaywrightDriver) -> dict:
+        """
+        Captures the page state at the end of a step group for the branches below it.
+
+        Returns:
+            dict: The storage state, the URL and the steps to replay after restoring them.
+                  When restoring would take as many steps as the prefix itself (opening the
+                  URL counts as one), or the storage state cannot be read, the snapshot holds
+                  no state and all steps up to the group are replayed from a fresh context instead.
+        """
+        path_steps = dag.path_steps(group_id)
+        replay = dag.replay_steps(group_id)
+        if len(path_steps) <= 1 + len(replay):
+            return {'storage_state': None, 'url': None, 'replay': path_steps}
+        storage_state = driver.get_storage_state()
+        if storage_state is None:
+            print(f"[TestRunner] Warning: No storage state for step group '{group_id}'; branches replay its steps.")
+            return {'storage_state': None, 'url': None, 'replay': dag.path_steps(group_id)}
+        return {'storage_state': storage_state, 'url': driver.get_current_url(), 'replay': replay}
+
+    def _restore_snapshot(self, snapshot: dict, driver: PlaywrightDriver):
+        """
+        Returns a new context (created with the snapshot's storage state) to the snapshot's
+        page: opens its URL and replays the steps whose effect the storage state does not hold.
+        """
+        url = snapshot.get('url')
+        if url and url != 'about:blank':
+            driver.navigate(url)
+        replay = snapshot.get('replay', [])
+        print(f"[TestRunner] Resumed branch from snapshot of {url or 'the plan start'} (replaying {len(replay)} steps).")
+        for step_data in replay:
+            step_instance = self._create_step(step_data.get('action'), step_data, driver)
+            if step_instance:
+                step_instance.execute()
+
+    def _assemble_dag_results(self, dag: PlanDag, group_results: dict, failed_cases: dict) -> list:
+        """
+        Builds the result of every test case from the results of the step groups it runs through.
+
+        Shared steps are reported in every case that contains them, numbered as in
+        that case, with 'shared_from' set to the number of the step that was executed.
+
+        Returns:
+            list: Case results in the same order as the case entries.
+        """
+        case_results = []
+        for position, entry in enumerate(dag.case_entries):
+            case_result = {'suite_name': entry['suite_name'], 'name': entry['case_name']}
+            step_results = []
+            details = failed_cases.get(position)
+            for group_id in dag.path(position):
+                if details:
+                    break
+                results = group_results.get(group_id)
+                if results is None:
+                    details = 'Test case was not executed: a step group it depends on did not run.'
+                elif dag.owner(group_id) == position:
+                    step_results.extend(results)
+                else:
+                    start_index = dag.group(group_id)['start_index']
+                    step_results.extend(dict(result, number=entry['offset'] + start_index + step_offset + 1, shared_from=result['number'])
+                                        for step_offset, result in enumerate(results))
+            if details:
+                case_result.update({'status': 'error', 'steps': step_results, 'details': details})
+            else:
+                failed = any(step['status'] in ('failed', 'error') for step in step_results)
+                case_result.update({'status': 'failed' if failed else 'passed', 'steps': step_results,
+                                    'duration': self._case_duration(step_results)})
+            case_results.append(case_result)
+        return case_results
+
+    def _execute_case(self, case_entry: dict, driver: PlaywrightDriver, run_context: dict) -> dict:
+        """
+        Executes the steps of a single test case on the given driver.
+
+        Args:
+            case_entry (dict): Case entry as returned by _collect_cases.
+            driver (PlaywrightDriver): The driver to execute the steps on.
+            run_context (dict): Shared execution parameters.
+
+        Returns:
+            dict: The case result with the status of every executed step.
+        """
+        run_context = case_entry.get('run_context', run_context)
+        with tracing.span('case', suite=case_entry['suite_name'], case=case_entry['case_name']):
+            # Every test case starts from a fresh context: no cookies or storage from earlier cases
+            driver.new_context()
+            if not driver.page:
+                return {
+                    'suite_name': case_entry['suite_name'],
+                    'name': case_entry['case_name'],
+                    'status': 'error',
+                    'steps': [],
+                    'details': 'Test case was not executed: could not create a browser context.',
+                }
+
+            step_results = []
+            pending_images = []
+            for local_index, step_data in enumerate(case_entry['steps']):
+                step_number = case_entry['offset'] + local_index + 1
+                if step_number < run_context['start_step']:
+                    continue
+                step_result = self._execute_step(step_data, step_number, driver, run_context, pending_images)
+                step_results.append(step_result)
+                self._record_step(case_entry, local_index + 1, step_result, driver.page)
+
+            if self.batch_analysis:
+                self._analyze_case_screenshots(pending_images)
+
+            if any(step['status'] in ('failed', 'error') for step in step_results):
+                status = 'failed'
+            else:
+                status = 'passed'
+
+            return {
+                'suite_name': case_entry['suite_name'],
+                'name': case_entry['case_name'],
+                'status': status,
+                'steps': step_results,
+                'duration': self._case_duration(step_results),
+            }
+
+    def _case_duration(self, step_results: list) -> float:
+        """
+        Returns the duration of a test case in seconds: the sum of its step durations.
+        Shared steps count with the duration of their execution, which estimates the
+        case's duration when run on its own.
+        """
+        return round(sum(step.get('duration', 0.0) for step in step_results), 3)
+
+    def _create_step(self, step_type: str, step_data: dict, driver: PlaywrightDriver) -> TestStep | None:
+        """
+        Instantiates the step class matching the step type.
+
+        Returns:
+            TestStep | None: The step instance, or None for unknown step types.
+        """
+        if step_type == 'navigate':
+            return NavigateStep(step_data, driver)
+        elif step_type == 'fill':
+            return FillStep(step_data, driver)
+        elif step_type == 'click':
+            return ClickStep(step_data, driver)
+        elif step_type == 'assert_url':
+            return AssertUrlStep(step_data, driver)
+        elif step_type == 'assert_element_visible':
+            return AssertElementVisibleStep(step_data, driver)
+        # Add other step types here as they are implemented (e.g., visual.click, api.call)
+        return None
+
+    def _resolve_step_url(self, step_data: dict, step_type: str, base_url: str | None):
+        """
+        Sets the 'url' key of a step from its 'target'.
+
+        Args:
+            step_data (dict): The step dictionary (updated in place).
+            step_type (str): The step action.
+            base_url (str | None): Base URL prepended to relative navigate targets.
+        """
+        # For navigate steps, prepend base_url if target is relative
+        if step_type == 'navigate' and base_url and step_data.get('target') and not step_data['target'].startswith(('http://', 'https://', 'file://')):
+            step_data['url'] = f"{base_url}{step_data['target']}"
+        else:
+            step_data['url'] = step_data.get('target') # Ensure 'url' key is set for NavigateStep
+
+    def _execute_step(self, step_data: dict, step_number: int, driver: PlaywrightDriver, run_context: dict,
+                      pending_images: list | None = None) -> dict:
+        """
+        Executes a single step, then takes and analyzes a screenshot.
+
+        Args:
+            step_data (dict): The step dictionary.
+            step_number (int): Global 1-based number of the step in the plan.
+            driver (PlaywrightDriver): The driver to execute the step on.
+            run_context (dict): Shared execution parameters.
+            pending_images (list, optional): Collects (step_result, image) pairs whose analysis
+                                             is deferred to the end of the test case.
+
+        Returns:
+            dict: The step result.
+        """
+        total_steps = run_context['total_steps']
+        base_url = run_context['base_url']
+        step_name = step_data.get('description', f'Step {step_number}') # Use 'description' for step name
+        step_type = step_data.get('action') # Use 'action' for step type
+        step_result = {'number': step_number, 'description': step_name, 'action': step_type, 'status': 'passed'}
+        started = time.perf_counter()
+
+        with tracing.span('step', number=step_number, action=step_type) as step_span:
+            print(f"[TestRunner] Executing step {step_number}/{total_steps}: {step_name} (Type: {step_type})")
+
+            self._resolve_step_url(step_data, step_type, base_url)
+
+            try:
+                # Instantiate the correct step class based on type
+                step_instance = self._create_step(step_type, step_data, driver)
+                if not step_instance:
+                    print(f"[TestRunner] Warning: Unknown step type '{step_type}'. Skipping step.")
+                    step_result['status'] = 'skipped'
+                    return step_result # Skip unknown step types
+
+                with tracing.span('driver', action=step_type):
+                    success = step_instance.execute()
+                if success:
+                    print(f"[TestRunner] Step {step_number} '{step_name}' completed successfully. ✔️")
+                else:
+                    print(f"[TestRunner] Step {step_number} '{step_name}' failed. ❌")
+                    step_result['status'] = 'failed'
+                    # Depending on requirements, you might stop execution on failure
+                    # For now, let's continue to the next step
+
+            except Exception as e:
+                print(f"[TestRunner] An error occurred during execution of step {step_number} '{step_name}': {e} ❌")
+                step_result['status'] = 'error'
+                step_result['error'] = str(e)
+            # Where the step's time went; 'model' is added when its screenshot analysis finishes
+            step_result['timings'] = {'driver': round(time.perf_counter() - started, 3)}
+
+            # Take a screenshot and analyze it if the screenshot policy selects the step
+            try:
+                screenshot = self._capture_screenshot(driver, step_data, step_number, step_result, run_context)
+                if screenshot is not None:
+                    self._analyze_step_screenshot(screenshot, step_number, step_result, pending_images)
+            except Exception as e:
+                print(f"[TestRunner] Error taking or analyzing screenshot for step {step_number}: {e}")
+                # Continue execution even if screenshot/analysis fails
+
+            step_result['duration'] = round(time.perf_counter() - started, 3)
+            step_span.set(status=step_result['status'])
+            return step_result
+
+    def _capture_screenshot(self, driver, step_data: dict, step_number: int, step_result: dict, run_context: dict):
+        """
+        Captures the screenshot of an executed step in memory (see ScreenshotCapture).
+
+        Nothing is captured when the screenshot would be neither analyzed nor retained,
+        or when the screenshot policy does not select the step. The policy's decision is
+        stored as the step's 'screenshot_trigger' (None if the capture was avoided), and
+        the path as its 'screenshot' if the file is retained.
+
+        Returns:
+            CapturedScreenshot | None: The screenshot, or None if none was taken.
+        """
+        options = self.screenshot_capture.options(step_data)
+        if not self.screenshot_analyzer and not options['retain']:
+            return None
+        dom_mutations = driver.dom_mutations() if self.screenshot_policy.needs_dom_check else None
+        step_result['screenshot_trigger'] = self.screenshot_policy.trigger(step_data, step_number, step_result['status'], dom_mutations)
+        if step_result['screenshot_trigger'] is None:
+            print(f"[TestRunner] No screenshot for step {step_number}: not selected by the screenshot policy.")
+            return None
+        screenshot_started = time.perf_counter()
+        with tracing.span('screenshot'):
+            screenshot = self.screenshot_capture.capture(driver, run_context.get('screenshot_dir', 'screenshots'), step_number, step_data)
+        step_result['timings']['screenshot'] = round(time.perf_counter() - screenshot_started, 3)
+        if screenshot is None:
+            print(f"[TestRunner] No screenshot taken for step {step_number}.")
+            return None
+        print(f"[TestRunner] Screenshot taken ({screenshot.mime_type}, {len(screenshot.data)} bytes){f': {screenshot.path}' if screenshot.path else ''}")
+        if screenshot.path:
+            step_result['screenshot'] = screenshot.path
+        return screenshot
+
+    def _analyze_step_screenshot(self, screenshot, step_number: int, step_result: dict, pending_images: list | None = None):
+        """
+        Analyzes the in-memory screenshot of a step: inline, in the background, or with
+        the other screenshots of its test case, as configured. Deferred screenshots are
+        kept in `pending_images`, not in the step result, which is recorded and reported.
+        """
+        if self.batch_analysis and pending_images is not None:
+            print(f"[TestRunner] Screenshot analysis for step {step_number} deferred to the end of the test case.")
+            pending_images.append((step_result, screenshot.data))
+        elif self.analysis_pipeline:
+            print(f"[TestRunner] Queuing screenshot analysis for step {step_number}...")
+            self.analysis_pipeline.submit(screenshot.data, on_result=lambda result, error: self._attach_analysis(step_result, result, error))
+        elif self.screenshot_analyzer:
+            print(f"[TestRunner] Analyzing screenshot for step {step_number}...")
+            analysis_result = self.screenshot_analyzer.analyze_screenshot(screenshot.data)
+            self._attach_analysis(step_result, analysis_result, None)
+            print(f"[TestRunner] Screenshot analysis for step {step_number} complete.")
+        else:
+            print("[TestRunner] Screenshot Analyzer not available. Skipping analysis.")
+
+    def _record_step(self, case_entry: dict, step_index: int, step_result: dict, page):
+        """
+        Records an executed step and the URL it led to in the knowledge graph, if one is configured.
+
+        Args:
+            case_entry (dict): Case entry as returned by _collect_cases.
+            step_index (int): 1-based index of the step within its test case.
+            step_result (dict): The step result.
+            page: The page the step was executed on.
+        """
+        if not self.graph_api:
+            return
+        try:
+            page_url = page.url if page else None
+            self.graph_api.record_step(case_entry['suite_name'], case_entry['case_name'], step_index, step_result, page_url,
+                                       plan_name=case_entry.get('plan_name'))
+        except Exception as e:
+            print(f"[TestRunner] Could not record step {step_result['number']} in the knowledge graph: {e}")
+
+    def _analyze_case_screenshots(self, pending_images: list):
+        """
+        Analyzes the screenshots of a finished test case in one batch, so the vision
+        model can serve them concurrently. Runs in the background when the analysis
+        pipeline is enabled.
+
+        Args:
+            pending_images (list): (step_result, image) pairs of the deferred screenshots.
+        """
+        if not pending_images:
+            return
+        steps_with_screenshot = [step for step, _ in pending_images]
+        screenshot_paths = [image for _, image in pending_images]
+        pending_images.clear() # Release the images once they are handed to the analyzer
+        if self.analysis_pipeline:
+            print(f"[TestRunner] Queuing analysis of {len(screenshot_paths)} screenshots of the test case...")
+            self.analysis_pipeline.submit_batch(
+                screenshot_paths,
+                on_results=[lambda result, error, step=step: self._attach_analysis(step, result, error) for step in steps_with_screenshot])
+            return
+        self._analyze_screenshot_batch(steps_with_screenshot, screenshot_paths)
+
+    def _analyze_screenshot_batch(self, steps_with_screenshot: list, screenshot_paths: list):
+        """
+        Analyzes the screenshots of the given steps in one batch and attaches each result to its step.
+
+        Args:
+            steps_with_screenshot (list): The step results.
+            screenshot_paths (list): The screenshot of every step: its path or in-memory image.
+        """
+        print(f"[TestRunner] Analyzing {len(screenshot_paths)} screenshots of the test case...")
+        try:
+            outcomes = self.screenshot_analyzer.analyze_screenshots(screenshot_paths, return_exceptions=True)
+        except Exception as e:
+            outcomes = [e] * len(screenshot_paths)
+        for step_result, outcome in zip(steps_with_screenshot, outcomes):
+            if isinstance(outcome, Exception):
+                self._attach_analysis(step_result, None, outcome)
+            else:
+                self._attach_analysis(step_result, outcome, None)
+
+    def _attach_analysis(self, step_result: dict, analysis_result: dict | None, error: Exception | None):
+        """
+        Stores the outcome of a screenshot analysis on its step result.
+        Called from analysis worker threads when the analysis runs in the background.
+        """
+        if error:
+            step_result['analysis_error'] = str(error)
+            print(f"[TestRunner] Screenshot analysis for step {step_result['number']} failed: {error}")
+            return
+        # TODO: Process analysis_result (e.g., update graph)
+        step_result['analysis'] = analysis_result.get('parsed_content') if analysis_result else None
+        if analysis_result and 'model_seconds' in analysis_result:
+            step_result.setdefault('timings', {})['model'] = analysis_result['model_seconds']
+        print(f"[TestRunner] Screenshot analysis for step {step_result['number']} complete.")
+
+    def _merge_case_results(self, test_plan_content: dict, case_results: list, steps_skipped: int = 0) -> dict:
+        """
+        Merges per-case results into a single report grouped by suite.
+
+        Args:
+            test_plan_content (dict): The content under the 'test_plan' key.
+            case_results (list): Case results in plan order.
+            steps_skipped (int): Steps not executed because a shared prefix ran once for several cases.
+
+        Returns:
+            dict: The report, in the same suites/cases layout as JsonReporter.
+        """
+        report = {
+            'name': test_plan_content.get('name', 'Unnamed Test Plan'),
+            'suites': [],
+            'summary': {'total': 0, 'passed': 0, 'failed': 0, 'error': 0, 'steps_skipped': steps_skipped,
+                        **count_captures(step for case_result in case_results for step in case_result['steps'])},
+        }
+        suites_by_name = {}
+        for case_result in case_results:
+            suite_name = case_result['suite_name']
+            if suite_name not in suites_by_name:
+                suites_by_name[suite_name] = {'name': suite_name, 'cases': []}
+                report['suites'].append(suites_by_name[suite_name])
+            suites_by_name[suite_name]['cases'].append({key: value for key, value in case_result.items() if key != 'suite_name'})
+
+            report['summary']['total'] += 1
+            report['summary'][case_result['status']] = report['summary'].get(case_result['status'], 0) + 1
+        return report
+
+    def _begin_artifacts(self, label: str):
+        """Starts a run in the artifact store; the screenshots of the run are retained in it."""
+        if self.artifact_store:
+            self.screenshot_capture.artifacts = self.artifact_store.begin_run(label)
+            print(f"[TestRunner] Artifacts of run {self.screenshot_capture.artifacts.run_id} go to {self.artifact_store.root}.")
+
+    def _finish_artifacts(self, report: dict | None):
+        """
+        Finishes the run in the artifact store, which packs older runs and applies the
+        retention limits, and stores the run id in the report.
+
+        Args:
+            report (dict | None): The report of the run, or None if it did not execute.
+        """
+        run_artifacts = self.screenshot_capture.artifacts
+        if run_artifacts is None:
+            return
+        self.screenshot_capture.drain() # Every screenshot must be in the manifest before the run is packed
+        self.screenshot_capture.artifacts = None
+        if report is not None:
+            report['run_id'] = run_artifacts.run_id
+        self.artifact_store.finish_run(run_artifacts, report['summary'] if report is not None else None)
+
+    def _print_capture_summary(self, summary: dict):
+        """Prints how many step screenshots were taken and how many the screenshot policy avoided."""
+        if summary['screenshots_avoided']:
+            print(f"[TestRunner] Screenshots: {summary['screenshots_captured']} taken, "
+                  f"{summary['screenshots_avoided']} avoided by the screenshot policy.")
+
+    def close(self):
+        """
+        Closes the browser kept open between plans, stops Playwright and prints the session counters.
+        """
+        # Also stops a Playwright instance left running by a browser launch that failed
+        self.driver.close_browser()
+        stats = self.driver.get_session_stats()
+        print(f"[TestRunner] Browser session: {stats['browser_launches']} launches, {stats['browser_reuses']} reuses, "
+              f"{stats['contexts_created']} contexts, ~{stats['launch_time_saved_seconds']}s launch time saved.")
+
+    def write_report(self, report_path: str) -> bool:
+        """
+        Writes the report of the last executed plan to a JSON file.
+
+        Args:
+            report_path (str): Path of the JSON report file.
+
+        Returns:
+            bool: True if the report was written, False otherwise.
+        """
+        if not self.last_report:
+            print("[TestRunner] Error: No report available. Execute a test plan first.")
+            return False
+        report_dir = os.path.dirname(report_path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(report_path, 'w') as f:
+            json.dump(self.last_report, f, indent=4)
+        print(f"[TestRunner] Report written to {report_path}")
+        return True
 
     # The execute_step method is now integrated into execute_plan
     # Keep it as a placeholder or remove if not needed elsewhere
@@ -0,0 +1,69 @@
+# mmat/test_runner/work_queue.py
+
+import threading
+from collections import deque
+from typing import Any, List, Optional
+
+class WorkStealingQueue:
+    """
+    A set of per-worker deques used to schedule test cases onto a pool of workers.
+
+    Each worker pops work from the front of its own deque. When its deque is empty
+    it steals from the back of the fullest other deque, so slow workers do not
+    leave fast workers idle while work is still pending.
+    """
+    def __init__(self, num_workers: int):
+        """
+        Initializes the WorkStealingQueue.
+
+        Args:
+            num_workers (int): Number of workers (and therefore deques) in the pool.
+        """
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+        self.num_workers = num_workers
+        self._deques: List[deque] = [deque() for _ in range(num_workers)]
+        self._lock = threading.Lock()
+        self._next_worker = 0
+        self.steals = 0 # Number of items taken from another worker's deque
+
+    def put(self, item: Any, worker_id: Optional[int] = None):
+        """
+        Adds an item to the queue.
+
+        Args:
+            item: The work item to schedule.
+            worker_id (int, optional): The worker whose deque receives the item.
+                                       Defaults to round-robin assignment.
+        """
+        with self._lock:
+            if worker_id is None:
+                worker_id = self._next_worker
+                self._next_worker = (self._next_worker + 1) % self.num_workers
+            self._deques[worker_id].append(item)
+
+    def get(self, worker_id: int) -> Any:
+        """
+        Takes the next item for a worker, stealing from another worker if needed.
+
+        Args:
+            worker_id (int): The worker requesting work.
+
+        Returns:
+            The next work item, or None if all deques are empty.
+        """
+        with self._lock:
+            own = self._deques[worker_id]
+            if own:
+                return own.popleft()
+
+            # Steal from the back of the fullest deque
+            victim = max(self._deques, key=len)
+            if victim:
+                self.steals += 1
+                return victim.pop()
+            return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(d) for d in self._deques)
@@ -30,6 +30,26 @@ class AssertUrlStep(TestStep):
             print(f"[AssertUrlStep] Execution failed: {e}")
             return False
 
+    async def execute_async(self):
+        """
+        Executes the URL assertion step on an asynchronous driver.
+        """
+        if not self.expected_url:
+            print("[AssertUrlStep] Execution failed: 'expected' URL not provided.")
+            return False
+        print(f"[AssertUrlStep] Executing: {self.description}")
+        try:
+            current_url = self.driver.get_current_url()
+            if self.expected_url in current_url:
+                print(f"[AssertUrlStep] Assertion successful: Current URL '{current_url}' contains expected '{self.expected_url}'.")
+                return True
+            else:
+                print(f"[AssertUrlStep] Assertion failed: Current URL '{current_url}' does not contain expected '{self.expected_url}'.")
+                return False
+        except Exception as e:
+            print(f"[AssertUrlStep] Execution failed: {e}")
+            return False
+
 class AssertElementVisibleStep(TestStep):
     """
     Test step to assert an element is visible on the page.
@@ -59,3 +79,23 @@ class AssertElementVisibleStep(TestStep):
         except Exception as e:
             print(f"[AssertElementVisibleStep] Execution failed: {e}")
             return False
+
+    async def execute_async(self):
+        """
+        Executes the element visibility assertion step on an asynchronous driver.
+        """
+        if not self.selector:
+            print("[AssertElementVisibleStep] Execution failed: 'selector' not provided.")
+            return False
+        print(f"[AssertElementVisibleStep] Executing: {self.description}")
+        try:
+            is_visible = await self.driver.is_element_visible(self.selector)
+            if is_visible:
+                print(f"[AssertElementVisibleStep] Assertion successful: Element with selector '{self.selector}' is visible.")
+                return True
+            else:
+                print(f"[AssertElementVisibleStep] Assertion failed: Element with selector '{self.selector}' is not visible.")
+                return False
+        except Exception as e:
+            print(f"[AssertElementVisibleStep] Execution failed: {e}")
+            return False
@@ -28,6 +28,16 @@ class TestStep(ABC):
         """
         pass
 
+    async def execute_async(self):
+        """
+        Executes the test step on an asynchronous driver (e.g., AsyncPlaywrightDriver).
+        Subclasses that support the async execution engine override this method.
+
+        Returns:
+            bool: True if the step executed successfully, False otherwise.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support asynchronous execution.")
+
     def __str__(self):
         return f"Step Type: {self.step_type}, Description: {self.description}"
 
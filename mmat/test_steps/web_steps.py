@@ -25,6 +25,21 @@ class NavigateStep(TestStep):
             print(f"[NavigateStep] Execution failed: {e}")
             return False
 
+    async def execute_async(self):
+        """
+        Executes the navigation step on an asynchronous driver.
+        """
+        if not self.url:
+            print("[NavigateStep] Execution failed: 'url' not provided.")
+            return False
+        print(f"[NavigateStep] Executing: {self.description}")
+        try:
+            await self.driver.navigate(self.url)
+            return True
+        except Exception as e:
+            print(f"[NavigateStep] Execution failed: {e}")
+            return False
+
 class ClickStep(TestStep):
     """
     Test step to click an element using a CSS selector.
@@ -50,6 +65,21 @@ class ClickStep(TestStep):
             print(f"[ClickStep] Execution failed: {e}")
             return False
 
+    async def execute_async(self):
+        """
+        Executes the click step on an asynchronous driver.
+        """
+        if not self.selector:
+            print("[ClickStep] Execution failed: 'selector' not provided.")
+            return False
+        print(f"[ClickStep] Executing: {self.description}")
+        try:
+            await self.driver.click(self.selector)
+            return True
+        except Exception as e:
+            print(f"[ClickStep] Execution failed: {e}")
+            return False
+
 class FillStep(TestStep):
     """
     Test step to fill an input field using a CSS selector and a value.
@@ -77,4 +107,19 @@ class FillStep(TestStep):
             print(f"[FillStep] Execution failed: {e}")
             return False
 
+    async def execute_async(self):
+        """
+        Executes the fill step on an asynchronous driver.
+        """
+        if not self.selector or self.value is None:
+            print("[FillStep] Execution failed: 'selector' or 'value' not provided.")
+            return False
+        print(f"[FillStep] Executing: {self.description}")
+        try:
+            await self.driver.fill(self.selector, self.value)
+            return True
+        except Exception as e:
+            print(f"[FillStep] Execution failed: {e}")
+            return False
+
 # Add other web-specific test steps here (e.g., ScreenshotStep, SelectStep, HoverStep, etc.)
@@ -0,0 +1,98 @@
+# MMAT Analysis Pipeline Tests
+# Tests for background screenshot analysis.
+
+import threading
+import time
+import unittest
+from mmat.analysis.analysis_pipeline import AnalysisPipeline
+
+# Mock ScreenshotAnalyzer for testing
+class MockScreenshotAnalyzer:
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def analyze_screenshot(self, screenshot_path):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append(screenshot_path)
+        if screenshot_path == self.fail_on:
+            raise RuntimeError("model unavailable")
+        return {"parsed_content": f"analysis of {screenshot_path}"}
+
+    def analyze_screenshots(self, screenshot_paths, return_exceptions=False):
+        results = []
+        for screenshot_path in screenshot_paths:
+            try:
+                results.append(self.analyze_screenshot(screenshot_path))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class TestAnalysisPipeline(unittest.TestCase):
+
+    def test_results_attached_to_their_steps(self):
+        """Test that each result is delivered to the callback of its own screenshot."""
+        pipeline = AnalysisPipeline(MockScreenshotAnalyzer(delay=0.01), max_workers=3)
+        steps = [{"number": i} for i in range(6)]
+        for step in steps:
+            pipeline.submit(f"step_{step['number']}.png",
+                            on_result=lambda result, error, step=step: step.update(analysis=result["parsed_content"]))
+        self.assertTrue(pipeline.drain())
+        pipeline.shutdown()
+
+        for step in steps:
+            self.assertEqual(step["analysis"], f"analysis of step_{step['number']}.png")
+        self.assertEqual(pipeline.stats["completed"], 6)
+        self.assertEqual(pipeline.pending(), 0)
+
+    def test_failures_reported_through_callback(self):
+        """Test that analysis errors are passed to the callback and counted."""
+        pipeline = AnalysisPipeline(MockScreenshotAnalyzer(fail_on="bad.png"))
+        outcomes = {}
+        for path in ("good.png", "bad.png"):
+            pipeline.submit(path, on_result=lambda result, error, path=path: outcomes.update({path: (result, error)}))
+        pipeline.drain()
+        pipeline.shutdown()
+
+        self.assertIsNone(outcomes["good.png"][1])
+        self.assertIsNone(outcomes["bad.png"][0])
+        self.assertIsInstance(outcomes["bad.png"][1], RuntimeError)
+        self.assertEqual(pipeline.stats["failed"], 1)
+
+    def test_backpressure_when_queue_full(self):
+        """Test that submit waits once max_pending analyses are outstanding."""
+        pipeline = AnalysisPipeline(MockScreenshotAnalyzer(delay=0.05), max_workers=1, max_pending=1)
+        for i in range(3):
+            pipeline.submit(f"step_{i}.png")
+            self.assertLessEqual(pipeline.pending(), 1)
+        pipeline.drain()
+        pipeline.shutdown()
+
+        self.assertEqual(pipeline.stats["backpressure_waits"], 2)
+        self.assertEqual(pipeline.stats["completed"], 3)
+
+    def test_batch_results_delivered_per_screenshot(self):
+        """Test that a batch takes one slot and reports every screenshot to its own callback."""
+        pipeline = AnalysisPipeline(MockScreenshotAnalyzer(fail_on="step_1.png"), max_workers=1, max_pending=1)
+        steps = [{"number": i} for i in range(3)]
+        future = pipeline.submit_batch(
+            [f"step_{step['number']}.png" for step in steps],
+            on_results=[lambda result, error, step=step: step.update(result=result, error=error) for step in steps])
+        self.assertTrue(pipeline.drain())
+        pipeline.shutdown()
+
+        self.assertEqual(future.result()[0], {"parsed_content": "analysis of step_0.png"})
+        self.assertIsNone(future.result()[1])
+        self.assertIsInstance(steps[1]["error"], RuntimeError)
+        self.assertEqual(steps[2]["result"]["parsed_content"], "analysis of step_2.png")
+        self.assertEqual(pipeline.stats["submitted"], 3)
+        self.assertEqual(pipeline.stats["completed"], 2)
+        self.assertEqual(pipeline.stats["failed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# MMAT Artifact Store Tests
+# Tests for run-scoped, content-addressed artifacts with packing and retention.
+
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import unittest
+
+from mmat.test_runner.artifact_store import ArtifactStore
+
+class TestArtifactStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def make_store(self, **settings):
+        store = ArtifactStore(self.root, **settings)
+        store.gc_grace_seconds = 0
+        return store
+
+    def run_with(self, store, *images, run_id=None):
+        run = store.begin_run("Plan", run_id=run_id)
+        paths = [run.put(f"screenshots/step_{number}.png", data, "png") for number, data in enumerate(images, start=1)]
+        store.finish_run(run, {"total": 1})
+        return run, paths
+
+    def test_runs_get_own_directories_and_share_objects(self):
+        """Test that runs have separate manifests while identical content is stored once."""
+        store = self.make_store()
+        run_1, paths_1 = self.run_with(store, b"login", b"login", run_id="20260101-000000-aaaaaa")
+        run_2, paths_2 = self.run_with(store, b"login", b"cart", run_id="20260101-000001-bbbbbb")
+
+        self.assertEqual(paths_1[0], paths_1[1])
+        self.assertEqual(paths_1[0], paths_2[0])
+        self.assertEqual(run_1.stats["objects_written"], 1)
+        self.assertEqual(run_1.stats["duplicates"], 1)
+        with open(paths_2[1], "rb") as f:
+            self.assertEqual(f.read(), b"cart")
+        self.assertEqual([run["run_id"] for run in store.runs()], [run_1.run_id, run_2.run_id])
+        with open(os.path.join(run_2.directory, "run.json")) as f:
+            info = json.load(f)
+        self.assertEqual((info["status"], info["label"], info["summary"]), ("finished", "Plan", {"total": 1}))
+
+    def test_max_runs_removes_oldest_and_its_objects(self):
+        """Test count retention: the oldest run and the objects only it used are removed."""
+        store = self.make_store(max_runs=2)
+        _, old_paths = self.run_with(store, b"old", b"shared", run_id="20260101-000000-aaaaaa")
+        _, shared_paths = self.run_with(store, b"shared", run_id="20260101-000001-bbbbbb")
+        self.run_with(store, b"new", run_id="20260101-000002-cccccc")
+
+        self.assertEqual([run["run_id"] for run in store.runs()], ["20260101-000001-bbbbbb", "20260101-000002-cccccc"])
+        self.assertFalse(os.path.exists(old_paths[0]))
+        self.assertTrue(os.path.exists(shared_paths[0]))
+
+    def test_max_age_and_bytes(self):
+        """Test age and size retention, which never remove the run that just finished."""
+        store = self.make_store(max_age_days=1)
+        run = store.begin_run(run_id="20200101-000000-aaaaaa")
+        run.put("screenshots/step_1.png", b"stale", "png")
+        info = {"run_id": run.run_id, "started": time.time() - 3 * 86400, "status": "running"}
+        store._write_run_info(run.directory, info)
+        self.run_with(store, b"fresh", run_id="20260101-000000-bbbbbb")
+        self.assertEqual([run["run_id"] for run in store.runs()], ["20260101-000000-bbbbbb"])
+
+        store = self.make_store(max_bytes=10)
+        self.run_with(store, b"0123456789", run_id="20260101-000001-cccccc")
+        self.assertEqual([run["run_id"] for run in store.runs()], ["20260101-000001-cccccc"])
+
+    def test_pack_finished_runs(self):
+        """Test that runs beyond keep_unpacked are packed with their artifacts under their names."""
+        store = self.make_store(pack="gz", keep_unpacked=1)
+        run_1, paths_1 = self.run_with(store, b"first", b"first", run_id="20260101-000000-aaaaaa")
+        self.run_with(store, b"second", run_id="20260101-000001-bbbbbb")
+
+        runs = store.runs()
+        self.assertEqual([(run["run_id"], run["packed"]) for run in runs],
+                         [("20260101-000000-aaaaaa", True), ("20260101-000001-bbbbbb", False)])
+        self.assertFalse(os.path.exists(run_1.directory))
+        self.assertFalse(os.path.exists(paths_1[0])) # Only the packed run used it
+        with tarfile.open(runs[0]["path"]) as archive:
+            self.assertEqual(archive.extractfile("screenshots/step_1.png").read(), b"first")
+            self.assertEqual(archive.extractfile("screenshots/step_2.png").read(), b"first")
+            self.assertIn("manifest.jsonl", archive.getnames())
+
+    def test_unknown_pack_format_is_ignored(self):
+        """Test that an unknown pack format leaves runs unpacked."""
+        self.assertIsNone(self.make_store(pack="rar").pack)
+
+if __name__ == '__main__':
+    unittest.main()
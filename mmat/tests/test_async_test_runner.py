@@ -0,0 +1,128 @@
+# MMAT Async Test Runner Tests
+# Tests for the case results the AsyncTestRunner reports, on a mocked async browser.
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+
+# The runner imports the Playwright drivers; mock their modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    import playwright.async_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+        "playwright.async_api": types.SimpleNamespace(async_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.test_runner import async_test_runner
+
+# Mock async browser driver: every session gets its own page; '/broken' pages fail to load
+class MockAsyncDriver:
+    def __init__(self, config=None):
+        self.config = config
+        self.browser = None
+        self.page = None
+        self.url = ""
+
+    async def launch_browser(self, browser_type="chromium", headless=True):
+        self.browser = True
+
+    async def new_session(self):
+        session = MockAsyncDriver(self.config)
+        session.page = object()
+        return session
+
+    async def navigate(self, url):
+        if "/broken" in url:
+            raise RuntimeError("net::ERR_CONNECTION_REFUSED")
+        self.url = url
+
+    def get_current_url(self):
+        return self.url
+
+    async def close_browser(self):
+        self.page = None
+
+# Mock reporter: records the arguments of every end_case call
+class MockReporter:
+    def __init__(self):
+        self.ended = []
+
+    async def start_suite(self, suite_name):
+        pass
+
+    async def end_suite(self, suite_name):
+        pass
+
+    async def start_case(self, suite_name, case_name):
+        pass
+
+    async def end_case(self, suite_name, case_name, status, details):
+        self.ended.append((case_name, status, details))
+
+    async def publish_results(self):
+        pass
+
+# Mock screenshot analyzer: never called, screenshots are not taken in these tests
+class MockScreenshotAnalyzer:
+    def analyze_screenshot(self, screenshot_path):
+        return {}
+
+
+class TestAsyncTestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def runner(self, reporters=None, screenshot_analyzer=None):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": "http://shop"}}},
+            "execution": {"run_state": os.path.join(self.directory, "run_state.json"),
+                          "history": os.path.join(self.directory, "history.db")},
+            "screenshots": {"policy": {"mode": "triggers", "actions": [], "on_failure": False}},
+            "artifacts": {"enabled": False},
+        }
+        return async_test_runner.AsyncTestRunner(MockAsyncDriver(), config_manager, screenshot_analyzer, reporters=reporters)
+
+    def test_end_case_gets_the_case_result(self):
+        """Test that reporters receive the same case result for passed and failed cases."""
+        reporter = MockReporter()
+        runner = self.runner(reporters=[reporter])
+        plan = {"test_plan": {"name": "Shop", "test_suites": [{"name": "Checkout", "test_cases": [
+            {"name": "ok", "steps": [{"action": "navigate", "target": "/cart"}]},
+            {"name": "broken", "steps": [{"action": "navigate", "target": "/broken"}]},
+        ]}]}}
+        self.assertTrue(asyncio.run(runner.execute_plan(plan)))
+
+        ended = {name: (status, details) for name, status, details in reporter.ended}
+        self.assertEqual(ended["ok"][0], "passed")
+        self.assertEqual(ended["broken"][0], "failed")
+        for name, (status, details) in ended.items():
+            self.assertEqual(details["suite_name"], "Checkout")
+            self.assertEqual(details["name"], name)
+            self.assertEqual(details["status"], status)
+            self.assertEqual(len(details["steps"]), 1)
+            self.assertIn("duration", details)
+
+    def test_no_analysis_pipeline(self):
+        """Test that the async runner does not start the thread-pool analysis pipeline."""
+        runner = self.runner(screenshot_analyzer=MockScreenshotAnalyzer())
+        self.assertIsNone(runner.analysis_pipeline)
+
+
+if __name__ == '__main__':
+    unittest.main()
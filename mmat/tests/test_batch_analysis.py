@@ -0,0 +1,154 @@
+# MMAT Batch Analysis Tests
+# Tests for the per-case screenshot batches of the test runners ('analysis.batch_per_case').
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+from mmat.graph.graph_api import GraphAPI
+
+# The runners import the Playwright drivers; mock their modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    import playwright.async_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+        "playwright.async_api": types.SimpleNamespace(async_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.test_runner import async_test_runner, test_runner
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+# Mock page: the graph records the URL after every step
+class MockPage:
+    def __init__(self):
+        self.url = ""
+
+# Mock browser driver: navigates and returns the same screenshot for every step
+class MockDriver:
+    def __init__(self, config=None):
+        self.config = config
+        self.browser = None
+        self.page = None
+
+    def launch_browser(self, browser_type="chromium", headless=True):
+        self.browser = True
+        self.new_context()
+
+    def new_context(self, storage_state=None):
+        self.page = MockPage()
+
+    def navigate(self, url):
+        self.page.url = url
+
+    def get_current_url(self):
+        return self.page.url
+
+    def capture_screenshot(self, **options):
+        return PNG_BYTES
+
+    def close_context(self):
+        self.page = None
+
+    def close_browser(self):
+        self.browser = None
+        self.page = None
+
+class MockAsyncDriver(MockDriver):
+    async def launch_browser(self, browser_type="chromium", headless=True):
+        self.browser = True
+
+    async def new_session(self):
+        session = MockAsyncDriver(self.config)
+        session.new_context()
+        return session
+
+    async def navigate(self, url):
+        self.page.url = url
+
+    async def capture_screenshot(self, **options):
+        return PNG_BYTES
+
+    async def close_browser(self):
+        self.page = None
+
+# Mock screenshot analyzer: records the size of every batch
+class MockScreenshotAnalyzer:
+    def __init__(self):
+        self.batches = []
+
+    def analyze_screenshot(self, screenshot_path):
+        return {"parsed_content": {"description": "page"}}
+
+    def analyze_screenshots(self, screenshot_paths, return_exceptions=False):
+        self.batches.append(len(screenshot_paths))
+        return [{"parsed_content": {"description": "page"}} for _ in screenshot_paths]
+
+def two_step_plan():
+    steps = [{"action": "navigate", "target": "/"}, {"action": "navigate", "target": "/cart"}]
+    return {"test_plan": {"name": "Shop", "test_suites": [{"name": "Checkout", "test_cases": [{"name": "Cart", "steps": steps}]}]}}
+
+
+class TestBatchAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def config_manager(self):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": "http://shop"}}},
+            "execution": {"run_state": os.path.join(self.directory, "run_state.json"),
+                          "history": os.path.join(self.directory, "history.db")},
+            "analysis": {"background": False, "batch_per_case": True},
+            "screenshots": {"retain": False},
+            "artifacts": {"enabled": False},
+        }
+        return config_manager
+
+    def assert_no_images(self, graph_api, report):
+        action_nodes = graph_api.get_nodes_by_type("action")
+        self.assertEqual(len(action_nodes), 2)
+        for node in action_nodes:
+            self.assertFalse(any(isinstance(value, bytes) for value in node.data.values()), node.data)
+            self.assertFalse(any(key.startswith("_") for key in node.data), node.data)
+        for step in report["suites"][0]["cases"][0]["steps"]:
+            self.assertEqual(step["analysis"], {"description": "page"})
+            self.assertFalse(any(isinstance(value, bytes) for value in step.values()), step)
+
+    def test_graph_nodes_carry_no_images(self):
+        """Test that batched screenshots are analyzed together and never recorded in the graph."""
+        analyzer = MockScreenshotAnalyzer()
+        graph_api = GraphAPI()
+        runner = test_runner.TestRunner(MockDriver(), self.config_manager(), analyzer, driver_factory=MockDriver, graph_api=graph_api)
+        self.assertTrue(runner.execute_plan(two_step_plan()))
+
+        self.assertEqual(analyzer.batches, [2])
+        self.assert_no_images(graph_api, runner.last_report)
+
+    def test_async_graph_nodes_carry_no_images(self):
+        """Test that the async runner also keeps batched screenshots out of the graph."""
+        analyzer = MockScreenshotAnalyzer()
+        graph_api = GraphAPI()
+        runner = async_test_runner.AsyncTestRunner(MockAsyncDriver(), self.config_manager(), analyzer, graph_api=graph_api)
+        self.assertTrue(asyncio.run(runner.execute_plan(two_step_plan())))
+
+        self.assertEqual(analyzer.batches, [2])
+        self.assert_no_images(graph_api, runner.last_report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+# MMAT DAG Execution Tests
+# Tests for running test plans with the 'dag' scheduler against flat execution, on a mocked browser.
+
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+
+# The runner imports the Playwright driver; mock its modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.test_runner import test_runner
+
+BASE_URL = "http://shop"
+
+# Mock page: the runner reads the URL after every step
+class MockPage:
+    def __init__(self):
+        self.url = "about:blank"
+
+# Mock browser driver for a small shop. Logging in sets a session cookie, which is part
+# of the storage state; typed values live on the page only and are lost on navigation.
+# Every driver call is logged so tests can see which steps were executed or replayed.
+class MockDriver:
+    log = []
+    lock = threading.Lock()
+
+    def __init__(self, config=None):
+        self.config = config
+        self.browser = None
+        self.page = None
+        self.cookies = {}
+        self.fields = {}
+
+    def record(self, *entry):
+        with MockDriver.lock:
+            MockDriver.log.append(entry)
+
+    def launch_browser(self, browser_type="chromium", headless=True):
+        self.browser = True
+        self.new_context()
+
+    def new_context(self, storage_state=None):
+        self.page = MockPage()
+        self.cookies = dict(storage_state["cookies"]) if storage_state else {}
+        self.fields = {}
+
+    def get_storage_state(self):
+        return {"cookies": dict(self.cookies)}
+
+    def get_current_url(self):
+        return self.page.url
+
+    def navigate(self, url):
+        self.record("navigate", url)
+        if "/broken" in url:
+            raise RuntimeError("net::ERR_CONNECTION_REFUSED")
+        self.page.url = url
+        self.fields = {}
+
+    def fill(self, selector, value):
+        self.record("fill", selector)
+        self.fields[selector] = value
+
+    def click(self, selector):
+        self.record("click", selector)
+        if selector == "#submit":
+            if not (self.fields.get("#user") and self.fields.get("#password")):
+                raise RuntimeError("Login form is incomplete")
+            self.cookies["session"] = self.fields["#user"]
+            self.navigate(f"{BASE_URL}/account")
+        elif selector == "#clear":
+            self.fields = {}
+        elif selector == "#settings":
+            if "session" not in self.cookies:
+                raise RuntimeError("Not logged in")
+            self.navigate(f"{BASE_URL}/settings")
+        elif selector == "#save":
+            if "session" not in self.cookies or not self.fields.get("#name"):
+                raise RuntimeError("Cannot save settings")
+            self.navigate(f"{BASE_URL}/saved")
+        elif selector == "#cancel":
+            self.navigate(f"{BASE_URL}/account")
+        else:
+            raise RuntimeError(f"No element matches {selector}")
+
+    def close_context(self):
+        self.page = None
+
+    def close_browser(self):
+        self.browser = None
+        self.page = None
+
+def login(first_target="/login"):
+    return [
+        {"action": "navigate", "target": first_target},
+        {"action": "fill", "selector": "#user", "value": "alice"},
+        {"action": "fill", "selector": "#password", "value": "secret"},
+    ]
+
+def settings_plan(first_target="/login"):
+    prefix = login(first_target) + [
+        {"action": "click", "selector": "#submit"},
+        {"action": "click", "selector": "#settings"},
+        {"action": "fill", "selector": "#name", "value": "Alice"},
+    ]
+    return {"test_plan": {"name": "Shop", "test_suites": [
+        {"name": "Settings", "test_cases": [
+            {"name": "Cancel", "steps": prefix + [{"action": "click", "selector": "#cancel"},
+                                                  {"action": "assert_url", "expected": "/account"}]},
+            {"name": "Save", "steps": prefix + [{"action": "click", "selector": "#save"},
+                                                {"action": "assert_url", "expected": "/saved"}]},
+        ]},
+        {"name": "Help", "test_cases": [{"name": "Open", "steps": [{"action": "navigate", "target": "/help"}]}]},
+    ]}}
+
+def login_form_plan():
+    return {"test_plan": {"name": "Login", "test_suites": [{"name": "Form", "test_cases": [
+        {"name": "Clear", "steps": login() + [{"action": "click", "selector": "#clear"},
+                                              {"action": "assert_url", "expected": "/login"}]},
+        {"name": "Submit", "steps": login() + [{"action": "click", "selector": "#submit"},
+                                               {"action": "assert_url", "expected": "/account"}]},
+    ]}]}}
+
+def outcomes(report):
+    """Returns what a report says about every case and step, without timings."""
+    return [(suite["name"], case["name"], case["status"], [(step["number"], step["action"], step["status"]) for step in case["steps"]])
+            for suite in report["suites"] for case in suite["cases"]]
+
+
+class TestDagExecution(unittest.TestCase):
+
+    def setUp(self):
+        MockDriver.log = []
+
+    def run_plan(self, plan, scheduler, workers=1):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": BASE_URL}}},
+            "execution": {"run_state": None, "history": None},
+            "screenshots": {"policy": {"mode": "triggers", "actions": [], "on_failure": False}},
+            "artifacts": {"enabled": False},
+        }
+        runner = test_runner.TestRunner(MockDriver(), config_manager, driver_factory=MockDriver)
+        self.assertTrue(runner.execute_plan(plan, workers=workers, scheduler=scheduler))
+        return runner
+
+    def test_dag_results_match_flat_execution(self):
+        """Test that DAG execution reports the same cases, steps and statuses, in plan order, as flat execution."""
+        flat = self.run_plan(settings_plan(), "cases")
+        self.assertEqual([case[2] for case in outcomes(flat.last_report)], ["passed", "passed", "passed"])
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                dag = self.run_plan(settings_plan(), "dag", workers)
+                self.assertEqual(outcomes(dag.last_report), outcomes(flat.last_report))
+
+    def test_snapshot_restores_storage_and_replays_trailing_fills(self):
+        """Test that a branch resumes from the session cookie and URL of the snapshot and retypes the lost field."""
+        runner = self.run_plan(settings_plan(), "dag")
+
+        stats = runner.last_dag_stats
+        self.assertEqual(stats["snapshot_restores"], 1)
+        self.assertEqual(stats["steps_replayed"], 1)
+        self.assertEqual(stats["steps_executed"], 11)
+        self.assertEqual(stats["steps_skipped"], 5) # The 6 shared steps of 'Save', less the replayed fill
+        self.assertEqual(runner.last_report["summary"]["steps_skipped"], 5)
+        self.assertEqual(MockDriver.log.count(("navigate", f"{BASE_URL}/login")), 1)
+        self.assertEqual(MockDriver.log.count(("navigate", f"{BASE_URL}/settings")), 2) # Once by #settings, once to restore
+        self.assertEqual(MockDriver.log.count(("fill", "#name")), 2)
+
+        save = runner.last_report["suites"][0]["cases"][1]
+        self.assertEqual([step.get("shared_from") for step in save["steps"]], [1, 2, 3, 4, 5, 6, None, None])
+        self.assertEqual([step["number"] for step in save["steps"]], list(range(9, 17)))
+
+    def test_unprofitable_snapshot_replays_prefix(self):
+        """Test that a prefix too short to be worth a snapshot is replayed from a fresh context."""
+        flat = self.run_plan(login_form_plan(), "cases")
+        runner = self.run_plan(login_form_plan(), "dag")
+
+        self.assertEqual(outcomes(runner.last_report), outcomes(flat.last_report))
+        self.assertEqual([case[2] for case in outcomes(runner.last_report)], ["passed", "passed"])
+        stats = runner.last_dag_stats
+        self.assertEqual((stats["snapshot_restores"], stats["steps_replayed"], stats["steps_skipped"]), (0, 3, 0))
+
+    def test_failure_in_shared_prefix_fails_dependent_cases(self):
+        """Test that a step failing in a shared prefix fails every case that shares it, as in flat execution."""
+        flat = self.run_plan(settings_plan("/broken"), "cases")
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                dag = self.run_plan(settings_plan("/broken"), "dag", workers)
+
+                self.assertEqual([case[2] for case in outcomes(dag.last_report)], ["failed", "failed", "passed"])
+                self.assertEqual(outcomes(dag.last_report), outcomes(flat.last_report))
+                save = dag.last_report["suites"][0]["cases"][1]
+                self.assertEqual(save["steps"][0]["status"], "failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
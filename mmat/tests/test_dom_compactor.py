@@ -0,0 +1,68 @@
+# MMAT DOM Compactor Tests
+# Tests for compacting a page's DOM into a token-budgeted outline for model prompts.
+
+import unittest
+from mmat.analysis.dom_compactor import DomCompactor, estimate_tokens, keywords, parse_html
+from mmat.driver.dom_snapshot import DomSnapshot
+
+def shop_page(products=40):
+    items = "".join(f'<li><a href="/p/{i}">Product {i}</a> <span>${i}.99</span></li>' for i in range(products))
+    return f"""<html><head><title>Shop</title><style>.price {{ color: red }}</style></head><body>
+        <script>window.secret = "token";</script>
+        <nav role="navigation"><a href="/">Home</a><a href="/help">Help</a></nav>
+        <ul>{items}<li><a href="/p/blue">Blue Widget</a> <span>$5</span></li></ul>
+        <div style="display: none"><button>Hidden offer</button></div>
+        <form><input id="query" type="search" placeholder="Search"><input type="hidden" name="csrf" value="x">
+        <button id="add-to-cart" type="submit">Add to cart</button></form>
+    </body></html>"""
+
+class TestDomCompactor(unittest.TestCase):
+
+    def test_parse_strips_scripts_styles_and_hidden_elements(self):
+        """Test that HTML parsing keeps interactive and text elements only."""
+        outline = parse_html(shop_page(products=2)).render()
+        self.assertIn('button#add-to-cart type="submit" "Add to cart"', outline)
+        self.assertIn('a href="/help" "Help"', outline)
+        for text in ("secret", "color", "Hidden offer", "csrf", "Shop"):
+            self.assertNotIn(text, outline)
+
+    def test_repeated_items_collapsed(self):
+        """Test that alike list items are replaced by a template and a count."""
+        compacted = DomCompactor().compact(shop_page())
+        self.assertIn('"Product 0"', compacted.text)
+        self.assertNotIn('"Product 1"', compacted.text)
+        self.assertIn("(+40 more like the above)", compacted.text)
+        self.assertEqual(compacted.repeats_collapsed, 80)
+        self.assertLess(compacted.elements_kept, compacted.elements)
+
+    def test_items_matching_description_survive_collapsing(self):
+        """Test that a repeated item matching the description is kept next to the template."""
+        compacted = DomCompactor().compact(shop_page(), "Open the Blue Widget")
+        self.assertIn('a href="/p/blue" "Blue Widget"', compacted.text)
+        self.assertIn("(+39 more like the above)", compacted.text)
+
+    def test_budget_keeps_relevant_elements(self):
+        """Test that a small budget keeps the elements matching the description with their ancestors."""
+        compacted = DomCompactor(token_budget=40).compact(shop_page(), "Click the addToCart button")
+        self.assertLessEqual(compacted.tokens, 40)
+        self.assertIn('button#add-to-cart', compacted.text)
+        self.assertTrue(compacted.text.startswith("body\n"))
+        self.assertRegex(compacted.text, r"\(\d+ more elements omitted\)$")
+
+    def test_snapshots_and_outlines(self):
+        """Test that snapshots and rendered outlines are compacted alike."""
+        snapshot = DomSnapshot.from_dict({"tag": "body", "children": [
+            {"tag": "a", "attributes": {"href": f"/{i}"}, "text": f"Item {i}"} for i in range(5)]})
+        expected = 'body\n  a href="/0" "Item 0"\n  (+4 more like the above)'
+        self.assertEqual(DomCompactor().compact(snapshot).text, expected)
+        self.assertEqual(DomCompactor().compact(snapshot.render()).text, expected)
+
+    def test_estimate_and_keywords(self):
+        """Test the local token estimate and the description keywords."""
+        self.assertEqual(estimate_tokens("Sign in, please"), 5)
+        self.assertEqual(estimate_tokens("internationalization 12345"), 6)
+        self.assertEqual(keywords("Click the addToCart button"), ["add", "button", "cart", "click"])
+
+
+if __name__ == '__main__':
+    unittest.main()
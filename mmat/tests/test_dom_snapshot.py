@@ -0,0 +1,57 @@
+# MMAT DOM Snapshot Tests
+# Tests for structural hashing and diffing of compact DOM snapshots.
+
+import unittest
+from mmat.driver.dom_snapshot import DomSnapshot
+
+def login_page(message=None, extra_item=False):
+    items = [{"tag": "a", "attributes": {"href": "/home"}, "text": "Home"},
+             {"tag": "a", "attributes": {"href": "/help"}, "text": "Help"}]
+    if extra_item:
+        items.append({"tag": "a", "attributes": {"id": "cart", "href": "/cart"}, "text": "Cart"})
+    form = [{"tag": "input", "attributes": {"id": "user", "type": "text", "placeholder": "User"}},
+            {"tag": "button", "attributes": {"id": "submit"}, "text": "Sign in"}]
+    if message:
+        form.append({"tag": "p", "role": "alert", "text": message})
+    return {"tag": "body", "children": [
+        {"tag": "nav", "role": "navigation", "children": items},
+        {"tag": "form", "role": "form", "attributes": {"id": "login"}, "children": form},
+    ]}
+
+class TestDomSnapshot(unittest.TestCase):
+
+    def test_structural_hash(self):
+        """Test that identical trees hash alike and any content change changes the hash."""
+        self.assertEqual(DomSnapshot.from_dict(login_page()).hash, DomSnapshot.from_dict(login_page()).hash)
+        self.assertNotEqual(DomSnapshot.from_dict(login_page()).hash, DomSnapshot.from_dict(login_page("Wrong password")).hash)
+
+    def test_diff_reports_only_changed_subtrees(self):
+        """Test that unchanged subtrees are skipped and only added nodes are reported."""
+        before = DomSnapshot.from_dict(login_page())
+        after = DomSnapshot.from_dict(login_page("Wrong password"))
+        diff = after.diff(before)
+        self.assertEqual([node.text for node in diff.added], ["Wrong password"])
+        self.assertEqual((diff.removed, diff.changed), ([], []))
+        self.assertEqual(diff.size(), 1)
+        self.assertIn('p [role=alert] "Wrong password"', diff.render())
+
+    def test_diff_removed_and_changed(self):
+        """Test that removed subtrees and nodes whose own content changed are reported."""
+        before = DomSnapshot.from_dict(login_page("Wrong password", extra_item=True))
+        changed = login_page()
+        changed["children"][1]["children"][1]["text"] = "Signing in..."
+        diff = DomSnapshot.from_dict(changed).diff(before)
+        self.assertEqual([node.attributes.get("id") for node in diff.removed], ["cart", None])
+        self.assertEqual([node.text for node in diff.changed], ["Signing in..."])
+        self.assertTrue(DomSnapshot.from_dict(changed).diff(DomSnapshot.from_dict(changed)).is_empty())
+
+    def test_render(self):
+        """Test the compact line format of a snapshot."""
+        lines = DomSnapshot.from_dict(login_page()).render().splitlines()
+        self.assertEqual(lines[0], "body")
+        self.assertIn('  form#login [role=form]', lines)
+        self.assertIn('    input#user type="text" placeholder="User"', lines)
+        self.assertIn('    button#submit "Sign in"', lines)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# MMAT Duration History Tests
+# Tests for the SQLite history of case and step durations.
+
+import os
+import shutil
+import tempfile
+import unittest
+from mmat.test_runner.duration_history import DurationHistory, percentile
+
+def case(key, duration, step_walls, status="passed"):
+    steps = [{"action": "click", "description": f"Step {i}", "status": "passed", "duration": wall,
+              "timings": {"driver": wall / 2, "screenshot": 0.1}} for i, wall in enumerate(step_walls, start=1)]
+    return {"key": key, "status": status, "duration": duration, "steps": steps}
+
+class TestDurationHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.history = DurationHistory(os.path.join(self.temp_dir, "output", "history.db"))
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile."""
+        self.assertEqual(percentile([4.0, 1.0, 3.0, 2.0], 0.5), 2.0)
+        self.assertEqual(percentile([float(i) for i in range(1, 101)], 0.95), 95.0)
+        self.assertEqual(percentile([7.0], 0.95), 7.0)
+
+    def test_case_durations_are_recent_medians(self):
+        """Test that the estimated duration of a case is the median of its latest runs."""
+        for duration in (100.0, 2.0, 3.0, 4.0):
+            self.history.record_run([case("Plan/Suite/A", duration, [duration])])
+        self.assertEqual(self.history.case_durations(recent=3), {"Plan/Suite/A": 3.0})
+
+    def test_runs_and_slowest_steps(self):
+        """Test the per-run percentiles and the slowest steps with their time breakdown."""
+        self.history.record_run([case("P/S/A", 3.0, [1.0, 2.0]), case("P/S/B", 1.0, [1.0])], label="P")
+        runs = self.history.runs()
+        self.assertEqual(len(runs), 1)
+        self.assertEqual((runs[0]["label"], runs[0]["cases"], runs[0]["p50"], runs[0]["total"]), ("P", 2, 1.0, 4.0))
+
+        slowest = self.history.slowest_steps(limit=1)
+        self.assertEqual((slowest[0]["case_key"], slowest[0]["step_index"], slowest[0]["p50"]), ("P/S/A", 2, 2.0))
+        self.assertEqual((slowest[0]["driver"], slowest[0]["model"]), (1.0, None))
+
+    def test_shared_steps_are_not_stored(self):
+        """Test that steps copied from a shared execution are not stored as executed by the case."""
+        shared = case("P/S/B", 2.0, [2.0])
+        shared["steps"][0]["shared_from"] = 1
+        self.history.record_run([shared])
+        self.assertEqual(self.history.slowest_steps(), [])
+
+    def test_regressions(self):
+        """Test that only steps clearly slower than their baseline in the latest run are reported."""
+        for walls in ([1.0, 0.1], [1.2, 0.1], [1.1, 0.1], [3.0, 0.3]):
+            self.history.record_run([case("P/S/A", sum(walls), walls)])
+        regressions = self.history.regressions(threshold=1.5, min_increase=0.5)
+        self.assertEqual([(regression["step_index"], regression["baseline"]) for regression in regressions], [(1, 1.1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# MMAT Execution Graph Tests
+# Tests for the indexes and traversal helpers of the execution graph.
+
+import unittest
+from mmat.graph.graph_api import GraphAPI
+from mmat.graph.models import ExecutionGraph, GraphEdge, GraphNode
+
+# Example test suites as loaded from a test plan
+TEST_SUITES = [
+    {
+        "name": "Comments",
+        "test_cases": [
+            {"name": "Submit", "steps": [
+                {"action": "navigate", "target": "/blog"},
+                {"action": "fill", "target": "#comment", "value": "Hello"},
+                {"action": "click", "target": "#submit"},
+            ]},
+            {"name": "Empty", "steps": [
+                {"action": "navigate", "target": "/blog"},
+            ]},
+        ],
+    }
+]
+
+class TestExecutionGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = ExecutionGraph()
+        for node_id, node_type, data in [
+            ("home", "state", {"url": "/"}),
+            ("login", "state", {"url": "/login"}),
+            ("account", "state", {"url": "/account"}),
+            ("button", "dom_element", {"selector": "#login"}),
+        ]:
+            self.graph.add_node(GraphNode(node_id, node_type, data))
+        self.graph.add_edge(GraphEdge("home", "login", "result", {"action": "click"}))
+        self.graph.add_edge(GraphEdge("login", "account", "result", {"action": "submit"}))
+        self.graph.add_edge(GraphEdge("home", "button", "relation", {}))
+
+    def test_adjacency_in_both_directions(self):
+        """Test outgoing and incoming neighbour lookups, with and without an edge type."""
+        self.assertEqual(self.graph.successors("home"), ["login", "button"])
+        self.assertEqual(self.graph.successors("home", "result"), ["login"])
+        self.assertEqual(self.graph.predecessors("account"), ["login"])
+        self.assertEqual(self.graph.out_edges("account"), [])
+
+    def test_type_and_attribute_indexes(self):
+        """Test lookups by node type and indexed data attribute, including replaced nodes."""
+        self.assertEqual({node.node_id for node in self.graph.nodes_by_type("state")}, {"home", "login", "account"})
+        self.assertEqual([node.node_id for node in self.graph.find_nodes("selector", "#login")], ["button"])
+
+        self.graph.add_node(GraphNode("login", "state", {"url": "/sign-in"}))
+        self.assertEqual(self.graph.find_nodes("url", "/login"), [])
+        self.assertEqual([node.node_id for node in self.graph.find_nodes("url", "/sign-in")], ["login"])
+
+    def test_traversals(self):
+        """Test BFS, shortest path and topological order."""
+        self.assertEqual(self.graph.bfs("home"), ["home", "login", "button", "account"])
+        self.assertEqual(self.graph.bfs("home", max_depth=1), ["home", "login", "button"])
+        self.graph.add_edge(GraphEdge("home", "account", "result", {}))
+        self.assertEqual(self.graph.shortest_path("home", "account"), ["home", "account"])
+        self.assertEqual(self.graph.shortest_path("home", "account", "relation"), None)
+
+        order = self.graph.topological_order()
+        self.assertLess(order.index("home"), order.index("login"))
+        self.assertLess(order.index("login"), order.index("account"))
+
+        self.graph.add_edge(GraphEdge("account", "home", "result", {}))
+        with self.assertRaises(ValueError):
+            self.graph.topological_order()
+
+    def test_from_dict_rebuilds_indexes(self):
+        """Test that a deserialized graph answers indexed queries."""
+        restored = ExecutionGraph.from_dict(self.graph.to_dict())
+        self.assertEqual(restored.successors("login"), ["account"])
+        self.assertEqual(len(restored.find_nodes("url", "/")), 1)
+
+    def test_compact_models(self):
+        """Test that nodes are slotted, serialize without copying and keep visual refs in data."""
+        node = GraphNode("ref", "visual_ref", {"visual_ref": {"bbox": {"x": 1, "y": 2, "width": 3, "height": 4}}})
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIs(node.to_dict()["data"], node.data)
+        self.assertEqual(node.visual_ref.bbox["width"], 3)
+        self.assertIs(node.node_type, "visual_ref")
+
+
+class TestGraphAPI(unittest.TestCase):
+
+    def test_build_graph_and_next_step(self):
+        """Test that steps of a case are chained and cases are reachable from their suite."""
+        graph_api = GraphAPI()
+        graph = graph_api.build_graph(TEST_SUITES)
+
+        first_step = "suite:Comments/case:Submit/step:1"
+        self.assertEqual(graph_api.get_next_step(first_step), "suite:Comments/case:Submit/step:2")
+        self.assertIsNone(graph_api.get_next_step("suite:Comments/case:Submit/step:3"))
+        self.assertEqual(len(graph_api.get_nodes_by_type("action")), 4)
+        self.assertEqual(len(graph_api.find_nodes("target", "/blog")), 2)
+        self.assertEqual(graph.successors("suite:Comments", "contains"),
+                         ["suite:Comments/case:Submit", "suite:Comments/case:Empty"])
+
+    def test_repeated_runs_do_not_duplicate_edges(self):
+        """Test that recording the same steps again updates their edges instead of adding new ones."""
+        graph_api = GraphAPI()
+        for status in ("failed", "passed"):
+            graph_api.record_step("Suite", "Case", 1, {"number": 1, "status": status}, "https://example.com/", plan_name="Plan")
+            graph_api.record_step("Suite", "Case", 2, {"number": 2, "status": status}, "https://example.com/login", plan_name="Plan")
+
+        first_step = GraphAPI.step_node_id("Suite", "Case", 1, "Plan")
+        self.assertEqual(graph_api.graph.edge_count(), 3)
+        self.assertEqual(graph_api.graph.successors(first_step, "next"), [GraphAPI.step_node_id("Suite", "Case", 2, "Plan")])
+        self.assertEqual(graph_api.graph.out_edges(first_step, "result")[0].data, {"status": "passed"})
+
+    def test_step_nodes_are_scoped_by_plan(self):
+        """Test that plans with the same suite and case names do not share step nodes."""
+        graph_api = GraphAPI()
+        graph_api.record_step("Suite", "Case", 1, {"number": 1, "status": "passed"}, plan_name="Smoke")
+        graph_api.record_step("Suite", "Case", 1, {"number": 1, "status": "failed"}, plan_name="Regression")
+
+        self.assertEqual(len(graph_api.get_nodes_by_type("action")), 2)
+        self.assertEqual(graph_api.get_node(GraphAPI.step_node_id("Suite", "Case", 1, "Smoke")).data["status"], "passed")
+        self.assertEqual(GraphAPI.step_node_id("Suite", "Case", 1, "Smoke"), "plan:Smoke/suite:Suite/case:Case/step:1")
+
+    def test_record_step_drops_private_keys(self):
+        """Test that analysis results and private runner keys are not stored on action nodes."""
+        graph_api = GraphAPI()
+        graph_api.record_step("Suite", "Case", 1, {"number": 1, "status": "passed", "analysis": {}, "_image": b"\x89PNG"})
+
+        self.assertEqual(graph_api.get_node(GraphAPI.step_node_id("Suite", "Case", 1)).data,
+                         {"number": 1, "status": "passed", "step_index": 1})
+
+
+
+if __name__ == '__main__':
+    unittest.main()
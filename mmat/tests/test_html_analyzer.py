@@ -0,0 +1,68 @@
+# MMAT HTML Analyzer Tests
+# Tests for sending only changed DOM subtrees to the reasoning model.
+
+import unittest
+from mmat.analysis.html_analyzer import HTMLAnalyzer
+from mmat.driver.dom_snapshot import DomSnapshot
+
+# Mock ReasoningModel recording the DOM it is sent
+class MockReasoningModel:
+    def __init__(self):
+        self.calls = []
+
+    def analyze_dom(self, dom_structure):
+        self.calls.append(dom_structure)
+        return {"analysis": len(self.calls)}
+
+# Mock PlaywrightDriver returning queued snapshots
+class MockDriver:
+    def __init__(self, *pages):
+        self.pages = list(pages)
+
+    def dom_snapshot(self):
+        url, tree = self.pages.pop(0)
+        return DomSnapshot.from_dict(tree, url)
+
+def page(*texts):
+    return {"tag": "body", "children": [{"tag": "main", "role": "main", "children": [
+        {"tag": "button", "attributes": {"id": f"b{index}"}, "text": text} for index, text in enumerate(texts)]}]}
+
+class TestHTMLAnalyzer(unittest.TestCase):
+
+    def test_full_then_diff_then_unchanged(self):
+        """Test that the first snapshot is sent whole, a small change as a diff, and an unchanged page not at all."""
+        model = MockReasoningModel()
+        driver = MockDriver(("http://x/", page("A", "B", "C", "D")), ("http://x/", page("A", "B", "C", "D", "E")),
+                            ("http://x/", page("A", "B", "C", "D", "E")))
+        analyzer = HTMLAnalyzer(model, graph_api=None, driver=driver)
+
+        first = analyzer.analyze_dom()
+        second = analyzer.analyze_dom()
+        third = analyzer.analyze_dom()
+
+        self.assertEqual((first["mode"], first["nodes_sent"]), ("full", 6))
+        self.assertEqual((second["mode"], second["nodes_sent"]), ("diff", 1))
+        self.assertIn('button#b4 "E"', model.calls[1])
+        self.assertNotIn('"A"', model.calls[1])
+        self.assertEqual((third["mode"], third["analysis"]), ("unchanged", {"analysis": 2}))
+        self.assertEqual(len(model.calls), 2)
+        self.assertEqual(analyzer.stats["nodes_sent"], 7)
+
+    def test_large_change_sends_full_snapshot(self):
+        """Test that a diff larger than max_diff_ratio of the page is replaced by the full snapshot."""
+        model = MockReasoningModel()
+        driver = MockDriver(("http://x/", page("A")), ("http://x/", page("X", "Y", "Z")))
+        analyzer = HTMLAnalyzer(model, graph_api=None, driver=driver)
+        analyzer.analyze_dom()
+        self.assertEqual(analyzer.analyze_dom()["mode"], "full")
+
+    def test_pages_are_diffed_per_url(self):
+        """Test that a snapshot is only diffed against the previous snapshot of the same URL."""
+        model = MockReasoningModel()
+        driver = MockDriver(("http://x/a", page("A")), ("http://x/b", page("A")))
+        analyzer = HTMLAnalyzer(model, graph_api=None, driver=driver)
+        analyzer.analyze_dom()
+        self.assertEqual(analyzer.analyze_dom()["mode"], "full")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# MMAT Local API Reasoning Model Tests
+# Tests for the completion cache, deterministic sampling and DOM prompts of the reasoning model.
+
+import os
+import shutil
+import unittest
+import requests
+from mmat.models.local_api_reasoning_model import LocalApiReasoningModel
+from mmat.models.response_cache import ResponseCache
+
+# Define a temporary directory for the cache
+TEST_CACHE_DIR = "test_reasoning_cache_dir"
+
+# Mock model transport: records the request payloads and answers with a fixed content (a plan by default)
+class MockResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}}]}
+
+class MockTransport:
+    def __init__(self, content='[{"action": "navigate", "target": "/"}]'):
+        self.content = content
+        self.payloads = []
+
+    def post(self, url, json=None, **kwargs):
+        self.payloads.append(json)
+        return MockResponse(self.content)
+
+# Mock streamed response that fails with an HTTP error status and records whether it was closed
+class MockErrorStreamResponse:
+    def __init__(self):
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+    def raise_for_status(self):
+        raise requests.exceptions.HTTPError("503 Server Error: Service Unavailable")
+
+    def iter_lines(self, decode_unicode=False):
+        return iter([])
+
+def product_list(count):
+    items = "".join(f'<li><a href="/p/{i}">Product {i}</a></li>' for i in range(count))
+    return f'<html><body><script>track()</script><ul>{items}</ul><button id="checkout">Checkout</button></body></html>'
+
+
+class TestLocalApiReasoningModel(unittest.TestCase):
+
+    def setUp(self):
+        if os.path.exists(TEST_CACHE_DIR):
+            shutil.rmtree(TEST_CACHE_DIR)
+
+    def tearDown(self):
+        if os.path.exists(TEST_CACHE_DIR):
+            shutil.rmtree(TEST_CACHE_DIR)
+
+    def test_repeated_plan_served_from_cache(self):
+        """Test that generating the same plan twice makes one model call."""
+        transport = MockTransport()
+        model = LocalApiReasoningModel("http://localhost:1234/v1", "reasoning", transport=transport,
+                                       cache=ResponseCache(TEST_CACHE_DIR))
+        first = model.generate_test_plan("Open the home page", {})
+        second = model.generate_test_plan("Open the home page", {})
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(transport.payloads), 1)
+        self.assertEqual(model.cache.get_stats()["hits"], 1)
+
+    def test_key_ignores_whitespace_but_not_sampling(self):
+        """Test that normalized messages share a key and different sampling parameters do not."""
+        model = LocalApiReasoningModel("http://localhost:1234/v1", "reasoning", transport=MockTransport(),
+                                       cache=ResponseCache(TEST_CACHE_DIR))
+        params = model._sampling_params(max_tokens=1000)
+        key = model._cache_key([{"role": "user", "content": "Describe\r\nthe plan  \n"}], params)
+
+        self.assertEqual(key, model._cache_key([{"role": "user", "content": "Describe\nthe plan"}], params))
+        self.assertNotEqual(key, model._cache_key([{"role": "user", "content": "Describe\nthe plan"}],
+                                                  model._sampling_params(max_tokens=500)))
+
+    def test_deterministic_sampling(self):
+        """Test that deterministic mode sends temperature 0 and the seed."""
+        transport = MockTransport()
+        model = LocalApiReasoningModel("http://localhost:1234/v1", "reasoning", transport=transport,
+                                       deterministic=True, seed=42)
+        model.generate_text([{"role": "user", "content": "Describe the plan"}])
+
+        self.assertEqual(transport.payloads[0]["temperature"], 0)
+        self.assertEqual(transport.payloads[0]["seed"], 42)
+
+    def test_stream_error_status_closes_response(self):
+        """Test that a streamed completion with an HTTP error status yields no steps and is closed."""
+        response = MockErrorStreamResponse()
+        transport = MockTransport()
+        transport.post = lambda url, json=None, **kwargs: response
+        model = LocalApiReasoningModel("http://localhost:1234/v1", "reasoning", transport=transport)
+
+        self.assertEqual(list(model.stream_test_plan("Open the home page", {})), [])
+        self.assertTrue(response.closed)
+
+    def test_identify_element_sends_compacted_dom(self):
+        """Test that element identification sends a DOM within the budget and parses the answer."""
+        transport = MockTransport('Here it is: {"selector": "#checkout", "confidence": 0.9, "reason": "Checkout button"}')
+        model = LocalApiReasoningModel("http://localhost:1234/v1", "reasoning", transport=transport, dom_token_budget=200)
+        result = model.identify_element_by_structure(product_list(500), "the checkout button")
+
+        self.assertEqual(result["element_selector"], "#checkout")
+        self.assertEqual(result["confidence"], 0.9)
+        self.assertLessEqual(result["dom_compaction"]["tokens"], 200)
+        prompt = transport.payloads[0]["messages"][1]["content"]
+        self.assertIn('button#checkout "Checkout"', prompt)
+        self.assertNotIn("track()", prompt)
+        self.assertNotIn('"Product 499"', prompt)
+
+    def test_analyze_dom_keeps_reply_that_is_not_json(self):
+        """Test that a DOM analysis reply without a JSON object is returned as raw text."""
+        model = LocalApiReasoningModel("http://localhost:1234/v1", "reasoning", transport=MockTransport("A login page."))
+        analysis = model.analyze_dom('body\n  button#login "Sign in"')
+
+        self.assertEqual(analysis["raw"], "A login page.")
+        self.assertEqual(analysis["dom_compaction"]["elements"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
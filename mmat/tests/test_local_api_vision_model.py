@@ -0,0 +1,81 @@
+# MMAT Local API Vision Model Tests
+# Tests for concurrent batch analysis of screenshots.
+
+import os
+import shutil
+import threading
+import time
+import unittest
+from mmat.models.local_api_vision_model import LocalApiVisionModel
+
+# Define a temporary directory for the screenshots
+TEST_SCREENSHOT_DIR = "test_vision_model_screenshots"
+
+# Mock model transport: records how many requests are in flight at the same time
+class MockResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}}]}
+
+class MockTransport:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+        # Answer later requests faster, so completion order differs from submission order
+        image_url = json["messages"][0]["content"][1]["image_url"]["url"]
+        time.sleep(self.delay / (1 + len(image_url) % 3))
+        with self._lock:
+            self.in_flight -= 1
+        return MockResponse(image_url[-8:])
+
+
+class TestLocalApiVisionModel(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs(TEST_SCREENSHOT_DIR, exist_ok=True)
+        self.paths = []
+        for i in range(6):
+            path = os.path.join(TEST_SCREENSHOT_DIR, f"step_{i}.png")
+            with open(path, "wb") as f:
+                f.write(b"image" * (i + 1))
+            self.paths.append(path)
+
+    def tearDown(self):
+        if os.path.exists(TEST_SCREENSHOT_DIR):
+            shutil.rmtree(TEST_SCREENSHOT_DIR)
+
+    def test_batch_respects_in_flight_limit_and_order(self):
+        """Test that at most max_in_flight requests run at once and results keep their order."""
+        transport = MockTransport()
+        model = LocalApiVisionModel("http://localhost:1234/v1", "vision", transport=transport, max_in_flight=3)
+        results = model.analyze_screenshots(self.paths)
+
+        self.assertEqual(transport.max_in_flight_seen, 3)
+        expected = [model.analyze_screenshot(path) for path in self.paths]
+        self.assertEqual(results, expected)
+
+    def test_missing_screenshot_returned_as_exception(self):
+        """Test that with return_exceptions a failed analysis does not fail the batch."""
+        model = LocalApiVisionModel("http://localhost:1234/v1", "vision", transport=MockTransport(delay=0))
+        results = model.analyze_screenshots([self.paths[0], "missing.png"], return_exceptions=True)
+
+        self.assertIn("choices", results[0])
+        self.assertIsInstance(results[1], FileNotFoundError)
+        with self.assertRaises(FileNotFoundError):
+            model.analyze_screenshots([self.paths[0], "missing.png"])
+
+
+if __name__ == '__main__':
+    unittest.main()
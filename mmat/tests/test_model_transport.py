@@ -0,0 +1,93 @@
+# MMAT Model Transport Tests
+# Tests for retries, the circuit breaker and latency statistics of the model API transport.
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from mmat.models.model_transport import CircuitOpenError, LatencyHistogram, ModelTransport
+
+# Mock model server: answers each request with the next status in `statuses` (then 200)
+class MockModelHandler(BaseHTTPRequestHandler):
+    statuses = []
+    requests_seen = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = type(self)
+        status = cls.statuses[cls.requests_seen] if cls.requests_seen < len(cls.statuses) else 200
+        cls.requests_seen += 1
+        body = b'{"choices": []}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestModelTransport(unittest.TestCase):
+
+    def setUp(self):
+        MockModelHandler.statuses = []
+        MockModelHandler.requests_seen = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MockModelHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"http://{self.host}/v1/chat/completions"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retries_retryable_status(self):
+        """Test that 503 and 429 responses are retried until the server answers."""
+        MockModelHandler.statuses = [503, 429]
+        transport = ModelTransport(backoff_factor=0.01)
+        response = transport.post(self.url, json={"model": "m"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(MockModelHandler.requests_seen, 3)
+        stats = transport.get_stats()
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["latency"][f"POST {self.host}/v1/chat/completions"]["count"], 3)
+        transport.close()
+
+    def test_client_error_not_retried(self):
+        """Test that a 400 response is returned without retrying."""
+        MockModelHandler.statuses = [400]
+        transport = ModelTransport(backoff_factor=0.01)
+        self.assertEqual(transport.post(self.url, json={}).status_code, 400)
+        self.assertEqual(MockModelHandler.requests_seen, 1)
+        transport.close()
+
+    def test_circuit_opens_after_repeated_failures(self):
+        """Test that requests fail fast once the failure threshold is reached, then recover."""
+        MockModelHandler.statuses = [500] * 4
+        transport = ModelTransport(max_retries=1, backoff_factor=0.01,
+                                   circuit_failure_threshold=2, circuit_reset_seconds=0.2)
+        for _ in range(2):
+            self.assertEqual(transport.post(self.url, json={}).status_code, 500)
+        with self.assertRaises(CircuitOpenError):
+            transport.post(self.url, json={})
+        self.assertEqual(MockModelHandler.requests_seen, 4)
+        self.assertEqual(transport.get_stats()["circuits"], {self.host: "open"})
+
+        threading.Event().wait(0.25) # Let the circuit reach its half-open trial
+        self.assertEqual(transport.post(self.url, json={}).status_code, 200)
+        self.assertEqual(transport.get_stats()["circuits"][self.host], "closed")
+        transport.close()
+
+    def test_histogram_quantiles(self):
+        """Test that quantiles fall into the expected buckets."""
+        histogram = LatencyHistogram(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.05, 0.05, 0.5, 3.0):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.95), 3.0)
+        self.assertEqual(histogram.to_dict()["buckets"], {"le_0.1": 3, "le_1.0": 1, "inf": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
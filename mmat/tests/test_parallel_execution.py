@@ -0,0 +1,128 @@
+# MMAT Parallel Execution Tests
+# Tests for running the test cases of a plan on a pool of worker browsers, on mocked browsers.
+
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+
+# The runner imports the Playwright driver; mock its modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.test_runner import test_runner
+
+# Mock browser driver: pages under '/wait/<ms>' take that long to load, so cases finish
+# out of plan order. The first `failing_launches` drivers fail to launch their browser.
+class MockDriver:
+    failing_launches = 0
+    drivers = []
+    lock = threading.Lock()
+
+    def __init__(self, config=None):
+        self.config = config
+        self.browser = None
+        self.page = None
+        self.url = ""
+        self.closed = False
+        self.thread = None
+
+    def launch_browser(self, browser_type="chromium", headless=True):
+        with MockDriver.lock:
+            MockDriver.drivers.append(self)
+            if MockDriver.failing_launches:
+                MockDriver.failing_launches -= 1
+                return
+        self.browser = True
+        self.page = object()
+        self.thread = threading.current_thread().name
+
+    def new_context(self, storage_state=None):
+        self.page = object()
+
+    def navigate(self, url):
+        self.url = url
+        if "/wait/" in url:
+            time.sleep(int(url.rsplit("/", 1)[1]) / 1000)
+
+    def get_current_url(self):
+        return self.url
+
+    def close_context(self):
+        self.page = None
+
+    def close_browser(self):
+        self.browser = None
+        self.page = None
+        self.closed = True
+
+def waiting_plan():
+    cases = [{"name": f"c{i}", "steps": [{"action": "navigate", "target": f"/wait/{wait}"}, {"action": "assert_url", "expected": f"/wait/{wait}"}]}
+             for i, wait in enumerate([40, 5, 30, 1, 20, 10])]
+    return {"test_plan": {"name": "Shop", "test_suites": [{"name": "Pages", "test_cases": cases}]}}
+
+
+class TestParallelExecution(unittest.TestCase):
+
+    def setUp(self):
+        MockDriver.failing_launches = 0
+        MockDriver.drivers = []
+
+    def runner(self):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": "http://shop"}}},
+            "execution": {"run_state": None, "history": None},
+            "screenshots": {"policy": {"mode": "triggers", "actions": [], "on_failure": False}},
+            "artifacts": {"enabled": False},
+        }
+        return test_runner.TestRunner(MockDriver(), config_manager, driver_factory=MockDriver)
+
+    def cases(self, runner):
+        return runner.last_report["suites"][0]["cases"]
+
+    def test_results_merged_in_plan_order(self):
+        """Test that cases finishing out of order are reported in plan order, with their own steps."""
+        runner = self.runner()
+        self.assertTrue(runner.execute_plan(waiting_plan(), workers=3))
+
+        cases = self.cases(runner)
+        self.assertEqual([case["name"] for case in cases], [f"c{i}" for i in range(6)])
+        self.assertEqual([case["status"] for case in cases], ["passed"] * 6)
+        self.assertEqual([[step["number"] for step in case["steps"]] for case in cases], [[2 * i + 1, 2 * i + 2] for i in range(6)])
+        self.assertEqual(len({driver.thread for driver in MockDriver.drivers}), 3) # One browser per worker
+        self.assertTrue(all(driver.closed for driver in MockDriver.drivers))
+
+    def test_failed_worker_launch_leaves_cases_to_others(self):
+        """Test that the cases of a worker whose browser fails to launch are run by the other workers."""
+        MockDriver.failing_launches = 1
+        runner = self.runner()
+        self.assertTrue(runner.execute_plan(waiting_plan(), workers=3))
+
+        self.assertEqual([case["status"] for case in self.cases(runner)], ["passed"] * 6)
+        self.assertTrue(all(driver.closed for driver in MockDriver.drivers)) # Also the driver that failed to launch
+
+    def test_no_worker_browser_gives_error_results(self):
+        """Test that every case gets an error result when no worker can launch a browser."""
+        MockDriver.failing_launches = 3
+        runner = self.runner()
+        self.assertTrue(runner.execute_plan(waiting_plan(), workers=3))
+
+        cases = self.cases(runner)
+        self.assertEqual([case["status"] for case in cases], ["error"] * 6)
+        self.assertEqual(cases[0]["details"], "Test case was not executed: no worker could launch a browser.")
+        self.assertEqual(runner.last_report["summary"]["error"], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# MMAT Plan Batch Tests
+# Tests for discovering test plans and running them as one batch with a merged report, on a mocked browser.
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+from mmat.reporting.report_merge import merge_reports
+
+# The runner and MMAT import the Playwright drivers; mock their modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    import playwright.async_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+        "playwright.async_api": types.SimpleNamespace(async_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.core.mmat import MMAT
+    from mmat.test_runner import test_runner
+
+# Mock browser driver: pages under '/broken' fail to load
+class MockDriver:
+    def __init__(self, config=None):
+        self.config = config
+        self.browser = None
+        self.page = None
+        self.url = ""
+
+    def launch_browser(self, browser_type="chromium", headless=True):
+        self.browser = True
+        self.new_context()
+
+    def new_context(self, storage_state=None):
+        self.page = object()
+
+    def navigate(self, url):
+        if "/broken" in url:
+            raise RuntimeError("net::ERR_CONNECTION_REFUSED")
+        self.url = url
+
+    def get_current_url(self):
+        return self.url
+
+    def close_context(self):
+        self.page = None
+
+    def close_browser(self):
+        self.browser = None
+        self.page = None
+
+def unnamed_plan(*targets):
+    """A plan without a name, with one case per navigate target."""
+    cases = [{"name": f"Open {target}", "steps": [{"action": "navigate", "target": target}]} for target in targets]
+    return {"test_plan": {"test_suites": [{"name": "Pages", "test_cases": cases}]}}
+
+
+class TestPlanDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for path in ("smoke/login.yaml", "smoke/cart.yml", "smoke/deep/search.json", "smoke/notes.txt", "regression/checkout.yaml"):
+            os.makedirs(os.path.dirname(os.path.join(self.directory, path)), exist_ok=True)
+            with open(os.path.join(self.directory, path), "w") as f:
+                f.write("test_plan: {}\n")
+        self.mmat = MMAT.__new__(MMAT) # Discovery needs no configuration
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def relative(self, paths):
+        return [os.path.relpath(path, self.directory) for path in paths]
+
+    def test_directory_is_searched_recursively(self):
+        """Test that a directory yields its YAML and JSON plans at any depth, sorted."""
+        plan_paths = self.mmat._discover_test_plans(os.path.join(self.directory, "smoke"))
+        self.assertEqual(self.relative(plan_paths), ["smoke/cart.yml", "smoke/deep/search.json", "smoke/login.yaml"])
+
+    def test_glob_matches_any_depth(self):
+        """Test that ** in a glob matches any number of directories and only files are returned."""
+        plan_paths = self.mmat._discover_test_plans(os.path.join(self.directory, "**", "*.yaml"))
+        self.assertEqual(self.relative(plan_paths), ["regression/checkout.yaml", "smoke/login.yaml"])
+
+    def test_plan_file_is_kept_as_is(self):
+        """Test that a plan file argument is returned unchanged, even if it does not exist yet."""
+        self.assertEqual(self.mmat._discover_test_plans("plans/missing.yaml"), ["plans/missing.yaml"])
+
+    def test_arguments_resolved_in_order_without_duplicates(self):
+        """Test that plans matched by several arguments, or spelled differently, are listed once at their first match."""
+        login = os.path.join(self.directory, "smoke", "login.yaml")
+        plan_paths = self.mmat._resolve_test_plans([
+            os.path.join(self.directory, "regression"),
+            os.path.join(self.directory, "smoke", ".", "login.yaml"),
+            os.path.join(self.directory, "smoke"),
+            login,
+        ])
+        self.assertEqual(self.relative(plan_paths), ["regression/checkout.yaml", "smoke/login.yaml", "smoke/cart.yml", "smoke/deep/search.json"])
+
+
+class TestPlanBatches(unittest.TestCase):
+
+    def runner(self):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": "http://shop"}}},
+            "execution": {"run_state": None, "history": None},
+            "screenshots": {"policy": {"mode": "triggers", "actions": [], "on_failure": False}},
+            "artifacts": {"enabled": False},
+        }
+        return test_runner.TestRunner(MockDriver(), config_manager, driver_factory=MockDriver)
+
+    def batch(self):
+        return [("smoke/plan.yaml", unnamed_plan("/", "/cart")),
+                ("regression/plan.yaml", unnamed_plan("/broken", "/search", "/help"))]
+
+    def test_batch_report_merges_plans_in_order(self):
+        """Test that the batch report lists every plan's suites and summary in plan order and adds up the counts."""
+        runner = self.runner()
+        self.assertTrue(runner.execute_plans(self.batch(), workers=2))
+
+        report = runner.last_report
+        self.assertEqual(report["name"], "2 test plans")
+        self.assertEqual([(suite["plan"], suite["plan_path"]) for suite in report["suites"]],
+                         [("Unnamed Test Plan", "smoke/plan.yaml"), ("Unnamed Test Plan", "regression/plan.yaml")])
+        self.assertEqual([[case["name"] for case in suite["cases"]] for suite in report["suites"]],
+                         [["Open /", "Open /cart"], ["Open /broken", "Open /search", "Open /help"]])
+        self.assertEqual([plan["path"] for plan in report["plans"]], ["smoke/plan.yaml", "regression/plan.yaml"])
+        self.assertEqual([(plan["summary"]["total"], plan["summary"]["failed"]) for plan in report["plans"]], [(2, 0), (3, 1)])
+        self.assertEqual((report["summary"]["total"], report["summary"]["passed"], report["summary"]["failed"]), (5, 4, 1))
+
+    def test_sharded_batch_of_plans_with_the_same_name(self):
+        """Test that the shards of a batch whose plans share a name merge into one complete report."""
+        reports = []
+        for index in (1, 2):
+            runner = self.runner()
+            self.assertTrue(runner.execute_plans(self.batch(), shard=(index, 2)))
+            reports.append(runner.last_report)
+        self.assertEqual([[plan["case_count"] for plan in report["plans"]] for report in reports], [[2, 3], [2, 3]])
+
+        merged = merge_reports(reports)
+        self.assertTrue(merged["complete"], (merged["missing_cases"], merged["duplicate_cases"]))
+        self.assertEqual(merged["summary"]["total"], 5)
+        self.assertEqual([plan["summary"]["total"] for plan in merged["plans"]], [2, 3])
+        self.assertEqual([[case["name"] for case in suite["cases"] if case["status"] != "not_run"] for suite in merged["suites"]],
+                         [["Open /", "Open /cart"], ["Open /broken", "Open /search", "Open /help"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# MMAT Plan DAG Tests
+# Tests for compiling test plans into DAGs of shared step groups and for the branch queue.
+
+import threading
+import unittest
+from mmat.test_runner.plan_dag import BranchQueue, PlanDag
+
+NAVIGATE = {"action": "navigate", "target": "/login"}
+USER = {"action": "fill", "selector": "#user", "value": "alice"}
+PASSWORD = {"action": "fill", "selector": "#password", "value": "secret"}
+SUBMIT = {"action": "click", "selector": "#submit"}
+
+def case(name, steps, offset=0):
+    return {"suite_name": "Suite", "case_name": name, "steps": steps, "offset": offset}
+
+class TestPlanDag(unittest.TestCase):
+
+    def test_shared_prefix_becomes_one_group(self):
+        """Test that the common leading steps of test cases are compiled into one group with a branch per case."""
+        entries = [
+            case("Profile", [NAVIGATE, USER, PASSWORD, SUBMIT, {"action": "click", "selector": "#profile"}], 0),
+            case("Logout", [dict(NAVIGATE, description="Open login"), USER, PASSWORD, SUBMIT, {"action": "click", "selector": "#logout"}], 5),
+            case("Other", [{"action": "navigate", "target": "/help"}], 10),
+        ]
+        dag = PlanDag(entries)
+
+        prefix_id, other_id = dag.children(PlanDag.ROOT)
+        self.assertEqual(len(dag.group(prefix_id)["steps"]), 4)
+        self.assertEqual(dag.group(prefix_id)["cases"], [0, 1])
+        self.assertEqual(dag.path(1), [prefix_id, dag.children(prefix_id)[1]])
+        self.assertEqual(dag.group(dag.children(prefix_id)[1])["start_index"], 4)
+        self.assertEqual(dag.path(2), [other_id])
+        self.assertEqual(dag.shared_step_count(), 4)
+        self.assertEqual(dag.total_step_count(), 11)
+
+    def test_case_ending_inside_shared_prefix(self):
+        """Test that a case that is a prefix of another ends at its own group."""
+        dag = PlanDag([case("Short", [NAVIGATE, USER]), case("Long", [NAVIGATE, USER, PASSWORD], 2)])
+
+        short_group = dag.path(0)[-1]
+        self.assertEqual(dag.group(short_group)["ending_cases"], [0])
+        self.assertEqual(dag.path(1), [short_group, dag.children(short_group)[0]])
+
+    def test_replay_steps_are_trailing_fills(self):
+        """Test that a branch replays the fills after the last page-changing step of the prefix."""
+        dag = PlanDag([
+            case("A", [NAVIGATE, USER, {"action": "assert_url", "expected": "/login"}, PASSWORD, SUBMIT]),
+            case("B", [NAVIGATE, USER, {"action": "assert_url", "expected": "/login"}, PASSWORD, {"action": "click", "selector": "#cancel"}], 5),
+        ])
+        prefix_id = dag.children(PlanDag.ROOT)[0]
+        self.assertEqual(dag.replay_steps(prefix_id), [USER, PASSWORD])
+        self.assertEqual(len(dag.path_steps(prefix_id)), 4)
+
+
+class TestBranchQueue(unittest.TestCase):
+
+    def test_waits_for_branches_added_by_running_workers(self):
+        """Test that idle workers wait for branches queued by a running one and stop once all are done."""
+        branch_queue = BranchQueue(2)
+        branch_queue.put("root", worker_id=0)
+        executed = []
+        lock = threading.Lock()
+
+        def worker(worker_id):
+            while True:
+                item = branch_queue.get(worker_id)
+                if item is None:
+                    return
+                with lock:
+                    executed.append(item)
+                if item == "root":
+                    branch_queue.put("left", worker_id)
+                    branch_queue.put("right", worker_id)
+                branch_queue.task_done()
+
+        threads = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(sorted(executed), ["left", "right", "root"])
+
+
+if __name__ == '__main__':
+    unittest.main()
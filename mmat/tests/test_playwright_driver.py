@@ -0,0 +1,251 @@
+# MMAT Playwright Driver Tests
+# Tests for the browser and context lifecycle of the Playwright drivers, on mocked browsers.
+
+import asyncio
+import itertools
+import sys
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+
+# The drivers only touch Playwright when launching; mock the modules if it is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    import playwright.async_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+        "playwright.async_api": types.SimpleNamespace(async_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.driver import async_playwright_driver, playwright_driver
+    from mmat.driver.playwright_driver import PlaywrightDriver
+    from mmat.driver.async_playwright_driver import AsyncPlaywrightDriver
+    from mmat.test_runner import test_runner
+
+# Mock browser objects: record the order in which they are closed
+class MockClosable:
+    def __init__(self, name, closed):
+        self.name = name
+        self.closed = closed
+
+    def close(self):
+        self.closed.append(self.name)
+
+    def stop(self):
+        self.closed.append(self.name)
+
+class MockAsyncClosable(MockClosable):
+    async def close(self):
+        self.closed.append(self.name)
+
+    async def stop(self):
+        self.closed.append(self.name)
+
+# Mock sync Playwright API: counts Playwright starts and stops, browser launches and contexts,
+# and records the context every page was navigated in
+class MockSyncPage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+
+    def goto(self, url):
+        self.url = url
+        self.context.playwright.navigations.append((url, self.context.number))
+
+class MockSyncContext:
+    def __init__(self, playwright, number):
+        self.playwright = playwright
+        self.number = number
+
+    def new_page(self):
+        return MockSyncPage(self)
+
+    def close(self):
+        pass
+
+class MockSyncBrowser:
+    def __init__(self, playwright):
+        self.playwright = playwright
+
+    def is_connected(self):
+        return True
+
+    def new_context(self, **kwargs):
+        return MockSyncContext(self.playwright, next(self.playwright.context_numbers))
+
+    def close(self):
+        self.playwright.counts["browser_closes"] += 1
+
+class MockSyncPlaywright:
+    def __init__(self, launch_fails=False):
+        self.launch_fails = launch_fails
+        self.counts = {"starts": 0, "stops": 0, "launches": 0, "browser_closes": 0}
+        self.context_numbers = itertools.count(1)
+        self.navigations = []
+        self.chromium = self
+
+    def __call__(self):
+        return self # sync_playwright()
+
+    def start(self):
+        self.counts["starts"] += 1
+        return self
+
+    def stop(self):
+        self.counts["stops"] += 1
+
+    def launch(self, headless=True):
+        if self.launch_fails:
+            raise RuntimeError("Executable doesn't exist")
+        self.counts["launches"] += 1
+        return MockSyncBrowser(self)
+
+# Mock async Playwright API: counts the contexts opened on the browser
+class MockAsyncBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **kwargs):
+        context = MockAsyncClosable(f"context{len(self.contexts) + 1}", [])
+        context.new_page = lambda: asyncio.sleep(0, result=object())
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        pass
+
+class MockAsyncPlaywright:
+    def __init__(self):
+        self.browser = MockAsyncBrowser()
+        self.chromium = self
+
+    def __call__(self):
+        return self # async_playwright()
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+    async def launch(self, headless=True):
+        return self.browser
+
+def two_case_plan(name):
+    cases = [{"name": f"c{i}", "steps": [{"action": "navigate", "target": f"/{name}/{i}"}]} for i in range(2)]
+    return {"test_plan": {"name": name, "test_suites": [{"name": "Pages", "test_cases": cases}]}}
+
+
+class TestPlaywrightDriver(unittest.TestCase):
+
+    def open_driver(self, closed):
+        driver = PlaywrightDriver({})
+        driver.playwright = MockClosable("playwright", closed)
+        driver.browser = MockClosable("browser", closed)
+        driver.browser_type = "chromium"
+        driver.context = MockClosable("context", closed)
+        driver.page = object()
+        return driver
+
+    def test_close_context_keeps_browser(self):
+        """Test that closing the context leaves the browser and Playwright running."""
+        closed = []
+        driver = self.open_driver(closed)
+        driver.close_context()
+
+        self.assertEqual(closed, ["context"])
+        self.assertIsNone(driver.context)
+        self.assertIsNone(driver.page)
+        self.assertIsNotNone(driver.browser)
+
+    def test_close_browser_closes_everything(self):
+        """Test that closing the browser closes the context, the browser and Playwright, in that order."""
+        closed = []
+        driver = self.open_driver(closed)
+        driver.close_browser()
+
+        self.assertEqual(closed, ["context", "browser", "playwright"])
+        self.assertEqual((driver.browser, driver.context, driver.page, driver.playwright), (None, None, None, None))
+        driver.close_browser() # Closing again is harmless
+        self.assertEqual(len(closed), 3)
+
+    def test_async_close_browser(self):
+        """Test that the async driver closes the context, the browser and Playwright."""
+        closed = []
+        driver = AsyncPlaywrightDriver({})
+        driver.playwright = MockAsyncClosable("playwright", closed)
+        driver.browser = MockAsyncClosable("browser", closed)
+        driver.context = MockAsyncClosable("context", closed)
+        asyncio.run(driver.close_browser())
+
+        self.assertEqual(closed, ["context", "browser", "playwright"])
+        self.assertIsNone(driver.browser)
+
+    def test_async_launch_opens_no_context(self):
+        """Test that the async driver launches only the browser and opens a context per session."""
+        playwright = MockAsyncPlaywright()
+
+        async def run():
+            driver = AsyncPlaywrightDriver({})
+            await driver.launch_browser()
+            self.assertIsNotNone(driver.browser)
+            self.assertEqual((driver.context, driver.page, len(playwright.browser.contexts)), (None, None, 0))
+            sessions = [await driver.new_session() for _ in range(2)]
+            self.assertTrue(all(session.page for session in sessions))
+            self.assertEqual(len(playwright.browser.contexts), 2)
+            await driver.close_browser()
+
+        with mock.patch.object(async_playwright_driver, "async_playwright", playwright):
+            asyncio.run(run())
+
+
+class TestBrowserReuse(unittest.TestCase):
+
+    def runner(self):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": "http://shop"}}},
+            "execution": {"run_state": None, "history": None},
+            "screenshots": {"policy": {"mode": "triggers", "actions": [], "on_failure": False}},
+            "artifacts": {"enabled": False},
+        }
+        return test_runner.TestRunner(PlaywrightDriver({}), config_manager, reuse_browser=True)
+
+    def test_browser_reused_with_context_per_case(self):
+        """Test that plans share one Playwright instance and browser, and every case gets a fresh context."""
+        playwright = MockSyncPlaywright()
+        with mock.patch.object(playwright_driver, "sync_playwright", playwright):
+            runner = self.runner()
+            self.assertTrue(runner.execute_plan(two_case_plan("a")))
+            self.assertTrue(runner.execute_plan(two_case_plan("b")))
+            self.assertEqual(playwright.counts, {"starts": 1, "stops": 0, "launches": 1, "browser_closes": 0})
+
+            stats = runner.driver.get_session_stats()
+            runner.close()
+
+        self.assertEqual([url for url, _ in playwright.navigations], ["http://shop/a/0", "http://shop/a/1", "http://shop/b/0", "http://shop/b/1"])
+        self.assertEqual(len({context for _, context in playwright.navigations}), 4)
+        # Every launch_browser() call also opens a context before the cases open theirs
+        self.assertEqual((stats["browser_launches"], stats["browser_reuses"], stats["contexts_created"]), (1, 1, 6))
+        self.assertGreaterEqual(stats["launch_time_saved_seconds"], 0)
+        self.assertEqual((playwright.counts["browser_closes"], playwright.counts["stops"]), (1, 1))
+
+    def test_close_stops_playwright_after_failed_launch(self):
+        """Test that close() stops Playwright when it started but the browser did not launch."""
+        playwright = MockSyncPlaywright(launch_fails=True)
+        with mock.patch.object(playwright_driver, "sync_playwright", playwright):
+            runner = self.runner()
+            self.assertFalse(runner.execute_plan(two_case_plan("a")))
+            runner.close()
+
+        self.assertEqual(playwright.counts, {"starts": 1, "stops": 1, "launches": 0, "browser_closes": 0})
+        self.assertIsNone(runner.driver.playwright)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# MMAT Report Merge Tests
+# Tests for merging the reports of the shards of a run.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+from mmat.reporting.report_merge import merge_reports
+
+# The CLI imports the Playwright drivers; mock their modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    import playwright.async_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+        "playwright.async_api": types.SimpleNamespace(async_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.cli import main as cli
+
+def shard_report(index, count, cases, case_count=None):
+    suites = {}
+    for suite_name, case_name, case_index, status in cases:
+        suites.setdefault(suite_name, []).append({"name": case_name, "status": status, "case_index": case_index, "steps": []})
+    return {
+        "name": "Plan",
+        "suites": [{"name": name, "cases": suite_cases} for name, suite_cases in suites.items()],
+        "summary": {"total": len(cases), "steps_skipped": 1, "screenshots_captured": 3, "screenshots_avoided": 2},
+        "shard": {"index": index, "count": count, **({"case_count": case_count} if case_count is not None else {})},
+    }
+
+class TestReportMerge(unittest.TestCase):
+
+    def test_merge_restores_plan_order(self):
+        """Test that cases of all shards are merged into their suites in plan order with a recomputed summary."""
+        merged = merge_reports([
+            shard_report(2, 2, [("Login", "Logout", 1, "failed"), ("Search", "Filter", 3, "passed")], case_count=4),
+            shard_report(1, 2, [("Login", "Sign in", 0, "passed"), ("Search", "Query", 2, "passed")], case_count=4),
+        ])
+
+        self.assertEqual([suite["name"] for suite in merged["suites"]], ["Login", "Search"])
+        self.assertEqual([case["name"] for case in merged["suites"][0]["cases"]], ["Sign in", "Logout"])
+        self.assertEqual([case["name"] for case in merged["suites"][1]["cases"]], ["Query", "Filter"])
+        self.assertEqual(merged["summary"], {"total": 4, "passed": 3, "failed": 1, "error": 0, "steps_skipped": 2,
+                                             "screenshots_captured": 6, "screenshots_avoided": 4})
+        self.assertEqual(merged["missing_shards"], [])
+        self.assertTrue(merged["complete"])
+
+    def test_missing_shards_are_listed(self):
+        """Test that shards without a report are listed."""
+        merged = merge_reports([shard_report(2, 3, [("Login", "Logout", 1, "passed")])])
+        self.assertEqual(merged["missing_shards"], [1, 3])
+        self.assertFalse(merged["complete"])
+
+    def test_missing_and_duplicate_cases_mark_report_incomplete(self):
+        """Test that cases no shard reported and cases reported twice are listed, and duplicates counted once."""
+        merged = merge_reports([
+            shard_report(1, 2, [("Login", "Sign in", 0, "passed"), ("Search", "Filter", 3, "passed")], case_count=4),
+            shard_report(2, 2, [("Search", "Filter", 3, "failed")], case_count=4),
+        ])
+
+        self.assertEqual(merged["missing_shards"], [])
+        self.assertEqual(merged["missing_cases"], [{"plan": None, "case_index": 1}, {"plan": None, "case_index": 2}])
+        self.assertEqual(merged["duplicate_cases"], [{"plan": None, "suite": "Search", "name": "Filter", "case_index": 3}])
+        self.assertEqual([case["status"] for case in merged["suites"][1]["cases"]], ["passed"])
+        self.assertEqual((merged["summary"]["total"], merged["summary"]["failed"]), (2, 0))
+        self.assertFalse(merged["complete"])
+
+    def test_batch_plans_are_merged_by_path(self):
+        """Test that the plans of batch reports are merged and their summaries recomputed."""
+        reports = []
+        for index, (plan_name, status) in enumerate([("A", "passed"), ("B", "failed")], start=1):
+            report = shard_report(index, 2, [("Suite", f"Case {plan_name}", 0, status)])
+            report["suites"][0]["plan"] = plan_name
+            report["suites"][0]["plan_path"] = f"{plan_name.lower()}.yaml"
+            report["plans"] = [{"path": "a.yaml", "name": "A", "summary": {}, "case_count": 1},
+                               {"path": "b.yaml", "name": "B", "summary": {}, "case_count": 1}]
+            reports.append(report)
+        merged = merge_reports(reports[::-1])
+
+        self.assertEqual([suite["plan"] for suite in merged["suites"]], ["A", "B"])
+        self.assertEqual([plan["summary"]["total"] for plan in merged["plans"]], [1, 1])
+        self.assertEqual(merged["plans"][1]["summary"]["failed"], 1)
+        self.assertEqual(merged["missing_cases"], [])
+        self.assertTrue(merged["complete"])
+
+    def test_batch_plans_with_the_same_name(self):
+        """Test that batch plans sharing a name are kept apart by path, not reported as duplicates."""
+        reports = []
+        for index, (path, status) in enumerate([("smoke/plan.yaml", "passed"), ("regression/plan.yaml", "failed")], start=1):
+            report = shard_report(index, 2, [("Suite", "Case", 0, status)])
+            report["suites"][0].update(plan="Unnamed Test Plan", plan_path=path)
+            report["plans"] = [{"path": "smoke/plan.yaml", "name": "Unnamed Test Plan", "summary": {}, "case_count": 1},
+                               {"path": "regression/plan.yaml", "name": "Unnamed Test Plan", "summary": {}, "case_count": 1}]
+            reports.append(report)
+        merged = merge_reports(reports[::-1])
+
+        self.assertEqual([suite["plan_path"] for suite in merged["suites"]], ["smoke/plan.yaml", "regression/plan.yaml"])
+        self.assertEqual([plan["summary"]["failed"] for plan in merged["plans"]], [0, 1])
+        self.assertEqual((merged["missing_cases"], merged["duplicate_cases"]), ([], []))
+        self.assertTrue(merged["complete"])
+
+    def test_cli_merges_without_configuration(self):
+        """Test that 'mmat merge-reports' writes the merged report without setting up MMAT."""
+        directory = tempfile.mkdtemp()
+        try:
+            report_files = []
+            for index, cases in enumerate([[("Suite", "A", 0, "passed")], [("Suite", "B", 1, "failed")]], start=1):
+                report_files.append(os.path.join(directory, f"shard-{index}.json"))
+                with open(report_files[-1], "w") as f:
+                    json.dump(shard_report(index, 2, cases, case_count=2), f)
+            output = os.path.join(directory, "merged", "report.json")
+
+            argv = ["mmat", "merge-reports", *report_files, "--output", output]
+            with mock.patch.object(sys, "argv", argv), mock.patch.object(cli, "MMAT", side_effect=AssertionError("MMAT was set up")):
+                cli.main()
+
+            with open(output) as f:
+                merged = json.load(f)
+            self.assertTrue(merged["complete"])
+            self.assertEqual([case["name"] for case in merged["suites"][0]["cases"]], ["A", "B"])
+            self.assertEqual(merged["merged_from"], report_files)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
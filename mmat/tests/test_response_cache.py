@@ -0,0 +1,85 @@
+# MMAT Response Cache Tests
+# Tests for the persistent model response cache.
+
+import os
+import shutil
+import unittest
+from mmat.models.response_cache import ResponseCache
+
+# Define a temporary directory for the cache
+TEST_CACHE_DIR = "test_response_cache_dir"
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        """Start every test from an empty cache directory."""
+        if os.path.exists(TEST_CACHE_DIR):
+            shutil.rmtree(TEST_CACHE_DIR)
+
+    def tearDown(self):
+        """Clean up the cache directory."""
+        if os.path.exists(TEST_CACHE_DIR):
+            shutil.rmtree(TEST_CACHE_DIR)
+
+    def test_hit_and_miss(self):
+        """Test that stored responses are returned and counted as hits."""
+        cache = ResponseCache(TEST_CACHE_DIR)
+        key = ResponseCache.make_key("vision", "digest", "prompt", "model", 1000)
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {"choices": [{"message": {"content": "a login form"}}]})
+        self.assertEqual(cache.get(key)["choices"][0]["message"]["content"], "a login form")
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_key_depends_on_every_part(self):
+        """Test that changing any key part gives a different key."""
+        base = ResponseCache.make_key("vision", "digest", "prompt", "model", 1000)
+        self.assertEqual(base, ResponseCache.make_key("vision", "digest", "prompt", "model", 1000))
+        self.assertNotEqual(base, ResponseCache.make_key("vision", "other", "prompt", "model", 1000))
+        self.assertNotEqual(base, ResponseCache.make_key("vision", "digest", "prompt", "model", 500))
+
+    def test_persists_between_instances(self):
+        """Test that entries written by one run are found by the next."""
+        ResponseCache(TEST_CACHE_DIR).put("k", {"value": 1})
+        reopened = ResponseCache(TEST_CACHE_DIR)
+        self.assertEqual(reopened.get("k"), {"value": 1})
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(TEST_CACHE_DIR, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a") # "b" is now the least recently used entry
+        cache.put("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_size_bound(self):
+        """Test that the total size stays under max_bytes."""
+        cache = ResponseCache(TEST_CACHE_DIR, max_bytes=200)
+        for i in range(10):
+            cache.put(str(i), "x" * 50)
+        self.assertLessEqual(cache.get_stats()["bytes"], 200)
+        self.assertEqual(cache.get("9"), "x" * 50)
+
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are misses and removed."""
+        ResponseCache(TEST_CACHE_DIR).put("k", {"value": 1})
+        self.assertEqual(ResponseCache(TEST_CACHE_DIR, ttl_seconds=60).get("k"), {"value": 1})
+
+        expired = ResponseCache(TEST_CACHE_DIR, ttl_seconds=0)
+        self.assertIsNone(expired.get("k"))
+        self.assertEqual(expired.get_stats()["expirations"], 1)
+        self.assertEqual(len(expired), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
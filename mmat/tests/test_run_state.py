@@ -0,0 +1,63 @@
+# MMAT Run State Tests
+# Tests for the test case content hashes and results kept between runs.
+
+import os
+import shutil
+import tempfile
+import unittest
+from mmat.test_runner.run_state import RunState, case_hash
+
+STEPS = [{"action": "navigate", "target": "/"}, {"action": "click", "selector": "#submit"}]
+
+class TestRunState(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "state", "run_state.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_case_hash(self):
+        """Test that the hash covers steps, parameters and base URL but not the derived step URL."""
+        base = case_hash(STEPS, {}, "https://example.com")
+        resolved = [dict(STEPS[0], url="https://example.com/"), STEPS[1]]
+        self.assertEqual(case_hash(resolved, {}, "https://example.com"), base)
+        self.assertNotEqual(case_hash(STEPS, {}, "https://staging.example.com"), base)
+        self.assertNotEqual(case_hash(STEPS, {"data": {"user": "bob"}}, "https://example.com"), base)
+        self.assertNotEqual(case_hash(STEPS[:1], {}, "https://example.com"), base)
+
+    def test_unchanged_requires_same_hash_and_pass(self):
+        """Test that only a case that passed with the same hash counts as unchanged, across save and load."""
+        state = RunState(self.path)
+        state.record("Plan/Suite/Passed", "abc", "passed")
+        state.record("Plan/Suite/Failed", "def", "failed")
+        state.save()
+
+        loaded = RunState(self.path)
+        self.assertTrue(loaded.is_unchanged("Plan/Suite/Passed", "abc"))
+        self.assertFalse(loaded.is_unchanged("Plan/Suite/Passed", "xyz"))
+        self.assertFalse(loaded.is_unchanged("Plan/Suite/Failed", "def"))
+        self.assertFalse(loaded.is_unchanged("Plan/Suite/New", "abc"))
+
+    def test_save_merges_records_of_other_processes(self):
+        """Test that saving keeps the records another process saved to the same file, and their durations."""
+        first = RunState(self.path)
+        second = RunState(self.path)
+        first.record("Plan/Suite/A", "abc", "passed", duration=1.5)
+        second.record("Plan/Suite/B", "def", "passed", duration=2.0)
+        first.save()
+        second.save()
+
+        self.assertEqual(RunState(self.path).durations(), {"Plan/Suite/A": 1.5, "Plan/Suite/B": 2.0})
+
+    def test_unreadable_state_is_ignored(self):
+        """Test that a corrupt state file is treated as empty."""
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(RunState(self.path).cases, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# MMAT Screenshot Capture Tests
+# Tests for in-memory step screenshots, their settings and background file writes.
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mmat.driver.screenshot_capture import ScreenshotCapture
+from mmat.utils import image_utils
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+JPEG_BYTES = b"\xff\xd8\xff\xe0" + b"\x00" * 32
+
+# Mock PlaywrightDriver returning encoded bytes like page.screenshot()
+class MockDriver:
+    def __init__(self):
+        self.calls = []
+
+    def capture_screenshot(self, image_format="png", quality=None, full_page=False, selector=None):
+        self.calls.append({"image_format": image_format, "quality": quality, "full_page": full_page, "selector": selector})
+        return JPEG_BYTES if image_format == "jpeg" else PNG_BYTES
+
+class TestImageUtils(unittest.TestCase):
+
+    def test_detect_mime_type(self):
+        """Test MIME type detection from the image signature."""
+        self.assertEqual(image_utils.detect_mime_type(PNG_BYTES), "image/png")
+        self.assertEqual(image_utils.detect_mime_type(JPEG_BYTES), "image/jpeg")
+        self.assertEqual(image_utils.detect_mime_type(b"RIFF\x00\x00\x00\x00WEBPVP8 "), "image/webp")
+        self.assertEqual(image_utils.detect_mime_type(b"unknown"), "image/png")
+
+    def test_fit_within(self):
+        """Test that sizes are scaled down to the limits, keeping the aspect ratio, and never up."""
+        self.assertEqual(image_utils.fit_within((1920, 1080), 960, None), (960, 540))
+        self.assertEqual(image_utils.fit_within((1920, 1080), 1280, 360), (640, 360))
+        self.assertEqual(image_utils.fit_within((800, 600), 1024, 768), (800, 600))
+
+    def test_read_image(self):
+        """Test that bytes are passed through and paths are read."""
+        self.assertEqual(image_utils.read_image(PNG_BYTES), PNG_BYTES)
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            f.write(PNG_BYTES)
+        try:
+            self.assertEqual(image_utils.read_image(f.name), PNG_BYTES)
+        finally:
+            os.remove(f.name)
+
+class TestScreenshotCapture(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_step_overrides_settings(self):
+        """Test that a step's 'screenshot' mapping overrides the configured settings."""
+        capture = ScreenshotCapture({"full_page": True})
+        driver = MockDriver()
+        screenshot = capture.capture(driver, self.directory, 3, {"screenshot": {"format": "jpeg", "quality": 70, "selector": "#cart"}})
+        self.assertEqual(driver.calls, [{"image_format": "jpeg", "quality": 70, "full_page": True, "selector": "#cart"}])
+        self.assertEqual(screenshot.mime_type, "image/jpeg")
+        self.assertEqual(screenshot.path, os.path.join(self.directory, "step_3.jpg"))
+
+    def test_retained_screenshot_written_after_drain(self):
+        """Test that retained screenshots are written in the background and complete on drain()."""
+        capture = ScreenshotCapture()
+        screenshot = capture.capture(MockDriver(), self.directory, 1)
+        capture.drain()
+        with open(screenshot.path, "rb") as f:
+            self.assertEqual(f.read(), PNG_BYTES)
+        self.assertEqual(capture.stats["captures"], 1)
+        self.assertEqual(capture.stats["files_written"], 1)
+
+    def test_not_retained_stays_in_memory(self):
+        """Test that retain: false keeps the screenshot in memory only."""
+        capture = ScreenshotCapture({"retain": False})
+        screenshot = capture.capture(MockDriver(), self.directory, 1)
+        capture.drain()
+        self.assertEqual(screenshot.data, PNG_BYTES)
+        self.assertIsNone(screenshot.path)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_webp_without_pillow_falls_back_to_png(self):
+        """Test that WebP output without Pillow keeps the PNG capture and its extension."""
+        capture = ScreenshotCapture({"format": "webp"})
+        with mock.patch.object(image_utils, "Image", None):
+            screenshot = capture.capture(MockDriver(), self.directory, 2)
+        capture.drain()
+        self.assertEqual(screenshot.data, PNG_BYTES)
+        self.assertEqual(screenshot.path, os.path.join(self.directory, "step_2.png"))
+        self.assertEqual(capture.stats["transcoded"], 0)
+
+    def test_unknown_format_uses_png(self):
+        """Test that an unknown format is replaced by PNG."""
+        capture = ScreenshotCapture({"format": "bmp", "retain": False})
+        driver = MockDriver()
+        capture.capture(driver, self.directory, 1)
+        self.assertEqual(driver.calls[0]["image_format"], "png")
+
+    def test_failed_capture_returns_none(self):
+        """Test that no screenshot is returned when the driver could not take one."""
+        driver = MockDriver()
+        driver.capture_screenshot = lambda **options: None
+        self.assertIsNone(ScreenshotCapture().capture(driver, self.directory, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# MMAT Screenshot Deduplicator Tests
+# Tests for reusing the analysis of visually identical screenshots.
+
+import unittest
+from mmat.analysis.screenshot_analyzer import ScreenshotAnalyzer
+from mmat.analysis.screenshot_deduplicator import ScreenshotDeduplicator, hash_distance
+
+# Mock VisionModel for testing
+class MockVisionModel:
+    def __init__(self):
+        self.calls = []
+
+    def analyze_screenshot(self, screenshot_path):
+        self.calls.append(screenshot_path)
+        return {"choices": [{"message": {"content": f"content of {screenshot_path}"}}]}
+
+    def analyze_screenshots(self, screenshot_paths, return_exceptions=False):
+        self.batches = getattr(self, "batches", []) + [list(screenshot_paths)]
+        return [self.analyze_screenshot(path) for path in screenshot_paths]
+
+# Perceptual hashes of the mock frames: step_2 differs from step_1 by one bit (a caret)
+FRAME_HASHES = {
+    "step_1.png": 0b1010_1010,
+    "step_2.png": 0b1010_1011,
+    "step_3.png": 0b0101_0101,
+}
+
+class TestScreenshotDeduplicator(unittest.TestCase):
+
+    def test_hash_distance(self):
+        """Test Hamming distance for perceptual hashes and equality for digests."""
+        self.assertEqual(hash_distance(0b1010, 0b1001), 2)
+        self.assertEqual(hash_distance("abc", "abc"), 0)
+        self.assertIsNone(hash_distance("abc", "abd"))
+
+    def test_similar_frames_reuse_analysis(self):
+        """Test that a frame within the threshold reuses the earlier analysis."""
+        vision_model = MockVisionModel()
+        deduplicator = ScreenshotDeduplicator(max_distance=2, hash_function=FRAME_HASHES.get)
+        analyzer = ScreenshotAnalyzer(vision_model, graph_api=None, deduplicator=deduplicator)
+
+        first = analyzer.analyze_screenshot("step_1.png")
+        second = analyzer.analyze_screenshot("step_2.png")
+        third = analyzer.analyze_screenshot("step_3.png")
+
+        self.assertEqual(vision_model.calls, ["step_1.png", "step_3.png"])
+        self.assertEqual(second["parsed_content"], first["parsed_content"])
+        self.assertTrue(second["deduplicated"])
+        self.assertNotIn("deduplicated", third)
+        self.assertEqual(deduplicator.stats, {"frames": 3, "calls_avoided": 1})
+
+    def test_threshold_zero_requires_exact_match(self):
+        """Test that with max_distance 0 a one-bit difference is analyzed again."""
+        vision_model = MockVisionModel()
+        deduplicator = ScreenshotDeduplicator(max_distance=0, hash_function=FRAME_HASHES.get)
+        analyzer = ScreenshotAnalyzer(vision_model, graph_api=None, deduplicator=deduplicator)
+
+        analyzer.analyze_screenshot("step_1.png")
+        analyzer.analyze_screenshot("step_2.png")
+        analyzer.analyze_screenshot("step_1.png")
+
+        self.assertEqual(vision_model.calls, ["step_1.png", "step_2.png"])
+        self.assertEqual(deduplicator.stats["calls_avoided"], 1)
+
+    def test_batch_sends_only_distinct_frames(self):
+        """Test that a batch sends one frame per group of similar frames and keeps the order."""
+        vision_model = MockVisionModel()
+        deduplicator = ScreenshotDeduplicator(max_distance=2, hash_function=FRAME_HASHES.get)
+        analyzer = ScreenshotAnalyzer(vision_model, graph_api=None, deduplicator=deduplicator)
+
+        results = analyzer.analyze_screenshots(["step_1.png", "step_2.png", "step_3.png"])
+
+        self.assertEqual(vision_model.batches, [["step_1.png", "step_3.png"]])
+        self.assertEqual([result["parsed_content"] for result in results],
+                         ["content of step_1.png", "content of step_1.png", "content of step_3.png"])
+        self.assertTrue(results[1]["deduplicated"])
+
+    def test_failed_analysis_is_not_reused(self):
+        """Test that a failed analysis is retried for the next similar frame."""
+        deduplicator = ScreenshotDeduplicator(hash_function=FRAME_HASHES.get)
+        frame, is_owner = deduplicator.claim(FRAME_HASHES["step_1.png"])
+        self.assertTrue(is_owner)
+        deduplicator.fail(frame)
+
+        _, is_owner = deduplicator.claim(FRAME_HASHES["step_2.png"])
+        self.assertTrue(is_owner)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# MMAT Screenshot Policy Tests
+# Tests for selecting the steps a screenshot is taken after.
+
+import unittest
+from mmat.test_runner.screenshot_policy import ScreenshotPolicy, count_captures
+
+class TestScreenshotPolicy(unittest.TestCase):
+
+    def test_always_captures_every_step(self):
+        """Test that the default policy captures every step."""
+        policy = ScreenshotPolicy()
+        self.assertEqual(policy.trigger({"action": "assert_url"}, 1, "passed"), "always")
+        self.assertFalse(policy.needs_dom_check)
+
+    def test_action_triggers(self):
+        """Test that only the configured actions trigger a capture."""
+        policy = ScreenshotPolicy({"mode": "triggers", "actions": ["navigate", "click"]})
+        self.assertEqual(policy.trigger({"action": "click"}, 1, "passed"), "action")
+        self.assertIsNone(policy.trigger({"action": "assert_url"}, 2, "passed"))
+        self.assertIsNone(policy.trigger({"action": "fill"}, 3, "passed"))
+
+    def test_failures_only(self):
+        """Test that a policy without actions captures failed and erroring steps only."""
+        policy = ScreenshotPolicy({"mode": "triggers", "actions": [], "on_failure": True})
+        self.assertIsNone(policy.trigger({"action": "click"}, 1, "passed"))
+        self.assertEqual(policy.trigger({"action": "click"}, 2, "failed"), "failure")
+        self.assertEqual(policy.trigger({"action": "click"}, 3, "error"), "failure")
+
+    def test_every_nth_step(self):
+        """Test sampling every Nth step."""
+        policy = ScreenshotPolicy({"mode": "triggers", "actions": [], "every_nth": 3})
+        captured = [number for number in range(1, 10) if policy.trigger({"action": "assert_url"}, number, "passed")]
+        self.assertEqual(captured, [3, 6, 9])
+
+    def test_dom_mutation(self):
+        """Test that DOM changes, new documents and unreadable counters trigger a capture."""
+        policy = ScreenshotPolicy({"mode": "triggers", "actions": [], "dom_mutation": True})
+        self.assertTrue(policy.needs_dom_check)
+        self.assertIsNone(policy.trigger({"action": "assert_url"}, 1, "passed", dom_mutations=0))
+        self.assertEqual(policy.trigger({"action": "click"}, 2, "passed", dom_mutations=4), "dom_mutation")
+        self.assertEqual(policy.trigger({"action": "navigate"}, 3, "passed", dom_mutations=-1), "dom_mutation")
+        self.assertEqual(policy.trigger({"action": "click"}, 4, "passed", dom_mutations=None), "dom_mutation")
+
+    def test_step_override(self):
+        """Test that a boolean 'screenshot' on a step forces or suppresses the capture."""
+        policy = ScreenshotPolicy({"mode": "triggers", "actions": []})
+        self.assertEqual(policy.trigger({"action": "assert_url", "screenshot": True}, 1, "passed"), "step")
+        self.assertIsNone(ScreenshotPolicy().trigger({"action": "click", "screenshot": False}, 2, "passed"))
+
+    def test_unknown_mode_uses_always(self):
+        """Test that an unknown mode falls back to capturing every step."""
+        self.assertEqual(ScreenshotPolicy({"mode": "sometimes"}).trigger({"action": "click"}, 1, "passed"), "always")
+
+    def test_count_captures(self):
+        """Test counting taken and avoided screenshots, ignoring shared steps and steps without a decision."""
+        steps = [
+            {"screenshot_trigger": "action"},
+            {"screenshot_trigger": None},
+            {"screenshot_trigger": None, "shared_from": "A"},
+            {"status": "skipped"},
+        ]
+        self.assertEqual(count_captures(steps), {"screenshots_captured": 1, "screenshots_avoided": 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# MMAT Sharding Tests
+# Tests for parsing shard specifications and splitting test cases into balanced shards.
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+import unittest
+from unittest import mock
+from mmat.config.config_manager import ConfigManager
+from mmat.reporting.report_merge import merge_reports
+from mmat.test_runner.run_state import RunState
+from mmat.test_runner.sharding import case_weights, parse_shard, partition
+
+# The runner imports the Playwright driver; mock its modules if Playwright is not installed
+try:
+    import playwright.sync_api  # noqa: F401
+    PLAYWRIGHT_MODULES = {}
+except ImportError:
+    PLAYWRIGHT_MODULES = {
+        "playwright": types.ModuleType("playwright"),
+        "playwright.sync_api": types.SimpleNamespace(sync_playwright=None),
+    }
+
+with mock.patch.dict(sys.modules, PLAYWRIGHT_MODULES):
+    from mmat.test_runner import test_runner
+
+# Mock browser driver: navigating to a '/slow' page takes a while, so recorded durations
+# do not follow the step counts
+class MockDriver:
+    visited = []
+
+    def __init__(self, config=None):
+        self.config = config
+        self.browser = None
+        self.page = None
+        self.url = ""
+
+    def launch_browser(self, browser_type="chromium", headless=True):
+        self.browser = True
+        self.new_context()
+
+    def new_context(self, storage_state=None):
+        self.page = object()
+
+    def navigate(self, url):
+        MockDriver.visited.append(url)
+        self.url = url
+        if "/slow" in url:
+            time.sleep(0.05)
+
+    def get_current_url(self):
+        return self.url
+
+    def close_context(self):
+        self.page = None
+
+    def close_browser(self):
+        self.browser = None
+
+def sharded_plan():
+    cases = []
+    for i in range(8):
+        path = f"/slow/{i}" if i % 3 == 0 else f"/fast/{i}"
+        cases.append({"name": f"c{i}", "steps": [{"action": "navigate", "target": path}] * (1 + i % 4)})
+    return {"test_plan": {"name": "Shop", "test_suites": [{"name": "Checkout", "test_cases": cases}]}}
+
+class TestSharding(unittest.TestCase):
+
+    def test_parse_shard(self):
+        """Test that i/N is parsed and invalid specifications are rejected."""
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_weights_fall_back_to_steps(self):
+        """Test that cases without a recorded duration are weighed by steps times the average seconds per step."""
+        self.assertEqual(case_weights(["a", "b"], [2, 3]), [2.0, 3.0])
+        self.assertEqual(case_weights(["a", "b"], [2, 3], {"a": 10.0}), [10.0, 15.0])
+
+    def test_partition_is_balanced_and_complete(self):
+        """Test that every case lands in exactly one shard and loads are balanced."""
+        keys = [f"case{i}" for i in range(7)]
+        weights = [8.0, 7.0, 6.0, 5.0, 4.0, 3.0, 3.0]
+        shards = partition(keys, weights, 3)
+
+        self.assertEqual(sorted(key for shard in shards for key in shard), sorted(keys))
+        loads = [sum(weights[keys.index(key)] for key in shard) for shard in shards]
+        self.assertLessEqual(max(loads) - min(loads), 3.0)
+
+    def test_partition_ignores_input_order(self):
+        """Test that every shard process computes the same partition regardless of case order."""
+        keys = ["a", "b", "c", "d"]
+        weights = [1.0, 1.0, 2.0, 2.0]
+        shards = partition(keys, weights, 2)
+        self.assertEqual(partition(keys[::-1], weights[::-1], 2), shards)
+
+
+class TestShardedRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        MockDriver.visited = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def runner(self, shard_durations=None):
+        config_manager = ConfigManager.__new__(ConfigManager)
+        config_manager.config = {
+            "environments": {"browser": {"config": {"baseUrl": "http://shop"}}},
+            "execution": {"run_state": os.path.join(self.directory, "run_state.json"),
+                          "history": os.path.join(self.directory, "history.db"),
+                          "shard_durations": shard_durations},
+            "screenshots": {"policy": {"mode": "triggers", "actions": [], "on_failure": False}},
+            "artifacts": {"enabled": False},
+        }
+        return test_runner.TestRunner(MockDriver(), config_manager, driver_factory=MockDriver)
+
+    def run_shards(self, count, shard_durations=None):
+        executed = []
+        self.reports = []
+        for index in range(1, count + 1):
+            runner = self.runner(shard_durations)
+            runner.execute_plan(sharded_plan(), shard=(index, count))
+            self.reports.append(runner.last_report)
+            executed.append([case["name"] for case in runner.last_report["suites"][0]["cases"] if "case_index" in case
+                             and case.get("status") != "not_run"])
+        return executed
+
+    def assert_disjoint_and_complete(self, executed):
+        names = [name for shard in executed for name in shard]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(sorted(names), [f"c{i}" for i in range(8)])
+
+    def test_shards_run_one_after_another_cover_every_case_once(self):
+        """Test that durations recorded by earlier shards do not change the split of later ones."""
+        for count in (2, 3):
+            self.assert_disjoint_and_complete(self.run_shards(count))
+            merged = merge_reports(self.reports)
+            self.assertTrue(merged["complete"])
+            self.assertEqual(merged["summary"]["total"], 8)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "history.db")))
+
+    def test_pinned_durations_balance_shards(self):
+        """Test that shards are split by the pinned durations file, which the runs leave untouched."""
+        path = os.path.join(self.directory, "shard_durations.json")
+        pinned = {"Shop/Checkout/c0": 20.0, "Shop/Checkout/c3": 0.5}
+        RunState.write_durations(path, pinned)
+        executed = self.run_shards(2, shard_durations=path)
+
+        keys = [f"Shop/Checkout/c{i}" for i in range(8)]
+        steps = [1 + i % 4 for i in range(8)]
+        expected = [sorted(key.rsplit("/", 1)[1] for key in shard) for shard in partition(keys, case_weights(keys, steps, pinned), 2)]
+        self.assertNotEqual(expected, [sorted(key.rsplit("/", 1)[1] for key in shard) for shard in partition(keys, steps, 2)])
+        self.assertEqual([sorted(shard) for shard in executed], expected)
+        self.assertEqual(RunState(path).durations(), pinned)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# MMAT SQLite Graph Store Tests
+# Tests for the persistent knowledge graph backend.
+
+import os
+import shutil
+import unittest
+from mmat.graph.graph_api import GraphAPI
+from mmat.graph.models import GraphEdge, GraphNode
+from mmat.graph.sqlite_store import SqliteGraphStore
+
+# Define a temporary directory for the database
+TEST_GRAPH_DIR = "test_graph_store_dir"
+TEST_GRAPH_DB = os.path.join(TEST_GRAPH_DIR, "graph.db")
+
+class TestSqliteGraphStore(unittest.TestCase):
+
+    def setUp(self):
+        if os.path.exists(TEST_GRAPH_DIR):
+            shutil.rmtree(TEST_GRAPH_DIR)
+
+    def tearDown(self):
+        if os.path.exists(TEST_GRAPH_DIR):
+            shutil.rmtree(TEST_GRAPH_DIR)
+
+    def test_upserts_written_in_batches(self):
+        """Test that writes are buffered until the batch is full or a query needs them."""
+        store = SqliteGraphStore(TEST_GRAPH_DB, batch_size=3)
+        store.add_node(GraphNode("home", "state", {"url": "/"}))
+        store.add_node(GraphNode("login", "state", {"url": "/login"}))
+        self.assertEqual(store.stats["transactions"], 0)
+        store.add_edge(GraphEdge("home", "login", "result", {"action": "click"}))
+        self.assertEqual(store.stats["transactions"], 1)
+
+        store.add_node(GraphNode("home", "state", {"url": "/", "title": "Home"}))
+        self.assertEqual(store.get_node("home").data["title"], "Home") # Query flushes pending writes
+        self.assertEqual(store.node_count(), 2)
+        store.close()
+
+    def test_queries(self):
+        """Test neighbour, type and attribute queries and traversal on the store."""
+        store = SqliteGraphStore(TEST_GRAPH_DB)
+        for node_id, url in [("a", "/"), ("b", "/login"), ("c", "/account")]:
+            store.add_node(GraphNode(node_id, "state", {"url": url, "depth": len(url)}))
+        store.add_node(GraphNode("button", "dom_element", {"selector": "#login"}))
+        store.add_edge(GraphEdge("a", "b", "result", {}))
+        store.add_edge(GraphEdge("b", "c", "result", {}))
+        store.add_edge(GraphEdge("a", "b", "result", {"action": "click"})) # Upsert of an existing edge
+
+        self.assertEqual(store.successors("a"), ["b"])
+        self.assertEqual(store.out_edges("a")[0].data, {"action": "click"})
+        self.assertEqual(store.predecessors("c", "result"), ["b"])
+        self.assertEqual([node.node_id for node in store.nodes_by_type("dom_element")], ["button"])
+        self.assertEqual([node.node_id for node in store.find_nodes("url", "/login")], ["b"])
+        self.assertEqual([node.node_id for node in store.find_nodes("depth", 1)], ["a"])
+        self.assertEqual(store.shortest_path("a", "c"), ["a", "b", "c"])
+        self.assertEqual(store.bfs("a"), ["a", "b", "c"])
+        store.close()
+
+    def test_graph_grows_across_runs(self):
+        """Test that steps recorded by one run are found, and updated, by the next."""
+        graph_api = GraphAPI(SqliteGraphStore(TEST_GRAPH_DB))
+        graph_api.record_step("Suite", "Case", 1, {"number": 1, "action": "navigate", "status": "passed"}, "https://example.com/")
+        graph_api.record_step("Suite", "Case", 2, {"number": 2, "action": "click", "status": "failed"}, "https://example.com/login")
+        graph_api.close()
+
+        graph_api = GraphAPI(SqliteGraphStore(TEST_GRAPH_DB))
+        first_step = GraphAPI.step_node_id("Suite", "Case", 1)
+        self.assertEqual(graph_api.get_next_step(first_step), GraphAPI.step_node_id("Suite", "Case", 2))
+        self.assertEqual(len(graph_api.get_nodes_by_type("state")), 2)
+
+        graph_api.record_step("Suite", "Case", 2, {"number": 2, "action": "click", "status": "passed"}, "https://example.com/login")
+        self.assertEqual(graph_api.get_node(GraphAPI.step_node_id("Suite", "Case", 2)).data["status"], "passed")
+        self.assertEqual(graph_api.graph.node_count(), 4)
+        self.assertEqual(graph_api.graph.to_execution_graph().successors(first_step, "result"), ["state:https://example.com/"])
+        graph_api.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# MMAT Streaming JSON Parser Tests
+# Tests for extracting test steps from a streamed LLM completion.
+
+import unittest
+from mmat.models.streaming_json import IncrementalJsonArrayParser
+
+STREAMED_CONTENT = (
+    'Here are the steps:\n```json\n['
+    '{"action": "navigate", "url": "https://example.com/[a]"}, '
+    '{"action": "fill", "selector": "#comment", "value": "a \\"}\\" b"}, '
+    '{"action": "click", "selector": "button"}'
+    ']\n```\nLet me know if you need more [steps].'
+)
+
+class TestIncrementalJsonArrayParser(unittest.TestCase):
+
+    def test_steps_yielded_when_complete(self):
+        """Test that each object is returned by the chunk that closes it."""
+        parser = IncrementalJsonArrayParser()
+        self.assertEqual(parser.feed('[{"action": "navigate", '), [])
+        self.assertEqual(parser.feed('"url": "/"}, {"action"'), [{"action": "navigate", "url": "/"}])
+        self.assertEqual(parser.feed(': "click"}]'), [{"action": "click"}])
+        self.assertTrue(parser.done)
+
+    def test_any_chunking_gives_same_steps(self):
+        """Test that brackets and quotes inside strings are handled across chunk boundaries."""
+        expected = [
+            {"action": "navigate", "url": "https://example.com/[a]"},
+            {"action": "fill", "selector": "#comment", "value": 'a "}" b'},
+            {"action": "click", "selector": "button"},
+        ]
+        for chunk_size in (1, 2, 3, 7, len(STREAMED_CONTENT)):
+            parser = IncrementalJsonArrayParser()
+            steps = []
+            for i in range(0, len(STREAMED_CONTENT), chunk_size):
+                steps.extend(parser.feed(STREAMED_CONTENT[i:i + chunk_size]))
+            self.assertEqual(steps, expected, f"chunk size {chunk_size}")
+
+    def test_text_after_array_ignored(self):
+        """Test that nothing is returned after the closing bracket of the array."""
+        parser = IncrementalJsonArrayParser()
+        parser.feed('[1, "two", [3]]')
+        self.assertEqual(parser.feed(' [4]'), [])
+
+    def test_invalid_element_skipped(self):
+        """Test that an element that is not valid JSON is skipped and counted."""
+        parser = IncrementalJsonArrayParser()
+        self.assertEqual(parser.feed('[{invalid}, {"action": "click"}]'), [{"action": "click"}])
+        self.assertEqual(parser.errors, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
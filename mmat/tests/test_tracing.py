@@ -0,0 +1,91 @@
+# MMAT Tracing Tests
+# Tests for nested timing spans and their Chrome trace and OpenTelemetry exports.
+
+import contextvars
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from mmat.utils.tracing import Tracer
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = Tracer()
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_disabled_tracer_records_nothing(self):
+        """Test that spans opened while disabled are shared no-ops."""
+        with self.tracer.span("step", number=1) as span:
+            span.set(status="passed")
+        self.assertIs(self.tracer.span("a"), self.tracer.span("b"))
+        self.assertEqual(self.tracer.spans, [])
+
+    def test_spans_nest_across_copied_contexts(self):
+        """Test that spans nest within a thread and in threads running a copy of the context."""
+        self.tracer.enable()
+        with self.tracer.span("step", number=1) as step:
+            with self.tracer.span("driver", action="click"):
+                pass
+            context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(self._analysis_span,))
+        thread.start()
+        thread.join()
+
+        spans = {span.name: span for span in self.tracer.spans}
+        self.assertIsNone(step.parent_id)
+        self.assertEqual(spans["driver"].parent_id, step.span_id)
+        self.assertEqual(spans["analysis"].parent_id, step.span_id)
+        self.assertNotEqual(spans["analysis"].thread_id, step.thread_id)
+        self.assertTrue(all(span.end_ns >= span.start_ns for span in self.tracer.spans))
+
+    def _analysis_span(self):
+        with self.tracer.span("analysis"):
+            pass
+
+    def test_errors_are_recorded(self):
+        """Test that an exception leaving a span is stored on it and propagated."""
+        self.tracer.enable()
+        with self.assertRaises(ValueError):
+            with self.tracer.span("vision.parse"):
+                raise ValueError("bad json")
+        self.assertEqual(self.tracer.spans[0].attributes["error"], "ValueError: bad json")
+
+    def test_exports(self):
+        """Test the Chrome trace and OpenTelemetry exports."""
+        self.tracer.enable()
+        with self.tracer.span("step", number=2):
+            with self.tracer.span("screenshot"):
+                pass
+
+        chrome_path = os.path.join(self.temp_dir, "trace.json")
+        self.assertEqual(self.tracer.export(chrome_path, "chrome"), 2)
+        with open(chrome_path) as f:
+            events = json.load(f)["traceEvents"]
+        complete = [event for event in events if event["ph"] == "X"]
+        self.assertEqual([event["name"] for event in complete], ["step", "screenshot"])
+        self.assertEqual(complete[0]["args"]["number"], 2)
+        self.assertTrue(any(event["ph"] == "M" for event in events))
+
+        otel_path = os.path.join(self.temp_dir, "otel", "trace.json")
+        self.tracer.export(otel_path, "otel")
+        with open(otel_path) as f:
+            spans = json.load(f)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        step, screenshot = spans
+        self.assertEqual(len(step["traceId"]), 32)
+        self.assertEqual(screenshot["parentSpanId"], step["spanId"])
+        self.assertNotIn("parentSpanId", step)
+        self.assertIn({"key": "number", "value": {"intValue": "2"}}, step["attributes"])
+        self.assertLessEqual(int(step["startTimeUnixNano"]), int(screenshot["startTimeUnixNano"]))
+
+        with self.assertRaises(ValueError):
+            self.tracer.export(chrome_path, "xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# MMAT Work Queue Tests
+# Tests for the work-stealing queue used by parallel test case execution.
+
+import unittest
+from mmat.test_runner.work_queue import WorkStealingQueue
+
+class TestWorkStealingQueue(unittest.TestCase):
+
+    def test_round_robin_assignment(self):
+        """Test that items are spread round-robin over the worker deques."""
+        queue = WorkStealingQueue(2)
+        for item in range(4):
+            queue.put(item)
+
+        self.assertEqual(queue.get(0), 0)
+        self.assertEqual(queue.get(1), 1)
+        self.assertEqual(queue.get(0), 2)
+        self.assertEqual(queue.get(1), 3)
+        self.assertEqual(queue.steals, 0)
+
+    def test_idle_worker_steals_from_back(self):
+        """Test that an idle worker steals the last item of the fullest deque."""
+        queue = WorkStealingQueue(2)
+        for item in range(3):
+            queue.put(item, worker_id=0)
+
+        self.assertEqual(queue.get(1), 2)
+        self.assertEqual(queue.get(0), 0)
+        self.assertEqual(queue.steals, 1)
+        self.assertEqual(len(queue), 1)
+
+    def test_empty_queue_returns_none(self):
+        """Test that get returns None once all work is taken."""
+        queue = WorkStealingQueue(3)
+        queue.put("only")
+        self.assertEqual(queue.get(2), "only")
+        self.assertIsNone(queue.get(0))
+        self.assertIsNone(queue.get(1))
+
+    def test_invalid_worker_count(self):
+        """Test that a pool needs at least one worker."""
+        with self.assertRaises(ValueError):
+            WorkStealingQueue(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
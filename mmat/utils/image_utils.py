@@ -0,0 +1,93 @@
+# MMAT Image Utilities
+# Helpers for screenshots held in memory or on disk: reading, MIME type detection,
+# and optional re-encoding and downscaling with Pillow.
+
+import io
+from typing import Optional, Tuple, Union
+
+try:
+    from PIL import Image # Optional: enables WebP output and downscaling
+except ImportError:
+    Image = None
+
+# A screenshot given to the analysis code: a file path or the encoded image bytes
+ImageSource = Union[str, bytes]
+
+# File extension and Pillow format name of every supported screenshot format
+IMAGE_FORMATS = {
+    "png": ("png", "PNG"),
+    "jpeg": ("jpg", "JPEG"),
+    "webp": ("webp", "WEBP"),
+}
+
+def read_image(image: ImageSource) -> bytes:
+    """Returns the encoded bytes of an image given as bytes or as a file path."""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    with open(image, "rb") as image_file:
+        return image_file.read()
+
+def describe_image(image: ImageSource) -> str:
+    """Returns a short label for log messages: the path, or the type and size of in-memory bytes."""
+    if isinstance(image, (bytes, bytearray)):
+        return f"<{detect_mime_type(image)} in memory, {len(image)} bytes>"
+    return str(image)
+
+def detect_mime_type(data: bytes) -> str:
+    """
+    Detects the MIME type of encoded image bytes from their signature.
+
+    Returns:
+        'image/png', 'image/jpeg', 'image/webp' or 'image/gif'; 'image/png' if the
+        signature is not recognized.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/png"
+
+def fit_within(size: Tuple[int, int], max_width: Optional[int], max_height: Optional[int]) -> Tuple[int, int]:
+    """Returns the largest size with the aspect ratio of `size` that fits the limits (never upscaled)."""
+    width, height = size
+    scale = 1.0
+    if max_width and width > max_width:
+        scale = min(scale, max_width / width)
+    if max_height and height > max_height:
+        scale = min(scale, max_height / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def transcode(data: bytes, image_format: str, quality: Optional[int] = None,
+              max_width: Optional[int] = None, max_height: Optional[int] = None) -> bytes:
+    """
+    Re-encodes an image in another format and/or downscales it to fit a maximum size.
+
+    Args:
+        data: The encoded image.
+        image_format: 'png', 'jpeg' or 'webp'.
+        quality: Quality (1-100) of JPEG and WebP output.
+        max_width: Maximum width in pixels, or None.
+        max_height: Maximum height in pixels, or None.
+
+    Returns:
+        The encoded result.
+
+    Raises:
+        RuntimeError: If Pillow is not installed.
+    """
+    if Image is None:
+        raise RuntimeError("Re-encoding or downscaling screenshots requires Pillow (pip install Pillow).")
+    with Image.open(io.BytesIO(data)) as image:
+        size = fit_within(image.size, max_width, max_height)
+        if size != image.size:
+            image = image.resize(size, Image.LANCZOS)
+        if image_format == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB") # JPEG has no alpha channel
+        options = {"quality": quality} if quality and image_format in ("jpeg", "webp") else {}
+        output = io.BytesIO()
+        image.save(output, format=IMAGE_FORMATS[image_format][1], **options)
+    return output.getvalue()
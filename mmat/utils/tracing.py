@@ -0,0 +1,209 @@
+# MMAT Tracing Utility
+# Nested timing spans across the runner, driver, screenshot and model phases,
+# exported as Chrome trace or OpenTelemetry JSON files.
+
+import contextvars
+import itertools
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# The innermost open span of the current thread or asyncio task
+_current_span: contextvars.ContextVar = contextvars.ContextVar("mmat_current_span", default=None)
+
+class Span:
+    """A finished or running span: a named, timed section of work with attributes."""
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "thread_id", "thread_name", "attributes")
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+
+    def set(self, **attributes):
+        """Adds attributes to the span, e.g. a status known only at its end."""
+        self.attributes.update(attributes)
+
+class _NoopSpan:
+    """Stands in for spans while tracing is disabled, so instrumented code costs one check."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class _SpanContext:
+    """Opens a span on enter, nested in the current one, and records it on exit."""
+    __slots__ = ("_tracer", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        self._span = Span(self._name, self._tracer._next_id(), parent.span_id if parent else None, self._attributes)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._span.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self._span.attributes["error"] = f"{exc_type.__name__}: {exc_value}"
+        _current_span.reset(self._token)
+        self._tracer._finish(self._span)
+        return False
+
+class Tracer:
+    """
+    Collects spans in memory while enabled.
+
+    Spans nest through a context variable: a span opened inside another one (in
+    the same thread or asyncio task, or in work handed to a thread together with a
+    copy of the context) becomes its child. While disabled, span() returns a shared
+    no-op object. Use the process-wide instance through the module's span() function.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[Span] = []
+        self.trace_id = ""
+        self._epoch_offset_ns = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def enable(self):
+        """Starts a new trace and records spans from now on."""
+        with self._lock:
+            self.spans = []
+            self.trace_id = secrets.token_hex(16)
+            # perf_counter has no epoch; anchor it once for exporters needing wall-clock times
+            self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+            self.enabled = True
+
+    def disable(self):
+        """Stops recording spans. Recorded spans are kept for export."""
+        self.enabled = False
+
+    def span(self, name: str, **attributes):
+        """
+        Returns a context manager timing a section of work.
+
+        Args:
+            name: Name of the span, e.g. 'step' or 'vision.request'.
+            **attributes: Attributes stored with the span.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _SpanContext(self, name, attributes)
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Returns the spans as Chrome trace events (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        start_ns = spans[0].start_ns if spans else 0
+        events = []
+        threads = {}
+        for span in spans:
+            threads.setdefault(span.thread_id, span.thread_name)
+            events.append({
+                "name": span.name, "cat": span.name.split(".")[0], "ph": "X", "pid": pid, "tid": span.thread_id,
+                "ts": (span.start_ns - start_ns) / 1000, "dur": (span.end_ns - span.start_ns) / 1000,
+                "args": dict(span.attributes, span_id=span.span_id, parent_id=span.parent_id),
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otel(self) -> Dict[str, Any]:
+        """Returns the spans in the OpenTelemetry (OTLP) JSON format."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        otel_spans = []
+        for span in spans:
+            otel_span = {
+                "traceId": self.trace_id,
+                "spanId": f"{span.span_id:016x}",
+                "name": span.name,
+                "kind": 1, # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns + self._epoch_offset_ns),
+                "endTimeUnixNano": str(span.end_ns + self._epoch_offset_ns),
+                "attributes": [_otel_attribute(key, value) for key, value in span.attributes.items()]
+                              + [_otel_attribute("thread.name", span.thread_name)],
+            }
+            if span.parent_id:
+                otel_span["parentSpanId"] = f"{span.parent_id:016x}"
+            if "error" in span.attributes:
+                otel_span["status"] = {"code": 2, "message": span.attributes["error"]} # STATUS_CODE_ERROR
+            otel_spans.append(otel_span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_otel_attribute("service.name", "mmat")]},
+            "scopeSpans": [{"scope": {"name": "mmat"}, "spans": otel_spans}],
+        }]}
+
+    def export(self, path: str, trace_format: str = "chrome") -> int:
+        """
+        Writes the recorded spans to a JSON file.
+
+        Args:
+            path: Path of the trace file.
+            trace_format: 'chrome' for the Chrome trace event format, 'otel' for OTLP JSON.
+
+        Returns:
+            The number of spans written.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if trace_format == "chrome":
+            trace = self.to_chrome_trace()
+        elif trace_format == "otel":
+            trace = self.to_otel()
+        else:
+            raise ValueError(f"Unknown trace format '{trace_format}'. Expected 'chrome' or 'otel'.")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return len(self.spans)
+
+def _otel_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+tracer = Tracer()
+
+def span(name: str, **attributes):
+    """Opens a span on the process-wide tracer. See Tracer.span()."""
+    return tracer.span(name, **attributes)